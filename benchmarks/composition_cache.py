@@ -0,0 +1,65 @@
+'''Benchmark reading and writing a search engine export of glycan compositions with
+and without the shared :class:`~glypy.io.composition_cache.CompositionCache`.
+
+A synthetic export is generated by drawing ``--lines`` compositions from a
+vocabulary of ``--distinct`` random N-glycan compositions, written in the
+GlyConnect and Byonic dialects.
+
+Usage::
+
+    python benchmarks/composition_cache.py [--lines N] [--distinct N] [--seed N]
+'''
+import argparse
+import random
+import time
+
+from glypy.io import byonic, glyconnect
+from glypy.structure.glycan_composition import FrozenGlycanComposition
+
+
+def synthetic_export(lines, distinct, seed):
+    rng = random.Random(seed)
+    space = [(hex_, hexnac, dhex, neuac) for hex_ in range(3, 16) for hexnac in range(2, 11)
+             for dhex in range(6) for neuac in range(6)]
+    vocabulary = rng.sample(space, min(distinct, len(space)))
+    compositions = []
+    for hex_, hexnac, dhex, neuac in vocabulary:
+        gc = FrozenGlycanComposition(Hex=hex_, HexNAc=hexnac)
+        if dhex:
+            gc['dHex'] = dhex
+        if neuac:
+            gc['NeuAc'] = neuac
+        compositions.append(gc)
+    return [rng.choice(compositions) for _ in range(lines)]
+
+
+def timed(label, fn, n):
+    start = time.time()
+    result = fn()
+    elapsed = time.time() - start
+    print("%s: %0.3f sec, %0.1f lines/sec" % (label, elapsed, n / elapsed))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1000000)
+    parser.add_argument("--distinct", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    compositions = synthetic_export(args.lines, args.distinct, args.seed)
+    n = len(compositions)
+    print("%d lines, %d distinct compositions" % (n, len(set(map(str, compositions)))))
+
+    for module in (glyconnect, byonic):
+        name = module.__name__.split(".")[-1]
+        texts = timed("%s dumps, no cache" % name, lambda: [module.dumps(gc) for gc in compositions], n)
+        timed("%s loads, no cache" % name, lambda: [module.loads(text) for text in texts], n)
+        module.composition_cache.clear()
+        parsed = timed("%s loads_many, shared cache" % name, lambda: module.loads_many(texts), n)
+        timed("%s dumps_many, shared cache" % name, lambda: module.dumps_many(parsed), n)
+        print(module.composition_cache)
+
+
+if __name__ == "__main__":
+    main()
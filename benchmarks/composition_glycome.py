@@ -0,0 +1,62 @@
+'''Benchmark simulating a biosynthesis pathway at the composition level with
+:class:`~glypy.enzyme.CompositionGlycome` against the structure level
+:class:`~glypy.enzyme.Glycome`.
+
+``--pathway`` selects the full N-glycan pathway from :func:`~glypy.enzyme.make_n_glycan_pathway`
+or the mucin type O-glycan pathway from :func:`~glypy.enzyme.make_mucin_type_o_glycan_pathway`.
+Both are unbounded, so runs are limited to ``--generations`` and to products of at most
+``--max-size`` residues. The compositions of the structures are checked to be a subset of
+those found by :class:`~glypy.enzyme.CompositionGlycome`.
+
+Usage::
+
+    python benchmarks/composition_glycome.py [--pathway n-glycan|mucin] [--generations N] [--max-size N]
+'''
+import argparse
+import time
+
+from glypy.enzyme import (
+    Glycome, CompositionGlycome, make_n_glycan_pathway, make_mucin_type_o_glycan_pathway)
+from glypy.io import glycoct
+from glypy.structure.glycan_composition import HashableGlycanComposition
+
+pathways = {
+    "n-glycan": make_n_glycan_pathway,
+    "mucin": make_mucin_type_o_glycan_pathway,
+}
+
+
+def timed(label, glycome, generations):
+    start = time.time()
+    sizes = [len(generation) for generation in glycome.run(generations)]
+    elapsed = time.time() - start
+    print("%s: %d generations, %d seen, %0.3f sec" % (label, len(sizes), len(glycome.seen), elapsed))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pathway", choices=sorted(pathways), default="n-glycan")
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--max-size", type=int, default=14)
+    args = parser.parse_args()
+    glycosylases, glycosyltransferases, seeds = pathways[args.pathway]()
+    max_size = args.max_size
+
+    structures = Glycome(glycosylases, glycosyltransferases, seeds,
+                         limits=[lambda structure: len(structure) <= max_size])
+    structure_time = timed("structures", structures, args.generations)
+    compositions = CompositionGlycome(glycosylases, glycosyltransferases, seeds,
+                                      limits=[lambda composition: sum(composition.values()) <= max_size])
+    composition_time = timed("compositions", compositions, args.generations)
+
+    graph = compositions.to_enzyme_graph()
+    projected = {HashableGlycanComposition.from_glycan(glycoct.loads(structures.structure_text(key)))
+                 for key in structures.seen}
+    print("%d structure compositions, %d found, all covered: %s" % (
+        len(projected), graph.node_count(), projected <= set(graph.nodes())))
+    print("speedup: %0.1fx" % (structure_time / composition_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+'''Benchmark computing the masses of many glycan compositions with
+:class:`~glypy.composition.composition_matrix.GlycanCompositionMatrix` against
+:meth:`~glypy.structure.glycan_composition.GlycanComposition.mass` and
+:func:`~glypy.composition.calculate_mass` one composition at a time.
+
+Usage::
+
+    python benchmarks/composition_mass.py [--max-hex N] [--max-hexnac N] [--max-neuac N] [--max-fuc N] [--charge N]
+'''
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from glypy.composition import calculate_mass
+from glypy.composition.composition_matrix import CompositionMatrix, GlycanCompositionMatrix
+from glypy.structure.glycan_composition import FrozenGlycanComposition
+
+
+def timed(label, fn, n=1):
+    start = time.time()
+    result = fn()
+    elapsed = time.time() - start
+    print("%s: %0.3f sec (%0.7f sec each)" % (label, elapsed, elapsed / n))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-hex", type=int, default=15)
+    parser.add_argument("--max-hexnac", type=int, default=10)
+    parser.add_argument("--max-neuac", type=int, default=5)
+    parser.add_argument("--max-fuc", type=int, default=5)
+    parser.add_argument("--charge", type=int, default=-2)
+    args = parser.parse_args()
+    compositions = [
+        FrozenGlycanComposition(Hex=hex_, HexNAc=hexnac, Neu5Ac=neuac, Fuc=fuc)
+        for hex_, hexnac, neuac, fuc in itertools.product(
+            range(3, args.max_hex + 1), range(2, args.max_hexnac + 1),
+            range(args.max_neuac + 1), range(args.max_fuc + 1))]
+    n = len(compositions)
+    print("%d compositions" % n)
+    charge = args.charge
+
+    expected = timed("GlycanComposition.mass", lambda: [c.mass(charge=charge) for c in compositions], n)
+    totals = [c.total_composition() for c in compositions]
+    timed("calculate_mass", lambda: [calculate_mass(c, charge=charge) for c in totals], n)
+
+    matrix = timed("GlycanCompositionMatrix.from_glycan_compositions",
+                   lambda: GlycanCompositionMatrix.from_glycan_compositions(compositions), n)
+    found = timed("GlycanCompositionMatrix.mass", lambda: matrix.mass(charge=charge), n)
+    timed("GlycanCompositionMatrix.mass, charges -1 to -4", lambda: matrix.mass(charge=[-1, -2, -3, -4]), n)
+    elements = timed("CompositionMatrix.from_compositions", lambda: CompositionMatrix.from_compositions(totals), n)
+    timed("CompositionMatrix.mass", lambda: elements.mass(charge=charge), n)
+    print("max difference: %0.3g" % np.abs(found - np.array(expected)).max())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+'''Benchmark writing and reading an enzyme graph in the JSON format of
+:meth:`~glypy.enzyme.EnzymeGraph.dump` and the compact format of
+:meth:`~glypy.enzyme.EnzymeGraph.dump_compact`.
+
+Without an input file, the N-glycan graph in ``test_data/enzyme_graph.json`` is used.
+With ``--structures``, nodes are parsed into :class:`~glypy.structure.glycan.Glycan`
+instances through :class:`~glypy.enzyme.GlycanStructureEnzymeGraph`.
+
+Usage::
+
+    python benchmarks/enzyme_graph_io.py [enzyme_graph.json] [--structures]
+'''
+import argparse
+import io
+import time
+
+from glypy.enzyme import EnzymeGraph, GlycanStructureEnzymeGraph
+
+
+def timed(label, fn):
+    start = time.time()
+    result = fn()
+    elapsed = time.time() - start
+    print("%s: %0.3f sec" % (label, elapsed))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs='?', default="test_data/enzyme_graph.json")
+    parser.add_argument("--structures", action="store_true")
+    args = parser.parse_args()
+    graph_type = GlycanStructureEnzymeGraph if args.structures else EnzymeGraph
+    with open(args.path, 'rt') as fh:
+        graph = timed("load JSON", lambda: graph_type.load(fh))
+    print("%d nodes, %d edges" % (graph.node_count(), graph.edge_count()))
+
+    text = timed("dumps JSON", graph.dumps)
+    buffer = io.StringIO()
+    timed("dump_compact", lambda: graph.dump_compact(buffer))
+    compact = buffer.getvalue()
+    print("JSON: %d characters, compact: %d characters" % (len(text), len(compact)))
+
+    timed("loads JSON", lambda: graph_type.loads(text))
+    timed("load_compact", lambda: graph_type.load_compact(io.StringIO(compact)))
+    timed("iter_compact", lambda: sum(1 for _ in graph_type.iter_compact(io.StringIO(compact))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+'''Benchmark shortest path, neighbor and reachability queries on a large synthetic enzyme
+graph with :class:`~glypy.enzyme.EnzymeGraph` and :class:`~glypy.enzyme.IndexedEnzymeGraph`.
+
+Reachability without one enzyme is compared between cloning the graph and calling
+:meth:`~glypy.enzyme.EnzymeGraph.remove_enzyme`, and an enzyme-masked traversal of the index.
+
+The graph is layered like a simulated glycome: each node has ``--degree`` children in
+the next few layers, each reached by one of ``--enzymes`` enzymes.
+
+Usage::
+
+    python benchmarks/enzyme_graph_paths.py [--nodes N] [--degree N] [--enzymes N] [--queries N] [--seed N]
+'''
+import argparse
+import random
+import time
+
+from glypy.enzyme import EnzymeGraph
+
+
+def synthetic_graph(nodes, degree, enzymes, seed):
+    rng = random.Random(seed)
+    width = max(int(nodes ** 0.5), 1)
+    names = ["enzyme%d" % i for i in range(enzymes)]
+    graph = EnzymeGraph()
+    for i in range(nodes - width):
+        layer_end = (i // width + 1) * width
+        for _ in range(degree):
+            child = rng.randrange(layer_end, min(layer_end + 2 * width, nodes))
+            graph.add("node%d" % i, "node%d" % child, rng.choice(names))
+    graph.seeds = {"node0"}
+    return graph
+
+
+def timed(label, fn, n=1):
+    start = time.time()
+    result = fn()
+    elapsed = time.time() - start
+    print("%s: %0.3f sec (%0.5f sec each)" % (label, elapsed, elapsed / n))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=100000)
+    parser.add_argument("--degree", type=int, default=3)
+    parser.add_argument("--enzymes", type=int, default=12)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    graph = synthetic_graph(args.nodes, args.degree, args.enzymes, args.seed)
+    print("%d nodes, %d edges" % (graph.node_count(), graph.edge_count()))
+    index = timed("index", graph.index)
+    source = "node0"
+    distances = index.distances_from(source)
+    rng = random.Random(args.seed)
+    targets = rng.sample(sorted(distances), args.queries)
+    n = len(targets)
+
+    paths = timed("EnzymeGraph.path_between", lambda: [graph.path_between(source, t) for t in targets if t != source], n)
+    indexed = timed("IndexedEnzymeGraph.shortest_path",
+                    lambda: [index.shortest_path(source, t) for t in targets if t != source], n)
+    assert [len(p) for p in paths] == [len(p) for p in indexed]
+    timed("IndexedEnzymeGraph.shortest_paths_from", lambda: index.shortest_paths_from(source, targets), n)
+    timed("EnzymeGraph.parents", lambda: [graph.parents(t) for t in targets], n)
+    timed("IndexedEnzymeGraph.parents", lambda: [index.parents(t) for t in targets], n)
+
+    dropped = sorted(index.enzymes)[:3]
+
+    def remove_enzyme():
+        result = []
+        for enzyme in dropped:
+            clone = graph.clone()
+            clone.remove_enzyme(enzyme)
+            result.append(clone.node_count())
+        return result
+
+    def masked():
+        return [len(index.descendants(graph.seeds, set(index.enzymes) - {enzyme})) for enzyme in dropped]
+
+    counts = timed("EnzymeGraph.clone + remove_enzyme", remove_enzyme, len(dropped))
+    assert counts == timed("IndexedEnzymeGraph.descendants", masked, len(dropped))
+    timed("IndexedEnzymeGraph.reachable", lambda: index.reachable(targets, enzymes=index.enzymes[1:]), n)
+    timed("IndexedEnzymeGraph.minimal_enzymes_many", lambda: index.minimal_enzymes_many(targets), n)
+
+
+if __name__ == "__main__":
+    main()
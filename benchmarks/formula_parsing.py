@@ -0,0 +1,88 @@
+'''Benchmark building :class:`~glypy.composition.Composition` objects from formulae, with and
+without :data:`~glypy.composition.formula_parser.formula_cache`.
+
+Formulae are drawn from plain, isotope-labelled and parenthesized forms. Element symbols are
+matched with :class:`~glypy.composition.formula_parser.ElementMatcher` and with the previous
+approach of testing every element of ``mass_data`` from longest to shortest name.
+
+Usage::
+
+    python benchmarks/formula_parsing.py [--formulae N] [--repeats N] [--seed N]
+'''
+import argparse
+import random
+import time
+
+from glypy.composition import Composition
+from glypy.composition.formula_parser import formula_cache, parse_formula, element_matcher
+from glypy.composition.mass_dict import nist_mass
+
+elements = ["C", "H", "N", "O", "S", "P", "Na", "K", "Cl", "Ca", "Fe", "Se"]
+isotopes = ["C[13]", "H[2]", "N[15]", "O[18]"]
+
+
+def random_formulae(n, rng):
+    formulae = []
+    for i in range(n):
+        kind = i % 3
+        atoms = ["%s%d" % (rng.choice(elements), rng.randint(1, 40)) for _ in range(rng.randint(2, 6))]
+        if kind == 1:
+            atoms.append("%s%d" % (rng.choice(isotopes), rng.randint(1, 6)))
+        elif kind == 2:
+            atoms.insert(rng.randrange(len(atoms)), "(%s%d)%d" % (
+                rng.choice(elements), rng.randint(1, 4), rng.randint(2, 5)))
+            atoms.append("(%s)%d" % ("".join(rng.sample(isotopes, 2)), rng.randint(1, 3)))
+        formulae.append("".join(atoms))
+    return formulae
+
+
+def sorted_match(formula, end, mass_data=nist_mass):
+    for element_name in sorted(mass_data, key=len, reverse=True):
+        if formula.endswith(element_name, 0, end + 1):
+            return element_name
+
+
+def timed(label, fn, n=1):
+    start = time.time()
+    result = fn()
+    elapsed = time.time() - start
+    print("%s: %0.3f sec (%0.7f sec each)" % (label, elapsed, elapsed / n))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--formulae", type=int, default=300)
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+    formulae = random_formulae(args.formulae, rng)
+    workload = formulae * args.repeats
+    rng.shuffle(workload)
+    n = len(workload)
+    print("%d formulae, %d distinct" % (n, len(formulae)))
+
+    parens = [formula for formula in formulae if "(" in formula]
+    timed("parse_formula, parenthesized", lambda: [parse_formula(f) for f in parens], len(parens))
+    plain = [formula for formula in formulae if "(" not in formula]
+    timed("parse_formula, plain and isotope-labelled", lambda: [parse_formula(f) for f in plain], len(plain))
+
+    positions = [(formula, i) for formula in parens for i, c in enumerate(formula) if c.isalpha()]
+    matcher = element_matcher(nist_mass)
+    expected = timed("sorted element match", lambda: [sorted_match(f, i) for f, i in positions], len(positions))
+    found = timed("ElementMatcher.match", lambda: [matcher.match(f, i) for f, i in positions], len(positions))
+    assert expected == found
+
+    formula_cache.clear()
+    formula_cache.maxsize = 0
+    uncached = timed("Composition, uncached", lambda: [Composition(f) for f in workload], n)
+    formula_cache.maxsize = 2 ** 16
+    formula_cache.clear()
+    cached = timed("Composition, cached", lambda: [Composition(f) for f in workload], n)
+    assert uncached == cached
+    print(formula_cache)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+'''Benchmark parsing serialized glycan compositions with :meth:`GlycanComposition.parse`,
+the memoized :meth:`HashableGlycanComposition.parse` and :meth:`GlycanComposition.parse_many`.
+
+A synthetic list of ``--lines`` strings is drawn from random N-glycan compositions.
+
+Usage::
+
+    python benchmarks/glycan_composition_parse.py [--lines N] [--seed N]
+'''
+import argparse
+import random
+import time
+
+from glypy.structure.glycan_composition import GlycanComposition, HashableGlycanComposition
+
+
+def synthetic_strings(lines, seed):
+    rng = random.Random(seed)
+    return [str(HashableGlycanComposition(
+        Hex=rng.randint(3, 12), HexNAc=rng.randint(2, 8), Fuc=rng.randint(0, 3), Neu5Ac=rng.randint(0, 4)))
+        for _ in range(lines)]
+
+
+def timed(label, fn, n):
+    start = time.time()
+    result = fn()
+    elapsed = time.time() - start
+    print("%s: %0.3f sec, %0.1f strings/sec" % (label, elapsed, n / elapsed))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=200000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    texts = synthetic_strings(args.lines, args.seed)
+    n = len(texts)
+    print("%d strings, %d distinct" % (n, len(set(texts))))
+
+    timed("HashableGlycanComposition.parse", lambda: [HashableGlycanComposition.parse(t) for t in texts], n)
+    timed("HashableGlycanComposition.parse_many", lambda: HashableGlycanComposition.parse_many(texts), n)
+    sample = texts[:n // 10]
+    m = len(sample)
+    timed("GlycanComposition.parse", lambda: [GlycanComposition.parse(t) for t in sample], m)
+    timed("GlycanComposition.parse_many", lambda: GlycanComposition.parse_many(sample), m)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+'''Benchmark simulating the N-glycan biosynthesis pathway from
+:func:`~glypy.enzyme.make_n_glycan_pathway` with :class:`~glypy.enzyme.Glycome`,
+reporting the time and number of structures for each generation.
+
+By default the sialyltransferases, ``gntE``, ``agal13galt`` and ``fuct3`` are
+removed, as in the test suite, which keeps the pathway finite. Pass ``--all-enzymes``
+to use the full pathway, which should be limited with ``--generations``.
+
+``--processes`` takes a comma separated list of worker counts to compare, each run
+with a :class:`~glypy.enzyme.MultiprocessingGlycome`. A count of 0 runs the
+single process :class:`~glypy.enzyme.Glycome`.
+
+Usage::
+
+    python benchmarks/glycome_generations.py [--generations N] [--all-enzymes] [--processes 0,1,2,4]
+'''
+import argparse
+import time
+
+from glypy.enzyme import Glycome, MultiprocessingGlycome, make_n_glycan_pathway
+
+
+def simulate(glycosylases, glycosyltransferases, seeds, processes, generations):
+    if processes:
+        glycome = MultiprocessingGlycome(glycosylases, glycosyltransferases, seeds, processes=processes)
+        glycome._log = lambda message: None
+    else:
+        glycome = Glycome(glycosylases, glycosyltransferases, seeds)
+    print("processes: %d" % processes)
+    start = last = time.time()
+    try:
+        for i, generation in enumerate(glycome.run(generations), 1):
+            now = time.time()
+            print("  generation %d: %d products, %d seen, %0.3f sec (%0.3f total)" % (
+                i, len(generation), len(glycome.seen), now - last, now - start))
+            last = now
+    finally:
+        if processes:
+            glycome.close()
+    elapsed = time.time() - start
+    graph = glycome.to_enzyme_graph()
+    print("  %d nodes, %d edges, %0.3f sec" % (graph.node_count(), graph.edge_count(), elapsed))
+    if processes:
+        print("  %r, %d false positives" % (glycome.seen_filter, glycome.filter_false_positives))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--generations", type=int, default=50)
+    parser.add_argument("--all-enzymes", action="store_true")
+    parser.add_argument("--processes", default="0",
+                        help="Comma separated worker process counts, 0 for a single process Glycome")
+    args = parser.parse_args()
+
+    timings = []
+    for processes in [int(n) for n in args.processes.split(",")]:
+        glycosylases, glycosyltransferases, seeds = make_n_glycan_pathway()
+        if not args.all_enzymes:
+            for name in ("gntE", "agal13galt", "siat2_3", "siat2_6", "fuct3"):
+                glycosyltransferases.pop(name)
+        timings.append((processes, simulate(glycosylases, glycosyltransferases, seeds,
+                                            processes, args.generations)))
+    baseline = timings[0][1]
+    for processes, elapsed in timings:
+        print("processes %d: %0.3f sec, %0.2fx" % (processes, elapsed, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+'''Benchmark resolving glycan compositions against the GNOme subsumption hierarchy
+one at a time with :meth:`~glypy.io.gnome.GNOme.resolve` and in bulk with
+:meth:`~glypy.io.gnome.GNOme.resolve_many`.
+
+The hierarchy is read from a snapshot written by :meth:`~glypy.io.gnome.GNOme.save`,
+or parsed from the OWL file otherwise. The queries are the glycans of the
+composition level nodes, repeated up to ``--limit``.
+
+Usage::
+
+    python benchmarks/gnome_resolve.py gno.owl[.gz]|gnome.snapshot [--limit N] [--level LEVEL]
+'''
+import argparse
+import time
+import warnings
+
+from glypy.io import gnome
+
+
+def timed(label, fn, n):
+    start = time.time()
+    result = fn()
+    elapsed = time.time() - start
+    print("%s: %0.3f sec, %0.1f compositions/sec" % (label, elapsed, n / elapsed))
+    return result
+
+
+def load(path):
+    try:
+        return gnome.GNOme.load_snapshot(path)
+    except ValueError:
+        return gnome.GNOme.load(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--limit", type=int, default=10000)
+    parser.add_argument("--level", default="saccharide")
+    args = parser.parse_args()
+    level = gnome.SubsumptionLevel[args.level]
+    start = time.time()
+    hierarchy = load(args.path)
+    print("load: %0.3f sec, %d terms" % (time.time() - start, len(hierarchy.terms)))
+
+    queries = []
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for acc in hierarchy.subsumption_levels.get("composition", []):
+            gc = hierarchy.terms[acc].glycan_composition()
+            if gc is not None:
+                queries.append(gc)
+    queries = (queries * (args.limit // max(len(queries), 1) + 1))[:args.limit]
+    n = len(queries)
+    print("%d compositions" % n)
+
+    timed("resolve, cold index", lambda: [hierarchy.resolve(gc, level) for gc in queries], n)
+    timed("resolve, warm index", lambda: [hierarchy.resolve(gc, level) for gc in queries], n)
+    timed("resolve_many", lambda: hierarchy.resolve_many(queries, level), n)
+
+
+if __name__ == "__main__":
+    main()
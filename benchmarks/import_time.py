@@ -0,0 +1,70 @@
+'''Measure the time taken to ``import glypy`` and load the named structure
+indices, with and without the compiled data cache, using ``python -X importtime``.
+
+Usage::
+
+    python benchmarks/import_time.py [--repeats N] [--max-warm-ms MS]
+
+Exits with a non-zero status if the warm-cache import of
+:mod:`glypy.structure.named_structures` exceeds ``--max-warm-ms``, so it can
+guard against regressions in CI.
+'''
+import argparse
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+STATEMENT = (
+    "import time; start = time.perf_counter(); import glypy; glypy.glycans.keys(); glypy.motifs.keys(); "
+    "print((time.perf_counter() - start) * 1000)")
+MODULE = "glypy.structure.named_structures"
+
+
+def run(env):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STATEMENT],
+        env=env, stderr=subprocess.PIPE, stdout=subprocess.PIPE, universal_newlines=True, check=True)
+    timings = {"wall": float(proc.stdout.strip())}
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)", line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return timings
+
+
+def summarize(label, samples):
+    self_times = sorted(s[MODULE][0] / 1000. for s in samples)
+    totals = sorted(s["wall"] for s in samples)
+    print("%s: %s self %0.1f ms, import glypy and load indices %0.1f ms (median of %d)" % (
+        label, MODULE, self_times[len(self_times) // 2], totals[len(totals) // 2], len(samples)))
+    return self_times[len(self_times) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--max-warm-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        env = dict(os.environ)
+        env["GLYPY_CACHE_DIR"] = directory
+        uncached_env = dict(env)
+        uncached_env["GLYPY_NO_DATA_CACHE"] = "1"
+        summarize("no cache", [run(uncached_env) for _ in range(args.repeats)])
+        run(env)
+        warm = summarize("warm cache", [run(env) for _ in range(args.repeats)])
+    finally:
+        shutil.rmtree(directory)
+    if args.max_warm_ms is not None and warm > args.max_warm_ms:
+        print("Warm import of %s took %0.1f ms, exceeding %0.1f ms" % (MODULE, warm, args.max_warm_ms))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
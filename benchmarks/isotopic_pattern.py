@@ -0,0 +1,89 @@
+'''Benchmark computing the isotopic patterns of many glycan compositions with
+:func:`~glypy.composition.isotopic_distribution.isotopic_patterns`.
+
+The patterns of a sample of compositions are checked against a reference which convolves
+the isotopes of one atom at a time, reporting the largest intensity difference and the
+largest mass error in ppm. Throughput is measured with a cold and a warm
+:class:`~glypy.composition.isotopic_distribution.IsotopicDistributionCache`.
+
+Usage::
+
+    python benchmarks/isotopic_pattern.py [--max-hex N] [--max-hexnac N] [--max-neuac N] [--max-fuc N] [--charge N]
+'''
+import argparse
+import itertools
+import time
+
+import numpy as np
+
+from glypy.composition.isotopic_distribution import (
+    isotopic_patterns, IsotopicDistributionCache, DEFAULT_MAX_PEAKS)
+from glypy.composition.mass_dict import nist_mass
+from glypy.structure.glycan_composition import GlycanComposition
+
+
+def reference_pattern(composition, max_peaks=DEFAULT_MAX_PEAKS):
+    p = np.ones(1)
+    w = np.zeros(1)
+    for element, count in composition.items():
+        isotopes = sorted((n, m, a) for n, (m, a) in nist_mass[element].items() if n and a > 0)
+        lightest = isotopes[0][0]
+        ep = np.zeros(isotopes[-1][0] - lightest + 1)
+        ew = np.zeros_like(ep)
+        for n, m, a in isotopes:
+            ep[n - lightest] = a
+            ew[n - lightest] = a * m
+        ew /= ep.sum()
+        ep /= ep.sum()
+        for _ in range(count):
+            p, w = np.convolve(p, ep), np.convolve(w, ep) + np.convolve(p, ew)
+    return w[:max_peaks] / p[:max_peaks], p[:max_peaks]
+
+
+def timed(label, fn, n=1):
+    start = time.time()
+    result = fn()
+    elapsed = time.time() - start
+    print("%s: %0.3f sec (%0.6f sec each)" % (label, elapsed, elapsed / n))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-hex", type=int, default=12)
+    parser.add_argument("--max-hexnac", type=int, default=8)
+    parser.add_argument("--max-neuac", type=int, default=4)
+    parser.add_argument("--max-fuc", type=int, default=3)
+    parser.add_argument("--charge", type=int, default=0)
+    args = parser.parse_args()
+    compositions = [
+        GlycanComposition(Hex=hex_, HexNAc=hexnac, Neu5Ac=neuac, Fuc=fuc).total_composition()
+        for hex_, hexnac, neuac, fuc in itertools.product(
+            range(3, args.max_hex + 1), range(2, args.max_hexnac + 1),
+            range(args.max_neuac + 1), range(args.max_fuc + 1))]
+    n = len(compositions)
+    print("%d compositions" % n)
+
+    cache = IsotopicDistributionCache()
+    patterns = timed("cold cache", lambda: isotopic_patterns(
+        compositions, charge=args.charge, truncate_after=1.0, cache=cache), n)
+    timed("warm cache", lambda: isotopic_patterns(
+        compositions, charge=args.charge, truncate_after=1.0, cache=cache), n)
+    print(cache)
+
+    sample = list(range(0, n, max(n // 20, 1)))
+    references = timed("per-atom reference", lambda: [reference_pattern(compositions[i]) for i in sample],
+                       len(sample))
+    intensity_error = 0.0
+    ppm_error = 0.0
+    for i, (masses, intensity) in zip(sample, references):
+        mz, found = patterns[i]
+        if args.charge:
+            mz = mz * abs(args.charge) - args.charge * nist_mass["H+"][0][0]
+        intensity_error = max(intensity_error, np.abs(found - intensity).max())
+        ppm_error = max(ppm_error, (np.abs(mz - masses) / masses).max() * 1e6)
+    print("max intensity difference: %0.3g, max mass error: %0.3g ppm" % (intensity_error, ppm_error))
+
+
+if __name__ == "__main__":
+    main()
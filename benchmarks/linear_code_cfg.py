@@ -0,0 +1,83 @@
+'''Benchmark reading and writing LinearCode and reading CFG sequences with and
+without the shared residue token caches of :mod:`glypy.io.linear_code` and
+:mod:`glypy.io.cfg`.
+
+The LinearCode encodings of the named glycans bundled with :mod:`glypy` and a
+handful of CFG glycan array sequences are repeated to form synthetic lists of
+``--limit`` structures.
+
+Usage::
+
+    python benchmarks/linear_code_cfg.py [--limit N]
+'''
+import argparse
+import time
+
+import glypy
+from glypy.io import cfg, linear_code
+
+
+CFG_EXAMPLES = [
+    "Galb1-4GlcNAcb1-2Mana1-3(Galb1-4GlcNAcb1-2Mana1-6)Manb1-4GlcNAcb1-4GlcNAcb-Sp8",
+    "Neu5Aca2-3Galb1-4(Fuca1-3)(6S)GlcNAcb-Sp0",
+    "Neu5Aca2-6Galb1-4GlcNAcb1-2Mana1-3(Neu5Aca2-6Galb1-4GlcNAcb1-2Mana1-6)Manb1-4GlcNAcb1-4(Fuca1-6)GlcNAcb-Sp24",
+    "Fuca1-2Galb1-3GalNAca-Sp8",
+    "Mana1-2Mana1-2Mana1-3(Mana1-2Mana1-6(Mana1-3)Mana1-6)Manb1-4GlcNAcb1-4GlcNAcb-Sp12",
+]
+
+
+def repeat(texts, n):
+    return (texts * (n // len(texts) + 1))[:n]
+
+
+def linear_code_texts():
+    texts = []
+    for glycan in glypy.glycans.values():
+        try:
+            texts.append(linear_code.dumps(glycan))
+        except linear_code.LinearCodeError:
+            continue
+    return texts
+
+
+def timed(label, fn, n):
+    start = time.time()
+    result = fn()
+    elapsed = time.time() - start
+    print("%s: %0.3f sec, %0.1f structures/sec" % (label, elapsed, n / elapsed))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=20000)
+    args = parser.parse_args()
+
+    texts = repeat(linear_code_texts(), args.limit)
+    n = len(texts)
+    print("%d LinearCode sequences" % n)
+    timed("loads, no shared cache", lambda: [
+        linear_code.loads(text, cache=linear_code.ResidueCache()) for text in texts], n)
+    linear_code.residue_cache.clear()
+    structures = timed("loads_many, shared cache", lambda: linear_code.loads_many(texts), n)
+    timed("dumps, no shared cache", lambda: [
+        linear_code.dumps(s, cache=linear_code.ResidueCache()) for s in structures], n)
+    timed("dumps_many, shared cache", lambda: linear_code.dumps_many(structures), n)
+    print(linear_code.residue_cache)
+
+    texts = repeat(CFG_EXAMPLES, args.limit)
+    n = len(texts)
+    print("%d CFG sequences" % n)
+    timed("loads, no shared cache", lambda: [_cfg_loads_uncached(text) for text in texts], n)
+    cfg.residue_cache.clear()
+    timed("loads_many, shared cache", lambda: cfg.loads_many(texts), n)
+    print(cfg.residue_cache)
+
+
+def _cfg_loads_uncached(text):
+    parser = cfg.GlycanDeserializer(cfg.MonosaccharideDeserializer(cache=cfg.ResidueCache()))
+    return parser(text)
+
+
+if __name__ == "__main__":
+    main()
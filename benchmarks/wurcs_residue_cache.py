@@ -0,0 +1,88 @@
+'''Benchmark reading and writing a WURCS dump with and without the shared
+:class:`~glypy.io.wurcs.ResidueCache`.
+
+The input file has one WURCS string per line, optionally preceded by an
+accession number and a tab, as in the GlyTouCan bulk exports. Gzipped
+files are read transparently. Without an input file, the WURCS encodings
+of the named glycans bundled with :mod:`glypy` are repeated to form a
+synthetic dump.
+
+Usage::
+
+    python benchmarks/wurcs_residue_cache.py [glytoucan_wurcs.tsv[.gz]] [--limit N]
+'''
+import argparse
+import gzip
+import time
+
+import glypy
+from glypy.io import wurcs
+
+
+def read_dump(path, limit=None):
+    opener = gzip.open if path.endswith(".gz") else open
+    texts = []
+    with opener(path, 'rt') as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            text = line.split("\t")[-1]
+            if not text.startswith("WURCS="):
+                continue
+            texts.append(text)
+            if limit is not None and len(texts) >= limit:
+                break
+    return texts
+
+
+def synthetic_dump(limit=None):
+    texts = [wurcs.dumps(glycan) for glycan in glypy.glycans.values()]
+    n = limit or 20000
+    return (texts * (n // len(texts) + 1))[:n]
+
+
+def timed(label, fn, n):
+    start = time.time()
+    result = fn()
+    elapsed = time.time() - start
+    print("%s: %0.3f sec, %0.1f structures/sec" % (label, elapsed, n / elapsed))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs='?')
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+    if args.path:
+        texts = read_dump(args.path, args.limit)
+    else:
+        texts = synthetic_dump(args.limit)
+    n = len(texts)
+    print("%d WURCS strings" % n)
+
+    timed("loads, no shared cache", lambda: [_loads_uncached(text) for text in texts], n)
+    wurcs.residue_cache.clear()
+    structures = timed("loads_many, shared cache", lambda: wurcs.loads_many(
+        texts, raise_errors=False), n)
+    print(wurcs.residue_cache)
+
+    structures = [s for s in structures if s is not None]
+    n = len(structures)
+    timed("dumps, no shared cache", lambda: [
+        wurcs.dumps(s, cache=wurcs.ResidueCache()) for s in structures], n)
+    wurcs.residue_cache.clear()
+    timed("dumps_many, shared cache", lambda: wurcs.dumps_many(structures), n)
+    print(wurcs.residue_cache)
+
+
+def _loads_uncached(text):
+    try:
+        return wurcs.loads(text, cache=wurcs.ResidueCache())
+    except wurcs.WURCSError:
+        return None
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,10 @@ from glypy.structure import glycan_composition
 from glypy.structure.glycan_composition import GlycanComposition, MonosaccharideResidue
 from glypy.utils import root, tree
 from glypy.utils.multimap import OrderedMultiMap
+from glypy.utils.lazy import lazy_attributes
+
+# Subpackages with heavy dependencies are only imported when first accessed
+__getattr__, __dir__ = lazy_attributes(__name__, ["io", "algorithms", "plot", "enzyme", "convert"])
 
 
 __all__ = [
@@ -1,3 +1,7 @@
-from .storage import  DistinctGlycanSet
+from glypy.utils.lazy import lazy_attributes
 
-__all__ = ['subtree_search', 'similarity', 'canonicalize', "DistinctGlycanSet"]
+__all__ = ['subtree_search', 'similarity', 'canonicalize', "DistinctGlycanSet", "HashedGlycanSet", "structure_key"]
+
+__getattr__, __dir__ = lazy_attributes(
+    __name__, ["subtree_search", "similarity", "canonicalize", "database", "storage"],
+    {"DistinctGlycanSet": "storage", "HashedGlycanSet": "storage", "structure_key": "storage"})
@@ -3,10 +3,10 @@ import sqlite3
 import logging
 import functools
 try:
-    from collections import Counter
+    from collections import Counter, OrderedDict
     from collections.abc import Iterable, Callable
 except ImportError:
-    from collections import Counter, Iterable, Callable
+    from collections import Counter, OrderedDict, Iterable, Callable
 
 
 import glypy
@@ -344,6 +344,46 @@ class GlycanRecordBase(object):
         values['table_name'] = self.__table_name
         yield template.format(**values)
 
+    def to_sql_parameters(self, id=None, mass_params=None, inherits=None, replace=False):
+        '''
+        Translates the :class:`GlycanRecord` instance into parameterized SQL
+        statements suitable for :meth:`sqlite3.Connection.executemany`.
+
+        Unlike :meth:`to_sql`, the pickled record is passed as a bound parameter
+        rather than formatted into the statement text, so records sharing a table
+        share the same statement and may be inserted in bulk.
+
+        Parameters
+        ----------
+        id: int
+            The primary key to use, overwriting :attr:`id` if present. Optional
+        mass_params: tuple
+            Parameters to pass to :meth:`.mass`. The output is stored
+            in the SQL record as the `mass` value
+        inherits: dict
+            Mapping of inherited column_data properties to include in the record
+        replace: bool
+            Whether to replace an existing record with the same primary key instead
+            of failing with :class:`sqlite3.IntegrityError`. Defaults to |False|
+
+        Yields
+        ------
+        tuple of (str, tuple):
+            The SQL insert statement and its parameters
+        '''
+        if id is not None:
+            self.id = id
+        ext_data = self._collect_ext_data()
+        names = ["glycan_id", "mass", "structure"] + list(ext_data)
+        template = "{verb} INTO {table_name} ({names}) VALUES ({placeholders});".format(
+            verb="INSERT OR REPLACE" if replace else "INSERT", table_name=self.__table_name, names=', '.join(names),
+            placeholders=', '.join("?" * len(names)))
+        _bound_db = getattr(self, "_bound_db", None)
+        self._bound_db = None
+        structure = sqlite3.Binary(pickle.dumps(self))
+        self._bound_db = _bound_db
+        yield template, (self.id, self.mass(**(mass_params or {})), structure) + tuple(ext_data.values())
+
     def to_update_sql(self, mass_params=None, inherits=None, *args, **kwargs):
         '''
         Generates SQL for use with ``UPDATE {table_name} set ... where glycan_id = {id};``.
@@ -606,6 +646,10 @@ class GlycanRecord(GlycanRecordBase):
         inherits = _resolve_column_data_mro(self.__class__)
         return super(GlycanRecord, self).to_sql(*args, inherits=inherits, **kwargs)
 
+    def to_sql_parameters(self, *args, **kwargs):
+        inherits = _resolve_column_data_mro(self.__class__)
+        return super(GlycanRecord, self).to_sql_parameters(*args, inherits=inherits, **kwargs)
+
     def to_update_sql(self, *args, **kwargs):
         inherits = _resolve_column_data_mro(self.__class__)
         inherits = inherits or _resolve_column_data_mro(self.__class__)
@@ -658,6 +702,13 @@ class GlycanRecordWithTaxon(GlycanRecord):
             yield "INSERT OR REPLACE INTO RecordTaxonomy (glycan_id, taxon_id) VALUES ({}, {});".format(
                 self.id, int(taxon.tax_id))
 
+    def to_sql_parameters(self, *args, **kwargs):
+        for stmt in super(GlycanRecordWithTaxon, self).to_sql_parameters(*args, **kwargs):
+            yield stmt
+        for taxon in self.taxa:
+            yield "INSERT OR REPLACE INTO RecordTaxonomy (glycan_id, taxon_id) VALUES (?, ?);", (
+                self.id, int(taxon.tax_id))
+
     @querymethod
     def query_by_taxon_id(cls, conn, taxon_ids):
         # Passed an iterable of taxa to search
@@ -800,36 +851,59 @@ class RecordDatabase(object):
             self.execute(ix_stmt)
         self.commit()
 
-    def load_data(self, record_list, commit=True, set_id=True, cast=True, **kwargs):
+    def load_data(self, record_list, commit=True, set_id=True, cast=True, batch_size=1000, **kwargs):
         '''
         Given an iterable of :attr:`.record_type` objects,
         assign each a primary key value and insert them into the
         database.
 
-        Forwards all ``**kwargs`` to :meth:`to_sql` calls.
+        Records are translated with :meth:`~.GlycanRecordBase.to_sql_parameters` and
+        inserted with :meth:`sqlite3.Connection.executemany` in batches of `batch_size`,
+        so `record_list` may be a lazy iterable of any length.
+
+        Forwards all ``**kwargs`` to :meth:`~.GlycanRecordBase.to_sql_parameters` calls.
 
         Parameters
         ----------
         record_list: GlycanRecord or iterable of GlycanRecords
         commit: bool
-            Whether or not to commit all changes to the database
+            Whether or not to commit all changes to the database. If |True|, changes
+            are committed after each batch.
         set_id: bool
         cast: bool
+        batch_size: int
+            The number of records to insert at a time
+
+        Returns
+        -------
+        int:
+            The number of records inserted
         '''
         if not isinstance(record_list, Iterable):
             record_list = [record_list]
+        statements = OrderedDict()
+        n = 0
+        pending = 0
         for record in record_list:
             if set_id:
                 self._id += 1
                 record.id = self._id
             if cast and not isinstance(record, self.record_type):
                 record = self.record_type.replicate(record)
-            for stmt in record.to_sql(**kwargs):
-                try:
-                    self.connection.execute(stmt)
-                except:
-                    print(stmt)
-                    raise
+            for stmt, params in record.to_sql_parameters(**kwargs):
+                statements.setdefault(stmt, []).append(params)
+            n += 1
+            pending += 1
+            if pending >= batch_size:
+                self._flush_statements(statements, commit)
+                pending = 0
+        self._flush_statements(statements, commit)
+        return n
+
+    def _flush_statements(self, statements, commit):
+        for stmt, param_list in statements.items():
+            self.connection.executemany(stmt, param_list)
+        statements.clear()
         if commit:
             self.commit()
 
@@ -889,7 +963,7 @@ class RecordDatabase(object):
         -------
         int
         """
-        res = (self.execute("SELECT count(glycan_id) FROM {table_name};").next())["count(glycan_id)"]
+        res = (self.execute("SELECT count(glycan_id) FROM {table_name};").fetchone())["count(glycan_id)"]
         return res or 0
 
     def create(self, structure, *args, **kwargs):
@@ -961,11 +1035,31 @@ class RecordDatabase(object):
             yield row
 
     def __contains__(self, key):
-        try:
-            self[int(key)]
-            return True
-        except IndexError:
-            return False
+        return bool(self.execute(
+            "SELECT EXISTS(SELECT 1 FROM {table_name} WHERE glycan_id = ?);", (int(key),)).fetchone()[0])
+
+    def contains_many(self, keys, batch_size=500):
+        '''
+        Find which of `keys` are present in the database without loading any records.
+
+        Parameters
+        ----------
+        keys: iterable of int
+        batch_size: int
+            The number of keys to test per query
+
+        Returns
+        -------
+        set of int
+        '''
+        keys = [int(k) for k in keys]
+        found = set()
+        for i in range(0, len(keys), batch_size):
+            chunk = keys[i:i + batch_size]
+            found.update(row[0] for row in self.execute(
+                "SELECT glycan_id FROM {{table_name}} WHERE glycan_id IN ({});".format(
+                    ', '.join("?" * len(chunk))), chunk))
+        return found
 
     def __repr__(self):  # pragma: no cover
         rep = "<RecordDatabase {} records>".format(len(self))
@@ -1,5 +1,7 @@
 import zlib
 
+from hashlib import blake2b
+
 try:
     from collections.abc import MutableSet
 except ImportError:
@@ -187,3 +189,206 @@ class DistinctGlycanSet(MutableSet):
     def __ior__(self, other):
         self.raw_data_buffer.update(other.raw_data_buffer)
         return self
+
+
+def _loss_key(composition):
+    if not composition:
+        return ""
+    return ",".join(["%s%d" % kv for kv in sorted(composition.items())])
+
+
+def _residue_signature(node):
+    parts = [
+        node.anomer.name, ",".join([c.name for c in node.configuration]),
+        ",".join([s.name for s in node.stem]), node.superclass.name,
+        str(node.ring_start), str(node.ring_end),
+        ",".join(sorted(["%d%s" % (pos, mod.name) for pos, mod in node.modifications.items()])),
+        ",".join(sorted([
+            "%d-%d%s/%s/%s" % (pos, link.child_position, link.child.name,
+                               _loss_key(link.parent_loss), _loss_key(link.child_loss))
+            for pos, link in node.substituent_links.items()])),
+    ]
+    return "|".join(parts)
+
+
+def structure_key(structure):
+    """Compute a canonical key for the topology of a :class:`~.Glycan`, without
+    serializing it to text.
+
+    Each residue is digested together with the sorted digests of its children and the
+    positions and losses of the links to them, so two structures receive the same key when
+    they are equal regardless of the order their branches were built in. The key is
+    stable across processes.
+
+    Parameters
+    ----------
+    structure: :class:`~.Glycan` or :class:`~.Monosaccharide`
+        The structure to digest
+
+    Returns
+    -------
+    :class:`bytes`
+    """
+    root = getattr(structure, "root", structure)
+    digests = _subtree_digests(root)
+    return _root_key(digests[id(root)], root)
+
+
+def _link_parts(position, link):
+    # A link's entry in its parent's digest is prefix + child digest + suffix
+    return ("%d-%d" % (position, link.child_position),
+            "/%s/%s" % (_loss_key(link.parent_loss), _loss_key(link.child_loss)))
+
+
+def _node_digest(signature, children):
+    text = "%s(%s)" % (signature, ";".join(sorted(children)))
+    return blake2b(text.encode('utf8'), digest_size=16).hexdigest()
+
+
+def _root_key(digest, root):
+    reduced = root.reducing_end
+    if reduced is not None:
+        digest = "%s$%s" % (digest, _loss_key(reduced.total_composition()))
+    return digest.encode('ascii')
+
+
+def _subtree_digests(root):
+    digests = {}
+    # Visit nodes in reverse pre-order so every child is digested before its parent
+    order = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        for pos, child in node.children():
+            stack.append(child)
+    for node in reversed(order):
+        children = []
+        for pos, link in node.children(links=True):
+            prefix, suffix = _link_parts(pos, link)
+            children.append(prefix + digests[id(link.child)] + suffix)
+        digests[id(node)] = _node_digest(_residue_signature(node), children)
+    return digests
+
+
+class HashedGlycanSet(MutableSet):
+    """Store a distinct set of :class:`~.Glycan` objects keyed by :func:`structure_key`.
+
+    Implements the :class:`MutableSet` interface. Unlike :class:`DistinctGlycanSet`, the
+    structures themselves are kept, one representative per key, so adding and iterating
+    never serializes or parses a structure.
+
+    Attributes
+    ----------
+    structures: :class:`dict`
+        Maps each key to its representative structure
+    """
+
+    def __init__(self, structures=None):
+        self.structures = {}
+        if structures is not None:
+            self.update(structures)
+
+    def add(self, structure):
+        """Add `structure` to the set, keeping the existing representative if an
+        equal structure is already present.
+
+        Parameters
+        ----------
+        structure: :class:`~.Glycan`
+
+        Returns
+        -------
+        :class:`bytes`
+            The key of `structure`
+        """
+        key = structure_key(structure)
+        self.structures.setdefault(key, structure)
+        return key
+
+    def add_keyed(self, key, structure):
+        """Add `structure` whose key is already known
+
+        Parameters
+        ----------
+        key: :class:`bytes`
+        structure: :class:`~.Glycan`
+        """
+        self.structures.setdefault(key, structure)
+
+    def discard(self, structure):
+        self.structures.pop(structure_key(structure), None)
+
+    def __contains__(self, structure):
+        return structure_key(structure) in self.structures
+
+    def has_key(self, key):
+        return key in self.structures
+
+    def keys(self):
+        return self.structures.keys()
+
+    def items(self):
+        return self.structures.items()
+
+    def __getitem__(self, key):
+        return self.structures[key]
+
+    def __len__(self):
+        return len(self.structures)
+
+    def __iter__(self):
+        return iter(self.structures.values())
+
+    def pop(self):
+        return self.structures.popitem()[1]
+
+    @classmethod
+    def from_items(cls, items):
+        inst = cls()
+        inst.structures.update(items)
+        return inst
+
+    def update(self, other):
+        if isinstance(other, HashedGlycanSet):
+            for key, structure in other.structures.items():
+                self.structures.setdefault(key, structure)
+        else:
+            for x in other:
+                self.add(x)
+
+    def partition(self, nchunks=2):
+        items = list(self.structures.items())
+        n = len(items)
+        chunk_size = max(int(n / nchunks), 1)
+        return [self.from_items(items[i:i + chunk_size]) for i in range(0, n, chunk_size)]
+
+    def difference_keys(self, keys):
+        """Create a new set without the structures whose keys are in `keys`
+
+        Parameters
+        ----------
+        keys: Container of :class:`bytes`
+
+        Returns
+        -------
+        :class:`HashedGlycanSet`
+        """
+        return self.from_items((k, v) for k, v in self.structures.items() if k not in keys)
+
+    def __sub__(self, other):
+        return self.difference_keys(other.structures)
+
+    def __isub__(self, other):
+        for key in other.structures:
+            self.structures.pop(key, None)
+        return self
+
+    def __or__(self, other):
+        inst = self.from_items(self.structures.items())
+        inst.update(other)
+        return inst
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
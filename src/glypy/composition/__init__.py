@@ -1,9 +1,9 @@
 from . import composition
-from .composition import Composition, calculate_mass
+from .composition import Composition, FrozenComposition, calculate_mass
 from .base import formula, ChemicalCompositionError
 
 __all__ = [
-    "composition", "Composition", "calculate_mass",
+    "composition", "Composition", "FrozenComposition", "calculate_mass",
     "formula", "ChemicalCompositionError",
     "composition_transform"
 ]
@@ -4,6 +4,7 @@
 import re
 from .mass_dict import nist_mass
 from .base import ChemicalCompositionError, composition_factory
+from .formula_parser import formula_cache, parse_formula
 
 cimport cython
 
@@ -376,126 +377,11 @@ cdef class CComposition(dict):
         dict.update(self, *args, **kwargs)
         self._mass_args = None
 
-    @cython.boundscheck(False)
     cpdef _from_formula(self, str formula, dict mass_data):
-        cdef:
-            str elem, isotope, number
-        if '(' in formula:
-            self._from_formula_parens(formula, mass_data)
-        elif not formula_pattern.match(formula):
-            raise ChemicalCompositionError('Invalid formula: ' + formula)
-        else:
-            for elem, isotope, number in re.findall(_atom, formula):
-                if not elem in mass_data:
-                    raise ChemicalCompositionError('Unknown chemical element: ' + elem)
-                self[_make_isotope_string(elem, int(isotope) if isotope else 0)
-                        ] += int(number) if number else 1
+        self.add_from(formula_cache.parse(formula, mass_data))
 
-    @cython.boundscheck(True)
     def _from_formula_parens(self, formula, mass_data):
-        # Parsing a formula backwards.
-        cdef:
-            Py_ssize_t prev_chem_symbol_start, i
-            int seek_mode, group_coef
-            str parse_stack
-            list resolve_stack
-
-
-        prev_chem_symbol_start = len(formula)
-        i = len(formula) - 1
-
-        seek_mode = 0
-        parse_stack = ""
-        resolve_stack = []
-        group_coef = 1
-
-        while i >= 0:
-            if seek_mode < 1:
-                if (formula[i] == ")"):
-                    seek_mode += 1
-                    if i + 1 == prev_chem_symbol_start:
-                        group_coef = 1
-                    elif formula[i + 1].isdigit():
-                        group_coef = int(formula[i + 1:prev_chem_symbol_start])
-                    i -= 1
-                    continue
-                # Read backwards until a non-number character is met.
-                if (formula[i].isdigit() or formula[i] == '-'):
-                    i -= 1
-                    continue
-
-                else:
-                    # If the number of atoms is omitted then it is 1.
-                    if i + 1 == prev_chem_symbol_start:
-                        num_atoms = 1
-                    else:
-                        try:
-                            num_atoms = int(formula[i + 1:prev_chem_symbol_start])
-                        except ValueError:
-                            raise ChemicalCompositionError(
-                                'Badly-formed number of atoms: %s' % formula)
-
-                    # Read isotope number if specified, else it is undefined (=0).
-                    if formula[i] == ']':
-                        brace_pos = formula.rfind('[', 0, i)
-                        if brace_pos == -1:
-                            raise ChemicalCompositionError(
-                                'Badly-formed isotope number: %s' % formula)
-                        try:
-                            isotope_num = int(formula[brace_pos + 1:i])
-                        except ValueError:
-                            raise ChemicalCompositionError(
-                                'Badly-formed isotope number: %s' % formula)
-                        i = brace_pos - 1
-                    else:
-                        isotope_num = 0
-
-                    # Match the element name to the mass_data.
-                    element_found = False
-                    # Sort the keys from longest to shortest to workaround
-                    # the overlapping keys issue
-                    for element_name in sorted(mass_data, key=len, reverse=True):
-                        if formula.endswith(element_name, 0, i + 1):
-                            isotope_string = _make_isotope_string(
-                                element_name, isotope_num)
-                            self[isotope_string] += num_atoms
-                            i -= len(element_name)
-                            prev_chem_symbol_start = i + 1
-                            element_found = True
-                            break
-
-                    if not element_found:
-                        raise ChemicalCompositionError(
-                            'Unknown chemical element in the formula: %s' % formula)
-            else:
-                ch = formula[i]
-                parse_stack += ch
-                i -= 1
-                if(ch == "("):
-                    seek_mode -= 1
-                    if seek_mode == 0:
-
-                        resolve_stack.append(Composition(
-                                             # Omit the last character, then reverse the parse
-                                             # stack string.
-                                             formula=parse_stack[:-1][::-1],
-                                             mass_data=mass_data)
-                                             * group_coef)
-                        prev_chem_symbol_start = i + 1
-                        seek_mode = False
-                        parse_stack = ""
-                elif(formula[i] == ")"):
-                    seek_mode += 1
-                else:
-                    # continue to accumulate tokens
-                    pass
-
-        # Unspool the resolve stack, adding together the chunks
-        # at this level. __add__ operates immutably, so must manually
-        # loop through each chunk.
-        for chunk in resolve_stack:
-            for elem, cnt in chunk.items():
-                self[elem] += cnt
+        self.add_from(parse_formula(formula, mass_data))
 
     cpdef _from_dict(self, comp):
         '''
@@ -505,13 +391,13 @@ cdef class CComposition(dict):
         PyDict_Update(self, comp)
 
     cpdef double calc_mass(self, int average=False, charge=None, dict mass_data=nist_mass) except -1:
-        cdef object mdid
-        mdid = id(mass_data)
+        # Compare mass_data by identity, holding a reference so a freed dict's
+        # id cannot be mistaken for it
         if self._mass_args is not None and average is self._mass_args[0]\
-                and charge == self._mass_args[1] and mdid == self._mass_args[2]:
+                and charge == self._mass_args[1] and mass_data is self._mass_args[2]:
             return self._mass
         else:
-            self._mass_args = (average, charge, mdid)
+            self._mass_args = (average, charge, mass_data)
             self._mass = calculate_mass(composition=self, average=average, charge=charge, mass_data=mass_data)
             return self._mass
 
@@ -4,6 +4,7 @@ import math
 from collections import defaultdict
 from .mass_dict import nist_mass
 from .base import ChemicalCompositionError, composition_factory
+from .formula_parser import formula_cache, parse_formula, _atom, _formula, formula_pattern
 
 import os
 
@@ -17,9 +18,6 @@ except ImportError:  # pragma: no cover
 # Forward Declaration
 
 _isotope_string = r'^([A-Z][a-z+]*)(?:\[(\d+)\])?$'
-_atom = r'([A-Z][a-z+]*)(?:\[(\d+)\])?([+-]?\d+)?'
-_formula = r'^({})*$'.format(_atom)
-formula_pattern = re.compile(_formula)
 
 
 def _make_isotope_string(element_name, isotope_num):
@@ -148,113 +146,17 @@ class PComposition(defaultdict):
         self._mass_args = None
 
     def _from_formula(self, formula, mass_data):
-        if '(' in formula:
-            return self._from_formula_parens(formula, mass_data)
-        if not formula_pattern.match(formula):
-            raise ChemicalCompositionError('Invalid formula: ' + formula)
-        for elem, isotope, number in re.findall(_atom, formula):
-            if elem not in mass_data:
-                raise ChemicalCompositionError('Unknown chemical element: ' + elem)
-            self[_make_isotope_string(elem, int(isotope) if isotope else 0)
-                 ] += int(number) if number else 1
-
-    def _from_formula_parens(self, formula, mass_data):  # pragma: no cover
-        # Parsing a formula backwards.
-        prev_chem_symbol_start = len(formula)
-        i = len(formula) - 1
-
-        seek_mode = 0
-        parse_stack = ""
-        resolve_stack = []
-        group_coef = None
-
-        while i >= 0:
-            if seek_mode < 1:
-                if (formula[i] == ")"):
-                    seek_mode += 1
-                    if i + 1 == prev_chem_symbol_start:
-                        group_coef = 1
-                    elif formula[i + 1].isdigit():
-                        group_coef = int(formula[i + 1:prev_chem_symbol_start])
-                    i -= 1
-                    continue
-                # Read backwards until a non-number character is met.
-                if (formula[i].isdigit() or formula[i] == '-'):
-                    i -= 1
-                    continue
-
-                else:
-                    # If the number of atoms is omitted then it is 1.
-                    if i + 1 == prev_chem_symbol_start:
-                        num_atoms = 1
-                    else:
-                        try:
-                            num_atoms = int(formula[i + 1:prev_chem_symbol_start])
-                        except ValueError:
-                            raise ChemicalCompositionError(
-                                'Badly-formed number of atoms: %s' % formula)
-
-                    # Read isotope number if specified, else it is undefined (=0).
-                    if formula[i] == ']':
-                        brace_pos = formula.rfind('[', 0, i)
-                        if brace_pos == -1:
-                            raise ChemicalCompositionError(
-                                'Badly-formed isotope number: %s' % formula)
-                        try:
-                            isotope_num = int(formula[brace_pos + 1:i])
-                        except ValueError:
-                            raise ChemicalCompositionError(
-                                'Badly-formed isotope number: %s' % formula)
-                        i = brace_pos - 1
-                    else:
-                        isotope_num = 0
-
-                    # Match the element name to the mass_data.
-                    element_found = False
-                    # Sort the keys from longest to shortest to workaround
-                    # the overlapping keys issue
-                    for element_name in sorted(mass_data, key=len, reverse=True):
-                        if formula.endswith(element_name, 0, i + 1):
-                            isotope_string = _make_isotope_string(
-                                element_name, isotope_num)
-                            self[isotope_string] += num_atoms
-                            i -= len(element_name)
-                            prev_chem_symbol_start = i + 1
-                            element_found = True
-                            break
-
-                    if not element_found:
-                        raise ChemicalCompositionError(
-                            'Unknown chemical element in the formula: %s' % formula)
-            else:
-                ch = formula[i]
-                parse_stack += ch
-                i -= 1
-                if(ch == "("):
-                    seek_mode -= 1
-                    if seek_mode == 0:
-
-                        resolve_stack.append(Composition(
-                                             # Omit the last character, then reverse the parse
-                                             # stack string.
-                                             formula=parse_stack[:-1][::-1],
-                                             mass_data=mass_data)
-                                             * group_coef)
-                        prev_chem_symbol_start = i + 1
-                        seek_mode = False
-                        parse_stack = ""
-                elif(formula[i] == ")"):
-                    seek_mode += 1
-                else:
-                    # continue to accumulate tokens
-                    pass
-
-        # Unspool the resolve stack, adding together the chunks
-        # at this level. __add__ operates immutably, so must manually
-        # loop through each chunk.
-        for chunk in resolve_stack:
-            for elem, cnt in chunk.items():
-                self[elem] += cnt
+        self._add_counts(formula_cache.parse(formula, mass_data))
+
+    def _from_formula_parens(self, formula, mass_data):
+        self._add_counts(parse_formula(formula, mass_data))
+
+    def _add_counts(self, counts):
+        # Add the parsed counts to any already present, without going through
+        # the augmented assignment operators subclasses may override
+        for elem, cnt in counts.items():
+            self[elem] += cnt
+        self._mass_args = None
 
     def _from_dict(self, comp):
         # for isotope_string, num_atoms in comp.items():
@@ -267,12 +169,13 @@ class PComposition(defaultdict):
         self.update(comp)
 
     def calc_mass(self, average=False, charge=None, mass_data=None):
-        mdid = id(mass_data)
+        # Compare mass_data by identity, holding a reference so a freed dict's
+        # id cannot be mistaken for it
         if self._mass_args is not None and average is self._mass_args[0]\
-                and charge == self._mass_args[1] and mdid == self._mass_args[2]:
+                and charge == self._mass_args[1] and mass_data is self._mass_args[2]:
             return self._mass
         else:
-            self._mass_args = (average, charge, mdid)
+            self._mass_args = (average, charge, mass_data)
             self._mass = pcalculate_mass(composition=self, average=average, charge=charge, mass_data=mass_data)
             return self._mass
 
@@ -367,40 +270,34 @@ def pcalculate_mass(composition=None, formula=None, average=False, charge=None,
     composition = composition if composition else PComposition(formula)
 
     # Get charge.
-    old_charge = composition['H+']
-    if charge is not None:
-        if old_charge != 0:
-            raise ChemicalCompositionError(
-                'Charge is specified both by the number of protons and '
-                '`charge` in kwargs')
-        composition['H+'] = charge
+    if charge is not None and composition['H+'] != 0:
+        raise ChemicalCompositionError(
+            'Charge is specified both by the number of protons and '
+            '`charge` in kwargs')
 
-    # Calculate mass.
+    # Calculate mass without modifying `composition`, so frozen compositions
+    # can be massed too.
     mass = 0.0
-    for isotope_string in composition:
-        element_name, isotope_num = _parse_isotope_string(isotope_string)
-        # Calculate average mass if required and the isotope number is
-        # not specified.
-        if (not isotope_num) and average:
-            for isotope in mass_data[element_name]:
-                if isotope != 0:
-                    mass += (composition[element_name]
-                             * mass_data[element_name][isotope][0]
-                             * mass_data[element_name][isotope][1])
-        else:
-            mass += (composition[isotope_string]
-                     * mass_data[element_name][isotope_num][0])
+    for isotope_string, count in composition.items():
+        mass += count * _element_mass(isotope_string, average, mass_data)
 
     # Calculate m/z if required.
     if charge:
+        mass += charge * _element_mass('H+', average, mass_data)
         mass /= abs(charge)
-    if old_charge != 0:
-        composition["H+"] = old_charge
-    elif charge:
-        del composition["H+"]
     return mass
 
 
+def _element_mass(isotope_string, average, mass_data):
+    element_name, isotope_num = _parse_isotope_string(isotope_string)
+    # Calculate average mass if required and the isotope number is
+    # not specified.
+    if (not isotope_num) and average:
+        return sum(mass * abundance for isotope, (mass, abundance) in mass_data[element_name].items()
+                   if isotope != 0)
+    return mass_data[element_name][isotope_num][0]
+
+
 # Checks to see if the Cython versions are available
 if use_cython:  # pragma: no cover
     Composition = CComposition
@@ -410,6 +307,255 @@ else:  # pragma: no cover
     calculate_mass = pcalculate_mass
 
 
+class FrozenComposition(Composition):
+    '''An immutable, hashable :class:`Composition`.
+
+    The hash is computed once, and masses are remembered for each combination of
+    ``average``, ``charge`` and ``mass_data``. Attempts to modify the composition in
+    place raise :class:`TypeError`, except for the augmented assignment operators, which
+    return a new mutable :class:`Composition` as :meth:`clone` does.
+
+    Use :meth:`intern` to share one instance between all equal compositions.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        self._frozen = False
+        Composition.__init__(self, *args, **kwargs)
+        for key in [key for key, value in self.items() if not value]:
+            dict.__delitem__(self, key)
+        self._key = frozenset(self.items())
+        self._hash = hash(self._key)
+        self._masses = {}
+        self._frozen = True
+
+    @classmethod
+    def intern(cls, composition, mass_data=None):
+        '''Get the shared :class:`FrozenComposition` equal to `composition` from
+        :data:`frozen_composition_cache`.
+
+        Parameters
+        ----------
+        composition : :class:`Mapping` or str
+            A composition, or a formula to parse with `mass_data`
+        mass_data : dict, optional
+
+        Returns
+        -------
+        :class:`FrozenComposition`
+        '''
+        return frozen_composition_cache.intern(composition, mass_data)
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("%s objects are immutable" % (self.__class__.__name__,))
+
+    def __setitem__(self, key, value):
+        if self._frozen:
+            self._immutable()
+        Composition.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if self._frozen:
+            self._immutable()
+        Composition.__delitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        if self._frozen:
+            self._immutable()
+        Composition.update(self, *args, **kwargs)
+
+    clear = pop = popitem = setdefault = _immutable
+
+    # The compiled Composition fills itself through these methods, which write to the
+    # underlying dict directly and would not pass through __setitem__ or update
+    def _from_dict(self, comp):
+        if self._frozen:
+            self._immutable()
+        Composition._from_dict(self, comp)
+
+    def _from_formula(self, formula, mass_data):
+        if self._frozen:
+            self._immutable()
+        Composition._from_formula(self, formula, mass_data)
+
+    def _from_formula_parens(self, formula, mass_data):
+        if self._frozen:
+            self._immutable()
+        Composition._from_formula_parens(self, formula, mass_data)
+
+    def __iadd__(self, other):
+        return self + other
+
+    def __isub__(self, other):
+        return self - other
+
+    def __imul__(self, other):
+        return self * other
+
+    def add(self, other, frozen=True):
+        '''Add `other` to a copy of this composition.
+
+        Parameters
+        ----------
+        other : :class:`Mapping`
+        frozen : bool, optional
+            Whether to return an interned :class:`FrozenComposition` or a mutable :class:`Composition`
+
+        Returns
+        -------
+        :class:`Composition`
+        '''
+        result = self + other
+        return self.intern(result) if frozen else result
+
+    def subtract(self, other, frozen=True):
+        '''Subtract `other` from a copy of this composition.
+
+        Parameters
+        ----------
+        other : :class:`Mapping`
+        frozen : bool, optional
+            Whether to return an interned :class:`FrozenComposition` or a mutable :class:`Composition`
+
+        Returns
+        -------
+        :class:`Composition`
+        '''
+        result = self - other
+        return self.intern(result) if frozen else result
+
+    def multiply(self, factor, frozen=True):
+        '''Multiply a copy of this composition by `factor`.
+
+        Parameters
+        ----------
+        factor : int
+        frozen : bool, optional
+            Whether to return an interned :class:`FrozenComposition` or a mutable :class:`Composition`
+
+        Returns
+        -------
+        :class:`Composition`
+        '''
+        result = self * factor
+        return self.intern(result) if frozen else result
+
+    def calc_mass(self, average=False, charge=None, mass_data=None):
+        if mass_data is None:
+            mass_data = nist_mass
+        key = (average, charge, id(mass_data))
+        try:
+            source, mass = self._masses[key]
+            if source is mass_data:
+                return mass
+        except KeyError:
+            pass
+        mass = Composition.calc_mass(self.clone(), average=average, charge=charge, mass_data=mass_data)
+        # Hold a reference to mass_data so its id is not reused while the mass is kept
+        self._masses[key] = (mass_data, mass)
+        return mass
+
+    @property
+    def mass(self):
+        return self.calc_mass()
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __str__(self):   # pragma: no cover
+        return 'FrozenComposition({})'.format(dict.__repr__(self))
+
+    def __repr__(self):  # pragma: no cover
+        return str(self)
+
+
+class FrozenCompositionCache(object):
+    '''Interns :class:`FrozenComposition` instances so equal compositions share one object.
+
+    Attributes
+    ----------
+    compositions : dict
+        Maps the frozen set of element counts of each composition to its :class:`FrozenComposition`
+    maxsize : int
+        The maximum number of compositions held. When the cache is full, new compositions
+        are frozen but not stored.
+    hits : int
+        The number of lookups satisfied from the cache
+    misses : int
+        The number of lookups that required freezing a new composition
+    '''
+
+    def __init__(self, maxsize=2 ** 16):
+        self.maxsize = maxsize
+        self.compositions = {}
+        self.hits = 0
+        self.misses = 0
+
+    def intern(self, composition, mass_data=None):
+        '''Get the :class:`FrozenComposition` equal to `composition`.
+
+        Parameters
+        ----------
+        composition : :class:`Mapping` or str
+            A composition, or a formula to parse with `mass_data`
+        mass_data : dict, optional
+
+        Returns
+        -------
+        :class:`FrozenComposition`
+        '''
+        if isinstance(composition, FrozenComposition):
+            key = composition._key
+        else:
+            if isinstance(composition, str):
+                composition = formula_cache.parse(composition, mass_data)
+            key = frozenset((element, count) for element, count in composition.items() if count)
+        try:
+            frozen = self.compositions[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return frozen
+        self.misses += 1
+        if not isinstance(composition, FrozenComposition):
+            composition = FrozenComposition(dict(key))
+        if len(self.compositions) < self.maxsize:
+            self.compositions[key] = composition
+        return composition
+
+    def stats(self):
+        '''Summarize the usage of the cache.
+
+        Returns
+        -------
+        dict
+        '''
+        return {
+            "compositions": len(self.compositions),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        '''Remove all interned compositions and reset the usage counters.
+        '''
+        self.compositions.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.compositions)
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({stats})".format(self=self, stats=self.stats())
+
+
+frozen_composition_cache = FrozenCompositionCache()
+
+
 def most_probable_isotopic_composition(*args, **kwargs):
     """Calculate the most probable isotopic composition of a
     chemical formula or |Composition| object.
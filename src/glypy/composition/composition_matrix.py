@@ -0,0 +1,411 @@
+'''Store many elemental compositions as one integer matrix and compute their masses at once.
+
+A :class:`CompositionMatrix` holds one row per composition and one column per element label,
+so the masses of every row are a single product of the count matrix with a vector of element
+masses. The mass vector is derived from ``mass_data`` once per matrix and kept, so repeated
+calls with different charges only pay for the product.
+
+A :class:`GlycanCompositionMatrix` holds glycan compositions as residue counts. Its masses are
+the product of the residue counts with the residue masses derived from the same element mass
+vector, so candidates of a composition search are scored without building a
+:class:`~.Composition` for each.
+
+This module requires :mod:`numpy`.
+'''
+from .composition import Composition, _parse_isotope_string
+from .mass_dict import nist_mass
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Composition matrices require numpy")
+
+
+def _as_composition(composition):
+    if hasattr(composition, "total_composition"):
+        return composition.total_composition()
+    if isinstance(composition, str):
+        return Composition(composition)
+    return composition
+
+
+def _count_matrix(counts, width):
+    # Input which is already a matrix keeps its row count, even without any columns
+    counts = np.asarray(counts, dtype=np.int64)
+    if counts.ndim == 2:
+        if counts.shape[1] != width:
+            raise ValueError("Expected %d columns, got %d" % (width, counts.shape[1]))
+        return counts
+    if not width:
+        return np.zeros((0, 0), dtype=np.int64)
+    return counts.reshape(-1, width)
+
+
+def _to_mz(mass, charge, mass_data):
+    # Mirrors calculate_mass: add a proton mass per charge and divide by the magnitude
+    if np.ndim(charge) == 0:
+        if not charge:
+            return mass
+        return (mass + charge * mass_data["H+"][0][0]) / abs(charge)
+    charge = np.asarray(charge)
+    mz = mass[:, None] + charge[None, :] * mass_data["H+"][0][0]
+    scale = np.abs(charge).astype(float)
+    scale[scale == 0] = 1.0
+    return mz / scale[None, :]
+
+
+class CompositionMatrix(object):
+    '''A collection of elemental compositions stored as a matrix of element counts.
+
+    Attributes
+    ----------
+    counts : :class:`numpy.ndarray`
+        An integer matrix with one row per composition and one column per element
+    elements : list of str
+        The element label of each column, which may carry an isotope label like ``C[13]``
+    element_index : dict
+        Maps each element label to its column
+    '''
+
+    def __init__(self, counts, elements):
+        _require_numpy()
+        self.elements = list(elements)
+        self.element_index = {element: i for i, element in enumerate(self.elements)}
+        self.counts = _count_matrix(counts, len(self.elements))
+        self._mass_vectors = {}
+
+    @classmethod
+    def from_compositions(cls, compositions, elements=None):
+        '''Build a matrix from a sequence of compositions.
+
+        Parameters
+        ----------
+        compositions : Iterable
+            :class:`~.Composition` instances, formulae, or objects with a ``total_composition``
+            method like :class:`~.GlycanComposition`
+        elements : Iterable of str, optional
+            The leading columns of the matrix. Elements not listed are added as they are found.
+
+        Returns
+        -------
+        :class:`CompositionMatrix`
+        '''
+        _require_numpy()
+        element_index = {element: i for i, element in enumerate(elements or ())}
+        rows = []
+        columns = []
+        values = []
+        n = 0
+        for composition in compositions:
+            for element, count in _as_composition(composition).items():
+                if not count:
+                    continue
+                try:
+                    column = element_index[element]
+                except KeyError:
+                    column = element_index[element] = len(element_index)
+                rows.append(n)
+                columns.append(column)
+                values.append(count)
+            n += 1
+        counts = np.zeros((n, len(element_index)), dtype=np.int64)
+        counts[rows, columns] = values
+        return cls(counts, element_index)
+
+    def mass_vector(self, average=False, mass_data=None):
+        '''The mass of one of each element of :attr:`elements`.
+
+        Average masses are computed as :func:`~.calculate_mass` does, and elements with
+        an isotope label always use that isotope's mass.
+
+        Parameters
+        ----------
+        average : bool, optional
+        mass_data : dict, optional
+            Defaults to :data:`~.nist_mass`
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+        '''
+        if mass_data is None:
+            mass_data = nist_mass
+        key = (average, id(mass_data))
+        try:
+            source, vector = self._mass_vectors[key]
+            if source is mass_data:
+                return vector
+        except KeyError:
+            pass
+        vector = np.zeros(len(self.elements))
+        for i, label in enumerate(self.elements):
+            element, isotope = _parse_isotope_string(label)
+            if average and not isotope:
+                vector[i] = sum(mass * abundance for number, (mass, abundance) in mass_data[element].items()
+                                if number != 0)
+            else:
+                vector[i] = mass_data[element][isotope][0]
+        # Hold a reference to mass_data so its id is not reused while the vector is kept
+        self._mass_vectors[key] = (mass_data, vector)
+        return vector
+
+    def mass(self, average=False, charge=0, mass_data=None):
+        '''Compute the mass or m/z of every composition.
+
+        Parameters
+        ----------
+        average : bool, optional
+            Whether to use average instead of monoisotopic masses
+        charge : int or Iterable of int, optional
+            If non-zero, compute m/z at this charge state. If several are given,
+            compute m/z at each of them.
+        mass_data : dict, optional
+            Defaults to :data:`~.nist_mass`
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The mass of each row, or with several charges, a matrix with one column per charge
+        '''
+        if mass_data is None:
+            mass_data = nist_mass
+        mass = self.counts @ self.mass_vector(average, mass_data)
+        return _to_mz(mass, charge, mass_data)
+
+    def composition(self, i):
+        '''Build the :class:`~.Composition` of row `i`.
+
+        Parameters
+        ----------
+        i : int
+
+        Returns
+        -------
+        :class:`~.Composition`
+        '''
+        composition = Composition()
+        for element, count in zip(self.elements, self.counts[i].tolist()):
+            if count:
+                composition[element] = count
+        return composition
+
+    def to_compositions(self):
+        '''Build the :class:`~.Composition` of every row.
+
+        Returns
+        -------
+        list of :class:`~.Composition`
+        '''
+        return [self.composition(i) for i in range(len(self))]
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            return self.composition(i)
+        return self.__class__(self.counts[i], self.elements)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.composition(i)
+
+    def __len__(self):
+        return self.counts.shape[0]
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({n} compositions, {self.elements!r})".format(self=self, n=len(self))
+
+
+class GlycanCompositionMatrix(object):
+    '''A collection of glycan compositions stored as a matrix of residue counts.
+
+    Attributes
+    ----------
+    counts : :class:`numpy.ndarray`
+        An integer matrix with one row per glycan composition and one column per residue
+    residues : list
+        The residue of each column
+    residue_elements : :class:`CompositionMatrix`
+        The elemental composition of each residue, one row per column of :attr:`counts`
+    offsets : :class:`CompositionMatrix`
+        The composition offset of each glycan composition
+    reducing_ends : list
+        The reducing end of each glycan composition, or :const:`None`
+    '''
+
+    def __init__(self, counts, residues, offsets=None, reducing_ends=None):
+        _require_numpy()
+        self.residues = list(residues)
+        self.residue_index = {residue: i for i, residue in enumerate(self.residues)}
+        self.counts = _count_matrix(counts, len(self.residues))
+        n = self.counts.shape[0]
+        if offsets is None:
+            offsets = CompositionMatrix.from_compositions([Composition("H2O")] * n)
+        if reducing_ends is None:
+            reducing_ends = [None] * n
+        self.offsets = offsets
+        self.reducing_ends = list(reducing_ends)
+        self.residue_elements = CompositionMatrix.from_compositions(
+            [residue.total_composition() for residue in self.residues], self.offsets.elements)
+        self._offset_elements = None
+
+    @classmethod
+    def from_glycan_compositions(cls, compositions, residues=None):
+        '''Build a matrix from a sequence of glycan compositions.
+
+        Parameters
+        ----------
+        compositions : Iterable of :class:`~.GlycanComposition`
+        residues : Iterable, optional
+            The leading columns of the matrix. Residues not listed are added as they are found.
+
+        Returns
+        -------
+        :class:`GlycanCompositionMatrix`
+        '''
+        _require_numpy()
+        residue_index = {residue: i for i, residue in enumerate(residues or ())}
+        # Residues are usually shared between compositions, so look them up by identity
+        # before hashing them, which may require formatting their names
+        identity_index = {}
+        rows = []
+        columns = []
+        values = []
+        offsets = []
+        reducing_ends = []
+        n = 0
+        for composition in compositions:
+            for residue, count in composition.items():
+                if not count:
+                    continue
+                try:
+                    column = identity_index[id(residue)][0]
+                except KeyError:
+                    try:
+                        column = residue_index[residue]
+                    except KeyError:
+                        column = residue_index[residue] = len(residue_index)
+                    identity_index[id(residue)] = (column, residue)
+                rows.append(n)
+                columns.append(column)
+                values.append(count)
+            offsets.append(composition.composition_offset)
+            reducing_ends.append(composition.reducing_end)
+            n += 1
+        counts = np.zeros((n, len(residue_index)), dtype=np.int64)
+        counts[rows, columns] = values
+        return cls(counts, residue_index, CompositionMatrix.from_compositions(offsets), reducing_ends)
+
+    def _offset_matrix(self):
+        if self._offset_elements is None:
+            offsets = self.offsets
+            if any(reducing_end is not None for reducing_end in self.reducing_ends):
+                compositions = offsets.to_compositions()
+                for composition, reducing_end in zip(compositions, self.reducing_ends):
+                    if reducing_end is not None:
+                        composition += reducing_end.total_composition()
+                offsets = CompositionMatrix.from_compositions(compositions, offsets.elements)
+            self._offset_elements = offsets
+        return self._offset_elements
+
+    def element_matrix(self):
+        '''Compute the elemental composition of every glycan composition.
+
+        Returns
+        -------
+        :class:`CompositionMatrix`
+        '''
+        offsets = self._offset_matrix()
+        elements = list(offsets.elements)
+        for element in self.residue_elements.elements:
+            if element not in offsets.element_index:
+                elements.append(element)
+        counts = np.zeros((len(self), len(elements)), dtype=np.int64)
+        counts[:, :len(offsets.elements)] = offsets.counts
+        index = [elements.index(element) for element in self.residue_elements.elements]
+        counts[:, index] += self.counts @ self.residue_elements.counts
+        return CompositionMatrix(counts, elements)
+
+    def mass(self, average=False, charge=0, mass_data=None):
+        '''Compute the mass or m/z of every glycan composition.
+
+        Parameters
+        ----------
+        average : bool, optional
+            Whether to use average instead of monoisotopic masses
+        charge : int or Iterable of int, optional
+            If non-zero, compute m/z at this charge state. If several are given,
+            compute m/z at each of them.
+        mass_data : dict, optional
+            Defaults to :data:`~.nist_mass`
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The mass of each row, or with several charges, a matrix with one column per charge
+        '''
+        if mass_data is None:
+            mass_data = nist_mass
+        residue_mass = self.residue_elements.mass(average, 0, mass_data)
+        mass = self.counts @ residue_mass + self._offset_matrix().mass(average, 0, mass_data)
+        return _to_mz(mass, charge, mass_data)
+
+    def glycan_composition(self, i, cls=None):
+        '''Build the glycan composition of row `i`.
+
+        Parameters
+        ----------
+        i : int
+        cls : type, optional
+            The type of glycan composition to build, defaulting to :class:`~.GlycanComposition`
+
+        Returns
+        -------
+        :class:`~.GlycanComposition`
+        '''
+        if cls is None:
+            from glypy.structure.glycan_composition import GlycanComposition as cls
+        composition = cls()
+        for residue, count in zip(self.residues, self.counts[i].tolist()):
+            if count:
+                composition[residue] = count
+        reducing_end = self.reducing_ends[i]
+        if reducing_end is not None:
+            composition.reducing_end = reducing_end.clone()
+        composition.composition_offset = self.offsets.composition(i)
+        return composition
+
+    def to_glycan_compositions(self, cls=None):
+        '''Build the glycan composition of every row.
+
+        Parameters
+        ----------
+        cls : type, optional
+            The type of glycan composition to build, defaulting to :class:`~.GlycanComposition`
+
+        Returns
+        -------
+        list
+        '''
+        return [self.glycan_composition(i, cls) for i in range(len(self))]
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            return self.glycan_composition(i)
+        rows = np.arange(len(self))[i]
+        return self.__class__(self.counts[rows], self.residues, self.offsets[rows],
+                              [self.reducing_ends[j] for j in rows.tolist()])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.glycan_composition(i)
+
+    def __len__(self):
+        return self.counts.shape[0]
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({n} compositions, {residues!r})".format(
+            self=self, n=len(self), residues=[str(residue) for residue in self.residues])
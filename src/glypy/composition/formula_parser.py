@@ -0,0 +1,310 @@
+'''Parse chemical formulae into element counts, remembering the formulae already parsed.
+
+Both :class:`~.PComposition` and :class:`~.CComposition` build themselves from a formula
+through :data:`formula_cache`, so the many compositions made from the same handful of
+formulae, like ``H2O`` or the shifts of glycosidic and cross-ring fragments, are parsed once
+and copied afterwards.
+
+Formulae with parenthesized groups are read backwards, matching each element symbol against
+an :class:`ElementMatcher` built once for each ``mass_data`` instead of testing every element
+in ``mass_data`` from longest to shortest name.
+'''
+import re
+
+from .mass_dict import nist_mass
+from .base import ChemicalCompositionError
+
+
+_atom = r'([A-Z][a-z+]*)(?:\[(\d+)\])?([+-]?\d+)?'
+_formula = r'^({})*$'.format(_atom)
+
+atom_pattern = re.compile(_atom)
+formula_pattern = re.compile(_formula)
+
+
+def _make_isotope_string(element_name, isotope_num):
+    if isotope_num == 0:
+        return element_name
+    else:
+        return '%s[%d]' % (element_name, isotope_num)
+
+
+class ElementMatcher(object):
+    '''Matches the longest element symbol of a ``mass_data`` ending at a position in a
+    formula, using a trie of the reversed element symbols.
+
+    Attributes
+    ----------
+    trie : dict
+        Maps each character to the subtrie of the symbols with that character before
+        the suffix already read. The symbol ending at a node is stored under :const:`None`.
+    size : int
+        The number of elements in the ``mass_data`` the matcher was built from
+    '''
+
+    def __init__(self, elements):
+        self.trie = {}
+        self.size = 0
+        for element in elements:
+            node = self.trie
+            for character in reversed(element):
+                node = node.setdefault(character, {})
+            node[None] = element
+            self.size += 1
+
+    def match(self, formula, end):
+        '''Find the longest element symbol ending at `end`, inclusive.
+
+        Parameters
+        ----------
+        formula : str
+        end : int
+
+        Returns
+        -------
+        str or :const:`None`
+        '''
+        node = self.trie
+        found = None
+        i = end
+        while i >= 0:
+            node = node.get(formula[i])
+            if node is None:
+                break
+            found = node.get(None, found)
+            i -= 1
+        return found
+
+
+_element_matchers = {}
+
+
+def element_matcher(mass_data=None):
+    '''Get the :class:`ElementMatcher` for `mass_data`, building it on first use or if
+    elements were added since.
+
+    Parameters
+    ----------
+    mass_data : dict, optional
+        Defaults to :data:`~.nist_mass`
+
+    Returns
+    -------
+    :class:`ElementMatcher`
+    '''
+    if mass_data is None:
+        mass_data = nist_mass
+    try:
+        source, matcher = _element_matchers[id(mass_data)]
+        if source is mass_data and matcher.size == len(mass_data):
+            return matcher
+    except KeyError:
+        pass
+    matcher = ElementMatcher(mass_data)
+    # Hold a reference to mass_data so its id is not reused while the matcher is kept
+    _element_matchers[id(mass_data)] = (mass_data, matcher)
+    return matcher
+
+
+def _parse_atoms(formula, mass_data, counts):
+    if not formula_pattern.match(formula):
+        raise ChemicalCompositionError('Invalid formula: ' + formula)
+    for elem, isotope, number in atom_pattern.findall(formula):
+        if elem not in mass_data:
+            raise ChemicalCompositionError('Unknown chemical element: ' + elem)
+        key = _make_isotope_string(elem, int(isotope) if isotope else 0)
+        counts[key] = counts.get(key, 0) + (int(number) if number else 1)
+
+
+def _parse_parens(formula, mass_data, counts):
+    # Parsing a formula backwards.
+    matcher = element_matcher(mass_data)
+    prev_chem_symbol_start = len(formula)
+    i = len(formula) - 1
+
+    seek_mode = 0
+    parse_stack = ""
+    group_coef = 1
+
+    while i >= 0:
+        if seek_mode < 1:
+            if (formula[i] == ")"):
+                seek_mode += 1
+                if i + 1 == prev_chem_symbol_start:
+                    group_coef = 1
+                elif formula[i + 1].isdigit():
+                    group_coef = int(formula[i + 1:prev_chem_symbol_start])
+                i -= 1
+                continue
+            # Read backwards until a non-number character is met.
+            if (formula[i].isdigit() or formula[i] == '-'):
+                i -= 1
+                continue
+
+            else:
+                # If the number of atoms is omitted then it is 1.
+                if i + 1 == prev_chem_symbol_start:
+                    num_atoms = 1
+                else:
+                    try:
+                        num_atoms = int(formula[i + 1:prev_chem_symbol_start])
+                    except ValueError:
+                        raise ChemicalCompositionError(
+                            'Badly-formed number of atoms: %s' % formula)
+
+                # Read isotope number if specified, else it is undefined (=0).
+                if formula[i] == ']':
+                    brace_pos = formula.rfind('[', 0, i)
+                    if brace_pos == -1:
+                        raise ChemicalCompositionError(
+                            'Badly-formed isotope number: %s' % formula)
+                    try:
+                        isotope_num = int(formula[brace_pos + 1:i])
+                    except ValueError:
+                        raise ChemicalCompositionError(
+                            'Badly-formed isotope number: %s' % formula)
+                    i = brace_pos - 1
+                else:
+                    isotope_num = 0
+
+                # Match the longest element name in mass_data ending here
+                element_name = matcher.match(formula, i)
+                if element_name is None:
+                    raise ChemicalCompositionError(
+                        'Unknown chemical element in the formula: %s' % formula)
+                isotope_string = _make_isotope_string(element_name, isotope_num)
+                counts[isotope_string] = counts.get(isotope_string, 0) + num_atoms
+                i -= len(element_name)
+                prev_chem_symbol_start = i + 1
+        else:
+            ch = formula[i]
+            parse_stack += ch
+            i -= 1
+            if (ch == "("):
+                seek_mode -= 1
+                if seek_mode == 0:
+                    # Omit the last character, then reverse the parse stack string.
+                    group = parse_formula(parse_stack[:-1][::-1], mass_data)
+                    for elem, cnt in group.items():
+                        counts[elem] = counts.get(elem, 0) + cnt * group_coef
+                    prev_chem_symbol_start = i + 1
+                    seek_mode = 0
+                    parse_stack = ""
+            elif (formula[i] == ")"):
+                seek_mode += 1
+
+
+def parse_formula(formula, mass_data=None):
+    '''Parse `formula` into a :class:`dict` of element counts without zero counts.
+
+    Parameters
+    ----------
+    formula : str
+    mass_data : dict, optional
+        Defaults to :data:`~.nist_mass`
+
+    Returns
+    -------
+    dict
+
+    Raises
+    ------
+    ChemicalCompositionError
+        If the formula is malformed or uses an element not in `mass_data`
+    '''
+    if mass_data is None:
+        mass_data = nist_mass
+    counts = {}
+    if '(' in formula:
+        _parse_parens(formula, mass_data, counts)
+    else:
+        _parse_atoms(formula, mass_data, counts)
+    return {elem: cnt for elem, cnt in counts.items() if cnt}
+
+
+class FormulaCache(object):
+    '''Remembers the element counts of each formula parsed for each ``mass_data``.
+
+    The cached counts must not be modified. Compositions copy them when they are built.
+
+    Attributes
+    ----------
+    formulae : dict
+        Maps ``(formula, id(mass_data))`` to the element counts of the formula
+    maxsize : int
+        The maximum number of formulae held. When the cache is full, new formulae are
+        parsed but not stored.
+    hits : int
+        The number of lookups satisfied from the cache
+    misses : int
+        The number of lookups that required parsing a formula
+    '''
+
+    def __init__(self, maxsize=2 ** 16):
+        self.maxsize = maxsize
+        self.formulae = {}
+        self.mass_data = {}
+        self.hits = 0
+        self.misses = 0
+
+    def parse(self, formula, mass_data=None):
+        '''Get the element counts of `formula`, parsing it with :func:`parse_formula`
+        if it has not been seen with `mass_data` before.
+
+        Parameters
+        ----------
+        formula : str
+        mass_data : dict, optional
+            Defaults to :data:`~.nist_mass`
+
+        Returns
+        -------
+        dict
+        '''
+        if mass_data is None:
+            mass_data = nist_mass
+        key = (formula, id(mass_data))
+        try:
+            counts = self.formulae[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return counts
+        self.misses += 1
+        counts = parse_formula(formula, mass_data)
+        if len(self.formulae) < self.maxsize:
+            self.formulae[key] = counts
+            # Hold a reference to mass_data so its id is not reused while keys refer to it
+            self.mass_data[id(mass_data)] = mass_data
+        return counts
+
+    def stats(self):
+        '''Summarize the usage of the cache.
+
+        Returns
+        -------
+        dict
+        '''
+        return {
+            "formulae": len(self.formulae),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        '''Remove all cached formulae and reset the usage counters.
+        '''
+        self.formulae.clear()
+        self.mass_data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.formulae)
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({stats})".format(self=self, stats=self.stats())
+
+
+formula_cache = FormulaCache()
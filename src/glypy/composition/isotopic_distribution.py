@@ -0,0 +1,273 @@
+'''Compute the aggregated isotopic pattern of a chemical composition.
+
+The isotopologues of a molecule are grouped by the number of extra neutrons they carry,
+giving one peak per nominal mass shift whose intensity is the probability of the group and
+whose mass is the abundance-weighted mean mass of its members. Each element's isotopes form
+a polynomial in the neutron shift, with a probability and a probability-weighted mass for
+each term, and the pattern of a composition is the product of those polynomials raised to
+the element counts. Products are truncated to a fixed number of peaks, so the terms kept are
+exact while the cost does not grow with the size of the molecule.
+
+The distribution of each element count is built by repeated squaring and kept in an
+:class:`IsotopicDistributionCache`, so the patterns of many related compositions, like the
+candidates of a glycan composition search, share most of their work.
+
+This module requires :mod:`numpy`.
+'''
+from .composition import _parse_isotope_string
+from .composition_matrix import _as_composition, _to_mz
+from .mass_dict import nist_mass
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+DEFAULT_MAX_PEAKS = 32
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("Isotopic pattern generation requires numpy")
+
+
+def _multiply(a, b, limit):
+    # Multiply two truncated polynomials of (probability, probability * mass) terms
+    p = np.convolve(a[0], b[0])[:limit]
+    w = (np.convolve(a[1], b[0]) + np.convolve(a[0], b[1]))[:limit]
+    return p, w
+
+
+class IsotopicDistributionCache(object):
+    '''Caches the isotopic distribution of each count of each element.
+
+    Attributes
+    ----------
+    distributions : dict
+        Maps ``(id(mass_data), element, count, limit)`` to the probabilities and
+        probability-weighted masses of the element count
+    mass_data : dict
+        Maps ``id(mass_data)`` to each ``mass_data`` used in a key
+    maxsize : int
+        The maximum number of distributions held. When the cache is full, new
+        distributions are computed but not stored.
+    hits : int
+        The number of lookups satisfied from the cache
+    misses : int
+        The number of lookups that required computing a new distribution
+    '''
+
+    def __init__(self, maxsize=2 ** 16):
+        self.maxsize = maxsize
+        self.distributions = {}
+        self.elements = {}
+        self.mass_data = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _element(self, element, mass_data):
+        # The isotopes of an element with non-zero abundance, as a polynomial in the
+        # neutron shift from the lightest of them
+        key = (id(mass_data), element)
+        try:
+            return self.elements[key]
+        except KeyError:
+            pass
+        isotopes = sorted((number, mass, abundance) for number, (mass, abundance) in mass_data[element].items()
+                          if number and abundance > 0)
+        if not isotopes:
+            p = np.ones(1)
+            w = np.array([mass_data[element][0][0]])
+        else:
+            lightest = isotopes[0][0]
+            p = np.zeros(isotopes[-1][0] - lightest + 1)
+            w = np.zeros_like(p)
+            for number, mass, abundance in isotopes:
+                p[number - lightest] = abundance
+                w[number - lightest] = abundance * mass
+            total = p.sum()
+            p /= total
+            w /= total
+        self.elements[key] = (p, w)
+        self._hold(mass_data)
+        return p, w
+
+    def _hold(self, mass_data):
+        # Hold a reference to mass_data so its id is not reused while keys refer to it
+        self.mass_data[id(mass_data)] = mass_data
+
+    def element_distribution(self, element, count, mass_data=None, limit=DEFAULT_MAX_PEAKS):
+        '''Get the isotopic distribution of `count` atoms of `element`.
+
+        Parameters
+        ----------
+        element : str
+            An element without an isotope label
+        count : int
+        mass_data : dict, optional
+            Defaults to :data:`~.nist_mass`
+        limit : int, optional
+            The number of peaks to keep
+
+        Returns
+        -------
+        tuple of :class:`numpy.ndarray`
+            The probability and probability-weighted mass of each peak
+        '''
+        if mass_data is None:
+            mass_data = nist_mass
+        key = (id(mass_data), element, count, limit)
+        try:
+            value = self.distributions[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return value
+        self.misses += 1
+        if count == 1:
+            p, w = self._element(element, mass_data)
+            value = p[:limit], w[:limit]
+        else:
+            # Split the count into its highest power of two and the rest, so every
+            # distribution built is reused by the counts which share its bits
+            high = 1 << (count.bit_length() - 1)
+            if high == count:
+                half = self.element_distribution(element, count // 2, mass_data, limit)
+                value = _multiply(half, half, limit)
+            else:
+                value = _multiply(self.element_distribution(element, high, mass_data, limit),
+                                  self.element_distribution(element, count - high, mass_data, limit),
+                                  limit)
+        if len(self.distributions) < self.maxsize:
+            self.distributions[key] = value
+            self._hold(mass_data)
+        return value
+
+    def stats(self):
+        '''Summarize the usage of the cache.
+
+        Returns
+        -------
+        dict
+        '''
+        return {
+            "distributions": len(self.distributions),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        '''Remove all cached distributions and reset the usage counters.
+        '''
+        self.distributions.clear()
+        self.elements.clear()
+        self.mass_data.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.distributions)
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({stats})".format(self=self, stats=self.stats())
+
+
+isotopic_cache = IsotopicDistributionCache()
+
+
+def isotopic_pattern(composition, charge=0, max_peaks=DEFAULT_MAX_PEAKS, truncate_after=0.9999,
+                     mass_data=None, cache=None):
+    '''Compute the aggregated isotopic pattern of `composition`.
+
+    Elements given with an isotope label, like ``C[13]``, and charge carriers like ``H+``
+    contribute their mass without an isotopic distribution.
+
+    Parameters
+    ----------
+    composition : :class:`~.Composition`, str, or object with ``total_composition``
+        The composition, a formula, or a :class:`~.GlycanComposition`, :class:`~.Glycan`
+        or other object with a ``total_composition`` method
+    charge : int or Iterable of int, optional
+        The charge state to compute m/z for, or several. A charge of 0 gives neutral masses.
+    max_peaks : int, optional
+        The largest number of peaks to compute
+    truncate_after : float, optional
+        Drop the peaks after the first ones whose summed intensity reaches this fraction.
+        Pass 1.0 to keep all `max_peaks`.
+    mass_data : dict, optional
+        Defaults to :data:`~.nist_mass`
+    cache : :class:`IsotopicDistributionCache`, optional
+        Defaults to the shared :data:`isotopic_cache`
+
+    Returns
+    -------
+    tuple of :class:`numpy.ndarray`
+        The m/z and intensity of each peak, with intensities summing to 1 before truncation.
+        If `charge` is an Iterable, a :class:`dict` mapping each charge to such a tuple.
+    '''
+    _require_numpy()
+    if mass_data is None:
+        mass_data = nist_mass
+    if cache is None:
+        cache = isotopic_cache
+    composition = _as_composition(composition)
+    p = np.ones(1)
+    w = np.zeros(1)
+    fixed_mass = 0.0
+    for label, count in composition.items():
+        if not count:
+            continue
+        element, isotope = _parse_isotope_string(label)
+        if isotope or count < 0 or element == "H+":
+            fixed_mass += count * mass_data[element][isotope][0]
+            continue
+        p, w = _multiply((p, w), cache.element_distribution(element, count, mass_data, max_peaks), max_peaks)
+    keep = p > 0
+    if truncate_after < 1.0:
+        keep &= (np.cumsum(p) - p) < truncate_after
+    p = p[keep]
+    masses = w[keep] / p + fixed_mass
+    try:
+        charges = iter(charge)
+    except TypeError:
+        return _to_mz(masses, charge, mass_data), p
+    return {z: (_to_mz(masses, z, mass_data), p) for z in charges}
+
+
+def isotopic_patterns(compositions, charge=0, max_peaks=DEFAULT_MAX_PEAKS, truncate_after=0.9999,
+                      mass_data=None, cache=None):
+    '''Compute the isotopic pattern of each of `compositions` with :func:`isotopic_pattern`,
+    computing each distinct composition once.
+
+    Parameters
+    ----------
+    compositions : Iterable
+    charge : int or Iterable of int, optional
+    max_peaks : int, optional
+    truncate_after : float, optional
+    mass_data : dict, optional
+    cache : :class:`IsotopicDistributionCache`, optional
+
+    Returns
+    -------
+    list
+        The pattern of each composition, in order
+    '''
+    try:
+        charge = tuple(charge)
+    except TypeError:
+        pass
+    patterns = {}
+    result = []
+    for composition in compositions:
+        composition = _as_composition(composition)
+        key = frozenset((label, count) for label, count in composition.items() if count)
+        try:
+            pattern = patterns[key]
+        except KeyError:
+            pattern = patterns[key] = isotopic_pattern(
+                composition, charge, max_peaks, truncate_after, mass_data, cache)
+        result.append(pattern)
+    return result
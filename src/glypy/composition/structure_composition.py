@@ -1,8 +1,7 @@
 import warnings
 
-from collections import defaultdict
-
 from glypy.composition import Composition
+from glypy.composition.composition import FrozenComposition
 
 do_warn = True
 do_error = False
@@ -16,33 +15,48 @@ class CompositionRule(object):
     def __init__(self, base_composition, position_shifts=None):
         if position_shifts is None:
             position_shifts = {}
-        self.composition = Composition(base_composition)
-        self.position_shifts = defaultdict(Composition)
-        self.position_shifts.update(position_shifts)
+        self.composition = FrozenComposition.intern(base_composition)
+        self.position_shifts = {
+            position: FrozenComposition.intern(shift) for position, shift in position_shifts.items()}
+        self._products = {}
 
     def __call__(self, position=-1):
-        # Implicitly copies
-        return self.composition + Composition(self.position_shifts[position])
+        # Returns a shared FrozenComposition, which must be cloned to be modified
+        try:
+            return self._products[position]
+        except KeyError:
+            shift = self.position_shifts.get(position)
+            product = self.composition if shift is None else self.composition.add(shift)
+            self._products[position] = product
+            return product
 
 
 class CompositionIndex(dict):
 
+    def __init__(self, *args, **kwargs):
+        super(CompositionIndex, self).__init__()
+        self.update(*args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
     def __getitem__(self, key):
         try:
             composition_dict = super(CompositionIndex, self).__getitem__(key)
         except KeyError:
-            composition_dict = Composition()
+            composition_dict = FrozenComposition.intern({})
             if do_warn:
                 warnings.warn("{key} could not be found. It may not have an explicit composition".format(key=key),
                               UnknownCompositionWarning,
                               stacklevel=3)
             if do_error:
                 raise
-        # Explicitly copies
-        return (composition_dict).clone()
+        # Returns a shared FrozenComposition, which must be cloned to be modified
+        return composition_dict
 
     def __setitem__(self, key, value):
-        value = Composition(value)
+        value = FrozenComposition.intern(value)
         super(CompositionIndex, self).__setitem__(key, value)
 
     def register(self, key, value):
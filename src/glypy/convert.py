@@ -0,0 +1,431 @@
+'''Convert collections of glycan structures between text formats.
+
+This module implements a streaming batch conversion pipeline on top of the
+readers in :mod:`glypy.io` and the writers registered with
+:meth:`~.Glycan.register_serializer`. Records are read one at a time from the
+input, converted in a process pool, optionally de-duplicated by canonical
+structure, and written to the output in input order. Paths ending in ``.gz``
+are read and written with :mod:`gzip`, and gzipped input is also detected from
+its content.
+
+The pipeline can be run from the command line::
+
+    python -m glypy.convert -f glycoct -t wurcs structures.glycoct.gz structures.wurcs.gz -p 4 --dedup
+
+Line-oriented formats (``wurcs``, ``iupac``, ``linear_code``) hold one structure per line,
+optionally preceded by an identifier and a tab character, which is carried over to the output.
+GlycoCT records begin with a ``RES`` line, and GlycoCT{XML} records are ``<sugar>`` elements.
+'''
+import argparse
+import gzip
+import hashlib
+import io
+import logging
+import multiprocessing
+import sys
+import time
+
+from collections import namedtuple
+from typing import Callable, Dict, Iterator, Optional, TextIO
+
+from glypy.structure import Glycan
+from glypy.structure.glycan_composition import GlycanComposition
+from glypy.utils import ET
+from glypy.io import glycoct, glycoct_xml, iupac, linear_code, wurcs
+
+
+logger = logging.getLogger(__name__)
+
+
+#: A single structure read from the input. ``payload`` is the record text in
+#: the input format.
+ConversionRecord = namedtuple("ConversionRecord", ("index", "identifier", "payload"))
+
+#: The outcome of converting a single :class:`ConversionRecord`. Exactly one of
+#: ``text`` or ``error`` is not :const:`None`.
+ConversionResult = namedtuple("ConversionResult", ("index", "identifier", "text", "key", "error"))
+
+
+LINE_FORMATS = ("wurcs", "iupac", "linear_code")
+MULTILINE_OUTPUT_FORMATS = ("glycoct", )
+
+
+def _load_glycoct(text):
+    return glycoct.loads(text, allow_multiple=False)
+
+
+def _load_glycoct_xml(text):
+    return glycoct_xml.load(io.BytesIO(text.encode('utf8')), allow_multiple=False)
+
+
+#: Maps input format names to a callable which parses a single record's text
+readers: Dict[str, Callable[[str], Glycan]] = {
+    "glycoct": _load_glycoct,
+    "glycoct_xml": _load_glycoct_xml,
+    "wurcs": wurcs.loads,
+    "iupac": iupac.loads,
+    "linear_code": linear_code.loads,
+}
+
+
+def writers() -> Dict[str, Callable[[Glycan], str]]:
+    '''The output formats available, as registered through
+    :meth:`~.Glycan.register_serializer`.
+
+    Returns
+    -------
+    dict
+    '''
+    return dict(Glycan._serializers)
+
+
+def open_stream(path: str, mode: str = 'r') -> TextIO:
+    '''Open `path` as a text stream, transparently handling gzip compression
+    and ``-`` as :data:`sys.stdin` or :data:`sys.stdout`.
+
+    When reading, gzip compression is detected from the file's content rather
+    than from its name.
+
+    Parameters
+    ----------
+    path : str
+        The path to open
+    mode : str
+        Either ``'r'`` or ``'w'``
+
+    Returns
+    -------
+    file-like
+    '''
+    if path == '-':
+        return sys.stdin if mode == 'r' else sys.stdout
+    if mode == 'r':
+        handle = open(path, 'rb')
+        magic = handle.read(2)
+        handle.seek(0)
+        if magic == b'\x1f\x8b':
+            return io.TextIOWrapper(gzip.GzipFile(fileobj=handle, mode='rb'), encoding='utf8')
+        return io.TextIOWrapper(handle, encoding='utf8')
+    if path.endswith(".gz"):
+        return gzip.open(path, 'wt', encoding='utf8')
+    return open(path, 'w', encoding='utf8')
+
+
+def iter_line_records(stream: TextIO) -> Iterator[ConversionRecord]:
+    '''Read one record per non-empty line. If a line contains a tab character, the
+    text preceding the last tab is the record identifier.
+    '''
+    index = 0
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        if "\t" in line:
+            identifier, payload = line.rsplit("\t", 1)
+        else:
+            identifier, payload = None, line
+        yield ConversionRecord(index, identifier, payload)
+        index += 1
+
+
+def iter_glycoct_records(stream: TextIO) -> Iterator[ConversionRecord]:
+    '''Read GlycoCT{condensed} records, each starting at a ``RES`` line.
+    '''
+    index = 0
+    buffer = []
+    for line in stream:
+        stripped = line.strip()
+        if stripped == "RES" and buffer:
+            yield ConversionRecord(index, None, '\n'.join(buffer))
+            index += 1
+            buffer = []
+        if stripped:
+            buffer.append(stripped)
+    if buffer:
+        yield ConversionRecord(index, None, '\n'.join(buffer))
+
+
+def iter_glycoct_xml_records(stream: TextIO) -> Iterator[ConversionRecord]:
+    '''Read GlycoCT{XML} records, the ``<sugar>`` elements containing a ``<residues>``
+    section, without holding the whole document in memory.
+    '''
+    index = 0
+    for _evt, entity in ET.iterparse(stream, ("end", )):
+        tag = entity.tag.split("}")[-1]
+        if tag != 'sugar':
+            continue
+        if any(child.tag.split("}")[-1] == 'residues' for child in entity):
+            payload = ET.tostring(entity)
+            if isinstance(payload, bytes):
+                payload = payload.decode('utf8')
+            yield ConversionRecord(index, entity.attrib.get("id"), payload)
+            index += 1
+        entity.clear()
+
+
+def iter_records(stream: TextIO, input_format: str) -> Iterator[ConversionRecord]:
+    '''Read the records of `stream` according to `input_format`.
+
+    Parameters
+    ----------
+    stream : file-like
+        The text stream to read
+    input_format : str
+        The name of the input format, one of :data:`readers`
+
+    Yields
+    ------
+    :class:`ConversionRecord`
+    '''
+    if input_format == 'glycoct':
+        return iter_glycoct_records(stream)
+    elif input_format == 'glycoct_xml':
+        # :func:`~xml.etree.ElementTree.iterparse` needs a byte stream when the
+        # document carries an encoding declaration
+        return iter_glycoct_xml_records(getattr(stream, 'buffer', stream))
+    elif input_format in LINE_FORMATS:
+        return iter_line_records(stream)
+    raise ValueError("Unknown input format %r" % (input_format, ))
+
+
+def canonical_key(structure) -> str:
+    '''Compute a digest identifying the canonical form of `structure`, used to
+    detect duplicates.
+
+    Parameters
+    ----------
+    structure : :class:`~.Glycan` or :class:`~.GlycanComposition`
+
+    Returns
+    -------
+    str
+    '''
+    if isinstance(structure, GlycanComposition):
+        text = structure.serialize()
+    else:
+        text = glycoct.dumps(structure)
+    return hashlib.sha1(text.encode('utf8')).hexdigest()
+
+
+class RecordConverter(object):
+    '''Converts :class:`ConversionRecord` instances from one format to another.
+
+    Instances are picklable so they may be shipped to worker processes once.
+
+    Attributes
+    ----------
+    input_format : str
+    output_format : str
+    dedup : bool
+        Whether to compute :func:`canonical_key` for each structure
+    '''
+
+    def __init__(self, input_format: str, output_format: str, dedup: bool = False):
+        try:
+            self.reader = readers[input_format]
+        except KeyError:
+            raise ValueError("Unknown input format %r" % (input_format, ))
+        try:
+            self.writer = writers()[output_format]
+        except KeyError:
+            raise ValueError("Unknown output format %r" % (output_format, ))
+        self.input_format = input_format
+        self.output_format = output_format
+        self.dedup = dedup
+
+    def __call__(self, record: ConversionRecord) -> ConversionResult:
+        try:
+            structure = self.reader(record.payload)
+            key = canonical_key(structure) if self.dedup else None
+            text = self.writer(structure)
+        except Exception as err:
+            return ConversionResult(record.index, record.identifier, None, None,
+                                    "%s: %s" % (err.__class__.__name__, err))
+        return ConversionResult(record.index, record.identifier, text, key, None)
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({self.input_format!r}, {self.output_format!r}, {self.dedup!r})".format(
+            self=self)
+
+
+_worker_converter: Optional[RecordConverter] = None
+
+
+def _worker_init(converter: RecordConverter):
+    global _worker_converter
+    _worker_converter = converter
+
+
+def _worker_convert(record: ConversionRecord) -> ConversionResult:
+    return _worker_converter(record)
+
+
+class ConversionSummary(object):
+    '''Tallies the outcome of a :func:`convert` run.
+
+    Attributes
+    ----------
+    total : int
+        The number of records read
+    converted : int
+        The number of records written
+    duplicates : int
+        The number of records skipped as duplicates of an earlier record
+    failures : list of :class:`ConversionResult`
+        The records which could not be converted
+    elapsed : float
+        The wall time taken, in seconds
+    '''
+
+    def __init__(self):
+        self.total = 0
+        self.converted = 0
+        self.duplicates = 0
+        self.failures = []
+        self.elapsed = 0.0
+
+    @property
+    def throughput(self) -> float:
+        '''The number of records processed per second'''
+        if self.elapsed == 0:
+            return 0.0
+        return self.total / self.elapsed
+
+    def __str__(self):
+        return ("Read {self.total} records, wrote {self.converted}, skipped {self.duplicates} duplicates, "
+                "{n_failures} failed in {self.elapsed:0.2f} sec ({self.throughput:0.1f} records/sec)").format(
+                    self=self, n_failures=len(self.failures))
+
+    def __repr__(self):
+        return ("{self.__class__.__name__}(total={self.total}, converted={self.converted}, "
+                "duplicates={self.duplicates}, failures={n_failures}, elapsed={self.elapsed:0.2f})").format(
+                    self=self, n_failures=len(self.failures))
+
+
+def _write_result(stream: TextIO, result: ConversionResult, output_format: str):
+    if output_format not in MULTILINE_OUTPUT_FORMATS:
+        if result.identifier is not None:
+            stream.write("%s\t%s\n" % (result.identifier, result.text))
+        else:
+            stream.write("%s\n" % (result.text, ))
+    else:
+        stream.write(result.text.strip())
+        stream.write("\n\n")
+
+
+def convert(input_stream: TextIO, output_stream: TextIO, input_format: str, output_format: str,
+            processes: int = 1, dedup: bool = False, chunksize: int = 64,
+            progress_interval: int = 10000) -> ConversionSummary:
+    '''Convert every record in `input_stream` from `input_format` to `output_format`,
+    writing the results to `output_stream` in input order.
+
+    Records which fail to parse or serialize are not written, but are collected in
+    :attr:`ConversionSummary.failures`.
+
+    Parameters
+    ----------
+    input_stream : file-like
+        The text stream to read records from
+    output_stream : file-like
+        The text stream to write converted records to
+    input_format : str
+        The name of the input format, one of :data:`readers`
+    output_format : str
+        The name of the output format, one of :func:`writers`
+    processes : int, optional
+        The number of worker processes to convert records with. If less than two,
+        records are converted in this process.
+    dedup : bool, optional
+        Whether to skip records whose :func:`canonical_key` has already been written
+    chunksize : int, optional
+        The number of records sent to a worker at a time
+    progress_interval : int, optional
+        Log progress every `progress_interval` records
+
+    Returns
+    -------
+    :class:`ConversionSummary`
+    '''
+    converter = RecordConverter(input_format, output_format, dedup=dedup)
+    summary = ConversionSummary()
+    seen = set()
+    start = time.time()
+    records = iter_records(input_stream, input_format)
+    pool = None
+    if processes is not None and processes > 1:
+        pool = multiprocessing.Pool(processes, initializer=_worker_init, initargs=(converter, ))
+        results = pool.imap(_worker_convert, records, chunksize=chunksize)
+    else:
+        results = map(converter, records)
+    try:
+        for result in results:
+            summary.total += 1
+            if result.error is not None:
+                logger.debug("Failed to convert record %d (%r): %s", result.index, result.identifier, result.error)
+                summary.failures.append(result)
+            elif dedup and result.key in seen:
+                summary.duplicates += 1
+            else:
+                if dedup:
+                    seen.add(result.key)
+                _write_result(output_stream, result, output_format)
+                summary.converted += 1
+            if progress_interval and summary.total % progress_interval == 0:
+                logger.info("%d records processed (%0.1f records/sec)", summary.total,
+                            summary.total / (time.time() - start))
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+    summary.elapsed = time.time() - start
+    return summary
+
+
+def main(argv=None):
+    output_formats = sorted(writers())
+    parser = argparse.ArgumentParser(
+        prog="python -m glypy.convert",
+        description="Convert a collection of glycan structures between text formats.")
+    parser.add_argument("input", help="The file to read, or '-' for STDIN. May be gzip compressed.")
+    parser.add_argument("output", help="The file to write, or '-' for STDOUT. Compressed if it ends with .gz")
+    parser.add_argument("-f", "--from", dest="input_format", choices=sorted(readers), required=True,
+                        help="The format to read")
+    parser.add_argument("-t", "--to", dest="output_format", choices=output_formats, required=True,
+                        help="The format to write")
+    parser.add_argument("-p", "--processes", type=int, default=1,
+                        help="The number of worker processes to use")
+    parser.add_argument("-d", "--dedup", action='store_true',
+                        help="Only write the first record of each distinct canonical structure")
+    parser.add_argument("-e", "--errors", default=None,
+                        help="Write a tab-separated report of records that failed to convert to this file")
+    parser.add_argument("--chunksize", type=int, default=64,
+                        help="The number of records to send to a worker at a time")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s",
+                        datefmt="%H:%M:%S")
+
+    input_stream = open_stream(args.input, 'r')
+    output_stream = open_stream(args.output, 'w')
+    try:
+        summary = convert(input_stream, output_stream, args.input_format, args.output_format,
+                          processes=args.processes, dedup=args.dedup, chunksize=args.chunksize)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    if args.errors:
+        with open_stream(args.errors, 'w') as error_stream:
+            error_stream.write("index\tidentifier\terror\n")
+            for failure in summary.failures:
+                error_stream.write("%d\t%s\t%s\n" % (failure.index, failure.identifier or '', failure.error))
+    else:
+        for failure in summary.failures:
+            logger.warning("Record %d (%s) failed: %s", failure.index, failure.identifier or '', failure.error)
+    logger.info("%s", summary)
+    return 1 if summary.total and not summary.converted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
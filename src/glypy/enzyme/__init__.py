@@ -1,16 +1,4 @@
-from .ec import (
-    EnzymeInformation, EnzymeCommissionNumber, EnzymeDatabase, expasy_enzyme_db)
-
-from .graph import (
-    EnzymeEdge, EnzymeGraph, GlycanCompositionEnzymeGraph,
-    GlycanStructureEnzymeGraph, _enzyme_graph_inner)
-
-from .pathways import (
-    Glycoenzyme, Glycosylase, Glycosyltransferase,
-    Substituentransferase, rejecting, reject_on_path,
-    make_n_glycan_pathway, make_mucin_type_o_glycan_pathway)
-
-from .glycome import (Glycome, MultiprocessingGlycome)
+from glypy.utils.lazy import lazy_attributes
 
 
 __all__ = [
@@ -18,7 +6,31 @@ __all__ = [
     "Glycoenzyme", "Glycosylase", "Glycosyltransferase",
     "Substituentransferase", "rejecting", "reject_on_path",
     "make_n_glycan_pathway", "make_mucin_type_o_glycan_pathway",
-    "Glycome", "MultiprocessingGlycome", "EnzymeGraph", "EnzymeEdge",
+    "Glycome", "MultiprocessingGlycome", "GlycomeCheckpoint", "SeenFilter",
+    "SiteIndex", "ResidueMatcher", "CompositionGlycome", "CompositionRule",
+    "EnzymeGraph", "EnzymeEdge",
     "GlycanStructureEnzymeGraph", "GlycanCompositionEnzymeGraph",
+    "EnzymeGraphWriter", "EnzymeGraphReader", "IndexedEnzymeGraph",
     "_enzyme_graph_inner", "expasy_enzyme_db",
 ]
+
+__getattr__, __dir__ = lazy_attributes(__name__, ["ec", "graph", "pathways", "glycome", "site_index",
+                                                  "composition_glycome"], {
+    "EnzymeInformation": "ec", "EnzymeCommissionNumber": "ec",
+    "EnzymeDatabase": "ec", "expasy_enzyme_db": "ec",
+
+    "EnzymeEdge": "graph", "EnzymeGraph": "graph", "GlycanCompositionEnzymeGraph": "graph",
+    "GlycanStructureEnzymeGraph": "graph", "_enzyme_graph_inner": "graph",
+    "EnzymeGraphWriter": "graph", "EnzymeGraphReader": "graph", "IndexedEnzymeGraph": "graph",
+
+    "Glycoenzyme": "pathways", "Glycosylase": "pathways", "Glycosyltransferase": "pathways",
+    "Substituentransferase": "pathways", "rejecting": "pathways", "reject_on_path": "pathways",
+    "make_n_glycan_pathway": "pathways", "make_mucin_type_o_glycan_pathway": "pathways",
+
+    "Glycome": "glycome", "MultiprocessingGlycome": "glycome", "SeenFilter": "glycome",
+    "GlycomeCheckpoint": "glycome",
+
+    "SiteIndex": "site_index", "ResidueMatcher": "site_index",
+
+    "CompositionGlycome": "composition_glycome", "CompositionRule": "composition_glycome",
+})
@@ -0,0 +1,276 @@
+'''Simulate the glycan compositions reachable from a set of seeds through a set of enzymes,
+without building any structures.
+
+Each enzyme is reduced to a :class:`CompositionRule`, a change in residue counts which is
+allowed when a composition holds at least the residues of the enzyme's acceptor pattern.
+Compositions are rows of integer residue counts, so a generation of compositions is
+checked against a rule at once, and the compositions seen so far are kept in a hash set.
+
+The acceptor constraint is coarse: a composition which holds the residues of an acceptor
+need not hold them in the arrangement the enzyme requires, and the enzymes' validators are
+not checked. The compositions and edges found are therefore a superset of the compositions
+of the structures a :class:`~.Glycome` would reach in the same number of generations.
+'''
+from collections import defaultdict
+
+from glypy.structure import Glycan, Monosaccharide
+from glypy.structure.glycan_composition import FrozenMonosaccharideResidue, HashableGlycanComposition
+
+from .graph import _enzyme_graph_inner, GlycanCompositionEnzymeGraph
+from .pathways import Glycosylase, Glycosyltransferase, Substituentransferase
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+def _residue_counts(molecule):
+    if isinstance(molecule, Monosaccharide):
+        molecule = Glycan(molecule, index_method=None)
+    return dict(HashableGlycanComposition.from_glycan(molecule).items())
+
+
+class CompositionRule(object):
+    '''An enzyme acting on glycan compositions.
+
+    Attributes
+    ----------
+    name : str
+        The name of the enzyme
+    delta : dict
+        Maps each residue the enzyme adds or removes to the change in its count
+    acceptors : list of dict
+        The residue counts a composition must hold for the enzyme to act on it, one
+        per alternative acceptor pattern
+    '''
+
+    def __init__(self, name, delta, acceptors=None):
+        if acceptors is None:
+            acceptors = [{}]
+        self.name = name
+        self.delta = dict(delta)
+        self.acceptors = [dict(acceptor) for acceptor in acceptors]
+
+    @classmethod
+    def from_enzyme(cls, name, enzyme):
+        '''Derive the rule for a :class:`~.Glycosyltransferase`, which adds one of its child
+        residue to any composition holding one of its parent patterns, or a terminal
+        :class:`~.Glycosylase`, which removes one of its child residue from any composition
+        holding one of its parent patterns and the child.
+
+        Parameters
+        ----------
+        name : str
+        enzyme : :class:`~.Glycoenzyme`
+
+        Returns
+        -------
+        :class:`CompositionRule`
+
+        Raises
+        ------
+        TypeError
+            If the enzyme's change to a composition cannot be determined
+        '''
+        parents = enzyme.parents
+        if isinstance(enzyme, Substituentransferase):
+            raise TypeError("Cannot express %s as a composition rule" % (enzyme.__class__.__name__,))
+        elif isinstance(enzyme, Glycosyltransferase):
+            children = [enzyme.child]
+            sign = 1
+        elif isinstance(enzyme, Glycosylase):
+            children = enzyme.child
+            if children is None or not enzyme.terminal:
+                raise TypeError("Cannot express a glycosylase without a terminal child as a composition rule")
+            sign = -1
+        else:
+            raise TypeError("Cannot express %s as a composition rule" % (enzyme.__class__.__name__,))
+        residues = {FrozenMonosaccharideResidue.from_monosaccharide(child) for child in children}
+        if len(residues) != 1:
+            raise TypeError("Cannot express an enzyme with several child residues as a composition rule")
+        residue, = residues
+        acceptors = []
+        for parent in (parents if parents is not None else [None]):
+            acceptor = _residue_counts(parent) if parent is not None else {}
+            if sign < 0:
+                acceptor[residue] = acceptor.get(residue, 0) + 1
+            acceptors.append(acceptor)
+        return cls(name, {residue: sign}, acceptors)
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({self.name!r}, {self.delta!r}, {self.acceptors!r})".format(self=self)
+
+
+class CompositionGlycome(object):
+    '''Simulate the glycan compositions reachable from a set of seeds by repeatedly applying
+    glycosylases and glycosyltransferases as :class:`CompositionRule` changes in residue counts.
+
+    Compositions are kept as tuples of residue counts ordered by :attr:`residues`.
+
+    Attributes
+    ----------
+    rules : list of :class:`CompositionRule`
+        The rules for the enzymes, or those given directly
+    residues : list of :class:`~.FrozenMonosaccharideResidue`
+        The residues counted by each composition
+    seen : :class:`set`
+        The compositions of every processed generation
+    key_graph : :class:`defaultdict`
+        The enzyme graph between compositions, mapping parent to child to a set of enzyme names
+    current_generation : list
+        The compositions to process in the next :meth:`step`
+    limits : list
+        Callables which receive a :class:`~.HashableGlycanComposition` and return whether
+        it may be kept
+    rejected : :class:`set`
+        The compositions which failed the limits
+    '''
+
+    def __init__(self, glycosylases, glycosyltransferases, seeds, limits=None, rules=None):
+        if limits is None:
+            limits = []
+        self.rules = list(rules or [])
+        for enzymes in (glycosylases, glycosyltransferases):
+            for name, enzyme in enzymes.items():
+                self.rules.append(CompositionRule.from_enzyme(name, enzyme))
+        seeds = [
+            _residue_counts(seed) if isinstance(seed, (Glycan, Monosaccharide)) else dict(seed.items())
+            for seed in seeds]
+        residues = set()
+        for counts in seeds:
+            residues.update(counts)
+        for rule in self.rules:
+            residues.update(rule.delta)
+            for acceptor in rule.acceptors:
+                residues.update(acceptor)
+        self.residues = sorted(residues, key=str)
+        self.limits = limits
+
+        self.seen = set()
+        self.rejected = set()
+        self.key_graph = defaultdict(_enzyme_graph_inner)
+        self.current_generation = list(dict.fromkeys(self._pack(counts) for counts in seeds))
+        self.seed_keys = set(self.current_generation)
+        self._compositions = {}
+        self._arrays = None
+
+    def _pack(self, counts):
+        return tuple(counts.get(residue, 0) for residue in self.residues)
+
+    def composition(self, key):
+        '''Get the :class:`~.HashableGlycanComposition` for the residue counts `key`.
+
+        Parameters
+        ----------
+        key : tuple of int
+
+        Returns
+        -------
+        :class:`~.HashableGlycanComposition`
+        '''
+        try:
+            return self._compositions[key]
+        except KeyError:
+            composition = HashableGlycanComposition()
+            for residue, count in zip(self.residues, key):
+                if count:
+                    composition[residue] = count
+            self._compositions[key] = composition
+            return composition
+
+    def within_limits(self, key):
+        if key in self.rejected:
+            return False
+        if self.limits:
+            composition = self.composition(key)
+            for limiter in self.limits:
+                if not limiter(composition):
+                    self.rejected.add(key)
+                    return False
+        return True
+
+    def _rule_arrays(self, rule):
+        delta = np.array(self._pack(rule.delta), dtype=np.int64)
+        acceptors = np.array([self._pack(acceptor) for acceptor in rule.acceptors], dtype=np.int64)
+        return delta, acceptors
+
+    def _products(self, generation):
+        # Yields the parents, children and rule name of each rule's products as row lists
+        if np is not None:
+            if self._arrays is None:
+                self._arrays = [self._rule_arrays(rule) for rule in self.rules]
+            counts = np.array(generation, dtype=np.int64).reshape(len(generation), len(self.residues))
+            for rule, (delta, acceptors) in zip(self.rules, self._arrays):
+                mask = (counts[:, None, :] >= acceptors[None, :, :]).all(axis=2).any(axis=1)
+                parents = counts[mask]
+                yield parents.tolist(), (parents + delta).tolist(), rule.name
+        else:
+            for rule in self.rules:
+                delta = self._pack(rule.delta)
+                acceptors = [self._pack(acceptor) for acceptor in rule.acceptors]
+                parents = [
+                    key for key in generation
+                    if any(all(c >= a for c, a in zip(key, acceptor)) for acceptor in acceptors)]
+                yield parents, [[c + d for c, d in zip(key, delta)] for key in parents], rule.name
+
+    def step(self):
+        '''Apply every rule to each composition in :attr:`current_generation`, recording
+        the edges to their products in :attr:`key_graph`.
+
+        Returns
+        -------
+        :class:`set`
+            The compositions of every product of the generation, including those seen before
+        '''
+        generation = self.current_generation
+        product_keys = set()
+        next_generation = {}
+        key_graph = self.key_graph
+        seen = self.seen
+        seen.update(generation)
+        if generation:
+            for parents, children, name in self._products(generation):
+                for parent, child in zip(parents, children):
+                    child = tuple(child)
+                    if child in seen or child in next_generation or self.within_limits(child):
+                        key_graph[tuple(parent)][child].add(name)
+                        product_keys.add(child)
+                        if child not in seen:
+                            next_generation[child] = None
+        self.current_generation = list(next_generation)
+        return product_keys
+
+    def run(self, n=50):
+        for i in range(n):
+            generation = self.step()
+            if not generation:
+                break
+            yield generation
+
+    @property
+    def enzyme_graph(self):
+        '''The enzyme graph keyed by :class:`~.HashableGlycanComposition`, built from
+        :attr:`key_graph` each time it is accessed.
+
+        Returns
+        -------
+        :class:`defaultdict`
+        '''
+        composition = self.composition
+        graph = defaultdict(_enzyme_graph_inner)
+        for parent, children in self.key_graph.items():
+            inner = graph[composition(parent)]
+            for child, enzymes in children.items():
+                inner[composition(child)] = set(enzymes)
+        return graph
+
+    def to_enzyme_graph(self):
+        '''Build a :class:`~.GlycanCompositionEnzymeGraph` from :attr:`key_graph`.
+
+        Returns
+        -------
+        :class:`~.GlycanCompositionEnzymeGraph`
+        '''
+        return GlycanCompositionEnzymeGraph(
+            self.enzyme_graph, {self.composition(key) for key in self.seed_keys})
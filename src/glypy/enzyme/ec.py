@@ -1,4 +1,3 @@
-import pkg_resources
 import json
 
 try:
@@ -10,9 +9,9 @@ from collections import defaultdict
 
 from six import string_types as basestring
 
-import glypy.io
 from glypy.utils import StringIO
 from glypy.utils.lazy import ProxyObject
+from glypy.utils.data_cache import read_resource
 
 
 class EnzymeCommissionNumber(object):
@@ -261,10 +260,7 @@ class EnzymeDatabase(object):
 
     @classmethod
     def _from_static(cls):
-        data_buffer = pkg_resources.resource_string(
-            glypy.io.__name__, "data/enzyme.json")
-        if isinstance(data_buffer, bytes):
-            data_buffer = data_buffer.decode("utf-8")
+        data_buffer = read_resource("glypy.io.data", "enzyme.json").decode("utf-8")
         return cls(StringIO(data_buffer), format='json')
 
 
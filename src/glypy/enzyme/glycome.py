@@ -1,13 +1,48 @@
+import base64
+import io
+import json
 import multiprocessing
+import os
+import zlib
 
 from collections import defaultdict
+from hashlib import blake2b
 
-from glypy.algorithms import DistinctGlycanSet
+from glypy.algorithms.storage import DistinctGlycanSet, HashedGlycanSet, structure_key
+from glypy.io import glycoct
 
-from .graph import _enzyme_graph_inner
+from .graph import _enzyme_graph_inner, EnzymeGraph, EnzymeGraphReader, EnzymeGraphWriter
+from .site_index import SiteIndex
 
 
 class Glycome(object):
+    """Simulate the structures reachable from a set of seed structures by repeatedly
+    applying glycosylases and glycosyltransferases.
+
+    Structures are identified by :func:`~glypy.algorithms.storage.structure_key` instead of
+    their GlycoCT text. Each generation is a :class:`~.HashedGlycanSet` of representative
+    structures, and once a generation has been processed its structures are serialized
+    exactly once into :attr:`structures`.
+
+    Attributes
+    ----------
+    seen_keys : :class:`set`
+        The keys of every structure from a processed generation
+    structures : :class:`dict`
+        Maps the keys in :attr:`seen_keys` to the compressed GlycoCT text of their structure
+    key_graph : :class:`defaultdict`
+        The enzyme graph between structure keys, mapping parent to child to a set of enzyme names
+    current_generation : :class:`~.HashedGlycanSet`
+        The structures to process in the next :meth:`step`
+    rejected : :class:`set`
+        The keys of products which failed the limits
+    generation : int
+        The number of generations processed by :meth:`run`
+    last_product_keys : :class:`set`
+        The keys of every product of the last :meth:`step`, including those seen before
+    checkpoints : :class:`GlycomeCheckpoint`
+        Where :meth:`run` records its progress, set by :meth:`checkpoint_to`
+    """
 
     def __init__(self, glycosylases, glycosyltransferases, seeds, track_generations=False,
                  limits=None):
@@ -17,27 +52,161 @@ class Glycome(object):
         self.glycosyltransferases = glycosyltransferases
         self.seeds = seeds
 
-        self.seen = DistinctGlycanSet()
+        self.seen_keys = set()
+        self.structures = {}
         self.track_generations = track_generations
-        self.enzyme_graph = defaultdict(_enzyme_graph_inner)
+        self.key_graph = defaultdict(_enzyme_graph_inner)
         self.history = []
-        self.current_generation = DistinctGlycanSet(seeds)
+        self.current_generation = HashedGlycanSet()
+        for seed in seeds:
+            self._add_product(self.current_generation, seed.clone())
+        self.seed_keys = set(self.current_generation.keys())
         self.limits = limits
+        self.rejected = set()
+        self.generation = 0
+        self.last_product_keys = set()
+        self.checkpoints = None
+        self._frontier_blobs = {}
+
+    @property
+    def seen(self):
+        """The structures of every processed generation, as a :class:`~.DistinctGlycanSet`
+        built from :attr:`structures` each time it is accessed.
+
+        Changes to the returned set are not reflected in the simulation.
+
+        Returns
+        -------
+        :class:`~.DistinctGlycanSet`
+        """
+        return DistinctGlycanSet.from_buffer_slice(self.structures.values())
 
     def save_generation(self, generation):
         if self.track_generations:
             self.history.append(generation)
-        self.seen.update(generation)
+        frontier_blobs = self._frontier_blobs
+        for key, structure in generation.items():
+            if key not in self.seen_keys:
+                self.seen_keys.add(key)
+                blob = frontier_blobs.get(key)
+                if blob is None:
+                    blob = _encode_structure(structure)
+                self.structures[key] = blob
+                if self.checkpoints is not None:
+                    self.checkpoints.processed.append(key)
+        frontier_blobs.clear()
 
     def run(self, n=50):
         for i in range(n):
             generation = self.step()
+            self.generation += 1
             if not generation:
                 break
+            if self.checkpoints is not None and self.generation % self.checkpoints.interval == 0:
+                self.checkpoint()
             yield generation
+        if self.checkpoints is not None:
+            self.checkpoint()
+
+    def _encode_frontier(self):
+        blobs = self._frontier_blobs
+        for key, structure in self.current_generation.items():
+            if key not in blobs:
+                blobs[key] = _encode_structure(structure)
+        return blobs
+
+    def _restore_frontier(self, blobs):
+        generation = HashedGlycanSet()
+        for key, blob in blobs.items():
+            generation.add_keyed(key, _decode_structure(blob))
+        self.current_generation = generation
+        self._frontier_blobs = dict(blobs)
+
+    def _restore_seen(self, keys):
+        self.seen_keys = set(keys)
+
+    def close(self):
+        """Close the files of :attr:`checkpoints`, if any.
+        """
+        if self.checkpoints is not None:
+            self.checkpoints.close()
+
+    def checkpoint_to(self, path, interval=1):
+        """Record the progress of :meth:`run` in the directory `path`, writing a
+        checkpoint every `interval` generations and when :meth:`run` finishes.
+
+        If generations have already been run, the first checkpoint holds all of them.
+
+        The directory holds a :class:`GlycomeCheckpoint`, which :meth:`resume` reads back.
+
+        Parameters
+        ----------
+        path : str
+            The directory to write to. It must not already hold a checkpoint.
+        interval : int, optional
+            The number of generations between checkpoints. Defaults to 1.
+
+        Returns
+        -------
+        :class:`GlycomeCheckpoint`
+        """
+        self.checkpoints = GlycomeCheckpoint(path, interval)
+        self.checkpoints.create(self)
+        return self.checkpoints
+
+    def checkpoint(self):
+        """Append the generations completed since the last checkpoint to :attr:`checkpoints`.
+        """
+        self.checkpoints.write(self)
+
+    @classmethod
+    def resume(cls, path, glycosylases=None, glycosyltransferases=None, limits=None, interval=1, **kwargs):
+        """Restore a simulation from the last complete checkpoint in `path`, and keep
+        writing checkpoints there.
+
+        Parameters
+        ----------
+        path : str
+            A directory written by :meth:`checkpoint_to`
+        glycosylases, glycosyltransferases : dict, optional
+            The enzymes of the simulation. If not provided, they are read from the
+            checkpoint, which requires :mod:`dill`.
+        limits : list, optional
+            The limits of the simulation. If not provided and the enzymes are read
+            from the checkpoint, the stored limits are used.
+        interval : int, optional
+            The number of generations between checkpoints
+        **kwargs
+            Forwarded to the constructor
+
+        Returns
+        -------
+        :class:`Glycome`
+        """
+        checkpoints = GlycomeCheckpoint(path, interval)
+        state = checkpoints.restore()
+        if glycosylases is None or glycosyltransferases is None:
+            stored_glycosylases, stored_glycosyltransferases, stored_limits = checkpoints.read_enzymes()
+            if glycosylases is None:
+                glycosylases = stored_glycosylases
+            if glycosyltransferases is None:
+                glycosyltransferases = stored_glycosyltransferases
+            if limits is None:
+                limits = stored_limits
+        inst = cls(glycosylases, glycosyltransferases, [], limits=limits, **kwargs)
+        inst.seeds = [_decode_structure(state["structures"][key]) for key in state["seed_keys"]]
+        inst.seed_keys = set(state["seed_keys"])
+        inst.generation = state["generation"]
+        inst._restore_seen(state["seen"])
+        inst.structures = {key: state["structures"][key] for key in inst.seen_keys}
+        inst.key_graph = state["key_graph"]
+        inst._restore_frontier({key: state["structures"][key] for key in state["frontier"]})
+        inst.checkpoints = checkpoints
+        checkpoints.bind(inst)
+        return inst
 
     def clean_next_generation(self, generation):
-        return generation - self.seen
+        return generation.difference_keys(self.seen_keys)
 
     def within_limits(self, structure):
         for limiter in self.limits:
@@ -45,65 +214,594 @@ class Glycome(object):
                 return False
         return True
 
+    def _enzyme_products(self, species):
+        # Every enzyme searches the same structure, so they share one index of its sites
+        index = SiteIndex(species)
+        for enzkey, enz in self.glycosylases.items():
+            for product in enz.products(species, index, refund=True):
+                yield enzkey, product
+        for enzkey, enz in self.glycosyltransferases.items():
+            for product in enz.products(species, index):
+                yield enzkey, product
+
+    def _apply_enzymes(self, species):
+        for enzkey, product in self._enzyme_products(species):
+            if self.within_limits(product.structure):
+                yield enzkey, product.structure
+
+    def _accept_product(self, generation, key, product):
+        # Structures in earlier generations already passed the limits, so a product
+        # is only built when its key is new or belongs to a seed
+        if generation.has_key(key) or (key in self.seen_keys and key not in self.seed_keys):
+            return True
+        if key in self.rejected:
+            return False
+        structure = product.structure
+        if not self.within_limits(structure):
+            self.rejected.add(key)
+            return False
+        if key not in self.seen_keys:
+            # Products are canonicalized after their ids are assigned, and the enzymes'
+            # subtree matching depends on ids following the canonical traversal order,
+            # as they would after a round trip through GlycoCT
+            structure.reindex()
+            generation.add_keyed(key, structure)
+        return True
+
+    def _add_product(self, generation, product):
+        key = structure_key(product)
+        if not generation.has_key(key):
+            # Products are canonicalized after their ids are assigned, and the enzymes'
+            # subtree matching depends on ids following the canonical traversal order,
+            # as they would after a round trip through GlycoCT
+            product.reindex()
+            generation.add_keyed(key, product)
+        return key
+
     def step(self):
-        next_generation = DistinctGlycanSet()
-        for species in self.current_generation:
-            parentkey = None
-            for enzkey, enz in self.glycosylases.items():
-                products = [root for root, leaf in enz(
-                    species, refund=True) if self.within_limits(root)]
-                if products:
-                    if parentkey is None:
-                        parentkey = str(species)
-                    for product in products:
-                        childkey = str(product)
-                        self.enzyme_graph[parentkey][childkey].add(enzkey)
-                        next_generation.add(product)
-            for enzkey, enz in self.glycosyltransferases.items():
-                products = [root for root in enz(
-                    species) if self.within_limits(root)]
-                if products:
-                    if parentkey is None:
-                        parentkey = str(species)
-                    for product in products:
-                        childkey = str(product)
-                        self.enzyme_graph[parentkey][childkey].add(enzkey)
-                        next_generation.add(product)
+        """Apply every enzyme to each structure in :attr:`current_generation`, recording
+        the edges to their products in :attr:`key_graph`.
+
+        Products are described by :class:`~.EnzymeProduct` and keyed without being
+        built, and only those which have not been seen are built into the next generation.
+
+        The keys of the products are kept in :attr:`last_product_keys`.
+
+        Returns
+        -------
+        :class:`~.DistinctGlycanSet`
+            Every product of the generation, including those seen before
+        """
+        next_generation = HashedGlycanSet()
+        product_keys = set()
+        key_graph = self.key_graph
+        for parentkey, species in self.current_generation.items():
+            for enzkey, product in self._enzyme_products(species):
+                childkey = product.key
+                if self._accept_product(next_generation, childkey, product):
+                    key_graph[parentkey][childkey].add(enzkey)
+                    product_keys.add(childkey)
         self.save_generation(self.current_generation)
         self.current_generation = self.clean_next_generation(next_generation)
-        return next_generation
+        self.last_product_keys = product_keys
+        return self._product_set(product_keys, self._encode_frontier())
+
+    def _product_set(self, keys, blobs):
+        # Products seen before are already stored compressed in the same encoding as
+        # DistinctGlycanSet, and new ones are compressed once for the next checkpoint
+        # or save_generation, so no structure is serialized just to be returned
+        structures = self.structures
+        return DistinctGlycanSet.from_buffer_slice(
+            [structures[key] if key in structures else blobs[key] for key in keys])
+
+    def structure_text(self, key):
+        """Get the GlycoCT text of the structure with `key`.
+
+        Parameters
+        ----------
+        key : :class:`bytes`
+
+        Returns
+        -------
+        :class:`str`
+        """
+        try:
+            return zlib.decompress(self.structures[key]).decode('utf-8')
+        except KeyError:
+            blob = self._frontier_blobs.get(key)
+            if blob is not None:
+                return zlib.decompress(blob).decode('utf-8')
+            return glycoct.dumps(self.current_generation[key])
+
+    @property
+    def enzyme_graph(self):
+        """The enzyme graph keyed by GlycoCT text, built from :attr:`key_graph`
+        each time it is accessed.
+
+        Returns
+        -------
+        :class:`defaultdict`
+        """
+        texts = {}
+
+        def text(key):
+            try:
+                return texts[key]
+            except KeyError:
+                value = texts[key] = self.structure_text(key)
+                return value
+
+        graph = defaultdict(_enzyme_graph_inner)
+        for parent, children in self.key_graph.items():
+            inner = graph[text(parent)]
+            for child, enzymes in children.items():
+                inner[text(child)] = set(enzymes)
+        return graph
+
+    def to_enzyme_graph(self):
+        """Build an :class:`~.EnzymeGraph` keyed by GlycoCT text from :attr:`key_graph`.
+
+        Returns
+        -------
+        :class:`~.EnzymeGraph`
+        """
+        return EnzymeGraph(self.enzyme_graph, {self.structure_text(k) for k in self.seed_keys})
+
+
+class GlycomeCheckpoint(object):
+    """The on-disk record of a :class:`Glycome` run, written incrementally so that a long
+    simulation can be resumed from its last complete generation.
+
+    The directory holds three files:
+
+    - ``glycome.log``, an append-only log of tab-separated records. ``K <key>`` names a
+      seed, ``S <key> <blob>`` stores the compressed GlycoCT of a structure in base64, once
+      per structure, and ``G <generation> <offset> <frontier> <processed>`` closes a
+      checkpoint, giving the length of the edge log and the JSON lists of the keys of the
+      current generation and of the structures processed since the previous checkpoint.
+    - ``edges.graph``, the edges between structures written by an :class:`~.EnzymeGraphWriter`
+      with GlycoCT text nodes, readable with :meth:`~.EnzymeGraph.load_compact`
+    - ``enzymes.pkl``, the enzymes and limits of the run, if :mod:`dill` is available
+
+    A ``G`` record is written only after everything it covers has been flushed to disk, so
+    records after the last one belong to an interrupted checkpoint and are discarded when
+    the run is resumed.
+
+    Attributes
+    ----------
+    path : str
+        The checkpoint directory
+    interval : int
+        The number of generations between checkpoints
+    processed : list
+        The keys of the structures processed since the last checkpoint
+    logged : set
+        The keys of the structures stored in the log
+    """
+
+    header = "#glypy-glycome-checkpoint"
+    version = 1
+
+    def __init__(self, path, interval=1):
+        self.path = path
+        self.interval = interval
+        self.processed = []
+        self.logged = set()
+        self.last_generation = None
+        self.log = None
+        self.edges = None
+        self.writer = None
+
+    @property
+    def log_path(self):
+        return os.path.join(self.path, "glycome.log")
+
+    @property
+    def edges_path(self):
+        return os.path.join(self.path, "edges.graph")
+
+    @property
+    def enzymes_path(self):
+        return os.path.join(self.path, "enzymes.pkl")
+
+    def create(self, glycome):
+        """Start a new checkpoint for `glycome`, recording its seeds and every structure it
+        has already processed as its current generation.
+
+        Parameters
+        ----------
+        glycome : :class:`Glycome`
+        """
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+        if os.path.exists(self.log_path):
+            raise ValueError("%r already holds a checkpoint" % (self.path,))
+        try:
+            import dill
+        except ImportError:
+            pass
+        else:
+            with open(self.enzymes_path, 'wb') as fh:
+                dill.dump((glycome.glycosylases, glycome.glycosyltransferases, glycome.limits), fh)
+        self.log = io.open(self.log_path, 'w', encoding='utf-8', newline='\n')
+        self.log.write("%s\t%d\n" % (self.header, self.version))
+        for key in sorted(glycome.seed_keys):
+            self.log.write("K\t%s\n" % (key.hex(),))
+        self.edges = io.open(self.edges_path, 'w', encoding='utf-8', newline='\n')
+        self.writer = EnzymeGraphWriter(self.edges, glycome.structure_text)
+        for key in sorted(glycome.seed_keys):
+            self.writer.add_seed(key)
+        # A run which started before the checkpoint was attached has already processed
+        # these structures without recording them
+        self.processed = list(glycome.structures)
+        self.write(glycome)
+
+    def _log_structure(self, key, blob):
+        if key not in self.logged:
+            self.logged.add(key)
+            self.log.write("S\t%s\t%s\n" % (key.hex(), base64.b64encode(blob).decode('ascii')))
+
+    def write(self, glycome):
+        """Append the generations `glycome` completed since the last checkpoint.
+
+        Parameters
+        ----------
+        glycome : :class:`Glycome`
+        """
+        if glycome.generation == self.last_generation:
+            return
+        frontier = glycome._encode_frontier()
+        for key in self.processed:
+            self._log_structure(key, glycome.structures[key])
+        for key, blob in frontier.items():
+            self._log_structure(key, blob)
+        # Every edge from a structure is found while it is processed, so only the
+        # structures processed since the last checkpoint have new edges
+        writer = self.writer
+        key_graph = glycome.key_graph
+        for parentkey in self.processed:
+            children = key_graph.get(parentkey)
+            if not children:
+                continue
+            parent = writer.add_node(parentkey)
+            for childkey, enzymes in children.items():
+                writer.add_edge_indices(parent, writer.add_node(childkey), sorted(enzymes))
+        self._sync(self.edges)
+        self._sync(self.log)
+        self.log.write("G\t%d\t%d\t%s\t%s\n" % (
+            glycome.generation, self.edges.tell(),
+            json.dumps(sorted(key.hex() for key in frontier)),
+            json.dumps([key.hex() for key in self.processed])))
+        self._sync(self.log)
+        self.processed = []
+        self.last_generation = glycome.generation
+
+    def _sync(self, handle):
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    def _read_log(self):
+        structures = {}
+        seed_keys = []
+        seen = []
+        checkpoint = None
+        end = None
+        logged = None
+        with open(self.log_path, 'rb') as fh:
+            line = fh.readline().decode('utf-8')
+            header, _, version = line.rstrip("\n").partition("\t")
+            if header != self.header:
+                raise ValueError("Not a Glycome checkpoint, header %r" % (line[:50],))
+            if int(version) > self.version:
+                raise ValueError("Unsupported Glycome checkpoint version %s" % (version,))
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    break
+                fields = line.decode('utf-8').rstrip("\n").split("\t")
+                kind = fields[0]
+                if kind == "S":
+                    structures[bytes.fromhex(fields[1])] = base64.b64decode(fields[2])
+                elif kind == "K":
+                    seed_keys.append(bytes.fromhex(fields[1]))
+                elif kind == "G":
+                    seen.extend(bytes.fromhex(key) for key in json.loads(fields[4]))
+                    checkpoint = fields
+                    end = fh.tell()
+                    logged = set(structures)
+                else:
+                    raise ValueError("Unrecognized record %r" % (line[:50],))
+        if checkpoint is None:
+            raise ValueError("%r holds no complete checkpoint" % (self.path,))
+        return {
+            "generation": int(checkpoint[1]),
+            "edge_offset": int(checkpoint[2]),
+            "frontier": [bytes.fromhex(key) for key in json.loads(checkpoint[3])],
+            "seen": seen,
+            "seed_keys": seed_keys,
+            "structures": {key: structures[key] for key in logged},
+            "log_offset": end,
+        }
+
+    def restore(self):
+        """Read the last complete checkpoint, discarding anything written after it,
+        and reopen the files for appending.
+
+        Returns
+        -------
+        :class:`dict`
+            The state of the run, with the keys ``generation``, ``frontier``, ``seen``,
+            ``seed_keys``, ``structures`` and ``key_graph``
+        """
+        state = self._read_log()
+        with open(self.log_path, 'r+b') as fh:
+            fh.truncate(state["log_offset"])
+        with open(self.edges_path, 'r+b') as fh:
+            fh.truncate(state["edge_offset"])
 
+        keys_by_text = {
+            zlib.decompress(blob).decode('utf-8'): key for key, blob in state["structures"].items()}
+        with io.open(self.edges_path, 'r', encoding='utf-8', newline='\n') as fh:
+            reader = EnzymeGraphReader(fh)
+            edges = list(reader.iter_edge_indices())
+        node_keys = [keys_by_text[text] for text in reader.node_texts]
+        enzymes = reader.enzymes
+        key_graph = defaultdict(_enzyme_graph_inner)
+        for parent, child, enzyme in edges:
+            key_graph[node_keys[parent]][node_keys[child]].add(enzymes[enzyme])
+        state["key_graph"] = key_graph
 
-def _MultiprocessingGlycome_worker(seeds_params):
-    seeds, params, seen = seeds_params
+        self.log = io.open(self.log_path, 'a', encoding='utf-8', newline='\n')
+        self.edges = io.open(self.edges_path, 'a', encoding='utf-8', newline='\n')
+        self.writer = EnzymeGraphWriter(self.edges, None, header=False)
+        self.writer.node_index = {key: i for i, key in enumerate(node_keys)}
+        self.writer.enzyme_index = {enzyme: i for i, enzyme in enumerate(enzymes)}
+        self.logged = set(state["structures"])
+        self.processed = []
+        self.last_generation = state["generation"]
+        return state
+
+    def bind(self, glycome):
+        """Write the nodes of new edges using the structures of `glycome`.
+        """
+        self.writer.dump_entity = glycome.structure_text
+
+    def read_enzymes(self):
+        """Read the enzymes and limits stored when the checkpoint was created.
+
+        Returns
+        -------
+        :class:`tuple`
+            The glycosylases, glycosyltransferases and limits
+        """
+        import dill
+        with open(self.enzymes_path, 'rb') as fh:
+            return dill.load(fh)
+
+    def load_enzyme_graph(self):
+        """Read the edges written so far as an :class:`~.EnzymeGraph` keyed by GlycoCT text.
+
+        Returns
+        -------
+        :class:`~.EnzymeGraph`
+        """
+        if self.edges is not None:
+            self.edges.flush()
+        with io.open(self.edges_path, 'r', encoding='utf-8', newline='\n') as fh:
+            return EnzymeGraph.load_compact(fh)
+
+    def close(self):
+        for handle in (self.log, self.edges):
+            if handle is not None:
+                handle.close()
+        self.log = self.edges = self.writer = None
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({self.path!r}, interval={self.interval})".format(self=self)
+
+
+class SeenFilter(object):
+    """A Bloom filter over structure keys held in shared memory, so that worker
+    processes can skip products which were already seen without a copy of :attr:`Glycome.seen_keys`.
+
+    The filter is written only by the process which created it and read by the workers
+    which inherit it. A structure which was not seen is never reported as seen, but a
+    small fraction of unseen structures are, which callers must check against the
+    exact set of keys.
+
+    Attributes
+    ----------
+    size : int
+        The number of bits in the filter
+    hashes : int
+        The number of bits set for each key
+    count : int
+        The number of keys added, in the process which added them
+    """
+
+    def __init__(self, size=2 ** 23, hashes=4, buffer=None):
+        self.size = size
+        self.hashes = hashes
+        if buffer is None:
+            buffer = multiprocessing.RawArray('B', (size + 7) // 8)
+        self.buffer = buffer
+        self.count = 0
+
+    def _positions(self, key):
+        digest = blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def add(self, key):
+        buffer = self.buffer
+        for position in self._positions(key):
+            buffer[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, keys):
+        for key in keys:
+            self.add(key)
+
+    def __contains__(self, key):
+        buffer = self.buffer
+        for position in self._positions(key):
+            if not buffer[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def false_positive_rate(self):
+        """Estimate the probability that an unseen key is reported as seen.
+
+        Returns
+        -------
+        float
+        """
+        return (1 - (1 - 1.0 / self.size) ** (self.hashes * self.count)) ** self.hashes
+
+    def __getstate__(self):
+        return (self.size, self.hashes, self.buffer)
+
+    def __setstate__(self, state):
+        self.size, self.hashes, self.buffer = state
+        self.count = 0
+
+    def __repr__(self):
+        return "{self.__class__.__name__}(size={self.size}, hashes={self.hashes}, count={self.count})".format(
+            self=self)
+
+
+def _encode_structure(structure):
+    return zlib.compress(glycoct.dumps(structure).encode('utf-8'))
+
+
+def _decode_structure(blob):
+    return glycoct.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+_worker_glycome = None
+_worker_seen = None
+
+
+def _MultiprocessingGlycome_initializer(params, seen):
+    global _worker_glycome, _worker_seen
     import dill
-    (glycosylases, glycosyltransferases, _,
-     track_generations, limits) = dill.loads(params)
-    # limits.append(lambda x: x not in seen)
-    glycome = Glycome(glycosylases, glycosyltransferases, seeds,
-                      track_generations, limits)
-    glycome.step()
-    return glycome.current_generation, glycome.enzyme_graph
+    glycosylases, glycosyltransferases, limits = dill.loads(params)
+    _worker_glycome = Glycome(glycosylases, glycosyltransferases, [], limits=limits)
+    _worker_seen = seen
+
+
+def _MultiprocessingGlycome_worker(chunk):
+    """Apply the enzymes of this process's :class:`Glycome` to a chunk of
+    ``(key, compressed GlycoCT)`` pairs.
+
+    Returns the edges produced as ``(parent, child, enzyme)`` triples, the encoded
+    products which are not in the shared :class:`SeenFilter`, and the edges whose child
+    was withheld, without being built, because the filter reported it as seen.
+    """
+    glycome = _worker_glycome
+    seen = _worker_seen
+    rejected = glycome.rejected
+    edges = []
+    products = {}
+    withheld = []
+    for parentkey, blob in chunk:
+        species = _decode_structure(blob)
+        for enzkey, product in glycome._enzyme_products(species):
+            childkey = product.key
+            if childkey not in products:
+                if childkey in seen:
+                    withheld.append((parentkey, childkey, enzkey))
+                    continue
+                if childkey in rejected:
+                    continue
+                structure = product.structure
+                if not glycome.within_limits(structure):
+                    rejected.add(childkey)
+                    continue
+                structure.reindex()
+                products[childkey] = _encode_structure(structure)
+            edges.append((parentkey, childkey, enzkey))
+    return edges, products, withheld
 
 
 class MultiprocessingGlycome(Glycome):
+    """A :class:`Glycome` which applies enzymes to each generation in a persistent pool
+    of worker processes.
+
+    The enzymes and limits are sent to each worker once when the pool starts. Structures
+    move between processes only as compressed GlycoCT keyed by :func:`~.structure_key`,
+    and workers consult a :class:`SeenFilter` in shared memory so they do not send back
+    products which were already processed. Each generation is held in that encoded form
+    until :attr:`current_generation` is accessed.
+
+    :meth:`step` returns the products of the generation as a :class:`~.DistinctGlycanSet`
+    built from their compressed GlycoCT, without decoding them.
+
+    Attributes
+    ----------
+    processes : int
+        The number of worker processes
+    seen_filter : :class:`SeenFilter`
+        The shared membership filter for :attr:`seen_keys`
+    filter_false_positives : int
+        The number of products withheld by workers which had not been seen, and were
+        regenerated in this process
+    """
 
     def __init__(self, glycosylases, glycosyltransferases, seeds, track_generations=False,
-                 limits=None, processes=None):
+                 limits=None, processes=None, filter_size=2 ** 23):
         if processes is None:
             processes = min(multiprocessing.cpu_count(), 4)
+        self._encoded_generation = None
         super(MultiprocessingGlycome, self).__init__(
             glycosylases, glycosyltransferases, seeds,
             track_generations, limits)
         self.processes = processes
         self.pool = None
-        self.seen = DistinctGlycanSet()
-        self._worker_params = (
-            self.glycosylases, self.glycosyltransferases, tuple(),
-            self.track_generations, self.limits)
+        self.seen_filter = SeenFilter(filter_size)
+        self.filter_false_positives = 0
+
+    @property
+    def current_generation(self):
+        if self._current_generation is None:
+            generation = HashedGlycanSet()
+            for key, blob in self._encoded_generation.items():
+                generation.add_keyed(key, _decode_structure(blob))
+            self._current_generation = generation
+            self._encoded_generation = None
+        return self._current_generation
+
+    @current_generation.setter
+    def current_generation(self, value):
+        self._current_generation = value
+        self._encoded_generation = None
+
+    def _encode_generation(self):
+        if self._encoded_generation is not None:
+            return self._encoded_generation
+        structures = self.structures
+        encoded = {}
+        for key, structure in self._current_generation.items():
+            blob = structures.get(key)
+            encoded[key] = blob if blob is not None else _encode_structure(structure)
+        return encoded
 
     def _create_pool(self):
-        self.pool = multiprocessing.Pool(self.processes)
+        import dill
+        params = dill.dumps((self.glycosylases, self.glycosyltransferases, self.limits))
+        self.pool = multiprocessing.Pool(
+            self.processes, _MultiprocessingGlycome_initializer, (params, self.seen_filter))
+
+    def close(self):
+        """Shut down the worker pool, if it is running, and close the files of
+        :attr:`checkpoints`.
+        """
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        super(MultiprocessingGlycome, self).close()
 
     def _log(self, message):
         print(message)
@@ -112,40 +810,100 @@ class MultiprocessingGlycome(Glycome):
         self._log(".... Task %d/%d finished (%d items generated)" % (
             i, len(chunks), len(current_generation)))
 
-    def _generate_work_loads(self, next_generation, chunks):
-        import dill
-        encoded_params = dill.dumps(self._worker_params)
-
-        for i, chunk in enumerate(chunks):
-            yield (chunk, encoded_params, next_generation)
-
     def _partition_generation(self, generation, max_chunk_size=2e3):
         n = len(generation)
-        n_chunks = int(n // max_chunk_size)
-        if n_chunks < self.processes * 4:
-            return generation.partition(self.processes * 4)
-        else:
-            return generation.partition(n_chunks)
+        n_chunks = max(int(n // max_chunk_size), self.processes * 4)
+        chunk_size = max(int(n / n_chunks), 1)
+        return [generation[i:i + chunk_size] for i in range(0, n, chunk_size)]
+
+    def _save_encoded_generation(self, generation):
+        seen = self.seen_keys
+        structures = self.structures
+        seen_filter = self.seen_filter
+        for key, blob in generation.items():
+            if key not in seen:
+                seen.add(key)
+                structures[key] = blob
+                seen_filter.add(key)
+                if self.checkpoints is not None:
+                    self.checkpoints.processed.append(key)
+
+    def _restore_seen(self, keys):
+        super(MultiprocessingGlycome, self)._restore_seen(keys)
+        self.seen_filter.update(self.seen_keys)
+
+    def _encode_frontier(self):
+        self._encoded_generation = self._encode_generation()
+        return self._encoded_generation
+
+    def _restore_frontier(self, blobs):
+        self._current_generation = None
+        self._encoded_generation = dict(blobs)
+
+    def _regenerate(self, parentkey, childkey):
+        species = _decode_structure(self.structures[parentkey])
+        for _enzkey, product in self._enzyme_products(species):
+            if product.key == childkey:
+                structure = product.structure
+                if not self.within_limits(structure):
+                    return None
+                structure.reindex()
+                return _encode_structure(structure)
+        raise KeyError(childkey)
+
+    def _accept_withheld(self, parentkey, childkey, products):
+        if childkey in products or (childkey in self.seen_keys and childkey not in self.seed_keys):
+            return True
+        if childkey in self.rejected:
+            return False
+        if childkey not in self.seen_keys:
+            self.filter_false_positives += 1
+        blob = self._regenerate(parentkey, childkey)
+        if blob is None:
+            self.rejected.add(childkey)
+            return False
+        if childkey not in self.seen_keys:
+            products[childkey] = blob
+        return True
 
     def step(self):
-        next_generation = DistinctGlycanSet()
         self._log(".... Starting Step")
-        chunks = self._partition_generation(self.current_generation)
-        self._log(".... Produced %d chunks" % (len(chunks) + 1,))
-        work_spec = self._generate_work_loads(next_generation, chunks)
-        if self.pool is None:
-            self._create_pool()
-        pool = self.pool
-        i = 0
-        for work in pool.imap_unordered(_MultiprocessingGlycome_worker, work_spec):
-            i += 1
-            current_generation, enzyme_graph = work
-            self.log_generation_chunk(i, chunks, current_generation)
-            next_generation.update(current_generation)
-            for parent, children in enzyme_graph.items():
-                for child, enzymes in children.items():
-                    self.enzyme_graph[parent][child].update(enzymes)
+        if self.track_generations:
+            self.history.append(self.current_generation)
+        generation = self._encode_generation()
+        # The filter must hold this generation before workers look for its members
+        self._save_encoded_generation(generation)
+        product_keys = set()
+        products = {}
+        if generation:
+            chunks = self._partition_generation(list(generation.items()))
+            self._log(".... Produced %d chunks" % (len(chunks),))
+            if self.pool is None:
+                self._create_pool()
+            key_graph = self.key_graph
+            withheld = []
+            for i, work in enumerate(self.pool.imap_unordered(_MultiprocessingGlycome_worker, chunks), 1):
+                edges, encoded, chunk_withheld = work
+                self.log_generation_chunk(i, chunks, encoded)
+                for parentkey, childkey, enzkey in edges:
+                    key_graph[parentkey][childkey].add(enzkey)
+                    product_keys.add(childkey)
+                for key, blob in encoded.items():
+                    products.setdefault(key, blob)
+                withheld.extend(chunk_withheld)
+            for parentkey, childkey, enzkey in withheld:
+                if self._accept_withheld(parentkey, childkey, products):
+                    key_graph[parentkey][childkey].add(enzkey)
+                    product_keys.add(childkey)
+        self._current_generation = None
+        self._encoded_generation = products
+        self.last_product_keys = product_keys
+        return self._product_set(product_keys, products)
 
-        self.save_generation(self.current_generation)
-        self.current_generation = self.clean_next_generation(next_generation)
-        return next_generation
+    def structure_text(self, key):
+        try:
+            return zlib.decompress(self.structures[key]).decode('utf-8')
+        except KeyError:
+            if self._encoded_generation is not None:
+                return zlib.decompress(self._encoded_generation[key]).decode('utf-8')
+            return glycoct.dumps(self._current_generation[key])
@@ -1,3 +1,4 @@
+import array
 import json
 from collections import namedtuple, defaultdict, deque
 try:
@@ -16,6 +17,235 @@ def _enzyme_graph_inner():
     return defaultdict(set)
 
 
+COMPACT_FORMAT_HEADER = "#glypy-enzyme-graph"
+COMPACT_FORMAT_VERSION = 1
+
+
+class EnzymeGraphWriter(object):
+    '''Write an enzyme graph to a file one edge at a time in a compact, line-oriented format.
+
+    Each node is written once, the first time it is referenced, and each enzyme is written
+    once to an enzyme table. Edges are then written as integer triples indexing into the
+    node and enzyme tables, instead of repeating the full node text for every edge as
+    :meth:`EnzymeGraph.dump` does. The lines of the format are:
+
+    - ``#glypy-enzyme-graph <version>``, the header
+    - ``M <json>``, the graph's metadata
+    - ``Z <json>``, the next entry in the enzyme table
+    - ``N <json>``, the next entry in the node table
+    - ``S <node>``, a seed node
+    - ``E <parent> <child> <enzyme>``, an edge
+
+    with fields separated by tabs.
+
+    Attributes
+    ----------
+    handle : file-like
+        The text file to write to
+    dump_entity : Callable
+        Converts a node to the string stored in the node table
+    node_index : dict
+        Maps each node written to its position in the node table
+    enzyme_index : dict
+        Maps each enzyme written to its position in the enzyme table
+
+    To append to an existing file, pass ``header=False`` and restore :attr:`node_index`
+    and :attr:`enzyme_index` from the tables already in it.
+    '''
+
+    def __init__(self, handle, dump_entity=str, metadata=None, header=True):
+        self.handle = handle
+        self.dump_entity = dump_entity
+        self.node_index = {}
+        self.enzyme_index = {}
+        if header:
+            self.handle.write("%s\t%d\n" % (COMPACT_FORMAT_HEADER, COMPACT_FORMAT_VERSION))
+        if metadata:
+            self.handle.write("M\t%s\n" % json.dumps(metadata, sort_keys=True))
+
+    def add_node(self, node):
+        '''Get the index of `node` in the node table, writing it if it is new.
+
+        Parameters
+        ----------
+        node : object
+
+        Returns
+        -------
+        int
+        '''
+        try:
+            return self.node_index[node]
+        except KeyError:
+            index = self.node_index[node] = len(self.node_index)
+            self.handle.write("N\t%s\n" % json.dumps(self.dump_entity(node)))
+            return index
+
+    def add_enzyme(self, enzyme):
+        '''Get the index of `enzyme` in the enzyme table, writing it if it is new.
+
+        Parameters
+        ----------
+        enzyme : str
+
+        Returns
+        -------
+        int
+        '''
+        try:
+            return self.enzyme_index[enzyme]
+        except KeyError:
+            index = self.enzyme_index[enzyme] = len(self.enzyme_index)
+            self.handle.write("Z\t%s\n" % json.dumps(enzyme))
+            return index
+
+    def add_seed(self, node):
+        self.handle.write("S\t%d\n" % self.add_node(node))
+
+    def add_edge(self, parent, child, enzyme):
+        parent = self.add_node(parent)
+        child = self.add_node(child)
+        self.handle.write("E\t%d\t%d\t%d\n" % (parent, child, self.add_enzyme(enzyme)))
+
+    def add_edge_indices(self, parent, child, enzymes):
+        '''Write an edge from `parent` to `child` for each of `enzymes`, where the nodes
+        are given by their indices from :meth:`add_node`.
+
+        Parameters
+        ----------
+        parent : int
+        child : int
+        enzymes : Iterable
+        '''
+        add_enzyme = self.add_enzyme
+        self.handle.write(''.join([
+            "E\t%d\t%d\t%d\n" % (parent, child, add_enzyme(enzyme)) for enzyme in enzymes]))
+
+
+class EnzymeGraphReader(object):
+    '''Read an enzyme graph written by :class:`EnzymeGraphWriter` one edge at a time.
+
+    Nodes are kept as their stored text until they are first used, and each node is only
+    converted by :attr:`load_entity` once, however many edges it participates in.
+
+    Attributes
+    ----------
+    handle : file-like
+        The text file to read from
+    load_entity : Callable
+        Converts the stored string of a node back into a node
+    node_texts : list
+        The node table read so far
+    enzymes : list
+        The enzyme table read so far
+    seed_indices : list
+        The positions of the seed nodes read so far
+    metadata : dict
+        The graph's metadata
+    '''
+
+    def __init__(self, handle, load_entity=None):
+        self.handle = handle
+        self.load_entity = load_entity
+        self.node_texts = []
+        self.enzymes = []
+        self.seed_indices = []
+        self.metadata = {}
+        self._nodes = {}
+        self._read_header()
+
+    def _read_header(self):
+        line = self.handle.readline()
+        header, _, version = line.rstrip("\n").partition("\t")
+        if header != COMPACT_FORMAT_HEADER:
+            raise ValueError("Not a compact enzyme graph file, header %r" % (line[:50],))
+        if int(version) > COMPACT_FORMAT_VERSION:
+            raise ValueError("Unsupported compact enzyme graph version %s" % (version,))
+
+    def node(self, index):
+        '''Materialize the node at `index` in the node table.
+
+        Parameters
+        ----------
+        index : int
+
+        Returns
+        -------
+        object
+        '''
+        try:
+            return self._nodes[index]
+        except KeyError:
+            text = self.node_texts[index]
+            node = self._nodes[index] = self.load_entity(text) if self.load_entity is not None else text
+            return node
+
+    def iter_edge_indices(self):
+        '''Iterate over the edges in the file as triples of (parent, child, enzyme)
+        table indices, without materializing any nodes.
+
+        Yields
+        ------
+        tuple of int
+        '''
+        node_texts = self.node_texts
+        for line in self.handle:
+            kind = line[0]
+            if kind == "E":
+                _, parent, child, enzyme = line.split("\t")
+                yield int(parent), int(child), int(enzyme)
+            elif kind == "N":
+                node_texts.append(json.loads(line[2:]))
+            elif kind == "Z":
+                self.enzymes.append(json.loads(line[2:]))
+            elif kind == "S":
+                self.seed_indices.append(int(line[2:]))
+            elif kind == "M":
+                self.metadata.update(json.loads(line[2:]))
+            elif not line.strip():
+                continue
+            else:
+                raise ValueError("Unrecognized record %r" % (line[:50],))
+
+    def __iter__(self):
+        node = self.node
+        enzymes = self.enzymes
+        for parent, child, enzyme in self.iter_edge_indices():
+            yield EnzymeEdge(node(parent), node(child), enzymes[enzyme])
+
+    def seeds(self):
+        return {self.node(i) for i in self.seed_indices}
+
+    def read_graph(self, graph_type=None):
+        '''Read the remaining edges into an :class:`EnzymeGraph`.
+
+        Parameters
+        ----------
+        graph_type : type, optional
+            The :class:`EnzymeGraph` subclass to build. Defaults to :class:`EnzymeGraph`.
+
+        Returns
+        -------
+        :class:`EnzymeGraph`
+        '''
+        if graph_type is None:
+            graph_type = EnzymeGraph
+        # Group the edges by table index first so each node is hashed once per parent
+        # and child rather than once per edge
+        adjacency = defaultdict(_enzyme_graph_inner)
+        for parent, child, enzyme in self.iter_edge_indices():
+            adjacency[parent][child].add(enzyme)
+        enzymes = self.enzymes
+        node = self.node
+        graph = defaultdict(_enzyme_graph_inner)
+        for parent, children in adjacency.items():
+            inner = _enzyme_graph_inner()
+            for child, enzyme_indices in children.items():
+                inner[node(child)] = {enzymes[i] for i in enzyme_indices}
+            graph[node(parent)] = inner
+        return graph_type(graph, self.seeds(), self.metadata)
+
+
 class EnzymeGraph(Mapping):
     def __init__(self, graph=None, seeds=None, metadata=None):
         if graph is None:
@@ -136,6 +366,15 @@ class EnzymeGraph(Mapping):
                 self.graph.pop(node)
         return i
 
+    def index(self):
+        '''Build an :class:`IndexedEnzymeGraph` of this graph for repeated traversal.
+
+        Returns
+        -------
+        :class:`IndexedEnzymeGraph`
+        '''
+        return IndexedEnzymeGraph(self)
+
     def _dump_entity(self, entity):
         return str(entity)
 
@@ -169,13 +408,24 @@ class EnzymeGraph(Mapping):
 
     @classmethod
     def _load(cls, data_structure):
-        seeds = {cls._load_entity(sd) for sd in data_structure["seeds"]}
+        # Each node appears once as a parent and once per parent as a child, so
+        # only convert each distinct string once
+        entities = {}
+
+        def load_entity(text):
+            try:
+                return entities[text]
+            except KeyError:
+                entity = entities[text] = cls._load_entity(text)
+                return entity
+
+        seeds = {load_entity(sd) for sd in data_structure["seeds"]}
         graph = defaultdict(_enzyme_graph_inner)
         for outer_key, outer_value in data_structure["graph"].items():
             outgraph_inner = _enzyme_graph_inner()
             for inner_key, inner_value in outer_value.items():
-                outgraph_inner[cls._load_entity(inner_key)] = set(inner_value)
-            graph[cls._load_entity(outer_key)] = outgraph_inner
+                outgraph_inner[load_entity(inner_key)] = set(inner_value)
+            graph[load_entity(outer_key)] = outgraph_inner
         metadata = data_structure.get('metadata')
         inst = cls(graph, seeds, metadata)
         return inst
@@ -190,6 +440,67 @@ class EnzymeGraph(Mapping):
         data = json.load(fd)
         return cls._load(data)
 
+    def dump_compact(self, fh):
+        '''Write this graph to `fh` in the compact format of :class:`EnzymeGraphWriter`.
+
+        Parameters
+        ----------
+        fh : file-like
+            A file opened in text mode
+        '''
+        writer = EnzymeGraphWriter(fh, self._dump_entity, self.metadata)
+        for seed in sorted(self.seeds, key=self._dump_entity):
+            writer.add_seed(seed)
+        for enzyme in sorted(self.enzymes()):
+            writer.add_enzyme(enzyme)
+        # Nodes like Glycan are expensive to hash, and the graph keeps every node alive
+        # while writing, so look up each node object's index by identity
+        indices = {}
+
+        def add_node(node):
+            try:
+                return indices[id(node)]
+            except KeyError:
+                index = indices[id(node)] = writer.add_node(node)
+                return index
+
+        for parent, children in self.graph.items():
+            parent = add_node(parent)
+            for child, enzymes in children.items():
+                writer.add_edge_indices(parent, add_node(child), enzymes)
+
+    @classmethod
+    def load_compact(cls, fh):
+        '''Read a graph written by :meth:`dump_compact` or an :class:`EnzymeGraphWriter`.
+
+        Parameters
+        ----------
+        fh : file-like
+            A file opened in text mode
+
+        Returns
+        -------
+        :class:`EnzymeGraph`
+        '''
+        return EnzymeGraphReader(fh, cls._load_entity).read_graph(cls)
+
+    @classmethod
+    def iter_compact(cls, fh):
+        '''Stream the edges of a graph written by :meth:`dump_compact` or an
+        :class:`EnzymeGraphWriter` without building the graph, converting each node
+        once when it is first used.
+
+        Parameters
+        ----------
+        fh : file-like
+            A file opened in text mode
+
+        Yields
+        ------
+        :class:`EnzymeEdge`
+        '''
+        return iter(EnzymeGraphReader(fh, cls._load_entity))
+
     def __eq__(self, other):
         return self.graph == other.graph
 
@@ -210,44 +521,49 @@ class EnzymeGraph(Mapping):
             for child, enzymes in children.items():
                 self[parent][child].update(enzymes)
 
-    def _dijkstra_distances_and_paths(self, source, sink):
-        distances = dict()
-        previous = dict()
-        unvisited = set()
-        for node in self.nodes():
-            distances[node] = float('inf')
-            previous[node] = None
-            unvisited.add(node)
-
-        distances[source] = 0
-        unvisited_finite_distance = dict()
+    def _bfs_paths(self, source, sink):
+        # All edges have length 1, so the sink is first reached along a shortest path
+        previous = {source: None}
         visit_queue = deque([source])
-        while sink in unvisited:
-            try:
-                current_node = visit_queue.popleft()
-            except IndexError:
-                if unvisited_finite_distance:
-                    current_node, _ = min(unvisited_finite_distance.items(), key=lambda x: x[1])
-                    unvisited_finite_distance.pop(current_node)
-                else:
-                    current_node, _ = min(distances.items(), key=lambda x: x[1])
-            try:
-                unvisited.remove(current_node)
-            except KeyError:
+        graph = self.graph
+        while visit_queue:
+            current_node = visit_queue.popleft()
+            children = graph.get(current_node)
+            if not children:
                 continue
-            for child in self.children(current_node):
-                # all edges are of length 1
-                alternate_distance = distances[current_node] + 1
-                if alternate_distance < distances[child]:
-                    distances[child] = alternate_distance
-                    previous[child] = (current_node, self[current_node][child])
-                if child in unvisited:
-                    unvisited_finite_distance[child] = alternate_distance
-
-        return distances, previous
+            for child, enzymes in children.items():
+                if child not in previous:
+                    previous[child] = (current_node, enzymes)
+                    if child == sink:
+                        return previous
+                    visit_queue.append(child)
+        return previous
 
     def path_between(self, source, sink):
-        _, previous = self._dijkstra_distances_and_paths(source, sink)
+        '''Find a shortest path from `source` to `sink`.
+
+        Parameters
+        ----------
+        source : object
+            The node to start from
+        sink : object
+            The node to reach
+
+        Returns
+        -------
+        list
+            The edges of the path as :class:`EnzymeEdge`, empty if `source` is `sink`
+
+        Raises
+        ------
+        ValueError
+            If `sink` cannot be reached from `source`
+        '''
+        if source == sink:
+            return []
+        previous = self._bfs_paths(source, sink)
+        if sink not in previous:
+            raise ValueError("no path from %r to %r" % (source, sink))
         parent, enz = previous[sink]
         path = []
         path.append(EnzymeEdge(parent, sink, enz))
@@ -274,3 +590,579 @@ class GlycanCompositionEnzymeGraph(EnzymeGraph):
     @classmethod
     def _load_entity(self, entity):
         return HashableGlycanComposition.parse(entity)
+
+
+def _csr(rows):
+    indptr = array.array('q', [0])
+    indices = array.array('q')
+    masks = []
+    for row in rows:
+        for index, mask in row:
+            indices.append(index)
+            masks.append(mask)
+        indptr.append(len(indices))
+    return indptr, indices, masks
+
+
+class IndexedEnzymeGraph(object):
+    '''An :class:`EnzymeGraph` indexed for traversal, with integer node ids and
+    compressed sparse row adjacency in both directions.
+
+    Each pair of parent and child is one entry in the adjacency, carrying the enzymes
+    between them as a bitset over :attr:`enzymes`, so finding the children or parents of a
+    node is proportional to its degree. All edges have length 1, so shortest paths are
+    found by breadth first search. Nodes may be removed, which hides them and their edges
+    without rebuilding the index.
+
+    Attributes
+    ----------
+    nodes : list
+        The nodes of the graph, indexed by id
+    node_ids : dict
+        Maps each node to its id
+    enzymes : list
+        The enzyme names, indexed by their bit in the edge bitsets
+    enzyme_ids : dict
+        Maps each enzyme name to its bit
+    indptr : :class:`array.array`
+        The offsets of each node's children in :attr:`indices`
+    indices : :class:`array.array`
+        The ids of the children of every node
+    masks : list of int
+        The enzyme bitset of each entry in :attr:`indices`
+    reverse_indptr : :class:`array.array`
+        The offsets of each node's parents in :attr:`reverse_indices`
+    reverse_indices : :class:`array.array`
+        The ids of the parents of every node
+    reverse_masks : list of int
+        The enzyme bitset of each entry in :attr:`reverse_indices`
+    seeds : set of int
+        The ids of the seed nodes
+    removed : :class:`bytearray`
+        Whether each node has been removed
+    in_degree : :class:`array.array`
+        The number of parents of each node which have not been removed
+    '''
+
+    def __init__(self, graph):
+        self.graph_type = graph.__class__
+        self.metadata = dict(graph.metadata)
+        self.nodes = []
+        self.node_ids = {}
+        self.enzymes = sorted(graph.enzymes())
+        self.enzyme_ids = {enzyme: i for i, enzyme in enumerate(self.enzymes)}
+        self.seeds = {self._intern(seed) for seed in graph.seeds}
+        children = defaultdict(list)
+        enzyme_ids = self.enzyme_ids
+        for parent, inner in graph.items():
+            parent = self._intern(parent)
+            for child, enzymes in inner.items():
+                if not enzymes:
+                    continue
+                child = self._intern(child)
+                mask = 0
+                for enzyme in enzymes:
+                    mask |= 1 << enzyme_ids[enzyme]
+                children[parent].append((child, mask))
+        self._set_adjacency(children)
+
+    def _set_adjacency(self, children):
+        # `children` maps each node id to a list of (child id, enzyme bitset) pairs
+        n = len(self.nodes)
+        parents = defaultdict(list)
+        for i in range(n):
+            for j, mask in children[i]:
+                parents[j].append((i, mask))
+        self.indptr, self.indices, self.masks = _csr(children[i] for i in range(n))
+        self.reverse_indptr, self.reverse_indices, self.reverse_masks = _csr(parents[i] for i in range(n))
+        self.removed = bytearray(n)
+        self.in_degree = array.array('q', [len(parents[i]) for i in range(n)])
+        self._removed_count = 0
+
+    def _intern(self, node):
+        try:
+            return self.node_ids[node]
+        except KeyError:
+            i = self.node_ids[node] = len(self.nodes)
+            self.nodes.append(node)
+            return i
+
+    def node_id(self, node):
+        '''Get the id of `node`.
+
+        Parameters
+        ----------
+        node : object
+
+        Returns
+        -------
+        int
+
+        Raises
+        ------
+        KeyError
+            If `node` is not in the graph or has been removed
+        '''
+        i = self.node_ids[node]
+        if self.removed[i]:
+            raise KeyError(node)
+        return i
+
+    def __contains__(self, node):
+        i = self.node_ids.get(node)
+        return i is not None and not self.removed[i]
+
+    def __len__(self):
+        return len(self.nodes) - self._removed_count
+
+    def __iter__(self):
+        removed = self.removed
+        return (node for i, node in enumerate(self.nodes) if not removed[i])
+
+    def __repr__(self):
+        return "{}({:d})".format(self.__class__.__name__, len(self))
+
+    def _enzyme_mask(self, enzymes):
+        if enzymes is None:
+            return -1
+        mask = 0
+        enzyme_ids = self.enzyme_ids
+        for enzyme in enzymes:
+            i = enzyme_ids.get(enzyme)
+            if i is not None:
+                mask |= 1 << i
+        return mask
+
+    def _enzyme_set(self, mask):
+        enzymes = self.enzymes
+        return {enzymes[i] for i in range(len(enzymes)) if mask >> i & 1}
+
+    def _neighbors(self, i, reverse=False):
+        if reverse:
+            indptr, indices = self.reverse_indptr, self.reverse_indices
+        else:
+            indptr, indices = self.indptr, self.indices
+        removed = self.removed
+        nodes = self.nodes
+        return [nodes[j] for j in indices[indptr[i]:indptr[i + 1]] if not removed[j]]
+
+    def children(self, target):
+        return self._neighbors(self.node_id(target))
+
+    def parents(self, target):
+        return self._neighbors(self.node_id(target), reverse=True)
+
+    def enzymes_between(self, parent, child):
+        '''Get the enzymes on the edges from `parent` to `child`.
+
+        Parameters
+        ----------
+        parent : object
+        child : object
+
+        Returns
+        -------
+        set
+        '''
+        i = self.node_id(parent)
+        j = self.node_id(child)
+        for k in range(self.indptr[i], self.indptr[i + 1]):
+            if self.indices[k] == j:
+                return self._enzyme_set(self.masks[k])
+        return set()
+
+    def parentless(self):
+        removed = self.removed
+        nodes = self.nodes
+        return {nodes[i] for i, degree in enumerate(self.in_degree) if not degree and not removed[i]}
+
+    def remove(self, node):
+        '''Remove `node` and every edge to or from it.
+
+        Parameters
+        ----------
+        node : object
+
+        Returns
+        -------
+        int
+            The number of nodes removed
+        '''
+        i = self.node_ids.get(node)
+        if i is None or self.removed[i]:
+            return 0
+        self.removed[i] = 1
+        self._removed_count += 1
+        in_degree = self.in_degree
+        for j in self.indices[self.indptr[i]:self.indptr[i + 1]]:
+            in_degree[j] -= 1
+        return 1
+
+    def _expand(self, frontier, previous, mask, reverse=False):
+        # Visit the next layer of a breadth first search, recording for each new node
+        # the node it was reached from and the enzymes of that edge
+        if reverse:
+            indptr, indices, masks = self.reverse_indptr, self.reverse_indices, self.reverse_masks
+        else:
+            indptr, indices, masks = self.indptr, self.indices, self.masks
+        removed = self.removed
+        layer = []
+        append = layer.append
+        for i in frontier:
+            start = indptr[i]
+            end = indptr[i + 1]
+            for j, edge_mask in zip(indices[start:end], masks[start:end]):
+                if j not in previous and not removed[j]:
+                    edge_mask &= mask
+                    if edge_mask:
+                        previous[j] = (i, edge_mask)
+                        append(j)
+        return layer
+
+    def _edge(self, parent, child, mask):
+        return EnzymeEdge(self.nodes[parent], self.nodes[child], self._enzyme_set(mask))
+
+    def _path_to(self, previous, j):
+        path = []
+        step = previous[j]
+        while step is not None:
+            i, mask = step
+            path.append(self._edge(i, j, mask))
+            j = i
+            step = previous[j]
+        return path[::-1]
+
+    def distances_from(self, source, enzymes=None):
+        '''Find the number of edges on the shortest path from `source` to every node it reaches.
+
+        Parameters
+        ----------
+        source : object
+        enzymes : Iterable, optional
+            Only follow edges with one of these enzymes
+
+        Returns
+        -------
+        dict
+        '''
+        mask = self._enzyme_mask(enzymes)
+        i = self.node_id(source)
+        previous = {i: None}
+        distances = {source: 0}
+        frontier = [i]
+        distance = 0
+        while frontier:
+            distance += 1
+            frontier = self._expand(frontier, previous, mask)
+            for j in frontier:
+                distances[self.nodes[j]] = distance
+        return distances
+
+    def shortest_paths_from(self, source, targets=None, enzymes=None):
+        '''Find a shortest path from `source` to each of `targets` with one breadth first search.
+
+        Parameters
+        ----------
+        source : object
+        targets : Iterable, optional
+            The nodes to find paths to. If not given, paths to every reachable node are found.
+        enzymes : Iterable, optional
+            Only follow edges with one of these enzymes
+
+        Returns
+        -------
+        dict
+            Maps each reachable target to its path as a list of :class:`EnzymeEdge`
+        '''
+        mask = self._enzyme_mask(enzymes)
+        i = self.node_id(source)
+        previous = {i: None}
+        if targets is not None:
+            targets = [self.node_ids[target] for target in targets if target in self]
+            remaining = set(targets)
+            remaining.discard(i)
+        frontier = [i]
+        while frontier and (targets is None or remaining):
+            frontier = self._expand(frontier, previous, mask)
+            if targets is not None:
+                remaining.difference_update(frontier)
+        if targets is None:
+            targets = previous
+        return {self.nodes[j]: self._path_to(previous, j) for j in targets if j in previous}
+
+    def shortest_path(self, source, sink, enzymes=None):
+        '''Find a shortest path from `source` to `sink` by searching forward from `source`
+        and backward from `sink` until the searches meet.
+
+        Parameters
+        ----------
+        source : object
+        sink : object
+        enzymes : Iterable, optional
+            Only follow edges with one of these enzymes
+
+        Returns
+        -------
+        list of :class:`EnzymeEdge`
+            The edges of the path, or :const:`None` if `sink` is not reachable
+        '''
+        mask = self._enzyme_mask(enzymes)
+        i = self.node_id(source)
+        j = self.node_id(sink)
+        if i == j:
+            return []
+        forward = {i: None}
+        backward = {j: None}
+        depths = {i: 0}, {j: 0}
+        frontiers = [i], [j]
+        while frontiers[0] and frontiers[1]:
+            # Grow the smaller search by a whole layer, so every meeting point in the
+            # layer can be compared
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            previous, other = (forward, backward) if side == 0 else (backward, forward)
+            depth = depths[side][frontiers[side][0]] + 1
+            layer = self._expand(frontiers[side], previous, mask, reverse=side == 1)
+            for k in layer:
+                depths[side][k] = depth
+            meeting = [k for k in layer if k in other]
+            if meeting:
+                k = min(meeting, key=lambda k: depths[0][k] + depths[1][k])
+                path = self._path_to(forward, k)
+                step = backward[k]
+                while step is not None:
+                    child, child_mask = step
+                    path.append(self._edge(k, child, child_mask))
+                    k = child
+                    step = backward[k]
+                return path
+            frontiers = (layer, frontiers[1]) if side == 0 else (frontiers[0], layer)
+        return None
+
+    def _ids(self, nodes):
+        node_ids = self.node_ids
+        removed = self.removed
+        ids = []
+        for node in nodes:
+            i = node_ids[node]
+            if not removed[i]:
+                ids.append(i)
+        return ids
+
+    def _closure(self, start, mask=-1, reverse=False, within=None, goal=None):
+        # Mark every id reachable from `start` along edges with an enzyme in `mask`,
+        # entering only the ids marked in `within`, and stop once `goal` is reached
+        if reverse:
+            indptr, indices, masks = self.reverse_indptr, self.reverse_indices, self.reverse_masks
+        else:
+            indptr, indices, masks = self.indptr, self.indices, self.masks
+        removed = self.removed
+        visited = bytearray(len(self.nodes))
+        stack = []
+        for i in start:
+            if not visited[i] and (within is None or within[i]):
+                visited[i] = 1
+                stack.append(i)
+        while stack:
+            if goal is not None and visited[goal]:
+                break
+            i = stack.pop()
+            begin = indptr[i]
+            end = indptr[i + 1]
+            for j, edge_mask in zip(indices[begin:end], masks[begin:end]):
+                if not visited[j] and edge_mask & mask and not removed[j] and (within is None or within[j]):
+                    visited[j] = 1
+                    stack.append(j)
+        return visited
+
+    def _marked(self, visited):
+        nodes = self.nodes
+        return {nodes[i] for i in range(len(nodes)) if visited[i]}
+
+    def descendants(self, nodes, enzymes=None):
+        '''Find every node reachable from `nodes`, including `nodes` themselves.
+
+        Parameters
+        ----------
+        nodes : Iterable
+        enzymes : Iterable, optional
+            Only follow edges with one of these enzymes
+
+        Returns
+        -------
+        set
+        '''
+        return self._marked(self._closure(self._ids(nodes), self._enzyme_mask(enzymes)))
+
+    def ancestors(self, nodes, enzymes=None):
+        '''Find every node from which one of `nodes` is reachable, including `nodes` themselves.
+
+        Parameters
+        ----------
+        nodes : Iterable
+        enzymes : Iterable, optional
+            Only follow edges with one of these enzymes
+
+        Returns
+        -------
+        set
+        '''
+        return self._marked(self._closure(self._ids(nodes), self._enzyme_mask(enzymes), reverse=True))
+
+    def _source_ids(self, sources):
+        if sources is None:
+            return [i for i in self.seeds if not self.removed[i]]
+        return self._ids(sources)
+
+    def reachable(self, targets, sources=None, enzymes=None):
+        '''Test which of `targets` can be produced from `sources` with one traversal.
+
+        Parameters
+        ----------
+        targets : Iterable
+        sources : Iterable, optional
+            The nodes to start from. Defaults to the seeds.
+        enzymes : Iterable, optional
+            Only follow edges with one of these enzymes
+
+        Returns
+        -------
+        dict
+            Maps each target to whether it is reachable
+        '''
+        visited = self._closure(self._source_ids(sources), self._enzyme_mask(enzymes))
+        node_ids = self.node_ids
+        return {target: target in node_ids and bool(visited[node_ids[target]]) for target in targets}
+
+    def _minimal_enzymes(self, target, sources, mask, within):
+        # Only the target's ancestors can lie on a path to it, so the enzymes in use are
+        # those on edges between them
+        within = self._closure([target], mask, reverse=True, within=within)
+        if not any(within[i] for i in sources):
+            return None
+        used = 0
+        indptr, indices, masks = self.indptr, self.indices, self.masks
+        for i in range(len(self.nodes)):
+            if within[i]:
+                for k in range(indptr[i], indptr[i + 1]):
+                    if within[indices[k]]:
+                        used |= masks[k]
+        used &= mask
+        # Drop each enzyme in turn while the target stays reachable
+        for bit in range(len(self.enzymes)):
+            trial = used & ~(1 << bit)
+            if trial != used and self._closure(sources, trial, within=within, goal=target)[target]:
+                used = trial
+        return self._enzyme_set(used)
+
+    def minimal_enzymes(self, target, sources=None, enzymes=None):
+        '''Find a set of enzymes which produces `target` from `sources`, from which no
+        enzyme can be dropped.
+
+        The set is minimal by inclusion, not necessarily the smallest such set. Enzymes
+        are dropped in the order of :attr:`enzymes`.
+
+        Parameters
+        ----------
+        target : object
+        sources : Iterable, optional
+            The nodes to start from. Defaults to the seeds.
+        enzymes : Iterable, optional
+            The enzymes to choose from. Defaults to all enzymes.
+
+        Returns
+        -------
+        set
+            The enzyme names, or :const:`None` if `target` cannot be produced
+        '''
+        return self.minimal_enzymes_many([target], sources, enzymes)[target]
+
+    def minimal_enzymes_many(self, targets, sources=None, enzymes=None):
+        '''Find a set of enzymes for each of `targets` as :meth:`minimal_enzymes` does,
+        sharing one traversal from `sources` between them.
+
+        Parameters
+        ----------
+        targets : Iterable
+        sources : Iterable, optional
+            The nodes to start from. Defaults to the seeds.
+        enzymes : Iterable, optional
+            The enzymes to choose from. Defaults to all enzymes.
+
+        Returns
+        -------
+        dict
+            Maps each target to its set of enzyme names, or :const:`None` if it cannot be produced
+        '''
+        mask = self._enzyme_mask(enzymes)
+        sources = self._source_ids(sources)
+        within = self._closure(sources, mask)
+        result = {}
+        for target in targets:
+            i = self.node_ids.get(target)
+            if i is None or not within[i]:
+                result[target] = None
+            else:
+                result[target] = self._minimal_enzymes(i, sources, mask, within)
+        return result
+
+    def subgraph(self, nodes, enzymes=None):
+        '''Build the subgraph induced by `nodes`, optionally keeping only the edges with
+        one of `enzymes`.
+
+        The new graph shares the node objects of this one instead of copying them. The
+        graph :meth:`EnzymeGraph.remove_enzyme` would leave is the subgraph of the
+        :meth:`descendants` of the seeds with the remaining enzymes.
+
+        Parameters
+        ----------
+        nodes : Iterable
+        enzymes : Iterable, optional
+            Only keep edges with one of these enzymes
+
+        Returns
+        -------
+        :class:`IndexedEnzymeGraph`
+        '''
+        mask = self._enzyme_mask(enzymes)
+        ids = sorted(set(self._ids(nodes)))
+        remap = {i: n for n, i in enumerate(ids)}
+        inst = self.__class__.__new__(self.__class__)
+        inst.graph_type = self.graph_type
+        inst.metadata = dict(self.metadata)
+        inst.nodes = [self.nodes[i] for i in ids]
+        inst.node_ids = {node: n for n, node in enumerate(inst.nodes)}
+        inst.enzymes = self.enzymes
+        inst.enzyme_ids = self.enzyme_ids
+        inst.seeds = {remap[i] for i in self.seeds if i in remap}
+        indptr, indices, masks = self.indptr, self.indices, self.masks
+        children = defaultdict(list)
+        for i in ids:
+            row = children[remap[i]]
+            for k in range(indptr[i], indptr[i + 1]):
+                j = remap.get(indices[k])
+                edge_mask = masks[k] & mask
+                if j is not None and edge_mask:
+                    row.append((j, edge_mask))
+        inst._set_adjacency(children)
+        return inst
+
+    def to_enzyme_graph(self):
+        '''Build an :class:`EnzymeGraph` of the nodes which have not been removed.
+
+        Returns
+        -------
+        :class:`EnzymeGraph`
+        '''
+        graph = defaultdict(_enzyme_graph_inner)
+        removed = self.removed
+        nodes = self.nodes
+        indptr, indices, masks = self.indptr, self.indices, self.masks
+        for i, node in enumerate(nodes):
+            if removed[i]:
+                continue
+            for k in range(indptr[i], indptr[i + 1]):
+                j = indices[k]
+                if not removed[j]:
+                    graph[node][nodes[j]] = self._enzyme_set(masks[k])
+        seeds = {nodes[i] for i in self.seeds if not removed[i]}
+        return self.graph_type(graph, seeds, self.metadata)
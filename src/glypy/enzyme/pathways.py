@@ -9,30 +9,42 @@ from glypy.io import iupac
 from glypy.structure.base import MoleculeBase
 from glypy.algorithms import subtree_search
 from glypy.algorithms.similarity import commutative_similarity
+from glypy.algorithms.storage import structure_key
 
 from glypy.utils import root as proot
 
 from .ec import EnzymeInformation, EnzymeDatabase
+from .site_index import SiteIndex, link_entry
 
 
 def rejecting(*args):
-    def checker(structure):
+    def checker(structure, index=None):
         for subtree in args:
-            if subtree_search.subtree_of(subtree, structure, exact=True):
+            if index is not None:
+                match = index.subtree_of(subtree)
+            else:
+                match = subtree_search.subtree_of(subtree, structure, exact=True)
+            if match:
                 return False
         return True
+    checker.uses_site_index = True
     return checker
 
 
 def reject_on_path(*args):
-    def checker(structure, selected_node):
+    def checker(structure, selected_node, index=None):
         for subtree in args:
+            if index is not None:
+                pairs = index.walk_with(subtree)
+            else:
+                pairs = subtree_search.walk_with(structure, subtree)
             path = {
-                v.id: k for k, v in subtree_search.walk_with(structure, subtree)
+                v.id: k for k, v in pairs
             }
             if selected_node.id in path:
                 return False
         return True
+    checker.uses_site_index = True
     return checker
 
 
@@ -46,6 +58,72 @@ def reject_on_parent(*args):
     return checker
 
 
+class EnzymeProduct(object):
+    """A product of applying an enzyme to one site of a structure, which is only
+    built when it is requested.
+
+    Attributes
+    ----------
+    enzyme : :class:`Glycoenzyme`
+        The enzyme acting on the site
+    index : :class:`~.SiteIndex`
+        The index over the source structure
+    site : object
+        The residue or link the enzyme acts on
+    options : dict
+        Extra arguments for the enzyme's :meth:`~Glycoenzyme.build_product`
+    """
+
+    __slots__ = ("enzyme", "index", "site", "options", "_key", "_result")
+
+    def __init__(self, enzyme, index, site, options=None):
+        self.enzyme = enzyme
+        self.index = index
+        self.site = site
+        self.options = options or {}
+        self._key = None
+        self._result = None
+
+    @property
+    def source(self):
+        """The structure the enzyme acts on
+        """
+        return self.index.structure
+
+    @property
+    def key(self):
+        """The :func:`~.structure_key` of the product structure, computed from
+        the source structure's digests when the enzyme supports it.
+
+        Returns
+        -------
+        :class:`bytes`
+        """
+        if self._key is None:
+            key = self.enzyme.product_key(self.index, self.site)
+            if key is None:
+                key = structure_key(self.structure)
+            self._key = key
+        return self._key
+
+    def materialize(self):
+        """Build the product, as yielded by the enzyme's ``apply`` method. Each call
+        builds a new copy.
+        """
+        return self.enzyme.build_product(self.source, self.site, **self.options)
+
+    @property
+    def structure(self):
+        """The product :class:`~.Glycan`, built on first access.
+        """
+        if self._result is None:
+            self._result = self.enzyme.product_structure(self.materialize())
+        return self._result
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({self.enzyme!r}, {self.site!r})".format(self=self)
+
+
 class Glycoenzyme(object):
 
     def __init__(self, parent_position, child_position, parent, child, terminal=True,
@@ -65,6 +143,7 @@ class Glycoenzyme(object):
         self._child_position = ()
         self._parents = ()
         self._child = None
+        self._product_template = None
 
         self.parent_position = parent_position
         self.child_position = child_position
@@ -82,6 +161,7 @@ class Glycoenzyme(object):
     @parent_position.setter
     def parent_position(self, value):
         self._parent_position = self._conform_position(value)
+        self._product_template = None
 
     @property
     def child_position(self):
@@ -90,6 +170,7 @@ class Glycoenzyme(object):
     @child_position.setter
     def child_position(self, value):
         self._child_position = self._conform_position(value)
+        self._product_template = None
 
     @property
     def parents(self):
@@ -106,6 +187,7 @@ class Glycoenzyme(object):
     @child.setter
     def child(self, value):
         self._child = value
+        self._product_template = None
 
     def _conform_validator(self, fn):
         try:
@@ -114,9 +196,13 @@ class Glycoenzyme(object):
             fn = (fn,)
         return fn
 
-    def validate_structure(self, structure):
+    def validate_structure(self, structure, index=None):
         for fn in self.validators:
-            if not fn(structure):
+            if index is not None and getattr(fn, "uses_site_index", False):
+                valid = fn(structure, index=index)
+            else:
+                valid = fn(structure)
+            if not valid:
                 return False
         return True
 
@@ -137,15 +223,67 @@ class Glycoenzyme(object):
             value = tuple(value)
         return value
 
-    def _traverse(self, structure):
+    def _traverse(self, structure, index):
         raise NotImplementedError()
 
-    def traverse(self, structure):
-        if self.validate_structure(structure):
-            return list(self._traverse(structure))
+    def traverse(self, structure, index=None):
+        """Find the sites in `structure` this enzyme acts on.
+
+        Parameters
+        ----------
+        structure : :class:`~.Glycan`
+            The structure to search
+        index : :class:`~.SiteIndex`, optional
+            An index over `structure` shared between enzymes. If not provided,
+            one is built for this call.
+
+        Returns
+        -------
+        :class:`list`
+        """
+        if index is None:
+            index = SiteIndex(structure)
+        if self.validate_structure(structure, index):
+            return list(self._traverse(structure, index))
         else:
             return []
 
+    def products(self, structure, index=None, **options):
+        """Describe the products of this enzyme acting on each site in `structure`
+        without building them.
+
+        Parameters
+        ----------
+        structure : :class:`~.Glycan`
+            The structure to search
+        index : :class:`~.SiteIndex`, optional
+            An index over `structure` shared between enzymes. If not provided,
+            one is built for this call.
+        **options
+            Forwarded to :meth:`build_product`
+
+        Returns
+        -------
+        :class:`list` of :class:`EnzymeProduct`
+        """
+        if index is None:
+            index = SiteIndex(structure)
+        return [EnzymeProduct(self, index, site, options) for site in self.traverse(structure, index)]
+
+    def build_product(self, structure, site, **options):
+        raise NotImplementedError()
+
+    def product_structure(self, product):
+        """Get the product structure from the result of :meth:`build_product`
+        """
+        return product
+
+    def product_key(self, index, site):
+        """Compute the :func:`~.structure_key` of the product at `site` from `index`,
+        or :const:`None` if it must be computed from the built product.
+        """
+        return None
+
 
 class Transferase(Glycoenzyme):
 
@@ -159,25 +297,29 @@ class Transferase(Glycoenzyme):
             def site_validator(structure, selected_node):  # pylint: disable=function-redefined
                 return True
         if parent_node_id is None:
-            parent_node_id = proot(self.parent).id
+            parent_node_id = proot(self.parents[0]).id
         self.parent_node_id = parent_node_id
         self.site_validators = self._conform_validator(site_validator)
         self.exact = exact
 
-    def _traverse(self, structure):
+    def _traverse(self, structure, index):
         if self.parents is not None:
             for parent in self.parents:
-                for node in subtree_search.find_matching_subtree_roots(parent, structure, exact=True):
-                    node = self._get_paired_node(node, parent)
+                for node in index.matching_roots(parent):
+                    node = index.paired_node(node, parent, self.parent_node_id)
                     for parent_position in self.parent_position:
                         if not node.is_occupied(parent_position) and (
                            (len(node.children()) == 0 and self.terminal) or (
-                                not self.terminal)) and self.validate_site(structure, node):
+                                not self.terminal)) and self.validate_site(structure, node, index):
                             yield node
 
-    def validate_site(self, structure, node):
+    def validate_site(self, structure, node, index=None):
         for fn in self.site_validators:
-            if not fn(structure, node):
+            if index is not None and getattr(fn, "uses_site_index", False):
+                valid = fn(structure, node, index=index)
+            else:
+                valid = fn(structure, node)
+            if not valid:
                 return False
         return True
 
@@ -188,19 +330,23 @@ class Transferase(Glycoenzyme):
     def make_bond(self, node, parent_position=None, child_position=None):
         raise NotImplementedError()
 
-    def apply(self, structure, parent_position=None, child_position=None):
-        for node in self.traverse(structure):
-            new_structure = structure.clone()
-            node = new_structure.get(node.id)
-            self.make_bond(node, parent_position, child_position)
-            # reset ids, rebuild the index, and standardize traversal order
-            new_structure.reindex()
-            new_structure.canonicalize()
-            yield new_structure
-
-    def __call__(self, structure, parent_position=None, child_position=None):
+    def build_product(self, structure, node, parent_position=None, child_position=None):
+        new_structure = structure.clone()
+        node = new_structure.get(node.id)
+        self.make_bond(node, parent_position, child_position)
+        # reset ids, rebuild the index, and standardize traversal order
+        new_structure.reindex()
+        new_structure.canonicalize()
+        return new_structure
+
+    def apply(self, structure, parent_position=None, child_position=None, index=None):
+        for product in self.products(structure, index, parent_position=parent_position,
+                                     child_position=child_position):
+            yield product.materialize()
+
+    def __call__(self, structure, parent_position=None, child_position=None, index=None):
         return self.apply(
-            structure, parent_position=parent_position, child_position=child_position)
+            structure, parent_position=parent_position, child_position=child_position, index=index)
 
 
 class Glycosyltransferase(Transferase):
@@ -211,6 +357,18 @@ class Glycosyltransferase(Transferase):
             new_monosaccharide, position=self.parent_position[0],
             child_position=self.child_position[0])
 
+    def product_key(self, index, site):
+        if site.is_occupied(self.parent_position[0]):
+            # Let building the product raise the same error it always has
+            return None
+        if self._product_template is None:
+            # The new link and child do not depend on the site, so bond them to a
+            # detached copy of the first site once and digest the result
+            scratch = site.clone()
+            self.make_bond(scratch)
+            self._product_template = [link_entry(pos, link) for pos, link in scratch.children(links=True)]
+        return index.key_with_children(site, self._product_template)
+
 
 class Substituentransferase(Glycosyltransferase):
 
@@ -220,6 +378,10 @@ class Substituentransferase(Glycosyltransferase):
             new_substituent, position=self.parent_position[0],
             child_position=self.child_position[0])
 
+    def product_key(self, index, site):
+        # Adding a substituent changes the site residue itself
+        return None
+
 
 class Glycosylase(Glycoenzyme):
 
@@ -240,14 +402,15 @@ class Glycosylase(Glycoenzyme):
             (len(link.child.children()) == 0 and self.terminal) or (not self.terminal)
         )
 
-    def _traverse(self, structure):
-        for p, link in structure.iterlinks():
+    def _traverse(self, structure, index):
+        comparator = index.comparator_for(self.comparator)
+        for p, link in index.links:
             if link.is_ambiguous():
                 warnings.warn(
                     "Glycosylase do not support ambiguous linkages at this time.")
             else:
-                if (self.parents is None or any(self.comparator(link.parent, parent) for parent in self.parents)) and\
-                   (self.child is None or any(self.comparator(link.child, child) for child in self.child)) and\
+                if (self.parents is None or any(comparator(link.parent, parent) for parent in self.parents)) and\
+                   (self.child is None or any(comparator(link.child, child) for child in self.child)) and\
                    (self.parent_position is None or link.parent_position in self.parent_position) and\
                    (self.child_position is None or link.child_position in self.child_position) and\
                    ((len(link.child.children()) == 0 and self.terminal) or (not self.terminal)):
@@ -256,18 +419,27 @@ class Glycosylase(Glycoenzyme):
     def digest(self, link, refund=False):
         link.break_link(refund=refund)
 
-    def apply(self, structure, refund=False):
-        for link in self.traverse(structure):
-            new_structure = structure.clone()
-            link = new_structure.get_link(link.id)
-            self.digest(link, refund)
-            parent, child = structure.__class__(
-                link.parent, index_method=None).reroot(index_method='dfs'), structure.__class__(
-                link.child, index_method='dfs')
-            yield parent.canonicalize(), child.canonicalize()
-
-    def __call__(self, structure, refund=False):
-        return self.apply(structure, refund=refund)
+    def build_product(self, structure, link, refund=False):
+        new_structure = structure.clone()
+        link = new_structure.get_link(link.id)
+        self.digest(link, refund)
+        parent, child = structure.__class__(
+            link.parent, index_method=None).reroot(index_method='dfs'), structure.__class__(
+            link.child, index_method='dfs')
+        return parent.canonicalize(), child.canonicalize()
+
+    def product_structure(self, product):
+        return product[0]
+
+    def product_key(self, index, link):
+        return index.key_without_link(link)
+
+    def apply(self, structure, refund=False, index=None):
+        for product in self.products(structure, index, refund=refund):
+            yield product.materialize()
+
+    def __call__(self, structure, refund=False, index=None):
+        return self.apply(structure, refund=refund, index=index)
 
 
 def make_n_glycan_pathway():
@@ -0,0 +1,430 @@
+'''An index over the residues and links of a single structure, shared by every
+enzyme applied to it.
+
+Matching an enzyme's acceptor pattern against a structure compares each pattern residue
+with each residue of the structure using :func:`~.commutative_similarity_score_with_tolerance`,
+and a pathway applies a dozen enzymes, each with its own patterns and validators, to every
+structure of every generation. These comparisons only depend on the traits of the two residues
+being compared, not on where they are in their structures, and a pathway's structures are built
+from a handful of distinct residue types.
+
+:class:`SiteIndex` traverses a structure once, assigning each residue a hashable type, and answers
+subtree inclusion, path walking and residue similarity queries for that structure, remembering
+each answer for the enzymes which ask again. :class:`ResidueMatcher` remembers the results of
+comparing pairs of residue types across every structure it is shared between.
+
+The index also holds the per-residue digests of :func:`~.structure_key`, so the key of a
+product which adds or removes a residue can be found by re-digesting only the path from the
+changed residue to the root, without building the product.
+'''
+from glypy.algorithms import subtree_search
+from glypy.algorithms.storage import (
+    _link_parts, _node_digest, _residue_signature, _root_key, _subtree_digests)
+from glypy.algorithms.similarity import (
+    commutative_similarity, commutative_similarity_score_with_tolerance)
+from glypy.utils import root as proot
+
+
+def residue_type(node):
+    '''Build a hashable description of the traits of `node` which residue similarity
+    and inclusion comparisons depend on.
+
+    Two residues with the same type compare identically against any other residue. Residues
+    whose modifications or substituents were added in a different order may receive different
+    types, which costs an extra comparison but never changes the result.
+
+    Parameters
+    ----------
+    node: :class:`~.Monosaccharide`
+
+    Returns
+    -------
+    :class:`tuple`
+    '''
+    return (
+        node.anomer, node.superclass, node.configuration, node.stem,
+        node.ring_start, node.ring_end,
+        tuple(node.modifications.items()),
+        tuple([(pos, link.child.name, tuple(link.child.composition.items()))
+               for pos, link in node.substituent_links.items()]),
+    )
+
+
+def link_entry(position, link):
+    """Build the digest entry of `link` and the subtree below it, as used by
+    :meth:`SiteIndex.key_with_children`.
+
+    Parameters
+    ----------
+    position: int
+        The position of `link` on its parent
+    link: :class:`~.Link`
+
+    Returns
+    -------
+    :class:`str`
+    """
+    prefix, suffix = _link_parts(position, link)
+    return prefix + _subtree_digests(link.child)[id(link.child)] + suffix
+
+
+class ResidueMatcher(object):
+    '''Remembers the result of comparing pairs of residue types, shared between
+    many :class:`SiteIndex` instances.
+
+    Attributes
+    ----------
+    pattern_types: dict
+        Maps the :func:`id` of residues which are not part of an indexed structure, like the
+        residues of enzyme acceptor patterns, to the residue and its type. The residue is held
+        so its :func:`id` cannot be reused while it is cached.
+    inclusions: dict
+        Maps pairs of pattern and residue types to the score of the pattern residue's inclusion
+        in the residue, or 0
+    similarities: dict
+        Maps pairs of residue types and the substituent flag to the result of
+        :func:`~.commutative_similarity`
+    maxsize : int
+        The maximum number of entries held in each table. When a table is full, new
+        results are computed but not stored.
+    hits : int
+        The number of comparisons answered from the cache
+    misses : int
+        The number of comparisons that were computed
+    '''
+
+    def __init__(self, maxsize=2 ** 16):
+        self.maxsize = maxsize
+        self.pattern_types = {}
+        self.inclusions = {}
+        self.similarities = {}
+        self.hits = 0
+        self.misses = 0
+
+    def pattern_type(self, node):
+        key = id(node)
+        try:
+            return self.pattern_types[key][1]
+        except KeyError:
+            value = residue_type(node)
+            if len(self.pattern_types) < self.maxsize:
+                self.pattern_types[key] = (node, value)
+            return value
+
+    def inclusion(self, pattern, pattern_type, node, node_type):
+        '''Compare the traits of the pattern residue with `node` the way
+        :func:`~.exact_ordering_inclusion` does, without considering their children.
+
+        Returns
+        -------
+        :class:`float`
+            The similarity score of the pair, or 0 if `pattern` is not included in `node`
+        '''
+        key = (pattern_type, node_type)
+        try:
+            score = self.inclusions[key]
+            self.hits += 1
+            return score
+        except KeyError:
+            pass
+        self.misses += 1
+        score = self._compute_inclusion(pattern, node)
+        if len(self.inclusions) < self.maxsize:
+            self.inclusions[key] = score
+        return score
+
+    def _compute_inclusion(self, pattern, node):
+        score, similar = commutative_similarity_score_with_tolerance(
+            pattern, node, 0, include_substituents=True)
+        if not similar:
+            return 0
+        node_substituents = dict(node.substituents())
+        for pos, sub in pattern.substituents():
+            node_sub = node_substituents.get(pos)
+            if node_sub is None or sub != node_sub:
+                return 0
+        node_modifications = dict(node.modifications.items())
+        for pos, mod in pattern.modifications.items():
+            node_mod = node_modifications.get(pos)
+            if node_mod is None or mod != node_mod:
+                return 0
+        return score
+
+    def similarity(self, a, a_type, b, b_type, include_substituents=True):
+        '''Compute :func:`~.commutative_similarity` for `a` and `b`, or reuse the
+        result for an earlier pair of residues with the same types.
+
+        Returns
+        -------
+        :class:`bool`
+        '''
+        key = (a_type, b_type, include_substituents)
+        try:
+            result = self.similarities[key]
+            self.hits += 1
+            return result
+        except KeyError:
+            pass
+        self.misses += 1
+        result = commutative_similarity(a, b, include_substituents=include_substituents)
+        if len(self.similarities) < self.maxsize:
+            self.similarities[key] = result
+        return result
+
+    def stats(self):
+        '''Summarize the usage of the cache.
+
+        Returns
+        -------
+        dict
+        '''
+        return {
+            "patterns": len(self.pattern_types),
+            "inclusions": len(self.inclusions),
+            "similarities": len(self.similarities),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        '''Remove all cached results and reset the usage counters.
+        '''
+        self.pattern_types.clear()
+        self.inclusions.clear()
+        self.similarities.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.pattern_types) + len(self.inclusions) + len(self.similarities)
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({stats})".format(self=self, stats=self.stats())
+
+
+residue_matcher = ResidueMatcher()
+
+
+class SiteIndex(object):
+    '''Answers the site-finding queries enzymes make against one structure.
+
+    The structure is traversed once when the index is created, and must not be modified
+    while the index is in use. Query results are remembered by the :func:`id` of the
+    pattern they were made with, which must stay alive as long as the index does.
+
+    Attributes
+    ----------
+    structure: :class:`~.Glycan`
+        The indexed structure
+    nodes: :class:`list`
+        The residues of :attr:`structure` in traversal order
+    links: :class:`list`
+        The ``(position, link)`` pairs of :meth:`~.Glycan.iterlinks` in traversal order
+    node_types: :class:`dict`
+        Maps the :func:`id` of each residue in :attr:`nodes` to its :func:`residue_type`
+    matcher: :class:`ResidueMatcher`
+        The cache of residue type comparisons
+    '''
+
+    def __init__(self, structure, matcher=None):
+        if matcher is None:
+            matcher = residue_matcher
+        self.structure = structure
+        self.matcher = matcher
+        self.nodes = list(structure)
+        self.node_types = {id(node): residue_type(node) for node in self.nodes}
+        self.links = list(structure.iterlinks())
+        self._roots = {}
+        self._walks = {}
+        self._digests = None
+
+    def residue_type(self, node):
+        try:
+            return self.node_types[id(node)]
+        except KeyError:
+            return self.matcher.pattern_type(node)
+
+    def similar(self, node, target, *args, **kwargs):
+        '''A drop-in replacement for :func:`~.commutative_similarity` with the
+        default tolerance and options, besides `include_substituents`.
+
+        Returns
+        -------
+        :class:`bool`
+        '''
+        include_substituents = kwargs.get("include_substituents", True)
+        return self.matcher.similarity(
+            node, self.residue_type(node), target, self.residue_type(target), include_substituents)
+
+    def comparator_for(self, comparator):
+        '''Get a comparator equivalent to `comparator` which uses this index when possible.
+        '''
+        if comparator is commutative_similarity:
+            return self.similar
+        return comparator
+
+    def _included(self, pattern, node):
+        matcher = self.matcher
+        score = matcher.inclusion(pattern, self.residue_type(pattern), node, self.residue_type(node))
+        if not score:
+            return 0
+        node_children = dict(node.children())
+        for pos, pattern_child in pattern.children():
+            node_child = node_children.get(pos)
+            if node_child is None:
+                return 0
+            if pattern_child[0] == node_child[0]:
+                match_score = self._included(pattern_child, node_child)
+                if not match_score:
+                    return 0
+                score += match_score
+            else:
+                return 0
+        return score
+
+    def matching_roots(self, subtree):
+        '''Find the residues of :attr:`structure` where `subtree` is included, like
+        :func:`~.find_matching_subtree_roots` with ``exact=True``.
+
+        Parameters
+        ----------
+        subtree: :class:`~.Glycan`
+
+        Returns
+        -------
+        :class:`list` of :class:`~.Monosaccharide`
+        '''
+        key = id(subtree)
+        try:
+            return self._roots[key]
+        except KeyError:
+            pass
+        subtree_root = proot(subtree)
+        roots = [node for node in self.nodes if self._included(subtree_root, node)]
+        self._roots[key] = roots
+        return roots
+
+    def subtree_of(self, subtree):
+        '''Find the first residue of :attr:`structure` where `subtree` is included, like
+        :func:`~.subtree_of` with ``exact=True``.
+
+        Returns
+        -------
+        :class:`int` or :const:`None`
+            The id of the matching residue
+        '''
+        roots = self.matching_roots(subtree)
+        if roots:
+            return roots[0].id
+        return None
+
+    def walk_with(self, reference):
+        '''Walk :attr:`structure` along `reference` with :func:`~.walk_with`.
+
+        Returns
+        -------
+        :class:`list` of (:class:`~.Monosaccharide`, :class:`~.Monosaccharide`)
+        '''
+        key = id(reference)
+        try:
+            return self._walks[key]
+        except KeyError:
+            pass
+        pairs = list(subtree_search.walk_with(self.structure, reference, comparator=self.similar))
+        self._walks[key] = pairs
+        return pairs
+
+    def paired_node(self, node, pattern, pattern_node_id):
+        '''Walk `pattern` from `node` and find the residue of :attr:`structure`
+        matched to the pattern residue with id `pattern_node_id`.
+
+        Returns
+        -------
+        :class:`~.Monosaccharide` or :const:`None`
+        '''
+        found = None
+        for pattern_node, structure_node in subtree_search.walk_with(node, pattern, comparator=self.similar):
+            if pattern_node.id == pattern_node_id:
+                found = structure_node
+        return found
+
+    def _build_digests(self):
+        root = self.structure.root
+        digests = _subtree_digests(root)
+        signatures = {}
+        entries = {}
+        parents = {}
+        for node in self.nodes:
+            key = id(node)
+            signatures[key] = _residue_signature(node)
+            children = []
+            for pos, link in node.children(links=True):
+                prefix, suffix = _link_parts(pos, link)
+                children.append((id(link.child), prefix, suffix))
+                parents[id(link.child)] = node
+            entries[key] = children
+        self._digests = (digests, signatures, entries, parents)
+        return self._digests
+
+    def _propagate(self, node, digest):
+        digests, signatures, entries, parents = self._digests
+        changed = id(node)
+        parent = parents.get(changed)
+        while parent is not None:
+            key = id(parent)
+            digest = _node_digest(signatures[key], [
+                prefix + (digest if child == changed else digests[child]) + suffix
+                for child, prefix, suffix in entries[key]])
+            changed = key
+            parent = parents.get(key)
+        return _root_key(digest, self.structure.root)
+
+    def key_with_children(self, node, children):
+        """Compute the :func:`~.structure_key` :attr:`structure` would have if new
+        links were added to `node`, without changing `node`'s own traits.
+
+        Parameters
+        ----------
+        node: :class:`~.Monosaccharide`
+            The residue of :attr:`structure` gaining children
+        children: :class:`list` of :class:`str`
+            The digest entries of the new links, built from :func:`link_entry`
+
+        Returns
+        -------
+        :class:`bytes`
+        """
+        if self._digests is None:
+            self._build_digests()
+        digests, signatures, entries, _ = self._digests
+        key = id(node)
+        digest = _node_digest(signatures[key], [
+            prefix + digests[child] + suffix for child, prefix, suffix in entries[key]] + list(children))
+        return self._propagate(node, digest)
+
+    def key_without_link(self, link):
+        """Compute the :func:`~.structure_key` of the fragment of :attr:`structure`
+        containing its root if `link` were broken.
+
+        Parameters
+        ----------
+        link: :class:`~.Link`
+
+        Returns
+        -------
+        :class:`bytes`
+        """
+        if self._digests is None:
+            self._build_digests()
+        digests, signatures, entries, _ = self._digests
+        parent = link.parent
+        key = id(parent)
+        removed = id(link.child)
+        digest = _node_digest(signatures[key], [
+            prefix + digests[child] + suffix for child, prefix, suffix in entries[key]
+            if child != removed])
+        return self._propagate(parent, digest)
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({n} residues, {m} links)".format(
+            self=self, n=len(self.nodes), m=len(self.links))
@@ -2,6 +2,7 @@
 :class:`~.Glycan` and :class:`~.Monosaccharide` objects in common text formats,
 communicating with glycan structure databases, and interpreting glycan nomenclature.
 '''
+from glypy.utils.lazy import lazy_attributes
 
 
 __all__ = [
@@ -10,3 +11,6 @@ __all__ = [
     "format_constants_map",
     "nomenclature"
 ]
+
+__getattr__, __dir__ = lazy_attributes(__name__, __all__ + [
+    "async_http", "byonic", "cfg", "composition_cache", "delimited", "glycomedb", "glyconnect", "gnome", "gws", "residue_cache"])
@@ -0,0 +1,244 @@
+'''An :mod:`asyncio` layer for issuing many requests to the remote databases :mod:`glypy.io`
+talks to, like :mod:`~.glycomedb` and :mod:`~.glyconnect`.
+
+Fetching thousands of records one blocking request at a time spends most of its wall
+time waiting on the network. :class:`AsyncHTTPClient` keeps a pooled :class:`requests.Session`
+per host, limits how many requests are in flight at once, retries transient failures with
+exponential backoff, and streams results as they complete through an asynchronous iterator.
+
+The blocking requests are executed on a thread pool driven by the event loop, so no
+additional HTTP library is required. :func:`run_sync` drives a coroutine to completion
+from synchronous code, which the blocking ``*_many`` wrappers in the client modules use.
+'''
+import asyncio
+import logging
+import threading
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import (Any, AsyncIterator, Awaitable, Callable, Dict, Iterable,
+                    Optional, Tuple, TypeVar)
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+#: HTTP status codes which indicate a request may succeed if retried
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+
+class FetchResult(namedtuple("FetchResult", ("key", "value", "error"))):
+    '''The outcome of fetching a single item with :meth:`AsyncHTTPClient.stream`.
+
+    Attributes
+    ----------
+    key : object
+        The item that was fetched
+    value : object
+        The result of processing the response, or :const:`None` if it failed
+    error : Exception
+        The exception raised while fetching or processing the item, or :const:`None`
+    '''
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AsyncHTTPClient(object):
+    '''Issue HTTP requests concurrently from :mod:`asyncio` code.
+
+    Attributes
+    ----------
+    concurrency : int
+        The maximum number of requests in flight at once
+    max_retries : int
+        The number of times a request is retried after a connection error, a timeout
+        or a response with a status in :data:`RETRY_STATUS_CODES`
+    backoff : float
+        The delay in seconds before the first retry, doubled for each subsequent retry
+    timeout : float
+        The timeout in seconds passed to :meth:`requests.Session.request`
+    '''
+
+    def __init__(self, concurrency: int = 8, max_retries: int = 3, backoff: float = 0.5,
+                 timeout: Optional[float] = 30.0):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self._sessions: Dict[Tuple[str, str], requests.Session] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def session_for(self, url: str) -> requests.Session:
+        '''Get the pooled :class:`requests.Session` used for the host of `url`.
+
+        Parameters
+        ----------
+        url : str
+
+        Returns
+        -------
+        :class:`requests.Session`
+        '''
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+                session.mount("%s://%s" % key, adapter)
+                self._sessions[key] = session
+        return session
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency, thread_name_prefix="glypy-http")
+            return self._executor
+
+    def _send(self, method: str, url: str, kwargs: Dict[str, Any]) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session_for(url).request(method, url, **kwargs)
+
+    async def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        '''Send a request, retrying transient failures.
+
+        Parameters
+        ----------
+        method : str
+            The HTTP method
+        url : str
+            The URL to request
+        **kwargs
+            Forwarded to :meth:`requests.Session.request`
+
+        Returns
+        -------
+        :class:`requests.Response`
+
+        Raises
+        ------
+        :class:`requests.HTTPError`:
+            If the final response has an error status
+        :class:`requests.ConnectionError` or :class:`requests.Timeout`:
+            If the final attempt could not connect
+        '''
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        delay = self.backoff
+        attempt = 0
+        while True:
+            try:
+                response = await loop.run_in_executor(executor, self._send, method, url, dict(kwargs))
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response
+                logger.debug("Retrying %s %s after status %d", method, url, response.status_code)
+            except (requests.ConnectionError, requests.Timeout) as err:
+                if attempt >= self.max_retries:
+                    raise
+                logger.debug("Retrying %s %s after %r", method, url, err)
+            attempt += 1
+            await asyncio.sleep(delay)
+            delay *= 2
+
+    async def get(self, url: str, **kwargs) -> requests.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> requests.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def stream(self, keys: Iterable[T], fetch: Callable[[T], Awaitable[Any]],
+                     raise_errors: bool = True) -> AsyncIterator[FetchResult]:
+        '''Call `fetch` on each of `keys` with at most :attr:`concurrency` calls outstanding,
+        yielding each result as soon as it is available.
+
+        Parameters
+        ----------
+        keys : Iterable
+            The items to fetch
+        fetch : Callable
+            A coroutine function taking one item
+        raise_errors : bool
+            If :const:`True`, the first error raised by `fetch` is propagated and the remaining
+            calls are cancelled. Otherwise, failures are reported through :attr:`FetchResult.error`.
+
+        Yields
+        ------
+        :class:`FetchResult`
+            In the order of completion
+        '''
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(key):
+            async with semaphore:
+                try:
+                    return FetchResult(key, await fetch(key), None)
+                except Exception as err:
+                    if raise_errors:
+                        raise
+                    return FetchResult(key, None, err)
+
+        tasks = [asyncio.ensure_future(bounded(key)) for key in keys]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def close(self):
+        '''Release all pooled connections and worker threads.
+        '''
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+async def collect(iterator: AsyncIterator[FetchResult]) -> Dict[Any, FetchResult]:
+    '''Exhaust an asynchronous iterator of :class:`FetchResult`, mapping each key to its result.
+    '''
+    return {result.key: result async for result in iterator}
+
+
+def run_sync(awaitable: Awaitable[T]) -> T:
+    '''Run `awaitable` to completion from synchronous code.
+
+    If the calling thread already has a running event loop, as in a Jupyter kernel,
+    the awaitable is run on a new event loop in a separate thread.
+
+    Returns
+    -------
+    object
+    '''
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(awaitable)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, awaitable).result()
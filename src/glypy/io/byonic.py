@@ -6,13 +6,18 @@ A simple dialect of Protein Metrics Byonic's glycan composition notation.
 '''
 import re
 
+from functools import partial
+from typing import Iterable, List, Optional
+
 from glypy.composition import Composition
 from glypy.structure.glycan_composition import (
     FrozenGlycanComposition,
+    HashableGlycanComposition,
     FrozenMonosaccharideResidue,
     SubstituentResidue, MolecularComposition)
 from glypy.structure.glycan import Glycan
 from glypy.utils import invert_dict
+from glypy.io.composition_cache import CompositionCache
 
 
 #: The set of defined symbols and their mappings.
@@ -45,13 +50,15 @@ monosaccharide_to_symbol = invert_dict(defined_symbols)
 tokenizer = re.compile(r"([^\(]+)\((\d+)\)")
 
 
-def loads(string):
+def loads(string, composition_type=FrozenGlycanComposition):
     '''Parse a Byonic glycan composition into a :class:`~.FrozenGlycanComposition`
 
     Parameters
     ----------
     string: str
         The string to parse
+    composition_type: type
+        The :class:`~.FrozenGlycanComposition` type to build
 
     Returns
     -------
@@ -62,7 +69,7 @@ def loads(string):
     :class:`KeyError`: Raised if a key isn't defined by the Byonic dialect
     '''
     tokens = tokenizer.findall(string)
-    gc = FrozenGlycanComposition()
+    gc = composition_type()
     for mono, count in tokens:
         mono = defined_symbols[mono]
         count = int(count)
@@ -95,3 +102,51 @@ def dumps(composition):
         tokens.append("%s(%d)" % (key, value))
     return ''.join(tokens)
 
+
+
+#: The :class:`~.CompositionCache` shared by :func:`loads_many` and :func:`dumps_many` by default
+composition_cache = CompositionCache(partial(loads, composition_type=HashableGlycanComposition), dumps)
+
+
+def loads_many(strings: Iterable[str], cache: Optional[CompositionCache]=None,
+               raise_errors: bool=True) -> List[Optional[HashableGlycanComposition]]:
+    '''Parse many Byonic glycan compositions, sharing one instance between all
+    occurrences of the same text. The returned compositions must not be modified.
+
+    Parameters
+    ----------
+    strings: Iterable of str
+        The strings to parse
+    cache: :class:`~.CompositionCache`, optional
+        The cache to use. Defaults to :data:`composition_cache`
+    raise_errors: bool, optional
+        Whether to raise a :class:`KeyError` for a string using an undefined symbol, or to
+        return :const:`None` in its place. Defaults to :const:`True`.
+
+    Returns
+    -------
+    :class:`list` of :class:`~.HashableGlycanComposition`
+    '''
+    if cache is None:
+        cache = composition_cache
+    return cache.parse_many(strings, raise_errors=raise_errors)
+
+
+def dumps_many(compositions: Iterable, cache: Optional[CompositionCache]=None) -> List[str]:
+    '''Encode many compositions into the Byonic glycan composition text format,
+    formatting each distinct :class:`~.HashableGlycanComposition` once.
+
+    Parameters
+    ----------
+    compositions: Iterable of :class:`~.GlycanComposition` or :class:`~.Glycan`
+        The structures to format
+    cache: :class:`~.CompositionCache`, optional
+        The cache to use. Defaults to :data:`composition_cache`
+
+    Returns
+    -------
+    :class:`list` of :class:`str`
+    '''
+    if cache is None:
+        cache = composition_cache
+    return cache.format_many(compositions)
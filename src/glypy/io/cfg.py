@@ -11,6 +11,7 @@ import warnings
 
 from collections import deque, namedtuple
 from functools import partial
+from typing import Callable, Dict, Optional, Tuple
 
 from glypy.structure import (
     Monosaccharide, Glycan, Link, AmbiguousLink,
@@ -21,6 +22,7 @@ from glypy.composition.structure_composition import substituent_compositions
 from glypy.composition.composition_transform import has_derivatization, derivatize
 from glypy.io import format_constants_map
 from glypy.io.nomenclature import identity
+from glypy.io.residue_cache import ResidueCacheBase
 from glypy.utils import invert_dict
 
 from glypy.io.file_utils import ParserInterface, ParserError
@@ -139,6 +141,68 @@ class SubstituentDeserializer(object):
         return self.substituent_from_cfg(substituents)
 
 
+class ResidueCache(ResidueCacheBase):
+    '''Interns the translations from CFG residue and linkage tokens to :class:`~.Monosaccharide`
+    and :class:`LinkageSpecification`.
+
+    Each residue token, as split into its substituent prefix, base type, substituent suffix
+    and anomer, is built into a template :class:`~.Monosaccharide` once, which is cloned for
+    each use.
+
+    Attributes
+    ----------
+    residues : dict
+        Maps residue tokens to template monosaccharides
+    linkages : dict
+        Maps linkage strings to :class:`LinkageSpecification`
+    maxsize : int
+        The maximum number of entries held in either table. When a table is full, new
+        translations are computed but not stored.
+    hits : int
+        The number of lookups satisfied from the cache
+    misses : int
+        The number of lookups that required computing a new translation
+    '''
+
+    residues: Dict[Tuple, Monosaccharide]
+    linkages: Dict[str, LinkageSpecification]
+
+    _tables = ("residues", "linkages")
+
+    def monosaccharide_from_token(self, key: Tuple, build: Callable, *args) -> Monosaccharide:
+        '''Create a new :class:`~.Monosaccharide` for a residue token.
+
+        Parameters
+        ----------
+        key : tuple
+            The substituent prefix position and name, base type, substituent position
+            and name, and anomer of the token
+        build : Callable
+            Builds the template residue from ``*args`` when `key` is not cached
+
+        Returns
+        -------
+        :class:`~.Monosaccharide`
+        '''
+        return self._lookup(self.residues, key, build, *args).clone()
+
+    def linkage_from_string(self, text: Optional[str], parse: Callable) -> LinkageSpecification:
+        '''Get the :class:`LinkageSpecification` for a linkage string.
+
+        Parameters
+        ----------
+        text : str or :const:`None`
+            The linkage string, if any
+        parse : Callable
+            Parses `text` when it is not cached
+
+        Returns
+        -------
+        :class:`LinkageSpecification`
+        '''
+        return self._lookup(self.linkages, text, parse, text)
+
+
 def aminate_substituent(substituent):
     if substituent.name.startswith("n_"):
         # already aminated
@@ -165,11 +229,31 @@ class MonosaccharideDeserializer(object):
         pass
     pattern = re.compile(_pattern, re.VERBOSE | re.UNICODE)
 
-    def __init__(self, substituent_deserializer=None):
+    # The same residue pattern, matched from left to right alongside the branch
+    # delimiters, letting the linkage extend to the next token instead of the end
+    token_pattern = re.compile(r"""
+        (?P<residue>
+        (:?\((?P<substituent_prefix_position>[0-9\?]+?)
+             (?P<substituent_prefix_name>[A-Za-z]+?)\))?
+        (?P<base_type>(?:[A-Z][a-z]{2}?|(:?[a-z]{3}[A-Z][a-z]{2})))
+        (?:(?P<substituent_position>\d+?)?(?P<substituent_name>[A-Za-z]+?))?
+        (?P<anomer>a|b|\?|alpha|beta|\u03B1|\u03B2)
+        (?P<linkage>[0-9?/]+(:?->?|,)[0-9?/]+)?)
+        |(?P<branch_end>\()
+        |(?P<branch_start>\))
+        |(?P<error>.)""", re.VERBOSE | re.UNICODE)
+
+    _residue_fields = ("substituent_prefix_position", "substituent_prefix_name", "base_type",
+                       "substituent_position", "substituent_name", "anomer")
+
+    def __init__(self, substituent_deserializer=None, cache=None):
         if substituent_deserializer is None:
             substituent_deserializer = SubstituentDeserializer()
+        if cache is None:
+            cache = ResidueCache()
         self.substituent_deserializer = substituent_deserializer
         self.linkage_parser = LinkageDeserializer()
+        self.cache = cache
 
     def has_pattern(self, string):
         return self.pattern.search(string)
@@ -271,6 +355,38 @@ class MonosaccharideDeserializer(object):
         self.add_monosaccharide_bond(residue, parent, linkage)
         return residue, linkage
 
+    def tokenize(self, text):
+        '''Split a CFG sequence without its spacer into residue and branch tokens
+        in a single pass.
+
+        Returns
+        -------
+        :class:`list` of :class:`re.Match`
+            The :attr:`~re.Match.lastgroup` of each token is one of ``"residue"``,
+            ``"branch_start"`` or ``"branch_end"``, in the sense of reading from the root.
+        '''
+        tokens = []
+        for match in self.token_pattern.finditer(text):
+            if match.lastgroup == 'error':
+                raise CFGError("Could not identify residue '...{}' at {}".format(
+                    text[max(match.start() - 30, 0):match.end()], match.start()))
+            tokens.append(match)
+        return tokens
+
+    def _residue_template(self, token):
+        residue, _ = self.build_residue(token.groupdict())
+        return residue
+
+    def monosaccharide_from_token(self, token, parent=None):
+        '''Build the residue matched by a token from :meth:`tokenize`, reusing the
+        translations in :attr:`cache`, and attach it to `parent`.
+        '''
+        residue = self.cache.monosaccharide_from_token(
+            token.group(*self._residue_fields), self._residue_template, token)
+        linkage = self.cache.linkage_from_string(token.group("linkage"), self.linkage_parser)
+        self.add_monosaccharide_bond(residue, parent, linkage)
+        return residue, linkage
+
     def __call__(self, cfg_str, parent=None):
         return self.monosaccharide_from_cfg(cfg_str, parent=parent)
 
@@ -326,18 +442,18 @@ class GlycanDeserializer(object):
 
             text = self.spacer_deserializer.remove_pattern(text)
 
-        while len(text) > 0:
+        deserializer = self.monosaccharide_deserializer
+        # The root is the right-most residue, so read the tokens from the end
+        for token in reversed(deserializer.tokenize(text)):
+            kind = token.lastgroup
             # If starting a new branch
-            match = self.new_branch_open.search(text)
-            if match is not None:
-                step = match.end(1) - match.start(1)
-                text = text[:-step]
+            if kind == 'branch_start':
                 branch_stack.append((last_residue, root, last_outedge))
                 root = None
                 last_residue = None
                 last_outedge = None
             # If ending a branch
-            elif text[-1] == '(':
+            elif kind == 'branch_end':
                 try:
                     branch_parent, old_root, old_last_outedge = branch_stack.pop()
                     # child_position, parent_position = last_outedge
@@ -345,22 +461,15 @@ class GlycanDeserializer(object):
                     root = old_root
                     last_residue = branch_parent
                     last_outedge = old_last_outedge
-                    text = text[:-1]
                 except IndexError:
-                    raise CFGError("Bad branching at {}".format(len(text)))
+                    raise CFGError("Bad branching at {}".format(token.end()))
             # Parsing a residue
             else:
-                match = self.monosaccharide_deserializer.has_pattern(text)
-                if match:
-                    next_residue, outedge = self.monosaccharide_deserializer(
-                        text[match.start(): match.end()], last_residue)
-                    if root is None:
-                        last_outedge = outedge
-                        root = next_residue
-                    last_residue = next_residue
-                    text = text[:match.start()]
-                else:
-                    raise CFGError("Could not identify residue '...{}' at {}".format(text[-30:], len(text)))
+                next_residue, outedge = deserializer.monosaccharide_from_token(token, last_residue)
+                if root is None:
+                    last_outedge = outedge
+                    root = next_residue
+                last_residue = next_residue
 
         res = structure_class(root=root)
         self.monosaccharide_deserializer.finalize(res)
@@ -395,7 +504,10 @@ class GlycanDeserializer(object):
         return glycan
 
 
-glycan_parser = GlycanDeserializer()
+#: The :class:`ResidueCache` shared by :func:`loads` and :func:`loads_many` by default
+residue_cache = ResidueCache()
+
+glycan_parser = GlycanDeserializer(MonosaccharideDeserializer(cache=residue_cache))
 
 
 def loads(text):
@@ -415,3 +527,32 @@ def loads(text):
         The parsed glycan structure
     '''
     return glycan_parser(text)
+
+
+def loads_many(texts, raise_errors=True):
+    '''Parse many CFG glycan sequences, sharing residue translations between them
+    through :data:`residue_cache`.
+
+    Parameters
+    ----------
+    texts : Iterable of str
+        The sequences to parse
+    raise_errors : bool, optional
+        Whether to raise an error when a sequence cannot be parsed, or to return :const:`None`
+        in its place. Defaults to :const:`True`.
+
+    Returns
+    -------
+    :class:`list` of :class:`~.Glycan`
+        The parsed structures, in the same order as `texts`
+    '''
+    results = []
+    for text in texts:
+        try:
+            structure = glycan_parser(text)
+        except (CFGError, KeyError, ValueError):
+            if raise_errors:
+                raise
+            structure = None
+        results.append(structure)
+    return results
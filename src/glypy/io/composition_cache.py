@@ -0,0 +1,184 @@
+'''Interned parsing and formatting for the simple glycan composition text dialects,
+like :mod:`~.glyconnect` and :mod:`~.byonic`.
+
+Search engine exports repeat a vocabulary of a few thousand compositions over millions
+of lines, so tokenizing every line and building a new composition for each wastes most
+of the time spent reading them. :class:`CompositionCache` parses each distinct string once
+into a :class:`~.HashableGlycanComposition` which is returned again for every later
+occurrence, and formats each distinct composition once. Each dialect module keeps a shared
+instance used by its ``loads_many`` and ``dumps_many`` functions.
+'''
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from glypy.structure.glycan_composition import HashableGlycanComposition
+
+
+class CompositionCache(object):
+    '''Interns the translations between the text of one composition dialect and
+    :class:`~.HashableGlycanComposition`.
+
+    Compositions returned by :meth:`parse` are shared between every caller which parses
+    the same text, and must not be modified.
+
+    Attributes
+    ----------
+    parser : Callable
+        Parses a string into a :class:`~.HashableGlycanComposition`
+    formatter : Callable
+        Formats a composition as a string
+    compositions : dict
+        Maps text to parsed compositions
+    texts : dict
+        Maps compositions to formatted text
+    maxsize : int
+        The maximum number of entries held in either table. When a table is full, new
+        translations are computed but not stored.
+    hits : int
+        The number of lookups satisfied from the cache
+    misses : int
+        The number of lookups that required computing a new translation
+    '''
+
+    compositions: Dict[str, HashableGlycanComposition]
+    texts: Dict[HashableGlycanComposition, str]
+    maxsize: int
+    hits: int
+    misses: int
+
+    def __init__(self, parser: Callable[[str], HashableGlycanComposition],
+                 formatter: Callable[[Any], str], maxsize: int=2 ** 16):
+        self.parser = parser
+        self.formatter = formatter
+        self.maxsize = maxsize
+        self.compositions = {}
+        self.texts = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _parse(self, text: str) -> HashableGlycanComposition:
+        self.misses += 1
+        composition = self.parser(text)
+        # Fill the cached mass and string up front, since the instance is shared
+        composition._validate()
+        if len(self.compositions) < self.maxsize:
+            self.compositions[text] = composition
+        return composition
+
+    def parse(self, text: str) -> HashableGlycanComposition:
+        '''Parse `text`, returning the same composition for every occurrence of the same text.
+
+        Parameters
+        ----------
+        text : str
+
+        Returns
+        -------
+        :class:`~.HashableGlycanComposition`
+        '''
+        try:
+            composition = self.compositions[text]
+        except KeyError:
+            return self._parse(text)
+        self.hits += 1
+        return composition
+
+    def format(self, composition) -> str:
+        '''Format `composition`, reusing the text of equal :class:`~.HashableGlycanComposition`
+        instances formatted earlier.
+
+        Parameters
+        ----------
+        composition : :class:`~.GlycanComposition` or :class:`~.Glycan`
+
+        Returns
+        -------
+        str
+        '''
+        if not isinstance(composition, HashableGlycanComposition):
+            return self.formatter(composition)
+        try:
+            text = self.texts[composition]
+        except KeyError:
+            self.misses += 1
+            text = self.formatter(composition)
+            if len(self.texts) < self.maxsize:
+                self.texts[composition] = text
+            return text
+        self.hits += 1
+        return text
+
+    def parse_many(self, texts: Iterable[str],
+                   raise_errors: bool=True) -> List[Optional[HashableGlycanComposition]]:
+        '''Parse many strings with :meth:`parse`.
+
+        Parameters
+        ----------
+        texts : Iterable of str
+        raise_errors : bool, optional
+            Whether to raise the error from a string that cannot be parsed, or to
+            return :const:`None` in its place. Defaults to :const:`True`.
+
+        Returns
+        -------
+        :class:`list` of :class:`~.HashableGlycanComposition`
+        '''
+        compositions = self.compositions
+        results = []
+        append = results.append
+        misses = self.misses
+        n = 0
+        try:
+            for text in texts:
+                n += 1
+                composition = compositions.get(text)
+                if composition is None:
+                    try:
+                        composition = self._parse(text)
+                    except (KeyError, ValueError):
+                        if raise_errors:
+                            raise
+                append(composition)
+        finally:
+            self.hits += n - (self.misses - misses)
+        return results
+
+    def format_many(self, compositions: Iterable) -> List[str]:
+        '''Format many compositions with :meth:`format`.
+
+        Parameters
+        ----------
+        compositions : Iterable of :class:`~.GlycanComposition` or :class:`~.Glycan`
+
+        Returns
+        -------
+        :class:`list` of str
+        '''
+        return [self.format(composition) for composition in compositions]
+
+    def stats(self) -> Dict[str, Any]:
+        '''Summarize the usage of the cache.
+
+        Returns
+        -------
+        dict
+        '''
+        return {
+            "compositions": len(self.compositions),
+            "texts": len(self.texts),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def clear(self):
+        '''Remove all cached translations and reset the usage counters.
+        '''
+        self.compositions.clear()
+        self.texts.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.compositions) + len(self.texts)
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({stats})".format(self=self, stats=self.stats())
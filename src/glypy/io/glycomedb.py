@@ -1,11 +1,13 @@
 # pragma: no cover
 import gzip
 import logging
+import weakref
 import requests
+from collections import OrderedDict
 from lxml import etree
 
-from glypy.utils import StringIO
 from glypy.io import glycoct
+from glypy.io.async_http import AsyncHTTPClient, collect, run_sync
 from glypy.algorithms.database import (Taxon, Aglyca, Motif,
                                        DatabaseEntry, GlycanRecord,
                                        GlycanRecordWithTaxon,
@@ -26,32 +28,108 @@ logger = logging.getLogger(__name__)
 cache = None
 
 
-def download_all_structures(db_path, record_type=GlycanRecordWithTaxon):  # pragma: no cover
-    response = requests.get(u'http://www.glycome-db.org/http-services/getStructureDump.action?user=eurocarbdb')
-    response.raise_for_status()
-    handle = gzip.GzipFile(fileobj=StringIO(response.content))
-    xml = etree.parse(handle)
+structure_dump_url = u'http://www.glycome-db.org/http-services/getStructureDump.action?user=eurocarbdb'
+
+
+def _open_structure_dump(source=None):
+    if source is None:
+        response = requests.get(structure_dump_url, stream=True)
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return response.raw
+    elif isinstance(source, str):
+        return open(source, 'rb')
+    return source
+
+
+def iter_structure_dump(source=None, record_type=GlycanRecordWithTaxon, errors=None):
+    '''
+    Incrementally parse the :title-reference:`GlycomeDB` structure dump, yielding
+    one record at a time without holding the whole document in memory.
+
+    Parameters
+    ----------
+    source: str or file-like, optional
+        A path to or file object over a (gzip-compressed) copy of the dump. If omitted,
+        the dump is streamed from :data:`structure_dump_url`.
+    record_type: type
+        The record type to construct
+    errors: list, optional
+        If provided, ``(id, exception)`` pairs for entries which could not be parsed are
+        appended to it
+
+    Yields
+    ------
+    GlycanRecord
+    '''
+    stream = _open_structure_dump(source)
+    head = stream.peek(2)[:2] if hasattr(stream, "peek") else b''
+    if head == b'\x1f\x8b' or (not head and source is None):
+        handle = gzip.GzipFile(fileobj=stream)
+    else:
+        handle = stream
+    try:
+        for _, structure in etree.iterparse(handle, tag="structure"):
+            glycomedb_id = structure.attrib.get('id')
+            try:
+                glycomedb_id = int(glycomedb_id)
+                glycoct_str = structure.find("sequence").text
+                taxa = [Taxon(t.attrib['ncbi'], None, None) for t in structure.iterfind(".//taxon")]
+                glycan = glycoct.loads(glycoct_str)
+                if (glycoct.loads(str(glycan)).mass() - glycan.mass()) > 0.00001:
+                    raise Exception("Mass did not match on reparse")
+                yield record_type(glycan, taxa=taxa, id=glycomedb_id)
+            except Exception as e:
+                logger.warning("Failed to parse %r: %r", glycomedb_id, e)
+                if errors is not None:
+                    errors.append((glycomedb_id, e))
+            finally:
+                structure.clear()
+                while structure.getprevious() is not None:
+                    del structure.getparent()[0]
+    finally:
+        if handle is not stream:
+            handle.close()
+        if stream is not source:
+            stream.close()
+
+
+def download_all_structures(db_path, record_type=GlycanRecordWithTaxon, source=None, batch_size=1000):
+    '''
+    Download the complete :title-reference:`GlycomeDB` structure dump into a new
+    :class:`~.RecordDatabase`.
+
+    The dump is parsed incrementally with :func:`iter_structure_dump` and the records
+    are inserted in batches of `batch_size`, committing after each batch.
+
+    Parameters
+    ----------
+    db_path: str
+        The path to the database file to write
+    record_type: type
+        The record type to store
+    source: str or file-like, optional
+        Read the dump from here instead of downloading it
+    batch_size: int
+        The number of records to insert per transaction
+
+    Returns
+    -------
+    RecordDatabase
+    '''
     db = RecordDatabase(db_path, record_type=record_type)
     misses = []
-    i = 0
-    for structure in xml.iterfind(".//structure"):
-        try:
-            glycomedb_id = int(structure.attrib['id'])
-            i += 1
-            glycoct_str = structure.find("sequence").text
-            taxa = [Taxon(t.attrib['ncbi'], None, None) for t in structure.iterfind(".//taxon")]
-            glycan = glycoct.loads(glycoct_str)
-            if (glycoct.loads(str(glycan)).mass() - glycan.mass()) > 0.00001:
-                raise Exception("Mass did not match on reparse")
-            record = record_type(glycan, taxa=taxa, id=glycomedb_id)
-            db.load_data(record, commit=False, set_id=False)
+
+    def progress(records):
+        for i, record in enumerate(records, 1):
             if i % 1000 == 0:
-                print(i, "Records parsed.")
-        except Exception as e:
-            misses.append((glycomedb_id, e))
-            print(glycomedb_id, e)
+                logger.info("%d Records parsed.", i)
+            yield record
+
+    db.load_data(progress(iter_structure_dump(source, record_type, misses)),
+                 commit=True, set_id=False, batch_size=batch_size)
     db.set_metadata("misses", misses)
-    db.commit()
+    db.apply_indices()
     return db
 
 
@@ -66,17 +144,57 @@ def set_cache(path):
     '''
     global cache
     logger.info("Setting glycomedb client cache to %r", path)
+    if cache is not None:
+        flush_cache()
     cache = RecordDatabase(path)
 
 
+#: The number of records added to the cache between commits
+cache_commit_interval = 500
+# The number of records added to each cache since it was last committed
+_uncommitted = weakref.WeakKeyDictionary()
+
+
 def add_cache(record):
-    if cache is None:
+    '''
+    Add `record` to the cache, if one is set. Changes are committed every
+    :data:`cache_commit_interval` records, or when :func:`flush_cache` is called.
+    '''
+    add_cache_many([record])
+
+
+def add_cache_many(records):
+    '''
+    Add many records to the cache at once, if one is set.
+
+    See :func:`add_cache`
+    '''
+    db = cache
+    if db is None:
         return
-    for stmt in record.to_sql():
-        try:
-            cache.connection.execute(stmt)
-        except Exception as e:
-            logger.error("An error occurred while adding %r", record, exc_info=e)
+    try:
+        _uncommitted[db] = _uncommitted.get(db, 0) + db.load_data(records, commit=False, set_id=False)
+    except Exception as e:
+        logger.error("An error occurred while adding %r", records, exc_info=e)
+    if _uncommitted.get(db, 0) >= cache_commit_interval:
+        flush_cache(db)
+
+
+def flush_cache(db=None):
+    '''
+    Commit any records added to the cache since the last commit.
+
+    Parameters
+    ----------
+    db: RecordDatabase, optional
+        The cache to commit. Defaults to the current cache
+    '''
+    if db is None:
+        db = cache
+    if db is None:
+        return
+    db.commit()
+    _uncommitted.pop(db, None)
 
 
 def check_cache(key):
@@ -90,6 +208,57 @@ def check_cache(key):
     return res
 
 
+def prefetch(ids, client=None, concurrency=8):
+    '''
+    Fetch the records for each of `ids` not already in the cache concurrently,
+    and add them to the cache in bulk.
+
+    Parameters
+    ----------
+    ids: Iterable of str or int
+    client: :class:`~.AsyncHTTPClient`, optional
+    concurrency: int
+        The maximum number of requests in flight when creating a client
+
+    Returns
+    -------
+    int:
+        The number of records fetched
+
+    Raises
+    ------
+    ValueError:
+        If no cache has been set with :func:`set_cache`
+    '''
+    if cache is None:
+        raise ValueError("No cache has been set")
+    ids = list(OrderedDict.fromkeys(int(i) for i in ids))
+    present = cache.contains_many(ids)
+    missing = [i for i in ids if i not in present]
+
+    async def fetch_all():
+        owned = client is None
+        http = AsyncHTTPClient(concurrency=concurrency) if owned else client
+        try:
+            return await collect(http.stream(
+                missing, lambda id: _fetch_record(id, http), raise_errors=False))
+        finally:
+            if owned:
+                http.close()
+
+    results = run_sync(fetch_all()) if missing else {}
+    records = []
+    for id in missing:
+        result = results[id]
+        if result.ok:
+            records.append(result.value)
+        else:
+            logger.error("Failed to fetch %r: %r", id, result.error)
+    add_cache_many(records)
+    flush_cache()
+    return len(records)
+
+
 get_url_template = "http://www.glycome-db.org/database/showStructure.action?glycomeId={id}"
 xpath = ".//condenced"
 
@@ -126,6 +295,102 @@ def get(id):
     return glycoct.loads(condensed)
 
 
+async def get_record_async(id, client):
+    '''
+    Get the complete record for `id` from :title-reference:`GlycomeDB` using
+    an :class:`~.AsyncHTTPClient`.
+
+    Parameters
+    ----------
+    id: str or int
+    client: :class:`~.AsyncHTTPClient`
+
+    Returns
+    -------
+    GlycanRecord
+    '''
+    if check_cache(id):
+        return cache[id]
+    record = await _fetch_record(id, client)
+    add_cache(record)
+    return record
+
+
+async def _fetch_record(id, client):
+    r = await client.get(get_url_template.format(id=id))
+    tree = etree.fromstring(r.content)
+    return _record_from_xml(tree, id)
+
+
+async def iter_records(ids, client=None, concurrency=8, raise_errors=True):
+    '''
+    Fetch the complete records for many `ids` from :title-reference:`GlycomeDB` concurrently,
+    parsing each as it arrives.
+
+    Parameters
+    ----------
+    ids: Iterable of str or int
+    client: :class:`~.AsyncHTTPClient`, optional
+        The client to issue requests with. If not provided, one is created with
+        `concurrency` and closed when iteration ends.
+    concurrency: int
+        The maximum number of requests in flight when creating a client
+    raise_errors: bool
+        Whether to stop at the first failure or report it through :attr:`~.FetchResult.error`
+
+    Yields
+    ------
+    :class:`~.FetchResult`
+        With the |GlycanRecord| as :attr:`~.FetchResult.value`, in the order of completion
+    '''
+    owned = client is None
+    if owned:
+        client = AsyncHTTPClient(concurrency=concurrency)
+    try:
+        async for result in client.stream(ids, lambda id: get_record_async(id, client), raise_errors):
+            yield result
+    finally:
+        if owned:
+            client.close()
+
+
+def get_records(ids, **kwargs):
+    '''
+    Get the complete records for many `ids` from :title-reference:`GlycomeDB`,
+    fetching them concurrently.
+
+    Parameters
+    ----------
+    ids: Iterable of str or int
+    **kwargs:
+        Forwarded to :func:`iter_records`
+
+    Returns
+    -------
+    list of GlycanRecord
+        In the same order as `ids`. If `raise_errors` is :const:`False`, failed
+        records are :const:`None`.
+    '''
+    ids = list(ids)
+    results = run_sync(collect(iter_records(ids, **kwargs)))
+    return [results[id].value for id in ids]
+
+
+def get_many(ids, **kwargs):
+    '''
+    Get the structures for many `ids` from :title-reference:`GlycomeDB`,
+    fetching them concurrently.
+
+    See :func:`get_records`
+
+    Returns
+    -------
+    list of Glycan
+    '''
+    return [record.structure if record is not None else None
+            for record in get_records(ids, **kwargs)]
+
+
 #: GlycomeDB supplies a detailed schema link which allows `lxml` to easily pull out
 #: more than just the GlycoCT string. To download a more informative record, use :func:`get_record`
 
@@ -355,6 +620,12 @@ def glycan_record_from_xml(xml_tree, id):
     GlycanRecord:
         Constructed record
     '''
+    record = _record_from_xml(xml_tree, id)
+    add_cache(record)
+    return record
+
+
+def _record_from_xml(xml_tree, id):
     structure = glycoct.loads(xml_tree.find(xpath).text)
     taxa = [Taxon(t.attrib['ncbi'], t.attrib['name'], make_entries(t)) for t in xml_tree.findall(".//taxon")]
     aglycon = [Aglyca(t.attrib['name'].replace(
@@ -364,7 +635,6 @@ def glycan_record_from_xml(xml_tree, id):
     dbxref.append(DatabaseEntry("GlycomeDB", id))
     record = GlycanRecord(structure, motifs=motifs, dbxref=dbxref, aglycones=aglycon, taxa=taxa, id=id)
     record.id = id
-    add_cache(record)
     return record
 
 if __name__ == "__main__":
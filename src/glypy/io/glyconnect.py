@@ -4,22 +4,33 @@ Glyconnect
 
 A simple dialect of the Glyconnect/GlycoMod glycan composition notation.
 '''
+import asyncio
+import codecs
+import hashlib
+import json
+import os
 import re
 
 from dataclasses import dataclass, field
-from typing import Dict, Union, List, Optional, Type, Generic, TypeVar
+from functools import partial
+from typing import (Any, AsyncIterator, Dict, Iterable, Iterator, Union, List,
+                    Optional, Type, Generic, TypeVar)
 
 from glypy.structure.glycan_composition import (
     FrozenGlycanComposition,
+    HashableGlycanComposition,
     FrozenMonosaccharideResidue,
     SubstituentResidue)
 from glypy.structure.glycan import Glycan
+from glypy.io.composition_cache import CompositionCache
 
 
 try:
     import requests
+    from glypy.io.async_http import AsyncHTTPClient, FetchResult, collect, run_sync
 except ImportError:
     requests = None
+    AsyncHTTPClient = FetchResult = collect = run_sync = None
 
 #: The set of defined symbols and their mappings.
 defined_symbols: Dict[str, Union[SubstituentResidue, FrozenMonosaccharideResidue]] = {
@@ -66,13 +77,15 @@ tokenizer = re.compile(r"([^:\s]+):(\d+)")
 undelimited_tokenizer = _generate_pattern(defined_symbols)
 
 
-def loads(string):
+def loads(string, composition_type=FrozenGlycanComposition):
     '''Parse a GlyConnect glycan composition into a :class:`~.FrozenGlycanComposition`
 
     Parameters
     ----------
     string: str
         The string to parse
+    composition_type: type
+        The :class:`~.FrozenGlycanComposition` type to build
 
     Returns
     -------
@@ -85,7 +98,7 @@ def loads(string):
     tokens = tokenizer.findall(string)
     if not tokens:
         tokens = undelimited_tokenizer.findall(string)
-    gc = FrozenGlycanComposition()
+    gc = composition_type()
     for mono, count in tokens:
         mono = defined_symbols[mono]
         count = int(count)
@@ -119,6 +132,65 @@ def dumps(composition):
     return ' '.join(tokens)
 
 
+#: The :class:`~.CompositionCache` shared by :func:`loads_many`, :func:`dumps_many` and
+#: :func:`parse_composition` by default
+composition_cache = CompositionCache(partial(loads, composition_type=HashableGlycanComposition), dumps)
+
+
+def parse_composition(string: str) -> HashableGlycanComposition:
+    '''Parse a GlyConnect glycan composition into a :class:`~.HashableGlycanComposition`
+    through :data:`composition_cache`, returning an independent copy of the shared
+    instance so the caller may modify it.
+
+    See :func:`loads`
+    '''
+    return composition_cache.parse(string).clone()
+
+
+def loads_many(strings: Iterable[str], cache: Optional[CompositionCache]=None,
+               raise_errors: bool=True) -> List[Optional[HashableGlycanComposition]]:
+    '''Parse many GlyConnect glycan compositions, sharing one instance between all
+    occurrences of the same text. The returned compositions must not be modified.
+
+    Parameters
+    ----------
+    strings: Iterable of str
+        The strings to parse
+    cache: :class:`~.CompositionCache`, optional
+        The cache to use. Defaults to :data:`composition_cache`
+    raise_errors: bool, optional
+        Whether to raise a :class:`KeyError` for a string using an undefined symbol, or to
+        return :const:`None` in its place. Defaults to :const:`True`.
+
+    Returns
+    -------
+    :class:`list` of :class:`~.HashableGlycanComposition`
+    '''
+    if cache is None:
+        cache = composition_cache
+    return cache.parse_many(strings, raise_errors=raise_errors)
+
+
+def dumps_many(compositions: Iterable, cache: Optional[CompositionCache]=None) -> List[str]:
+    '''Encode many compositions into the GlyConnect glycan composition text format,
+    formatting each distinct :class:`~.HashableGlycanComposition` once.
+
+    Parameters
+    ----------
+    compositions: Iterable of :class:`~.GlycanComposition` or :class:`~.Glycan`
+        The structures to format
+    cache: :class:`~.CompositionCache`, optional
+        The cache to use. Defaults to :data:`composition_cache`
+
+    Returns
+    -------
+    :class:`list` of :class:`str`
+    '''
+    if cache is None:
+        cache = composition_cache
+    return cache.format_many(compositions)
+
+
 API_SERVER = "https://glyconnect.expasy.org/api"
 
 
@@ -229,8 +301,8 @@ class CompositionRecord(RecordBase):
     reviewed: bool
     glytoucan_id: Optional[str] = None
 
-    def parse(self):
-        return loads(self.format_glyconnect)
+    def parse(self) -> HashableGlycanComposition:
+        return parse_composition(self.format_glyconnect)
 
 
 @dataclass
@@ -255,9 +327,206 @@ class CompozitorGlycan(RecordBase):
     def from_dict(cls, data: dict):
         comp = CompositionRecord.from_dict(data['composition'])
         struct = StructureRecord.from_dict(data['structure'])
-        protein = ProteinRecord.from_dict(data['protein'])
-        taxonomy = TaxonomyRecord.from_dict(data['taxonomy'])
-        return cls(comp, struct, protein, taxonomy)
+        taxonomy = _optional_record(TaxonomyRecord, data.get('taxonomy'))
+        protein = _optional_record(ProteinRecord, data.get('protein'))
+        return cls(comp, struct, taxonomy, protein)
+
+
+def _optional_record(record_type: Type[RecordBase], data: Optional[dict]):
+    if not data:
+        return None
+    return record_type.from_dict(data)
+
+
+class LazyCompozitorGlycan(object):
+    '''A :class:`CompozitorGlycan` whose component records are only built from the
+    response when they are first accessed.
+
+    Attributes
+    ----------
+    data : dict
+        The decoded JSON of this result
+    '''
+
+    def __init__(self, data: dict):
+        self.data = data
+        self._records = {}
+
+    def _record(self, name: str, record_type: Type[RecordBase]):
+        try:
+            return self._records[name]
+        except KeyError:
+            record = self._records[name] = _optional_record(record_type, self.data.get(name))
+            return record
+
+    @property
+    def composition(self) -> CompositionRecord:
+        return self._record("composition", CompositionRecord)
+
+    @property
+    def structure(self) -> StructureRecord:
+        return self._record("structure", StructureRecord)
+
+    @property
+    def taxonomy(self) -> Optional[TaxonomyRecord]:
+        return self._record("taxonomy", TaxonomyRecord)
+
+    @property
+    def protein(self) -> Optional[ProteinRecord]:
+        return self._record("protein", ProteinRecord)
+
+    def materialize(self) -> CompozitorGlycan:
+        return CompozitorGlycan(self.composition, self.structure, self.taxonomy, self.protein)
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({self.data!r})".format(self=self)
+
+
+class _JSONStream(object):
+    '''Decode JSON values incrementally from an iterable of text chunks.'''
+
+    def __init__(self, chunks: Iterable[str]):
+        self.chunks = iter(chunks)
+        self.buffer = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        for chunk in self.chunks:
+            if chunk:
+                self.buffer = self.buffer[self.pos:] + chunk
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            n = len(self.buffer)
+            while self.pos < n and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < n:
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError("Expected %r, found %r" % (char, self.buffer[self.pos:self.pos + 20]))
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_query_results(chunks: Iterable[str]) -> Iterator[dict]:
+    stream = _JSONStream(chunks)
+    if stream.peek() != "{":
+        raise ValueError("Malformed query or invalid response")
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key == "results" and stream.peek() == "[":
+            stream.expect("[")
+            if stream.peek() != "]":
+                while True:
+                    yield stream.value()
+                    if stream.peek() != ",":
+                        break
+                    stream.expect(",")
+            stream.expect("]")
+        else:
+            stream.value()
+        if stream.peek() != ",":
+            break
+        stream.expect(",")
+    stream.expect("}")
+
+
+def _iter_text(response: "requests.Response", chunk_size: int) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    for chunk in response.iter_content(chunk_size):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+class CollectionCache(object):
+    '''Store the collections fetched by :class:`Compozitor` in a directory, so that they
+    are downloaded again only when the server reports they have changed.
+
+    Each response is saved with its ``Last-Modified`` header, which is sent back as
+    ``If-Modified-Since`` when the collection is next requested. A ``304 Not Modified``
+    response is answered from disk.
+
+    Attributes
+    ----------
+    directory : str
+        The directory the responses are stored in
+    '''
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(url.encode("utf8")).hexdigest())
+
+    def _read_metadata(self, url: str) -> Optional[dict]:
+        try:
+            with open(self._path(url) + ".meta", 'rt') as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        '''The conditional request headers to send when fetching `url`'''
+        metadata = self._read_metadata(url)
+        if metadata and metadata.get("last_modified"):
+            return {"If-Modified-Since": metadata["last_modified"]}
+        return {}
+
+    def load(self, url: str) -> Any:
+        '''Read the stored response body for `url` as JSON'''
+        with open(self._path(url) + ".json", 'rb') as fh:
+            return json.loads(fh.read())
+
+    def store(self, url: str, body: bytes, last_modified: Optional[str]=None):
+        '''Save the response body for `url` and its ``Last-Modified`` header'''
+        path = self._path(url)
+        for suffix, content in ((".json", body),
+                                (".meta", json.dumps({"url": url, "last_modified": last_modified}).encode("utf8"))):
+            tmp = path + suffix + ".tmp"
+            with open(tmp, 'wb') as fh:
+                fh.write(content)
+            os.replace(tmp, path + suffix)
+
+    def read_response(self, url: str, response: "requests.Response") -> Any:
+        '''Decode the JSON of `response` to a request for `url`, answering ``304 Not Modified``
+        from disk and storing any new content.'''
+        if response.status_code == 304:
+            return self.load(url)
+        response.raise_for_status()
+        self.store(url, response.content, response.headers.get("Last-Modified"))
+        return response.json()
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith((".json", ".meta")):
+                os.remove(os.path.join(self.directory, name))
 
 
 T = TypeVar("T", bound=RecordBase)
@@ -265,52 +534,97 @@ T = TypeVar("T", bound=RecordBase)
 
 @dataclass
 class APICollectionProperty(Generic[T]):
-    url: str
+    path: str
     record_type: Type[T]
 
+    def url_for(self, obj) -> str:
+        return f"{obj.api_server}{self.path}"
+
+    def parse(self, data) -> List[T]:
+        return [self.record_type.from_dict(d) for d in data]
+
     def __get__(self, obj, objtype=None) -> List[T]:
         if obj is None:
             return self
-        result = obj._cache.get(self.url)
+        url = self.url_for(obj)
+        result = obj._cache.get(url)
         if result is not None:
             return result
-        resp = requests.get(self.url)
-        resp.raise_for_status()
-        data = resp.json()
-        result = [self.record_type.from_dict(d) for d in data]
-        obj._cache[self.url] = result
+        resp = requests.get(url, headers=obj._request_headers(url))
+        result = self.parse(obj._read_collection(url, resp))
+        obj._cache[url] = result
+        return result
+
+    async def load_async(self, obj, client) -> List[T]:
+        url = self.url_for(obj)
+        result = obj._cache.get(url)
+        if result is not None:
+            return result
+        resp = await client.get(url, headers=obj._request_headers(url))
+        result = self.parse(obj._read_collection(url, resp))
+        obj._cache[url] = result
         return result
 
     def __delete__(self, obj):
-        del obj._cache[self.url]
+        del obj._cache[self.url_for(obj)]
 
 
 @dataclass
 class Compozitor:
+    '''A client for the GlyConnect Compozitor API.
+
+    Attributes
+    ----------
+    api_server : str
+        The base URL of the API
+    collection_cache : :class:`CollectionCache`, optional
+        Where to store the protein, source, cell line and disease collections between
+        sessions. A directory path may be given instead.
+    '''
     _cache: dict = field(default_factory=dict, repr=False)
+    api_server: str = API_SERVER
+    collection_cache: Optional[CollectionCache] = None
+
+    def __post_init__(self):
+        if isinstance(self.collection_cache, str):
+            self.collection_cache = CollectionCache(self.collection_cache)
 
     proteins = APICollectionProperty(
-        f"{API_SERVER}/proteins-all",
+        "/proteins-all",
         ProteinRecord
     )
 
     sources = APICollectionProperty(
-        f"{API_SERVER}/sources-all",
+        "/sources-all",
         Source
     )
 
     cell_lines = APICollectionProperty(
-        f"{API_SERVER}/cell_lines-all",
+        "/cell_lines-all",
         CellLine
     )
 
     diseases = APICollectionProperty(
-        f"{API_SERVER}/diseases-all",
+        "/diseases-all",
         Disease
     )
 
-    def query(self, taxonomy: Optional[str]=None, cell_line: Optional[str]=None,
-              protein: Optional[str]=None, disease: Optional[str]=None):
+    _collections = ("proteins", "sources", "cell_lines", "diseases")
+
+    def _request_headers(self, url: str) -> Dict[str, str]:
+        if self.collection_cache is None:
+            return {}
+        return self.collection_cache.request_headers(url)
+
+    def _read_collection(self, url: str, response: "requests.Response") -> Any:
+        if self.collection_cache is None:
+            response.raise_for_status()
+            return response.json()
+        return self.collection_cache.read_response(url, response)
+
+    @staticmethod
+    def _query_params(taxonomy: Optional[str]=None, cell_line: Optional[str]=None,
+                      protein: Optional[str]=None, disease: Optional[str]=None) -> Dict[str, str]:
         params = {}
         if taxonomy:
             params['taxonomy'] = (taxonomy)
@@ -320,9 +634,10 @@ class Compozitor:
             params['protein'] = (protein)
         if disease:
             params['disease'] = (disease)
-        resp = requests.get(f"{API_SERVER}/glycosylations", params)
-        resp.raise_for_status()
-        data = resp.json()
+        return params
+
+    @staticmethod
+    def _parse_query_response(data) -> List[CompozitorGlycan]:
         if isinstance(data, list):
             raise ValueError("Malformed query or invalid response")
         results = []
@@ -331,6 +646,92 @@ class Compozitor:
                 results.append(CompozitorGlycan.from_dict(res))
         return results
 
+    def query(self, taxonomy: Optional[str]=None, cell_line: Optional[str]=None,
+              protein: Optional[str]=None, disease: Optional[str]=None) -> List[CompozitorGlycan]:
+        return [glycan.materialize() for glycan in self.iter_query(taxonomy, cell_line, protein, disease)]
+
+    def iter_query(self, taxonomy: Optional[str]=None, cell_line: Optional[str]=None,
+                   protein: Optional[str]=None, disease: Optional[str]=None,
+                   chunk_size: int=2 ** 16) -> Iterator[LazyCompozitorGlycan]:
+        '''Run a query, yielding each result as soon as it has been read from the response.
+
+        The response is decoded incrementally, `chunk_size` bytes at a time, so the full
+        result set is never held in memory. Each result is a :class:`LazyCompozitorGlycan`
+        which builds its records on first access.
+
+        Yields
+        ------
+        :class:`LazyCompozitorGlycan`
+        '''
+        params = self._query_params(taxonomy, cell_line, protein, disease)
+        with requests.get(f"{self.api_server}/glycosylations", params, stream=True) as resp:
+            resp.raise_for_status()
+            for data in _iter_query_results(_iter_text(resp, chunk_size)):
+                yield LazyCompozitorGlycan(data)
+
+    def iter_query_pages(self, taxonomy: Optional[str]=None, cell_line: Optional[str]=None,
+                         protein: Optional[str]=None, disease: Optional[str]=None,
+                         page_size: int=1000) -> Iterator[List[LazyCompozitorGlycan]]:
+        '''Run a query, yielding its results in lists of up to `page_size` as they are read.
+
+        See :meth:`iter_query`
+        '''
+        page = []
+        for glycan in self.iter_query(taxonomy, cell_line, protein, disease):
+            page.append(glycan)
+            if len(page) >= page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    async def query_async(self, client: AsyncHTTPClient, taxonomy: Optional[str]=None,
+                          cell_line: Optional[str]=None, protein: Optional[str]=None,
+                          disease: Optional[str]=None) -> List[CompozitorGlycan]:
+        params = self._query_params(taxonomy, cell_line, protein, disease)
+        resp = await client.get(f"{self.api_server}/glycosylations", params=params)
+        return self._parse_query_response(resp.json())
+
+    async def iter_queries(self, queries: Iterable[Dict[str, str]], client: Optional[AsyncHTTPClient]=None,
+                           concurrency: int=8, raise_errors: bool=True) -> AsyncIterator[FetchResult]:
+        '''Run many queries concurrently, yielding each :class:`~.FetchResult` as it completes.
+
+        Each query is a :class:`dict` of the keyword arguments of :meth:`query`. The
+        :attr:`~.FetchResult.key` of each result is the index of its query.
+        '''
+        queries = list(queries)
+        owned = client is None
+        if owned:
+            client = AsyncHTTPClient(concurrency=concurrency)
+        try:
+            async for result in client.stream(
+                    range(len(queries)), lambda i: self.query_async(client, **queries[i]), raise_errors):
+                yield result
+        finally:
+            if owned:
+                client.close()
+
+    def query_many(self, queries: Iterable[Dict[str, str]], **kwargs) -> List[List[CompozitorGlycan]]:
+        '''Run many queries concurrently, returning their results in the same order.
+
+        See :meth:`iter_queries`
+        '''
+        queries = list(queries)
+        results = run_sync(collect(self.iter_queries(queries, **kwargs)))
+        return [results[i].value for i in range(len(queries))]
+
+    async def load_collections_async(self, client: AsyncHTTPClient) -> None:
+        await asyncio.gather(*[
+            getattr(type(self), name).load_async(self, client) for name in self._collections])
+
+    def load_collections(self, concurrency: int=4) -> None:
+        '''Fetch all of the protein, source, cell line and disease collections concurrently.
+        '''
+        async def _load():
+            with AsyncHTTPClient(concurrency=concurrency) as client:
+                await self.load_collections_async(client)
+        run_sync(_load())
+
 
 client = Compozitor()
 query = client.query
@@ -6,12 +6,18 @@ or using :term:`RDF`-object mapping via :meth:`GlySpaceRDFClient.get` and relate
 
 '''
 
+import asyncio
 import logging
+import pickle
 import re
+import sqlite3
+import threading
+import time
 import warnings
 
 from numbers import Number
 from collections import defaultdict, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from six import text_type
 
 try:
@@ -23,7 +29,9 @@ import requests
 with warnings.catch_warnings():
     from rdflib import ConjunctiveGraph, Namespace, URIRef, Literal, Graph
     from rdflib.namespace import split_uri
+    from rdflib.plugins.stores.sparqlstore import SPARQLStore
     from glypy.io import glycoct, iupac, wurcs, _glycordf
+    from glypy.io.async_http import FetchResult
 
 # http://glytoucan.org/glyspace/documentation/apidoc.html
 # http://code.glytoucan.org/system/glyspace
@@ -156,6 +164,125 @@ class LRUDict(object):  # pragma: no cover
         self.store[key] = value
 
 
+class ResponseCache(object):
+    '''A persistent store of responses from a remote :term:`SPARQL` endpoint, backed by
+    an SQLite database.
+
+    Values are pickled, so any picklable response, such as the list of :mod:`rdflib` terms
+    matching a triple pattern, may be stored. Entries older than :attr:`ttl` seconds are
+    treated as missing and are replaced the next time they are fetched.
+
+    An instance may be shared between threads and between :class:`RDFClientBase` instances.
+
+    Attributes
+    ----------
+    path : str
+        The path to the database file, or ``":memory:"`` for a transient cache
+    ttl : float or :const:`None`
+        The number of seconds an entry remains valid. If :const:`None`, entries never expire.
+    hits : int
+        The number of lookups satisfied from the cache
+    misses : int
+        The number of lookups which found no valid entry
+    '''
+
+    def __init__(self, path=":memory:", ttl=None):
+        self.path = path
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS response (key TEXT PRIMARY KEY, stored REAL, value BLOB)")
+            self.connection.commit()
+
+    def _is_fresh(self, stored):
+        return self.ttl is None or (time.time() - stored) <= self.ttl
+
+    def get(self, key, default=None):
+        '''Get the value stored under `key` if it has not expired.
+
+        Parameters
+        ----------
+        key : str
+        default : object, optional
+            The value to return if there is no valid entry
+
+        Returns
+        -------
+        object
+        '''
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT stored, value FROM response WHERE key = ?", (key, )).fetchone()
+            if row is None or not self._is_fresh(row[0]):
+                self.misses += 1
+                return default
+            self.hits += 1
+        return pickle.loads(row[1])
+
+    def __contains__(self, key):
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT stored FROM response WHERE key = ?", (key, )).fetchone()
+        return row is not None and self._is_fresh(row[0])
+
+    def set(self, key, value):
+        self.set_many([(key, value)])
+
+    __setitem__ = set
+
+    def set_many(self, items):
+        '''Store many key-value pairs in a single transaction.
+
+        Parameters
+        ----------
+        items : Iterable of (str, object)
+        '''
+        now = time.time()
+        rows = [(key, now, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)) for key, value in items]
+        with self._lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO response (key, stored, value) VALUES (?, ?, ?)", rows)
+            self.connection.commit()
+
+    def expire(self):
+        '''Remove all entries older than :attr:`ttl`.
+
+        Returns
+        -------
+        int :
+            The number of entries removed
+        '''
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            cursor = self.connection.execute(
+                "DELETE FROM response WHERE stored < ?", (time.time() - self.ttl, ))
+            self.connection.commit()
+        return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self.connection.execute("DELETE FROM response")
+            self.connection.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        with self._lock:
+            self.connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM response").fetchone()[0]
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({self.path!r}, ttl={self.ttl!r})".format(self=self)
+
+
 class PredicateDescriptor(text_type):
 
     """A specialization of the unicode text type for representing a string which
@@ -522,8 +649,28 @@ class ChainFunctionDict(defaultdict):
 
 
 class RDFClientBase(ConjunctiveGraph):
+    """The base type for :term:`RDF` clients which map entities of a remote :term:`SPARQL`
+    endpoint to :class:`ReferenceEntity` objects.
+
+    Attributes
+    ----------
+    cache : :class:`LRUDict`
+        An in-process cache of recently constructed entities
+    response_cache : :class:`ResponseCache` or :const:`None`
+        A persistent cache of raw responses from the remote endpoint shared between sessions.
+        See :meth:`set_response_cache`.
+    batch_size : int
+        The number of entities requested per query by :meth:`get_many` and related methods
+    max_workers : int
+        The maximum number of batched queries in flight at the same time
+    """
     _predicates_seen = set()
     predicate_processor_map = ChainFunctionDict()
+    _sparql_endpoint_uri = None
+
+    response_cache = None
+    batch_size = 50
+    max_workers = 4
 
     @classmethod
     def register_predicate_processor(cls, predicate):
@@ -545,11 +692,90 @@ class RDFClientBase(ConjunctiveGraph):
             return f
         return wrapper
 
-    def __init__(self, sparql_endpoint, accession_ns, cache_size=100):
+    def __init__(self, sparql_endpoint, accession_ns, cache_size=100, response_cache=None):
         super(RDFClientBase, self).__init__(store="SPARQLStore")
         self.open(sparql_endpoint)
         self.accession_ns = accession_ns
         self.cache = LRUDict(maxsize=cache_size)
+        self.response_cache = response_cache
+
+    def set_response_cache(self, cache, ttl=None):
+        """Persist responses from the remote endpoint in `cache`, so that repeated
+        requests for the same entities, including those from later sessions, do
+        not need to be sent again.
+
+        Parameters
+        ----------
+        cache : str or :class:`ResponseCache` or :const:`None`
+            A path to an SQLite database file to store responses in, an existing
+            :class:`ResponseCache`, or :const:`None` to stop persisting responses.
+        ttl : float, optional
+            The number of seconds a response remains valid when `cache` is a path.
+
+        Returns
+        -------
+        :class:`ResponseCache`
+        """
+        if cache is not None and not isinstance(cache, ResponseCache):
+            cache = ResponseCache(cache, ttl=ttl)
+        self.response_cache = cache
+        return cache
+
+    @property
+    def sparql_endpoint(self):
+        """The URI of the endpoint this client's store queries, or :const:`None` when
+        the client queries a local graph.
+
+        Returns
+        -------
+        str or :const:`None`
+        """
+        return getattr(self.store, "query_endpoint", None)
+
+    def _response_key(self, kind, *terms):
+        # Responses are keyed by the endpoint actually queried, so clients of
+        # different endpoints can share one cache.
+        return ' '.join([str(self.sparql_endpoint), kind] + [
+            term.n3() if term is not None else '*' for term in terms])
+
+    def _match(self, pattern, prefetched=None):
+        if prefetched is not None and pattern in prefetched:
+            return prefetched[pattern]
+        cache = self.response_cache
+        if cache is None:
+            return set(self.triples(pattern))
+        key = self._response_key("triples", *pattern)
+        triples = cache.get(key)
+        if triples is None:
+            triples = set(self.triples(pattern))
+            cache[key] = triples
+        return triples
+
+    def _map_batches(self, func, items, batch_size=None, max_workers=None):
+        if batch_size is None:
+            batch_size = self.batch_size
+        if max_workers is None:
+            max_workers = self.max_workers
+        batches = [items[i:i + batch_size] for i in range(0, len(items), batch_size)]
+        # Queries against a local graph are parsed and evaluated in-process, which
+        # is not thread-safe, so only a remote store is queried concurrently.
+        if max_workers <= 1 or len(batches) <= 1 or not isinstance(self.store, SPARQLStore):
+            return [func(batch) for batch in batches]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            return list(executor.map(func, batches))
+
+    def _fetch_subject_triples(self, urirefs):
+        sparql = r'''
+        SELECT ?subject ?predicate ?object WHERE {
+            VALUES ?subject { %s }
+            ?subject ?predicate ?object
+        }
+        '''
+        query_string = sparql % ' '.join(URIRef(uriref).n3() for uriref in urirefs)
+        results = {URIRef(uriref): set() for uriref in urirefs}
+        for subject, predicate, obj in self.query(query_string):
+            results[URIRef(subject)].add((URIRef(subject), predicate, obj))
+        return results
 
     def accession_to_uriref(self, accession):
         """Utility method to translate free strings into full URIs
@@ -597,13 +823,16 @@ class RDFClientBase(ConjunctiveGraph):
             An object representing the subject whose attributes are named after
             predicates with their objects as values.
         """
+        return self._get(uriref, simplify, query_type)
+
+    def _get(self, uriref, simplify=True, query_type='auto', prefetched=None):
         if not isinstance(uriref, URIRef):
             uriref = self.accession_to_uriref(uriref)
         if (uriref, query_type) in self.cache:
             return self.cache[uriref, query_type]
         results = defaultdict(list)
         if query_type == 'auto' or query_type == 'subject':
-            for subject, predicate, obj in set(self.triples((uriref, None, None))):
+            for subject, predicate, obj in self._match((uriref, None, None), prefetched):
                 predicate_name = PredicateDescriptor.bind(predicate)
                 self._predicates_seen.add(predicate)
                 if isinstance(obj, Literal):
@@ -625,7 +854,7 @@ class RDFClientBase(ConjunctiveGraph):
             except Exception:
                 predicate_name = None
             if predicate_name is not None:
-                for subject, predicate, obj in set(self.triples((None, uriref, None))):
+                for subject, predicate, obj in self._match((None, uriref, None), prefetched):
                     if isinstance(obj, Literal):
                         obj = obj.toPython()
                     elif isinstance(obj, URIRef):
@@ -641,7 +870,7 @@ class RDFClientBase(ConjunctiveGraph):
                 query_type = 'predicate'
 
         if query_type == 'object':
-            for subject, predicate, obj in set(self.triples((None, None, uriref))):
+            for subject, predicate, obj in self._match((None, None, uriref), prefetched):
                 predicate_name = PredicateDescriptor.bind(predicate)
                 self._predicates_seen.add(predicate)
                 if isinstance(subject, Literal):
@@ -667,6 +896,48 @@ class RDFClientBase(ConjunctiveGraph):
         self.cache[uriref, query_type] = results
         return results
 
+    def get_many(self, accessions, simplify=True, batch_size=None, max_workers=None):
+        """Download all related information for many entities at once.
+
+        Equivalent to calling :meth:`get` on each member of `accessions`, but the triples
+        for entities which are not already cached are requested in batches of `batch_size`
+        using a ``VALUES`` clause, with up to `max_workers` batches in flight at once.
+
+        Parameters
+        ----------
+        accessions : Iterable of str or rdflib.term.URIRef
+            The entities to fetch, as in :meth:`get`
+        simplify : bool, optional
+            As in :meth:`get`
+        batch_size : int, optional
+            Defaults to :attr:`batch_size`
+        max_workers : int, optional
+            Defaults to :attr:`max_workers`
+
+        Returns
+        -------
+        list of ReferenceEntity
+        """
+        urirefs = [
+            uriref if isinstance(uriref, URIRef) else self.accession_to_uriref(uriref)
+            for uriref in accessions]
+        response_cache = self.response_cache
+        missing = []
+        seen = set()
+        for uriref in urirefs:
+            if uriref in seen or (uriref, 'auto') in self.cache:
+                continue
+            seen.add(uriref)
+            if response_cache is None or self._response_key("triples", uriref, None, None) not in response_cache:
+                missing.append(uriref)
+        prefetched = {}
+        for batch in self._map_batches(self._fetch_subject_triples, missing, batch_size, max_workers):
+            prefetched.update(((uriref, None, None), triples) for uriref, triples in batch.items())
+        if response_cache is not None:
+            response_cache.set_many(
+                (self._response_key("triples", *pattern), triples) for pattern, triples in prefetched.items())
+        return [self._get(uriref, simplify, 'auto', prefetched) for uriref in urirefs]
+
 
 class UniprotRDFClient(RDFClientBase):
     predicate_processor_map = ChainFunctionDict()
@@ -807,31 +1078,146 @@ class GlyTouCanRDFClient(RDFClientBase):
         k = results.vars[0]
         return [ReferenceEntity(row[k]) for row in results.bindings]
 
-    def structure(self, *accessions):
+    def structure(self, *accessions, batch_size=None, max_workers=None):
+        r"""Fetch the GlycoCT sequence of each accession number and parse it
+        into a |Glycan|.
+
+        The sequences are requested in batches using a ``VALUES`` clause
+
+        .. code-block:: sparql
+
+            SELECT DISTINCT ?saccharide ?glycoct WHERE {
+                VALUES ?saccharide { <accession-1> <accession-2> ... }
+                ?saccharide glycan:has_glycosequence ?sequence .
+                FILTER CONTAINS(str(?sequence), "glycoct") .
+                ?sequence glycan:has_sequence ?glycoct .
+            }
+
+        and are stored in :attr:`response_cache` if it is set.
+
+        Parameters
+        ----------
+        \*accessions : str or rdflib.term.URIRef
+            The accession numbers of the structures
+        batch_size : int, optional
+            Defaults to :attr:`batch_size`
+        max_workers : int, optional
+            Defaults to :attr:`max_workers`
+
+        Returns
+        -------
+        |Glycan| or list of |Glycan|
+            A single |Glycan| if only one accession was given
+
+        Raises
+        ------
+        KeyError:
+            If any accession does not have a GlycoCT sequence
+        """
+        urirefs = [URIRef(accession) if isinstance(accession, URIRef) else NSGlycoinfo[accession]
+                   for accession in accessions]
+        response_cache = self.response_cache
+        sequences = {}
+        missing = []
+        for uriref in urirefs:
+            if uriref in sequences:
+                continue
+            sequence = None
+            if response_cache is not None:
+                sequence = response_cache.get(self._response_key("glycoct", uriref))
+            sequences[uriref] = sequence
+            if sequence is None:
+                missing.append(uriref)
+        if missing:
+            fetched = {}
+            for batch in self._map_batches(self._fetch_glycoct, missing, batch_size, max_workers):
+                fetched.update(batch)
+            sequences.update(fetched)
+            if response_cache is not None:
+                response_cache.set_many(
+                    (self._response_key("glycoct", uriref), sequence)
+                    for uriref, sequence in fetched.items() if sequence is not None)
         accumulator = []
+        for uriref in urirefs:
+            glycoct_string = sequences[uriref]
+            if glycoct_string is None:
+                raise KeyError("No GlycoCT sequence found for %s" % (uriref, ))
+            accumulator.append(glycoct.loads(glycoct_string))
+        if len(accumulator) == 1:
+            return accumulator[0]
+        else:
+            return accumulator
+
+    async def iter_structures(self, accessions, batch_size=None, max_workers=None):
+        """Fetch and parse the GlycoCT sequence of each accession number as in :meth:`structure`,
+        yielding each |Glycan| as soon as the batch containing it arrives.
+
+        Parameters
+        ----------
+        accessions : Iterable of str or rdflib.term.URIRef
+            The accession numbers of the structures
+        batch_size : int, optional
+            Defaults to :attr:`batch_size`
+        max_workers : int, optional
+            Defaults to :attr:`max_workers`
+
+        Yields
+        ------
+        :class:`~.FetchResult`
+            Keyed by the accession's :class:`~rdflib.term.URIRef`, in the order of completion.
+            An accession without a GlycoCT sequence has a :class:`KeyError` as its
+            :attr:`~.FetchResult.error`.
+        """
+        if batch_size is None:
+            batch_size = self.batch_size
+        if max_workers is None:
+            max_workers = self.max_workers
+        if not isinstance(self.store, SPARQLStore):
+            max_workers = 1
+        response_cache = self.response_cache
+        missing = []
+        for uriref in OrderedDict.fromkeys(
+                URIRef(accession) if isinstance(accession, URIRef) else NSGlycoinfo[accession]
+                for accession in accessions):
+            sequence = None
+            if response_cache is not None:
+                sequence = response_cache.get(self._response_key("glycoct", uriref))
+            if sequence is None:
+                missing.append(uriref)
+            else:
+                yield FetchResult(uriref, glycoct.loads(sequence), None)
+        if not missing:
+            return
+        loop = asyncio.get_running_loop()
+        batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+            futures = [loop.run_in_executor(executor, self._fetch_glycoct, batch) for batch in batches]
+            for future in asyncio.as_completed(futures):
+                sequences = await future
+                if response_cache is not None:
+                    response_cache.set_many(
+                        (self._response_key("glycoct", uriref), sequence)
+                        for uriref, sequence in sequences.items() if sequence is not None)
+                for uriref, sequence in sequences.items():
+                    if sequence is None:
+                        yield FetchResult(uriref, None, KeyError("No GlycoCT sequence found for %s" % (uriref, )))
+                    else:
+                        yield FetchResult(uriref, glycoct.loads(sequence), None)
+
+    def _fetch_glycoct(self, urirefs):
         sparql = r'''
         SELECT DISTINCT ?saccharide ?glycoct WHERE {
+            VALUES ?saccharide { %s }
             ?saccharide glycan:has_glycosequence ?sequence .
             FILTER CONTAINS(str(?sequence), "glycoct") .
             ?sequence glycan:has_sequence ?glycoct .
-            FILTER ("%s" = str(?saccharide))
         }
         '''
-        for accession in accessions:
-            if isinstance(accession, URIRef):
-                accession_str = str(accession)
-            else:
-                accession_str = str(NSGlycoinfo[accession])
-            query_string = sparql % accession_str
-            results = self.query(query_string)
-            g = results.vars[1]
-            glycoct_string = results.bindings[0][g]
-            structure = glycoct.loads(glycoct_string)
-            accumulator.append(structure)
-        if len(accumulator) == 1:
-            return accumulator[0]
-        else:
-            return accumulator
+        query_string = sparql % ' '.join(uriref.n3() for uriref in urirefs)
+        sequences = dict.fromkeys(urirefs)
+        for saccharide, glycoct_string in self.query(query_string):
+            sequences[URIRef(saccharide)] = str(glycoct_string)
+        return sequences
 
 
 class UnicarbKBRDFClient(RDFClientBase):
@@ -865,6 +1251,7 @@ unikarbkb_client = UnicarbKBRDFClient()
 
 
 get = client.get
+get_many = client.get_many
 query = client.query
 structure = client.structure
 from_taxon = client.from_taxon
@@ -6,22 +6,32 @@ Tools to traverse the
 `GNOme Glycan Naming and Subsumption Ontology <https://gnome.glyomics.org/>`_
 """
 import re
+import sys
+import mmap
+import array
 import bisect
+import struct
 import warnings
 
+from collections.abc import Mapping
 from urllib.request import urlopen
-from typing import Dict, DefaultDict, List, Any, Optional, Tuple, Deque
+from typing import Dict, DefaultDict, List, Any, Optional, Tuple, Deque, Sequence, TYPE_CHECKING
 from dataclasses import dataclass, field
 
-from lxml import etree
-
 from glypy.structure.glycan_composition import (
     GlycanComposition, FrozenMonosaccharideResidue, HashableGlycanComposition)
 
 from glypy.algorithms.similarity import monosaccharide_similarity
-from glypy.io import glyspace
 from glypy.utils import enum
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+if TYPE_CHECKING:
+    from lxml import etree
+
 
 class SubsumptionLevel(enum.Enum):
     molecular_weight = 1
@@ -51,6 +61,9 @@ generic_residues = {
 
 modifications = {"P", "S", "X", "Me",}
 
+#: The generic residue classes a composition may be generalized to, excluding the placeholder
+generic_classes = [name for name in generic_residues if name != "Xxx"]
+
 
 def parse_gnome_glycan(text: str) -> Dict[str, int]:
     mapping = {}
@@ -70,7 +83,7 @@ def parse_gnome_glycan(text: str) -> Dict[str, int]:
     return mapping
 
 
-def _local_name(element: etree.Element) -> str:
+def _local_name(element: "etree.Element") -> str:
     """Strip namespace from the XML element's name"""
     tag = element.tag
     if tag and tag[0] == "{":
@@ -78,7 +91,7 @@ def _local_name(element: etree.Element) -> str:
     return tag
 
 
-def _local_name_and_namespace(element: etree.Element) -> Tuple[str, str]:
+def _local_name_and_namespace(element: "etree.Element") -> Tuple[str, str]:
     tag = element.tag
     if tag and tag[0] == "{":
         parts = tag.rpartition("}")
@@ -115,16 +128,16 @@ class _GNOmeOWLXMLParser:
         self.subclasses = DefaultDict(list)
         self.subsumption_levels = DefaultDict(list)
 
-    def register_property(self, element: etree.Element):
+    def register_property(self, element: "etree.Element"):
         state = self.element_as_dict(element)
         self.property_names[state["about"].rpartition("/")[2]] = state["label"]
 
-    def register_entity(self, element: etree.Element):
+    def register_entity(self, element: "etree.Element"):
         state = self.element_as_dict(element)
         self.entity_names[state["about"].rpartition(
             "/")[2]] = (state["label"], state)
 
-    def register_object_class(self, element: etree.Element):
+    def register_object_class(self, element: "etree.Element"):
         state = self.element_as_dict(element)
         name = state["about"].rpartition("/")[2]
         self.object_classes[name] = state
@@ -140,7 +153,7 @@ class _GNOmeOWLXMLParser:
                 name)
         return state
 
-    def element_as_dict(self, element: etree.Element):
+    def element_as_dict(self, element: "etree.Element"):
         name = _local_name(element)
         info = dict()
         is_resource = False
@@ -194,7 +207,7 @@ class _GNOmeOWLXMLParser:
         return info
 
     @classmethod
-    def from_element_tree(cls, tree: etree.ElementTree) -> "_GNOmeOWLXMLParser":
+    def from_element_tree(cls, tree: "etree.ElementTree") -> "_GNOmeOWLXMLParser":
         self = cls()
         root = tree.getroot()
         for prop in root.iterfind("./owl:AnnotationProperty", self.namespace_map):
@@ -207,6 +220,7 @@ class _GNOmeOWLXMLParser:
 
     @classmethod
     def parse(cls, uri) -> "_GNOmeOWLXMLParser":
+        from lxml import etree
         tree = etree.parse(uri)
         return cls.from_element_tree(tree)
 
@@ -280,6 +294,7 @@ class SubsumptionNode:
 
     def glytoucan(self):
         if self.glytoucan_id:
+            from glypy.io import glyspace
             return glyspace.get(self.glytoucan_id)
 
     def glycan_composition(self) -> Optional[HashableGlycanComposition]:
@@ -323,19 +338,232 @@ class MolecularMassNode(SubsumptionNode):
         return self.mass
 
 
+SNAPSHOT_MAGIC = b"GNOMESNP"
+SNAPSHOT_VERSION = 1
+
+_snapshot_header = struct.Struct("<8sHHI")
+_snapshot_section = struct.Struct("<24s1s7xQQ")
+_byte_order_flag = {"little": 1, "big": 2}[sys.byteorder]
+
+
+class _SnapshotWriter:
+    """Accumulates the sections of a :class:`GNOme` snapshot file."""
+
+    def __init__(self):
+        self.string_index: Dict[str, int] = {}
+        self.string_list: List[bytes] = []
+        self.sections: List[Tuple[str, str, array.array]] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        try:
+            return self.string_index[value]
+        except KeyError:
+            i = self.string_index[value] = len(self.string_list)
+            self.string_list.append(value.encode('utf8'))
+            return i
+
+    def add(self, name: str, typecode: str, values):
+        if len(name) > 24:
+            raise ValueError("Section name %r is too long" % (name, ))
+        self.sections.append((name, typecode, array.array(typecode, values)))
+
+    def add_csr(self, name: str, rows):
+        indptr = [0]
+        indices = []
+        for row in rows:
+            indices.extend(row)
+            indptr.append(len(indices))
+        self.add(name + "_indptr", 'q', indptr)
+        self.add(name + "_indices", 'i', indices)
+
+    def write(self, stream):
+        offsets = [0]
+        for value in self.string_list:
+            offsets.append(offsets[-1] + len(value))
+        sections = [("strings", 'B', array.array('B', b''.join(self.string_list))),
+                    ("string_offsets", 'q', array.array('q', offsets))] + self.sections
+        offset = _snapshot_header.size + _snapshot_section.size * len(sections)
+        directory = []
+        for name, typecode, values in sections:
+            offset += -offset % 8
+            directory.append((name, typecode, offset, len(values)))
+            offset += len(values) * values.itemsize
+        stream.write(_snapshot_header.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, _byte_order_flag, len(sections)))
+        for name, typecode, offset, count in directory:
+            stream.write(_snapshot_section.pack(name.encode('ascii'), typecode.encode('ascii'), offset, count))
+        position = _snapshot_header.size + _snapshot_section.size * len(sections)
+        for (name, typecode, values), (_, _, offset, _) in zip(sections, directory):
+            stream.write(b'\0' * (offset - position))
+            data = values.tobytes()
+            stream.write(data)
+            position = offset + len(data)
+
+
+class _GNOmeSnapshot:
+    """
+    A read-only view over a :class:`GNOme` snapshot file, usually backed
+    by a memory map. Each section is exposed as a typed :class:`memoryview`
+    without copying.
+    """
+
+    def __init__(self, buffer, handle=None):
+        self.buffer = buffer
+        self.handle = handle
+        self.closed = False
+        view = memoryview(buffer)
+        magic, version, byte_order, n_sections = _snapshot_header.unpack_from(view, 0)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Not a GNOme snapshot")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError("Unsupported GNOme snapshot version %d" % (version, ))
+        if byte_order != _byte_order_flag:
+            raise ValueError("GNOme snapshot was written with a different byte order")
+        self.sections: Dict[str, memoryview] = {}
+        for k in range(n_sections):
+            name, typecode, offset, count = _snapshot_section.unpack_from(
+                view, _snapshot_header.size + k * _snapshot_section.size)
+            typecode = typecode.decode('ascii')
+            size = array.array(typecode).itemsize
+            self.sections[name.rstrip(b'\0').decode('ascii')] = view[
+                offset:offset + count * size].cast(typecode)
+        self.string_blob = self.sections['strings']
+        self.string_offsets = self.sections['string_offsets']
+
+    @classmethod
+    def open(cls, path: str, use_mmap: bool = True) -> "_GNOmeSnapshot":
+        if not use_mmap:
+            with open(path, 'rb') as fh:
+                return cls(fh.read())
+        handle = open(path, 'rb')
+        try:
+            buffer = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            handle.close()
+            raise
+        return cls(buffer, handle)
+
+    def _check_open(self):
+        if self.closed:
+            raise ValueError("The GNOme snapshot has been closed")
+
+    def __getitem__(self, name: str) -> memoryview:
+        try:
+            return self.sections[name]
+        except KeyError:
+            self._check_open()
+            raise
+
+    def string(self, i: int) -> Optional[str]:
+        if i < 0:
+            return None
+        self._check_open()
+        return str(self.string_blob[self.string_offsets[i]:self.string_offsets[i + 1]], 'utf8')
+
+    def row(self, name: str, i: int) -> memoryview:
+        indptr = self[name + "_indptr"]
+        return self[name + "_indices"][indptr[i]:indptr[i + 1]]
+
+    def strings(self, indices) -> List[str]:
+        return [self.string(j) for j in indices]
+
+    def close(self):
+        self.closed = True
+        self.string_blob = self.string_offsets = None
+        for view in self.sections.values():
+            view.release()
+        self.sections.clear()
+        if self.handle is not None:
+            self.buffer.close()
+            self.handle.close()
+            self.handle = None
+
+
+class _SnapshotTerms(Mapping):
+    """
+    A :class:`~collections.abc.Mapping` from GNOme accession to :class:`SubsumptionNode`
+    which builds each node from a :class:`_GNOmeSnapshot` the first time it is requested.
+    """
+
+    def __init__(self, snapshot: _GNOmeSnapshot):
+        self.snapshot = snapshot
+        term_ids = snapshot['term_id']
+        self.index = {snapshot.string(j): i for i, j in enumerate(term_ids)}
+        self.nodes: Dict[str, SubsumptionNode] = {}
+
+    def node_at(self, i: int) -> SubsumptionNode:
+        snapshot = self.snapshot
+        category = SubsumptionLevel[snapshot['term_category'][i]]
+        node_type = MolecularMassNode if category == SubsumptionLevel.molecular_weight else SubsumptionNode
+        return node_type(
+            id=snapshot.string(snapshot['term_id'][i]),
+            definition=snapshot.string(snapshot['term_definition'][i]),
+            subsumption_category=category,
+            glytoucan_id=snapshot.string(snapshot['term_glytoucan_id'][i]),
+            base_composition=snapshot.string(snapshot['term_base_composition'][i]),
+            composition=snapshot.string(snapshot['term_composition'][i]),
+            topology=snapshot.string(snapshot['term_topology'][i]),
+            subclass_of=snapshot.strings(snapshot.row('superclass', i)),
+            subclasses=snapshot.strings(snapshot.row('subclass', i)),
+            glycan=snapshot.string(snapshot['term_glycan'][i]))
+
+    def __getitem__(self, key: str) -> SubsumptionNode:
+        try:
+            return self.nodes[key]
+        except KeyError:
+            pass
+        node = self.nodes[key] = self.node_at(self.index[key])
+        return node
+
+    def __contains__(self, key) -> bool:
+        return key in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
 class GNOme:
     """
     An interface for the `GNOme <https://gnome.glyomics.org/>`_ glycan subsumption graph.
+
+    The graph may be built by parsing the ontology with :meth:`load`, and stored in a
+    compact binary snapshot with :meth:`save` which :meth:`load_snapshot` can read back
+    much faster.
+
+    Attributes
+    ----------
+    terms : :class:`Mapping` of :class:`str` to :class:`SubsumptionNode`
+        All nodes in the graph, keyed by accession
+    subsumption_levels : :class:`dict`
+        The accessions of all nodes at each subsumption level
+    mass_values : :class:`Sequence` of :class:`float`
+        The masses of all :class:`MolecularMassNode` in ascending order
+    mass_accessions : :class:`list` of :class:`str`
+        The accessions of the nodes in :attr:`mass_values`, in the same order
     """
-    terms: Dict[str, SubsumptionNode]
+    terms: Mapping
     subsumption_levels: Dict[str, List[str]]
-    mass_index: List[SubsumptionNode]
+    mass_values: Sequence[float]
+    mass_accessions: List[str]
 
-    def __init__(self, terms: Dict[str, SubsumptionNode],
-                 subsumption_levels: Dict[str, List[str]]) -> None:
+    def __init__(self, terms: Mapping,
+                 subsumption_levels: Dict[str, List[str]],
+                 _snapshot: Optional[_GNOmeSnapshot]=None) -> None:
         self.terms = terms
         self.subsumption_levels = subsumption_levels
-        self.mass_index = self._make_mass_index()
+        self._snapshot = _snapshot
+        self._mass_index = None
+        self._glycan_cache = {}
+        self._mass_array = None
+        self._match_cache = {}
+        self._residue_key_cache = {}
+        self._composition_keys = {}
+        self._subclass_indices = {}
+        self._make_mass_arrays()
 
     @classmethod
     def from_parser(cls, parser: _GNOmeOWLXMLParser):
@@ -350,49 +578,243 @@ class GNOme:
             nodes[k].subclasses = parser.subclasses[k]
         return cls(nodes, parser.subsumption_levels)
 
-    def _make_mass_index(self):
-        mass_index = []
-        for acc in self.subsumption_levels['molecular weight']:
-            node = self.terms[acc]
-            mass_index.append(node)
-        mass_index.sort()
-        return mass_index
-
-    def resolve_mass(self, mass: float) -> SubsumptionNode:
-        i = bisect.bisect_left(self.mass_index, mass)
-        lo = self.mass_index[i - 1]
-        lo_err = abs(lo.mass - mass)
-        hi = self.mass_index[i]
-        hi_err = abs(hi.mass - mass)
+    def _make_mass_arrays(self):
+        if self._snapshot is not None:
+            self.mass_values = self._snapshot['mass_values']
+            term_ids = self._snapshot['term_id']
+            self.mass_accessions = [self._snapshot.string(term_ids[i]) for i in self._snapshot['mass_terms']]
+            return
+        pairs = sorted((self.terms[acc].mass, acc) for acc in self.subsumption_levels.get('molecular weight', []))
+        self.mass_values = [mass for mass, _ in pairs]
+        self.mass_accessions = [acc for _, acc in pairs]
+
+    @property
+    def mass_index(self) -> List[SubsumptionNode]:
+        if self._mass_index is None:
+            self._mass_index = [self.terms[acc] for acc in self.mass_accessions]
+        return self._mass_index
+
+    def _nearest_mass(self, i: int, mass: float) -> int:
+        n = len(self.mass_values)
+        if i == 0:
+            return 0
+        if i == n:
+            return n - 1
+        lo_err = abs(self.mass_values[i - 1] - mass)
+        hi_err = abs(self.mass_values[i] - mass)
         if hi_err < lo_err:
-            term = hi
+            return i
         elif hi_err > lo_err:
-            term = lo
-        else:
+            return i - 1
+        raise ValueError(
+            "Ambiguous duplicate masses (%0.2f, %0.2f)" % (self.mass_values[i - 1], self.mass_values[i]))
+
+    def resolve_mass(self, mass: float) -> SubsumptionNode:
+        i = self._nearest_mass(bisect.bisect_left(self.mass_values, mass), mass)
+        return self.terms[self.mass_accessions[i]]
+
+    def _resolve_masses(self, masses: Sequence[float]) -> List[int]:
+        if np is None:
+            return [self._nearest_mass(bisect.bisect_left(self.mass_values, mass), mass) for mass in masses]
+        if self._mass_array is None:
+            self._mass_array = np.array(self.mass_values, dtype=float)
+        values = self._mass_array
+        masses = np.asarray(masses, dtype=float)
+        n = len(values)
+        i = np.searchsorted(values, masses)
+        lo = np.clip(i - 1, 0, n - 1)
+        hi = np.clip(i, 0, n - 1)
+        lo_err = np.abs(values[lo] - masses)
+        hi_err = np.abs(values[hi] - masses)
+        inner = (i > 0) & (i < n)
+        ambiguous = inner & (lo_err == hi_err)
+        if ambiguous.any():
+            j = i[ambiguous.argmax()]
             raise ValueError(
-                "Ambiguous duplicate masses (%0.2f, %0.2f)" % (lo.mass, hi.mass))
-        return term
+                "Ambiguous duplicate masses (%0.2f, %0.2f)" % (values[j - 1], values[j]))
+        return np.where(inner & (lo_err < hi_err), lo, hi).tolist()
+
+    def parsed_glycan(self, accession: str) -> Optional[Dict[str, int]]:
+        """
+        Get the residue counts of :attr:`SubsumptionNode.glycan` for the node `accession`
+        as parsed by :func:`parse_gnome_glycan`, or :const:`None` if it has no glycan.
+        """
+        try:
+            return self._glycan_cache[accession]
+        except KeyError:
+            pass
+        if self._snapshot is not None:
+            snapshot = self._snapshot
+            i = self.terms.index[accession]
+            if snapshot['term_glycan'][i] < 0:
+                value = None
+            else:
+                indptr = snapshot['glycan_indptr']
+                start, end = indptr[i], indptr[i + 1]
+                value = dict(zip(snapshot.strings(snapshot['glycan_residues'][start:end]),
+                                 snapshot['glycan_counts'][start:end]))
+        else:
+            glycan = self.terms[accession].glycan
+            value = parse_gnome_glycan(glycan) if glycan else None
+        self._glycan_cache[accession] = value
+        return value
+
+    def _residue_keys(self, mono) -> Tuple[FrozenMonosaccharideResidue, FrozenMonosaccharideResidue]:
+        name = str(mono)
+        try:
+            return self._residue_key_cache[name]
+        except KeyError:
+            pass
+        specific = FrozenMonosaccharideResidue.from_iupac_lite(name)
+        generic = specific
+        for generic_name in generic_classes:
+            if self._match_monosaccharide_to_str(mono, generic_name):
+                generic = self._generic_residue(generic_name)
+                break
+        self._residue_key_cache[name] = value = (specific, generic)
+        return value
+
+    def _generic_residue(self, name: str) -> FrozenMonosaccharideResidue:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return FrozenMonosaccharideResidue.from_iupac_lite(name)
+
+    def _query_keys(self, glycan_composition: GlycanComposition) -> Tuple[HashableGlycanComposition,
+                                                                          HashableGlycanComposition]:
+        specific = {}
+        generic = {}
+        for mono, ct in glycan_composition.items():
+            specific_mono, generic_mono = self._residue_keys(mono)
+            specific[specific_mono] = specific.get(specific_mono, 0) + ct
+            generic[generic_mono] = generic.get(generic_mono, 0) + ct
+        return HashableGlycanComposition(specific), HashableGlycanComposition(generic)
+
+    def composition_key(self, accession: str) -> Optional[HashableGlycanComposition]:
+        """
+        Get the key the node `accession` is indexed under for composition lookups.
+
+        A node whose glycan is written entirely in terms of the generic residue classes
+        of :data:`generic_residues`, like a base composition, is keyed on those classes,
+        and a node whose glycan names only specific monosaccharides is keyed on them. A
+        node which mixes the two, or uses residues without a known composition, has no key
+        and is matched against queries residue by residue instead.
+
+        Returns
+        -------
+        :class:`~.HashableGlycanComposition` or :const:`None`
+        """
+        try:
+            return self._composition_keys[accession]
+        except KeyError:
+            pass
+        key = None
+        residues = self.parsed_glycan(accession)
+        if residues:
+            n_generic = sum(name in generic_classes for name in residues)
+            if n_generic == len(residues):
+                key = HashableGlycanComposition({
+                    self._generic_residue(name): ct for name, ct in residues.items()})
+            elif n_generic == 0:
+                key = {}
+                for name, ct in residues.items():
+                    try:
+                        mono = FrozenMonosaccharideResidue.from_iupac_lite(name)
+                    except Exception:
+                        key = None
+                        break
+                    if mono.mass() == 0:
+                        key = None
+                        break
+                    key[mono] = ct
+                if key is not None:
+                    key = HashableGlycanComposition(key)
+        self._composition_keys[accession] = key
+        return key
+
+    def _subclass_index(self, accession: str) -> Tuple[Dict[HashableGlycanComposition, Tuple[int, str]],
+                                                       List[Tuple[int, str]]]:
+        try:
+            return self._subclass_indices[accession]
+        except KeyError:
+            pass
+        keyed = {}
+        unkeyed = []
+        for i, acc in enumerate(self.terms[accession].subclasses):
+            if not self.parsed_glycan(acc):
+                continue
+            key = self.composition_key(acc)
+            if key is None:
+                unkeyed.append((i, acc))
+            elif key not in keyed:
+                keyed[key] = (i, acc)
+        self._subclass_indices[accession] = value = (keyed, unkeyed)
+        return value
+
+    def build_composition_index(self):
+        """
+        Compute the composition keys of every node below the molecular weight level
+        and index the subclasses of every node by them up front, rather than as each
+        node is first visited by :meth:`resolve`.
+        """
+        for level in ('molecular weight', 'basecomposition', 'composition', 'topology'):
+            for acc in self.subsumption_levels.get(level, []):
+                self._subclass_index(acc)
+
+    def _resolve_subclass(self, glycan_composition: GlycanComposition,
+                          keys: Tuple[HashableGlycanComposition, HashableGlycanComposition],
+                          node: SubsumptionNode) -> Optional[SubsumptionNode]:
+        keyed, unkeyed = self._subclass_index(node.id)
+        best = None
+        for key in keys:
+            hit = keyed.get(key)
+            if hit is not None and (best is None or hit < best):
+                best = hit
+        for i, acc in unkeyed:
+            if best is not None and i > best[0]:
+                break
+            if self._match_base_composition(glycan_composition, self.parsed_glycan(acc)):
+                best = (i, acc)
+                break
+        if best is None:
+            return None
+        return self.terms[best[1]]
 
     def resolve_base_composition(self, glycan_composition: GlycanComposition,
                                  node: SubsumptionNode) -> Optional[SubsumptionNode]:
-        for acc in node.subclasses:
-            subnode = self.terms[acc]
-            if subnode.glycan:
-                node_gc = parse_gnome_glycan(subnode.glycan)
-                if self._match_base_composition(glycan_composition, node_gc):
-                    return subnode
-        return None
+        """
+        Find the first subclass of `node` whose glycan matches `glycan_composition`.
+
+        Parameters
+        ----------
+        glycan_composition : :class:`~.GlycanComposition`
+            The composition to match
+        node : :class:`SubsumptionNode`
+            The node whose subclasses are searched
+
+        Returns
+        -------
+        :class:`SubsumptionNode` or :const:`None`
+        """
+        return self._resolve_subclass(glycan_composition, self._query_keys(glycan_composition), node)
 
     def _match_monosaccharide_to_str(self, mono, mono_str) -> bool:
-        if mono_str == 'Sia':
-            return any(self._match_monosaccharide_to_str(mono, alt)
-                       for alt in generic_residues['Sia'])
+        cache_key = (str(mono), mono_str)
         try:
-            base_mono = FrozenMonosaccharideResidue.from_iupac_lite(mono_str)
-            return self._match_monosaccharide(mono, base_mono)
-        except Exception as err:
-            warnings.warn(f"Failed to convert {mono_str}: {err}")
-            return False
+            return self._match_cache[cache_key]
+        except KeyError:
+            pass
+        if mono_str == 'Sia':
+            result = any(self._match_monosaccharide_to_str(mono, alt)
+                         for alt in generic_residues['Sia'])
+        else:
+            try:
+                base_mono = FrozenMonosaccharideResidue.from_iupac_lite(mono_str)
+                result = self._match_monosaccharide(mono, base_mono)
+            except Exception as err:
+                warnings.warn(f"Failed to convert {mono_str}: {err}")
+                result = False
+        self._match_cache[cache_key] = result
+        return result
 
     def _match_monosaccharide(self, mono_a, mono_b) -> bool:
         a, b = monosaccharide_similarity(mono_a, mono_b)
@@ -411,38 +833,78 @@ class GNOme:
                 return False
         return all(ct == 0 for ct in base.values())
 
+    def _resolve_from_mass_node(self, glycan_composition: GlycanComposition, node: SubsumptionNode,
+                                subsumption_level: SubsumptionLevel) -> Optional[SubsumptionNode]:
+        if subsumption_level == SubsumptionLevel.molecular_weight:
+            return node
+        keys = self._query_keys(glycan_composition)
+        node = self._resolve_subclass(glycan_composition, keys, node)
+        if node is None or subsumption_level == SubsumptionLevel.basecomposition:
+            return node
+        while True:
+            next_node = self._resolve_subclass(glycan_composition, keys, node)
+            if next_node is None or next_node.subsumption_category > subsumption_level:
+                return node
+            node = next_node
+
     def resolve(self, glycan_composition: GlycanComposition,
                 subsumption_level: SubsumptionLevel=None) -> Optional[SubsumptionNode]:
         """
         Resolve a glycan composition against the GNOme subsumption hierarchy
         to a specific level of resolution is desired.
 
+        The composition is first assigned to the molecular weight node nearest its mass,
+        and then follows the subclass whose glycan matches it down the hierarchy until
+        no subclass matches or the next one would be more specific than `subsumption_level`.
+        The last node reached is returned, so a composition resolved to the composition
+        level gets its composition node even when a topology below it also matches. At each
+        step the first subclass in the ontology's order whose glycan matches is taken, as
+        :meth:`resolve_base_composition` finds it.
+
+        Parameters
+        ----------
+        glycan_composition : :class:`~.GlycanComposition`
+            The composition to resolve
+        subsumption_level : :class:`SubsumptionLevel`, optional
+            The most specific level to resolve to. Defaults to
+            :attr:`SubsumptionLevel.saccharide`.
+
+        Returns
+        -------
+        :class:`SubsumptionNode` or :const:`None`
         """
         if subsumption_level is None:
-            subsumption_level = SubsumptionLevel
+            subsumption_level = SubsumptionLevel.saccharide
         node = self.resolve_mass(glycan_composition.mass())
-        if node is None:
-            return None
-        if subsumption_level == SubsumptionLevel.molecular_weight:
-            return node
-        node = self.resolve_base_composition(glycan_composition, node)
-        if node is None:
-            return None
-        if subsumption_level == SubsumptionLevel.basecomposition:
-            return node
-        node_queue = Deque([node])
-        root = node
-        possible_matches = Deque()
-        while node_queue:
-            node = node_queue.popleft()
-            next_node = self.resolve_base_composition(glycan_composition, node)
-            if next_node is None:
-                possible_matches.appendleft(node)
-            elif not subsumption_level or (next_node.subsumption_category <= subsumption_level):
-                node_queue.append(next_node)
-        if possible_matches:
-            return possible_matches[0]
-        return root
+        return self._resolve_from_mass_node(glycan_composition, node, subsumption_level)
+
+    def resolve_many(self, compositions: Sequence[GlycanComposition],
+                     subsumption_level: SubsumptionLevel=None) -> List[Optional[SubsumptionNode]]:
+        """
+        Resolve many glycan compositions at once, as in :meth:`resolve`.
+
+        The molecular weight nodes for all of the compositions are found with a single
+        vectorized search when :mod:`numpy` is available.
+
+        Parameters
+        ----------
+        compositions : :class:`Sequence` of :class:`~.GlycanComposition`
+            The compositions to resolve
+        subsumption_level : :class:`SubsumptionLevel`, optional
+            The most specific level to resolve to. Defaults to
+            :attr:`SubsumptionLevel.saccharide`.
+
+        Returns
+        -------
+        :class:`list` of :class:`SubsumptionNode` or :const:`None`
+        """
+        if subsumption_level is None:
+            subsumption_level = SubsumptionLevel.saccharide
+        compositions = list(compositions)
+        indices = self._resolve_masses([gc.mass() for gc in compositions])
+        mass_accessions = self.mass_accessions
+        return [self._resolve_from_mass_node(gc, self.terms[mass_accessions[i]], subsumption_level)
+                for gc, i in zip(compositions, indices)]
 
     @classmethod
     def load(cls, uri: Optional[str]=None):
@@ -472,3 +934,92 @@ class GNOme:
             uri = urlopen(uri)
         parser = _GNOmeOWLXMLParser.parse(uri)
         return cls.from_parser(parser)
+
+    def save(self, path: str):
+        """
+        Write the subsumption hierarchy to ``path`` as a binary snapshot which
+        can be read with :meth:`load_snapshot`.
+
+        The snapshot holds a string table, a table of terms with each field stored as
+        an index into the string table, the subclass and superclass relationships as
+        compressed sparse row arrays, the sorted masses of the molecular weight nodes,
+        and the residue counts of each node's glycan as parsed by :func:`parse_gnome_glycan`.
+        All arrays are aligned so they can be used directly from a memory map.
+
+        Parameters
+        ----------
+        path : str
+            The path to write the snapshot to
+        """
+        writer = _SnapshotWriter()
+        accessions = list(self.terms)
+        term_index = {acc: i for i, acc in enumerate(accessions)}
+        nodes = [self.terms[acc] for acc in accessions]
+        intern = writer.intern
+        writer.add("term_id", 'i', [intern(node.id) for node in nodes])
+        writer.add("term_definition", 'i', [intern(node.definition) for node in nodes])
+        writer.add("term_category", 'b', [node.subsumption_category.value for node in nodes])
+        writer.add("term_glytoucan_id", 'i', [intern(node.glytoucan_id) for node in nodes])
+        writer.add("term_base_composition", 'i', [intern(node.base_composition) for node in nodes])
+        writer.add("term_composition", 'i', [intern(node.composition) for node in nodes])
+        writer.add("term_topology", 'i', [intern(node.topology) for node in nodes])
+        writer.add("term_glycan", 'i', [intern(node.glycan) for node in nodes])
+        writer.add_csr("subclass", ([intern(acc) for acc in node.subclasses] for node in nodes))
+        writer.add_csr("superclass", ([intern(acc) for acc in node.subclass_of] for node in nodes))
+        writer.add("mass_values", 'd', self.mass_values)
+        writer.add("mass_terms", 'i', [term_index[acc] for acc in self.mass_accessions])
+
+        glycan_indptr = [0]
+        glycan_residues = []
+        glycan_counts = []
+        for acc in accessions:
+            residues = self.parsed_glycan(acc) or {}
+            for name, count in residues.items():
+                glycan_residues.append(intern(name))
+                glycan_counts.append(count)
+            glycan_indptr.append(len(glycan_residues))
+        writer.add("glycan_indptr", 'q', glycan_indptr)
+        writer.add("glycan_residues", 'i', glycan_residues)
+        writer.add("glycan_counts", 'i', glycan_counts)
+
+        levels = list(self.subsumption_levels)
+        writer.add("level_names", 'i', [intern(level) for level in levels])
+        writer.add_csr("level", ([intern(acc) for acc in self.subsumption_levels[level]] for level in levels))
+        with open(path, 'wb') as fh:
+            writer.write(fh)
+
+    @classmethod
+    def load_snapshot(cls, path: str, use_mmap: bool=True) -> "GNOme":
+        """
+        Load the subsumption hierarchy from a snapshot written by :meth:`save`.
+
+        The snapshot is memory mapped by default, so that many processes loading the
+        same file share its pages. Individual :class:`SubsumptionNode` objects are only
+        created when first looked up in :attr:`terms`.
+
+        Parameters
+        ----------
+        path : str
+            The path to the snapshot
+        use_mmap : bool, optional
+            Whether to memory map the snapshot rather than reading it into memory.
+            Defaults to :const:`True`.
+
+        Returns
+        -------
+        :class:`GNOme`
+        """
+        snapshot = _GNOmeSnapshot.open(path, use_mmap=use_mmap)
+        levels = {}
+        for i, name in enumerate(snapshot['level_names']):
+            levels[snapshot.string(name)] = snapshot.strings(snapshot.row('level', i))
+        return cls(_SnapshotTerms(snapshot), levels, _snapshot=snapshot)
+
+    def close(self):
+        """
+        Release the snapshot this hierarchy was loaded from, if any. Nodes which were not
+        already looked up become unavailable, and looking them up raises :class:`ValueError`.
+        """
+        if self._snapshot is not None:
+            self.mass_values = list(self.mass_values)
+            self._snapshot.close()
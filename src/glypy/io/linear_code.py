@@ -9,11 +9,13 @@ Currently does not handle the sigils indicating deviation from the common forms.
 
 import re
 from collections import OrderedDict, deque
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
 
 from six import string_types as basestring
 
 from glypy.io import format_constants_map
 from glypy.io.nomenclature import identity
+from glypy.io.residue_cache import ResidueCacheBase, monosaccharide_key
 from glypy.structure import constants, named_structures, Monosaccharide, Glycan, Substituent
 from glypy.utils import invert_dict
 
@@ -204,7 +206,7 @@ def priority(sym):
     return -1
 
 
-def glycan_to_linear_code(structure=None, max_tolerance=3):
+def glycan_to_linear_code(structure=None, max_tolerance=3, cache=None):
     '''
     Translate a |Glycan| structure into Linear Code. Called from :func:`to_linear_code`.
     Recursively operates on branches.
@@ -217,11 +219,15 @@ def glycan_to_linear_code(structure=None, max_tolerance=3):
     max_tolerance: int
         The maximum amount of deviance to allow when translating |Monosaccharide| objects
         into nomenclature symbols
+    cache: :class:`ResidueCache`, optional
+        The residue translation cache to use. Defaults to the shared :data:`residue_cache`
 
     Returns
     -------
     deque
     '''
+    if cache is None:
+        cache = residue_cache
     base = structure.root if isinstance(structure, Glycan) else structure
     stack = [(1, base)]
     outstack = deque()
@@ -229,16 +235,16 @@ def glycan_to_linear_code(structure=None, max_tolerance=3):
         outedge_pos, node = stack.pop()
         if outedge_pos in {1, -1}:
             outedge_pos = ''
-        outstack.appendleft(monosaccharide_to_linear_code(node, max_tolerance=max_tolerance) + str(outedge_pos))
+        outstack.appendleft(cache.symbol_from_monosaccharide(node, max_tolerance) + str(outedge_pos))
         children = []
         for pos, child in node.children():
-            rank = priority(child)
+            rank = cache.priority(child)
             children.append((pos, child, rank))
         if len(children) > 1:
             ordered_children = sorted(children, key=lambda x: x[2])
             for pos, child, rank in ordered_children[:-1]:
                 branch = '({branch}{attach_pos})'.format(
-                    branch=''.join(glycan_to_linear_code(child, max_tolerance=max_tolerance)),
+                    branch=''.join(glycan_to_linear_code(child, max_tolerance=max_tolerance, cache=cache)),
                     attach_pos=pos
                 )
                 outstack.appendleft(branch)
@@ -250,22 +256,26 @@ def glycan_to_linear_code(structure=None, max_tolerance=3):
     return outstack
 
 
-def to_linear_code(structure):
+def to_linear_code(structure, cache=None):
     '''
     Translates `structure` to Linear Code.
 
     Parameters
     ----------
     structure: Monosaccharide or Glycan
+    cache: :class:`ResidueCache`, optional
+        The residue translation cache to use. Defaults to the shared :data:`residue_cache`
 
     Returns
     -------
     str
     '''
+    if cache is None:
+        cache = residue_cache
     if isinstance(structure, Monosaccharide):
-        return monosaccharide_to_linear_code(structure)
+        return cache.symbol_from_monosaccharide(structure)
     else:
-        return ''.join(list(glycan_to_linear_code(structure)))
+        return ''.join(list(glycan_to_linear_code(structure, cache=cache)))
 
 
 class LinearCodeError(ParserError):
@@ -280,6 +290,15 @@ def monosaccharide_from_linear_code(residue_str, parent=None):
     resulting |Monosaccharide| to `parent` at `outedge`.
     '''
     base_type, substituents, anomer, outedge = re.search(r"([A-Z]+)(\[.*?\])?([abo\?]?)(.)?", residue_str).groups()
+    base = _build_monosaccharide(base_type, substituents, anomer)
+    outedge = _parse_outedge(outedge)
+    if parent is not None:
+        parent.add_monosaccharide(base, position=outedge, child_position=min(base.open_attachment_sites()[0]))
+
+    return base, outedge
+
+
+def _build_monosaccharide(base_type, substituents, anomer):
     base = named_structures.monosaccharides[monosaccharides_from[base_type]]
     base.anomer = anomer_map_from.get(anomer, None)
     if substituents is not None:
@@ -291,18 +310,138 @@ def monosaccharide_from_linear_code(residue_str, parent=None):
             except (ValueError, TypeError):
                 pos = -1
             base.add_substituent(subst_object, position=pos)
+    return base
+
+
+def _parse_outedge(outedge):
     try:
-        outedge = int(outedge)
+        return int(outedge)
     except (ValueError, TypeError):
-        outedge = -1
+        return -1
 
-    if parent is not None:
-        parent.add_monosaccharide(base, position=outedge, child_position=min(base.open_attachment_sites()[0]))
 
-    return base, outedge
+class ResidueCache(ResidueCacheBase):
+    '''Interns the translations between Linear Code residue tokens and :class:`~.Monosaccharide`.
+
+    Parsing maps a ``(base type, substituents, anomer)`` token to a template
+    :class:`~.Monosaccharide` which is cloned for each use. Writing maps a
+    :func:`~.monosaccharide_key` to the residue's symbol and its branching :func:`priority`,
+    which are otherwise found by comparing the residue to each reference monosaccharide.
+
+    Attributes
+    ----------
+    residues : dict
+        Maps ``(base type, substituents, anomer)`` tokens to template monosaccharides
+    symbols : dict
+        Maps ``(monosaccharide key, max_tolerance)`` to residue symbols
+    priorities : dict
+        Maps monosaccharide keys to branching priorities
+    maxsize : int
+        The maximum number of entries held in any table. When a table is full, new
+        translations are computed but not stored.
+    hits : int
+        The number of lookups satisfied from the cache
+    misses : int
+        The number of lookups that required computing a new translation
+    '''
+
+    residues: Dict[Tuple[str, Optional[str], str], Monosaccharide]
+    symbols: Dict[Tuple[Hashable, int], str]
+    priorities: Dict[Hashable, int]
+
+    _tables = ("residues", "symbols", "priorities")
+
+    def monosaccharide_from_token(self, base_type: str, substituents: Optional[str],
+                                  anomer: str) -> Monosaccharide:
+        '''Create a new :class:`~.Monosaccharide` for a residue token.
+
+        Parameters
+        ----------
+        base_type : str
+            The residue symbol
+        substituents : str or :const:`None`
+            The bracketed substituent list, if any
+        anomer : str
+            The anomeric symbol
+
+        Returns
+        -------
+        :class:`~.Monosaccharide`
+        '''
+        key = (base_type, substituents, anomer)
+        return self._lookup(self.residues, key, _build_monosaccharide, base_type, substituents, anomer).clone()
+
+    def symbol_from_monosaccharide(self, monosaccharide: Monosaccharide, max_tolerance: int=3) -> str:
+        '''Get the Linear Code symbol for `monosaccharide`, as in :func:`monosaccharide_to_linear_code`.
+
+        Parameters
+        ----------
+        monosaccharide : :class:`~.Monosaccharide`
+        max_tolerance : int
+            The maximum error tolerance to allow while looking for a match
+
+        Returns
+        -------
+        str
+        '''
+        key = (monosaccharide_key(monosaccharide), max_tolerance)
+        return self._lookup(self.symbols, key, monosaccharide_to_linear_code, monosaccharide, max_tolerance)
+
+    def priority(self, monosaccharide: Monosaccharide) -> int:
+        '''Get the branching priority of `monosaccharide`, as in :func:`priority`.
+
+        Parameters
+        ----------
+        monosaccharide : :class:`~.Monosaccharide`
+
+        Returns
+        -------
+        int
+        '''
+        return self._lookup(self.priorities, monosaccharide_key(monosaccharide), priority, monosaccharide)
+
+
+#: The :class:`ResidueCache` shared by :func:`loads` and :func:`dumps` by default
+residue_cache = ResidueCache()
+
+
+#: Splits a Linear Code sequence into residue and branch tokens in a single pass
+token_pattern = re.compile(r"""
+    (?P<residue>(?P<base_type>[A-Z]+)(?P<substituents>\[[^\]]*\])?(?P<anomer>[abo?]?)(?P<outedge>[^A-Z()\[\]])?)
+    |(?P<branch_end>\()
+    |(?P<branch_start>\))
+    |(?P<error>.)
+""", re.VERBOSE)
 
 
-def parse_linear_code(text, structure_class=Glycan):
+def tokenize(text):
+    '''Split a Linear Code sequence into residue and branch tokens in order.
+
+    Parameters
+    ----------
+    text: str
+
+    Returns
+    -------
+    :class:`list` of :class:`re.Match`
+        The :attr:`~re.Match.lastgroup` of each token is one of ``"residue"``,
+        ``"branch_start"`` or ``"branch_end"``, in the sense of reading from the root.
+
+    Raises
+    ------
+    LinearCodeError:
+        When a character cannot begin any token
+    '''
+    tokens = []
+    for match in token_pattern.finditer(text):
+        if match.lastgroup == 'error':
+            raise LinearCodeError("Could not identify residue '...{}' at {}".format(
+                text[max(match.start() - 10, 0):match.end()], match.start()))
+        tokens.append(match)
+    return tokens
+
+
+def parse_linear_code(text, structure_class=Glycan, cache=None):
     '''
     Parse the character string `text`, extracting GlycoMinds Linear Code-format
     carbohydrate structures, converting them into a |Glycan| object.
@@ -317,6 +456,10 @@ def parse_linear_code(text, structure_class=Glycan):
     ----------
     text: str
         The string to be parsed
+    structure_class: type
+        The class to use to wrap the :class:`~.Monosaccharide` graph (the default is :class:`~.Glycan`)
+    cache: :class:`ResidueCache`, optional
+        The residue translation cache to use. Defaults to the shared :data:`residue_cache`
 
     Returns
     -------
@@ -334,20 +477,23 @@ def parse_linear_code(text, structure_class=Glycan):
     KeyError:
         When an unknown symbol is encountered
     '''
+    if cache is None:
+        cache = residue_cache
     last_outedge = None
     root = None
     last_residue = None
     branch_stack = []
-    while len(text) > 0:
+    # The root is the right-most residue, so read the tokens from the end
+    for token in reversed(tokenize(text)):
+        kind = token.lastgroup
         # If starting a new branch
-        if text[-1] == ')':
+        if kind == 'branch_start':
             branch_stack.append((last_residue, root, last_outedge))
             root = None
             last_residue = None
             last_outedge = None
-            text = text[:-1]
         # If ending a branch
-        elif text[-1] == '(':
+        elif kind == 'branch_end':
             try:
                 branch_parent, old_root, old_last_outedge = branch_stack.pop()
                 branch_parent.add_monosaccharide(root, position=last_outedge,
@@ -355,21 +501,21 @@ def parse_linear_code(text, structure_class=Glycan):
                 root = old_root
                 last_residue = branch_parent
                 last_outedge = old_last_outedge
-                text = text[:-1]
             except IndexError:
-                raise LinearCodeError("Bad branching at {}".format(len(text)))
+                raise LinearCodeError("Bad branching at {}".format(token.end()))
         # Parsing a residue
         else:
-            match = re.search(r"([A-Z]+?)(\[[^\]]*?\])?(.)(.)?$", text)
-            if match:
-                next_residue, outedge = monosaccharide_from_linear_code(text[match.start(): match.end()], last_residue)
-                if root is None:
-                    last_outedge = outedge
-                    root = next_residue
-                last_residue = next_residue
-                text = text[:match.start()]
-            else:
-                raise LinearCodeError("Could not identify residue '...{}' at {}".format(text[-10:], len(text)))
+            next_residue = cache.monosaccharide_from_token(
+                token.group('base_type'), token.group('substituents'), token.group('anomer'))
+            outedge = _parse_outedge(token.group('outedge'))
+            if last_residue is not None:
+                last_residue.add_monosaccharide(
+                    next_residue, position=outedge,
+                    child_position=min(next_residue.open_attachment_sites()[0]))
+            if root is None:
+                last_outedge = outedge
+                root = next_residue
+            last_residue = next_residue
 
     res = structure_class(root=root).reindex()
     res.canonicalize()
@@ -386,6 +532,71 @@ dumps = to_linear_code
 loads = parse_linear_code
 
 
+def loads_many(texts, structure_class=Glycan, cache=None, raise_errors=True):
+    '''Parse many Linear Code sequences, sharing residue translations between them.
+
+    Parameters
+    ----------
+    texts: Iterable of str
+        The sequences to parse
+    structure_class: type
+        The class to use to wrap the :class:`~.Monosaccharide` graph (the default is :class:`~.Glycan`)
+    cache: :class:`ResidueCache`, optional
+        The residue translation cache to use. Defaults to the shared :data:`residue_cache`
+    raise_errors: bool, optional
+        Whether to raise an error when a sequence cannot be parsed, or to return :const:`None`
+        in its place. Defaults to :const:`True`.
+
+    Returns
+    -------
+    list
+        The parsed results, in the same order as `texts`
+    '''
+    if cache is None:
+        cache = residue_cache
+    results = []
+    for text in texts:
+        try:
+            structure = parse_linear_code(text, structure_class=structure_class, cache=cache)
+        except (LinearCodeError, KeyError, ValueError):
+            if raise_errors:
+                raise
+            structure = None
+        results.append(structure)
+    return results
+
+
+def dumps_many(structures, cache=None, raise_errors=True):
+    '''Translate many structures to Linear Code, sharing residue translations between them.
+
+    Parameters
+    ----------
+    structures: Iterable of Glycan or Monosaccharide
+        The structures to translate
+    cache: :class:`ResidueCache`, optional
+        The residue translation cache to use. Defaults to the shared :data:`residue_cache`
+    raise_errors: bool, optional
+        Whether to raise an error when a structure cannot be translated, or to return :const:`None`
+        in its place. Defaults to :const:`True`.
+
+    Returns
+    -------
+    :class:`list` of :class:`str`
+    '''
+    if cache is None:
+        cache = residue_cache
+    results = []
+    for structure in structures:
+        try:
+            text = to_linear_code(structure, cache=cache)
+        except (LinearCodeError, KeyError):
+            if raise_errors:
+                raise
+            text = None
+        results.append(text)
+    return results
+
+
 class LinearCodeParser(ParserInterface):
     def process_result(self, line):
         structure = loads(line)
@@ -0,0 +1,123 @@
+'''Shared machinery for the residue translation caches of the text formats, like
+:class:`glypy.io.wurcs.ResidueCache`, :class:`glypy.io.linear_code.ResidueCache` and
+:class:`glypy.io.cfg.ResidueCache`.
+
+A collection of structures in any one format repeats a small vocabulary of residue
+tokens, so each format's cache stores the translation of each distinct token once.
+:class:`ResidueCacheBase` implements the lookup, bookkeeping and summary shared by all of
+them, and :func:`monosaccharide_key` identifies a residue independently of its links for
+the caches which translate monosaccharides back into text.
+'''
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from glypy.composition import Composition
+from glypy.structure import Monosaccharide
+
+
+_HYDROXYL = Composition("OH")
+
+
+def monosaccharide_key(monosaccharide: Monosaccharide) -> Hashable:
+    '''Build a hashable key capturing every property of `monosaccharide` that
+    contributes to how it is written, excluding its glycosidic links.
+
+    Parameters
+    ----------
+    monosaccharide : :class:`~.Monosaccharide`
+
+    Returns
+    -------
+    :class:`tuple`
+    '''
+    substituents = []
+    substituent_groups = {}
+    for position, link in monosaccharide.substituent_links.items():
+        dest = link.to(monosaccharide)
+        # Distinguish a single substituent attached at multiple positions from
+        # several substituents of the same type without depending upon the
+        # actual substituent ids.
+        group = substituent_groups.setdefault(dest.id, len(substituent_groups))
+        substituents.append((position, dest.name, link.parent_loss == _HYDROXYL, group))
+    return (
+        monosaccharide.anomer,
+        tuple(monosaccharide.configuration),
+        tuple(monosaccharide.stem),
+        monosaccharide.superclass,
+        monosaccharide.ring_start,
+        monosaccharide.ring_end,
+        tuple(monosaccharide.modifications.items()),
+        tuple(substituents),
+    )
+
+
+class ResidueCacheBase(object):
+    '''The base class of the residue translation caches.
+
+    Subclasses name the :class:`dict` attributes holding their translations in
+    :attr:`_tables`, and look translations up through :meth:`_lookup`.
+
+    Attributes
+    ----------
+    maxsize : int
+        The maximum number of entries held in any table. When a table is full, new
+        translations are computed but not stored.
+    hits : int
+        The number of lookups satisfied from the cache
+    misses : int
+        The number of lookups that required computing a new translation
+    '''
+
+    _tables: Tuple[str, ...] = ()
+
+    maxsize: int
+    hits: int
+    misses: int
+
+    def __init__(self, maxsize=2 ** 16):
+        self.maxsize = maxsize
+        for name in self._tables:
+            setattr(self, name, {})
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, table: Dict, key: Hashable, compute: Callable, *args) -> Any:
+        # Get the translation stored under `key`, or compute it with ``compute(*args)``
+        # and store it if `table` is not full
+        try:
+            value = table[key]
+        except KeyError:
+            pass
+        else:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = compute(*args)
+        if len(table) < self.maxsize:
+            table[key] = value
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        '''Summarize the usage of the cache.
+
+        Returns
+        -------
+        dict
+        '''
+        stats = {name: len(getattr(self, name)) for name in self._tables}
+        stats["hits"] = self.hits
+        stats["misses"] = self.misses
+        return stats
+
+    def clear(self):
+        '''Remove all cached translations and reset the usage counters.
+        '''
+        for name in self._tables:
+            getattr(self, name).clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return sum(len(getattr(self, name)) for name in self._tables)
+
+    def __repr__(self):
+        return "{self.__class__.__name__}({stats})".format(self=self, stats=self.stats())
@@ -2,9 +2,10 @@
 '''
 
 from glypy.io.file_utils import ParserInterface
-from .parser import loads
+from .parser import loads, loads_many
 from .node_type import NodeTypeSpec
-from .writer import dumps
+from .writer import dumps, dumps_many
+from .residue_cache import ResidueCache, residue_cache
 from .utils import WURCSError
 from .carbon_descriptors import CarbonDescriptors
 
@@ -17,6 +18,8 @@ class WURCSParser(ParserInterface):
 
 __all__ = [
     "WURCSParser", "loads", "dumps",
+    "loads_many", "dumps_many",
+    "ResidueCache", "residue_cache",
     "NodeTypeSpec", "CarbonDescriptors",
     "WURCSError",
 ]
@@ -11,7 +11,8 @@ from glypy.structure import glycan, link as _link, glycan_composition, Monosacch
 from glypy.io.tree_builder_utils import try_int
 
 from .node_type import NodeTypeSpec
-from .utils import base52, WURCSFeatureNotSupported
+from .residue_cache import ResidueCache, residue_cache
+from .utils import base52, WURCSError, WURCSFeatureNotSupported
 
 
 class WURCSParser(object):
@@ -21,19 +22,25 @@ class WURCSParser(object):
     node_type_count: int
     node_count: int
     edge_count: int
-    node_type_map: Dict[str, NodeTypeSpec]
+    node_type_map: Dict[int, NodeTypeSpec]
+    node_type_text: Dict[int, str]
     node_index_to_node: Dict[int, Monosaccharide]
     glyph_to_node_index: Dict[str, int]
     has_uncertain_linkages: bool
+    cache: ResidueCache
 
-    def __init__(self, line, structure_class=glycan.Glycan):
+    def __init__(self, line, structure_class=glycan.Glycan, cache=None):
+        if cache is None:
+            cache = residue_cache
         self.line = unquote(line)
         self.structure_class = structure_class
+        self.cache = cache
         self.version = self.parse_version()
         self.node_type_count = None
         self.node_count = None
         self.edge_count = None
         self.node_type_map = {}
+        self.node_type_text = {}
         self.node_index_to_node = {}
         self.glyph_to_node_index = {}
         self.has_uncertain_linkages = False
@@ -72,7 +79,8 @@ class WURCSParser(object):
             section = self.line.split("/", 2)[2].split("]/")[0] + ']'
         node_types = [s[:-1] for s in section.split("[")[1:]]
         for i, node_type in enumerate(node_types, 1):
-            self.node_type_map[i] = NodeTypeSpec.parse(node_type, self.version)
+            self.node_type_text[i] = node_type
+            self.node_type_map[i] = self.cache.node_type_from_string(node_type, self.version)
         return self.node_type_map
 
     def parse_node_index_to_type_section(self, section=None):
@@ -80,7 +88,7 @@ class WURCSParser(object):
             section = self.extract_sections()[2]
         for i, index in enumerate(map(int, section.split('-'))):
             alpha = base52(i)
-            mono = self.node_type_map[index].to_monosaccharide()
+            mono = self.cache.monosaccharide_from_string(self.node_type_text[index], self.version)
             mono.id = i
             self.node_index_to_node[i] = mono
             self.glyph_to_node_index[alpha] = i
@@ -168,7 +176,7 @@ class WURCSParser(object):
             return self.structure_class(root=self.node_index_to_node[0], index_method='dfs', canonicalize=True)
 
 
-def loads(text, structure_class=glycan.Glycan, _allow_composition: bool=True):
+def loads(text, structure_class=glycan.Glycan, _allow_composition: bool=True, cache: ResidueCache=None):
     """Parse a WURCS-encoded glycan structure from `text` into a :class:`~.Glycan`
     or :class:`~.GlycanComposition`.
 
@@ -178,12 +186,51 @@ def loads(text, structure_class=glycan.Glycan, _allow_composition: bool=True):
         The WURCS string to parse
     structure_class : :class:`type`, optional
         The class to use to wrap the :class:`~.Monosaccharide` graph (the default is :class:`~.Glycan`)
+    cache : :class:`~.ResidueCache`, optional
+        The residue translation cache to use. Defaults to the shared :data:`~.residue_cache`
 
     Returns
     -------
     :class:`~.Glycan` or :class:`~.GlycanComposition`
         The parsed result
     """
-    parser = WURCSParser(text, structure_class=structure_class)
+    parser = WURCSParser(text, structure_class=structure_class, cache=cache)
     structure = parser.parse(_allow_composition=_allow_composition)
     return structure
+
+
+def loads_many(texts, structure_class=glycan.Glycan, _allow_composition: bool=True,
+               cache: ResidueCache=None, raise_errors: bool=True):
+    """Parse many WURCS-encoded glycan structures, sharing residue translations
+    between them.
+
+    Parameters
+    ----------
+    texts : Iterable of str
+        The WURCS strings to parse
+    structure_class : :class:`type`, optional
+        The class to use to wrap the :class:`~.Monosaccharide` graph (the default is :class:`~.Glycan`)
+    cache : :class:`~.ResidueCache`, optional
+        The residue translation cache to use. Defaults to the shared :data:`~.residue_cache`
+    raise_errors : bool, optional
+        Whether to raise a :class:`~.WURCSError` when a string cannot be parsed, or to
+        return :const:`None` in its place. Defaults to :const:`True`.
+
+    Returns
+    -------
+    :class:`list` of :class:`~.Glycan` or :class:`~.GlycanComposition`
+        The parsed results, in the same order as `texts`
+    """
+    if cache is None:
+        cache = residue_cache
+    results = []
+    for text in texts:
+        try:
+            structure = loads(text, structure_class=structure_class,
+                              _allow_composition=_allow_composition, cache=cache)
+        except WURCSError:
+            if raise_errors:
+                raise
+            structure = None
+        results.append(structure)
+    return results
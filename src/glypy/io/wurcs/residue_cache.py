@@ -0,0 +1,117 @@
+'''Interned translation tables between WURCS unique residue strings and
+:class:`~.Monosaccharide` objects.
+
+The vocabulary of unique residues used across a large collection of WURCS
+strings, e.g. a GlyTouCan dump, is small relative to the number of structures,
+so re-interpreting the same ``<UniqueRES>`` string or re-deriving the same
+:class:`~.CarbonDescriptors` for every residue of every structure wastes most of
+the time spent reading or writing. :class:`ResidueCache` stores each translation
+once and is shared by default between all calls to :func:`~.loads` and :func:`~.dumps`.
+'''
+from typing import Dict, Hashable, Optional, Tuple
+
+from glypy.structure import Monosaccharide
+from glypy.io.residue_cache import ResidueCacheBase, monosaccharide_key
+
+from .node_type import NodeTypeSpec
+
+
+class ResidueCache(ResidueCacheBase):
+    '''Interns the translations between WURCS unique residue strings, :class:`~.NodeTypeSpec`
+    and :class:`~.Monosaccharide`.
+
+    Parsing maps a ``(residue string, version)`` pair to a :class:`~.NodeTypeSpec` and a template
+    :class:`~.Monosaccharide` which is cloned for each use. Writing maps a :func:`~.monosaccharide_key`
+    to the unique residue string.
+
+    Attributes
+    ----------
+    node_types : dict
+        Maps ``(residue string, version)`` to ``(NodeTypeSpec, template Monosaccharide)``
+    residues : dict
+        Maps :func:`~.monosaccharide_key` values to unique residue strings
+    maxsize : int
+        The maximum number of entries held in either table. When a table is full, new
+        translations are computed but not stored.
+    hits : int
+        The number of lookups satisfied from the cache
+    misses : int
+        The number of lookups that required computing a new translation
+    '''
+
+    node_types: Dict[Tuple[str, float], Tuple[NodeTypeSpec, Optional[Monosaccharide]]]
+    residues: Dict[Hashable, str]
+
+    _tables = ("node_types", "residues")
+
+    def _make_node_type(self, text: str, version: float) -> Tuple[NodeTypeSpec, Optional[Monosaccharide]]:
+        spec = NodeTypeSpec.parse(text, version)
+        # :meth:`Monosaccharide.clone` duplicates a substituent for every link
+        # it holds, so a residue with a multiply-attached substituent cannot be
+        # stamped out from a template.
+        if any(isinstance(position, list) for position, _, _ in spec.substituents):
+            template = None
+        else:
+            template = spec.to_monosaccharide()
+        return spec, template
+
+    def _parse_node_type(self, text: str, version: float) -> Tuple[NodeTypeSpec, Optional[Monosaccharide]]:
+        return self._lookup(self.node_types, (text, version), self._make_node_type, text, version)
+
+    def node_type_from_string(self, text: str, version: float) -> NodeTypeSpec:
+        '''Get the :class:`~.NodeTypeSpec` for a unique residue string.
+
+        The returned instance is shared and must not be mutated.
+
+        Parameters
+        ----------
+        text : str
+            The unique residue string, without the enclosing brackets
+        version : float
+            The WURCS version number
+
+        Returns
+        -------
+        :class:`~.NodeTypeSpec`
+        '''
+        return self._parse_node_type(text, version)[0]
+
+    def monosaccharide_from_string(self, text: str, version: float) -> Monosaccharide:
+        '''Create a new :class:`~.Monosaccharide` for a unique residue string.
+
+        Parameters
+        ----------
+        text : str
+            The unique residue string, without the enclosing brackets
+        version : float
+            The WURCS version number
+
+        Returns
+        -------
+        :class:`~.Monosaccharide`
+        '''
+        spec, template = self._parse_node_type(text, version)
+        if template is None:
+            return spec.to_monosaccharide()
+        return template.clone()
+
+    def residue_from_monosaccharide(self, monosaccharide: Monosaccharide) -> str:
+        '''Get the unique residue string for `monosaccharide`.
+
+        Parameters
+        ----------
+        monosaccharide : :class:`~.Monosaccharide`
+
+        Returns
+        -------
+        str
+        '''
+        return self._lookup(self.residues, monosaccharide_key(monosaccharide), _residue_string, monosaccharide)
+
+
+def _residue_string(monosaccharide: Monosaccharide) -> str:
+    return NodeTypeSpec.from_monosaccharide(monosaccharide).to_res()
+
+
+#: The :class:`ResidueCache` shared by :func:`~.loads` and :func:`~.dumps` by default
+residue_cache = ResidueCache()
@@ -4,7 +4,7 @@ from glypy.structure import Glycan, Monosaccharide
 from glypy.structure.glycan_composition import GlycanComposition
 from glypy.utils import tree
 
-from .node_type import NodeTypeSpec
+from .residue_cache import ResidueCache, residue_cache
 from .utils import base52
 
 
@@ -15,12 +15,18 @@ class WURCSWriter(object):
     and populating them from a saccharide structure, composition, or
     monosaccharide.
 
+    Unique residue strings are looked up through a :class:`~.ResidueCache`,
+    so :attr:`node_type_map` is keyed by the unique residue string.
+
     """
 
     version = '2.0'
 
-    def __init__(self, glycan):
+    def __init__(self, glycan, cache=None):
+        if cache is None:
+            cache = residue_cache
         self.glycan = glycan
+        self.cache = cache
         self.node_type_map = OrderedDict()
         self.node_index_to_node_type = OrderedDict()
         self.index_to_glyph = dict()
@@ -33,7 +39,7 @@ class WURCSWriter(object):
         index_to_glyph = dict()
         id_to_index = dict()
         for i, node in enumerate(self._iter_monosaccharides(), 1):
-            node_type = NodeTypeSpec.from_monosaccharide(node)
+            node_type = self.cache.residue_from_monosaccharide(node)
             index_to_glyph[i] = base52(i - 1)
             id_to_index[node.id] = i
             node_index_to_node_type[i] = node_type
@@ -108,7 +114,7 @@ class WURCSWriter(object):
         return '/'.join(sections)
 
 
-def dumps(glycan):
+def dumps(glycan, cache: ResidueCache=None):
     """Encode a saccharide object as a WURCS 2.0 string.
 
     .. note::
@@ -120,6 +126,8 @@ def dumps(glycan):
     ----------
     glycan : :class:`~.Glycan`, :class:`~.GlycanComposition`, or :class:`~.Monosaccharide`
         The structure to encode
+    cache : :class:`~.ResidueCache`, optional
+        The residue translation cache to use. Defaults to the shared :data:`~.residue_cache`
 
     Returns
     -------
@@ -130,7 +138,28 @@ def dumps(glycan):
         glycan = Glycan(glycan.clone())
     if not isinstance(glycan, GlycanComposition):
         glycan = tree(glycan)
-    return WURCSWriter(glycan).write()
+    return WURCSWriter(glycan, cache=cache).write()
+
+
+def dumps_many(glycans, cache: ResidueCache=None):
+    """Encode many saccharide objects as WURCS 2.0 strings, sharing residue
+    translations between them.
+
+    Parameters
+    ----------
+    glycans : Iterable of :class:`~.Glycan`, :class:`~.GlycanComposition`, or :class:`~.Monosaccharide`
+        The structures to encode
+    cache : :class:`~.ResidueCache`, optional
+        The residue translation cache to use. Defaults to the shared :data:`~.residue_cache`
+
+    Returns
+    -------
+    :class:`list` of :class:`str`
+        The encoded structures, in the same order as `glycans`
+    """
+    if cache is None:
+        cache = residue_cache
+    return [dumps(glycan, cache=cache) for glycan in glycans]
 
 
 Glycan.register_serializer('wurcs', dumps)
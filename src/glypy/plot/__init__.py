@@ -1,12 +1,4 @@
-from . import cfg_symbols, snfg_symbols
-from .draw_tree import plot, DrawTreeNode, enumerate_tree, DrawTree
-from .cfg_symbols import CFGNomenclature
-from .snfg_symbols import SNFGNomenclature
-from .symbolic_nomenclature import SymbolicNomenclatureBase
-from .geometry import TreeLayoutBase
-from .buchheim import BalancedTreeLayout
-from .topological_layout import TopologicalTreeLayout
-from . import common
+from glypy.utils.lazy import lazy_attributes
 
 
 __all__ = [
@@ -16,3 +8,14 @@ __all__ = [
     'TreeLayoutBase', 'BalancedTreeLayout',
     'TopologicalTreeLayout', 'common'
 ]
+
+# matplotlib is only imported once something is drawn
+__getattr__, __dir__ = lazy_attributes(__name__, [
+    "cfg_symbols", "snfg_symbols", "iupac_symbols", "draw_tree", "symbolic_nomenclature",
+    "geometry", "buchheim", "topological_layout", "fragment_annotation", "common"
+], {
+    "plot": "draw_tree", "DrawTreeNode": "draw_tree", "enumerate_tree": "draw_tree", "DrawTree": "draw_tree",
+    "CFGNomenclature": "cfg_symbols", "SNFGNomenclature": "snfg_symbols",
+    "SymbolicNomenclatureBase": "symbolic_nomenclature", "TreeLayoutBase": "geometry",
+    "BalancedTreeLayout": "buchheim", "TopologicalTreeLayout": "topological_layout",
+})
@@ -685,13 +685,14 @@ class FrozenMonosaccharideResidue(MonosaccharideResidue):
             return cache[string]
         except KeyError:
             result = from_iupac_lite(string, residue_class=cls)
-            if string not in cache:
-                for k, v in cache.items():
-                    if v == result:
-                        cache[string] = v
-                        break
-                else:
-                    cache[string] = result
+            # Residues are stored under their canonical name, so a synonym like "NeuAc"
+            # resolves to the same instance as "Neu5Ac" with a single lookup
+            canonical = str(result)
+            try:
+                result = cache[canonical]
+            except KeyError:
+                cache[canonical] = result
+            cache[string] = result
             return result
 
     def total_composition(self):
@@ -1442,21 +1443,7 @@ class GlycanComposition(_CompositionBase, SaccharideCollection):
             self._derivatized(deriv.clone(), make_counter(uid()), include_reducing_end=False)
 
     @classmethod
-    def parse(cls, string):
-        """Parse a :class:`str` into a :class:`GlycanComposition`.
-
-        This will parse the format produced by :meth:`serialize`
-
-        Parameters
-        ----------
-        string : :class:`str`
-            The string to parse
-
-        Returns
-        -------
-        :class:`GlycanComposition`
-        """
-        tokens, reduced = cls._get_parse_tokens(string)
+    def _from_parse_tokens(cls, string, tokens, reduced, key_parser):
         inst = cls._empty()
         deriv = None
         for token in tokens:
@@ -1467,7 +1454,7 @@ class GlycanComposition(_CompositionBase, SaccharideCollection):
                     return inst
                 else:
                     raise ValueError("Malformed Token, %s" % (token,))
-            key = cls._key_parser(residue)
+            key = key_parser(residue)
             if "^" in residue:
                 _deriv = has_derivatization(key)
                 if _deriv:
@@ -1476,6 +1463,74 @@ class GlycanComposition(_CompositionBase, SaccharideCollection):
         inst._handle_reduction_and_derivatization(reduced, deriv)
         return inst
 
+    @classmethod
+    def parse(cls, string):
+        """Parse a :class:`str` into a :class:`GlycanComposition`.
+
+        This will parse the format produced by :meth:`serialize`
+
+        Parameters
+        ----------
+        string : :class:`str`
+            The string to parse
+
+        Returns
+        -------
+        :class:`GlycanComposition`
+        """
+        tokens, reduced = cls._get_parse_tokens(string)
+        return cls._from_parse_tokens(string, tokens, reduced, cls._key_parser)
+
+    @classmethod
+    def _batch_parser(cls):
+        keys = {}
+        key_parser = cls._key_parser
+
+        def parse_key(residue):
+            try:
+                key = keys[residue]
+            except KeyError:
+                key = keys[residue] = key_parser(residue)
+            # Residues may be modified in place, e.g. by :meth:`drop_stems`, so each
+            # instance gets its own copy
+            return key.clone()
+
+        def parse(string):
+            tokens, reduced = cls._get_parse_tokens(string)
+            return cls._from_parse_tokens(string, tokens, reduced, parse_key)
+        return parse
+
+    @classmethod
+    def parse_many(cls, strings, raise_errors=True):
+        """Parse many strings in the format produced by :meth:`serialize`.
+
+        Each distinct residue name is only interpreted once across all of `strings`,
+        and tokenizing uses the C implementation when it is available.
+
+        Parameters
+        ----------
+        strings : Iterable of :class:`str`
+            The strings to parse
+        raise_errors : bool, optional
+            Whether to raise the error from a string that cannot be parsed, or to
+            return :const:`None` in its place. Defaults to :const:`True`.
+
+        Returns
+        -------
+        :class:`list` of :class:`GlycanComposition`
+        """
+        parse = cls._batch_parser()
+        results = []
+        for string in strings:
+            try:
+                inst = parse(string)
+            except ValueError:
+                if raise_errors:
+                    raise
+                inst = None
+            results.append(inst)
+        return results
+
     def _derivatized(self, substituent, id_base, include_reducing_end=True):
         n = 2
         items = list(self.items())
@@ -1505,6 +1560,7 @@ class GlycanComposition(_CompositionBase, SaccharideCollection):
 
 from_glycan = GlycanComposition.from_glycan
 parse = GlycanComposition.parse
+parse_many = GlycanComposition.parse_many
 
 
 class FrozenGlycanComposition(GlycanComposition):
@@ -1538,29 +1594,55 @@ class FrozenGlycanComposition(GlycanComposition):
         _CompositionBase.__delitem__(self, key)
         self._invalidate()
 
+    # Parsed instances shared by all subclasses, keyed by class and string. Each call to
+    # :meth:`parse` receives a copy, as the counts are still mutable.
+    __parse_cache = {}
+    _parse_cache_size = 2 ** 16
+
+    @classmethod
+    def get_parse_cache(cls):
+        return cls.__parse_cache
+
     @classmethod
     def parse(cls, string):
-        tokens, reduced = cls._get_parse_tokens(string)
-        inst = cls._empty()
-        deriv = None
-        key_parser = cls._key_parser
-        for token in tokens:
-            try:
-                residue, count = _parse_name_count(token)
-            except ValueError:
-                if string == "{}":
-                    return inst
-                else:
-                    raise ValueError("Malformed Token, %s" % (token,))
-            key = key_parser(residue)
-            if "^" in residue:
-                _deriv = has_derivatization(key)
-                if _deriv:
-                    deriv = _deriv
-            inst._setitem_fast(key, count)
-        inst._handle_reduction_and_derivatization(reduced, deriv)
+        """Parse a :class:`str` into a :class:`FrozenGlycanComposition`.
+
+        The result of parsing each distinct string is remembered, so repeated strings
+        are copied from the first parse instead of being tokenized again.
+
+        Parameters
+        ----------
+        string : :class:`str`
+            The string to parse
+
+        Returns
+        -------
+        :class:`FrozenGlycanComposition`
+        """
+        string = str(string)
+        cache = cls.__parse_cache
+        try:
+            template = cache[cls, string]
+        except KeyError:
+            tokens, reduced = cls._get_parse_tokens(string)
+            template = cls._from_parse_tokens(string, tokens, reduced, cls._key_parser)
+            if len(cache) >= cls._parse_cache_size:
+                return template
+            template._validate()
+            cache[cls, string] = template
+        inst = cls.__new__(cls)
+        dict.update(inst, template)
+        inst._composition_offset = template._composition_offset.clone()
+        reduced = template._reducing_end
+        inst._reducing_end = reduced.clone() if reduced is not None else None
+        inst._mass = template._mass
+        inst._str = template._str
         return inst
 
+    @classmethod
+    def _batch_parser(cls):
+        return cls.parse
+
     def serialize(self):
         if self._str is None:
             self._str = super(FrozenGlycanComposition, self).serialize()
@@ -21,7 +21,7 @@ class Modification(ModificationBase):
     __slots__ = ('name', 'position', 'composition', 'id')
 
     def __init__(self, name, position, composition=None, id=None):
-        composition = composition or resolve_composition_rule(name)(position)
+        composition = composition or resolve_composition_rule(name)(position).clone()
         if id is None:
             id = uid()
         self.name = name
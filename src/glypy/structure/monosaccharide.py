@@ -55,7 +55,8 @@ def _get_standard_composition(monosaccharide):
     :class:`~glypy.composition.composition.Composition`:
         The baseline composition from `monosaccharide.superclass` + `monosaccharide.modifications`
     '''
-    base = monosaccharide_composition[monosaccharide.superclass.name]
+    # The table holds shared frozen compositions, so copy it before it is stored on a node
+    base = monosaccharide_composition[monosaccharide.superclass.name].clone()
     modifications = list(monosaccharide.modifications.items())
     double_bond_count = 0
     keto_group = False
@@ -1,20 +1,71 @@
-import importlib.resources
-import hjson
 import re
 
-import importlib
-
 from glypy.utils import StringIO, identity, uid
 from glypy.utils.lazy import ProxyObject
+from glypy.utils.data_cache import load_compiled
 from glypy.io import glycoct
 from glypy.structure.glycan import NamedGlycan
 
 
+DATA_PACKAGE = "glypy.structure.data"
+
+
+def _parse_structure_table(stream):
+    import hjson
+    return {k: glycoct.loads(v) for k, v in hjson.load(stream).items()}
+
+
+def _parse_motif_table(stream):
+    import hjson
+    motifs = []
+    for motif in hjson.load(stream):
+        name = motif['name']
+        motif_structure = NamedGlycan(name=name, root=glycoct.loads(motif['glycoct']).root, index_method=None)
+        motif_structure.motif_name = name
+        motif_structure.motif_class = motif['class']
+        motif_structure.motif_category = motif['category']
+        motif_structure.is_core_motif = motif["core_motif"]
+        motifs.append(motif_structure)
+    return motifs
+
+
+def _compile_resource(resource, parser):
+    def builder(data):
+        return parser(StringIO(data.decode('utf8')))
+    return load_compiled(DATA_PACKAGE, resource, builder)
+
+
+def load_structure_table(resource):
+    """Load the parsed ``name: GlycoCT`` table in the named data resource, using the
+    compiled copy from :func:`~.load_compiled` when it is up to date.
+
+    Parameters
+    ----------
+    resource : str
+        The name of the file in :mod:`glypy.structure.data`
+
+    Returns
+    -------
+    dict
+    """
+    return _compile_resource(resource, _parse_structure_table)
+
+
+def compile_data():
+    """Compile all of the named structure data files ahead of time so that the
+    first import in a new environment does not need to parse them.
+    """
+    load_structure_table("monosaccharides.hjson")
+    load_structure_table("glycans.hjson")
+    _compile_resource("motifs.hjson", _parse_motif_table)
+
+
 class StructureIndex(dict):
-    def __init__(self, stream, key_transform=identity, value_transform=identity):
-        self.update(hjson.load(stream))
-        for k, v in self.items():
-            self[key_transform(k)] = value_transform(glycoct.loads(v))
+    def __init__(self, stream=None, key_transform=identity, value_transform=identity, structures=None):
+        if structures is None:
+            structures = _parse_structure_table(stream)
+        for k, v in structures.items():
+            self[key_transform(k)] = value_transform(v)
         self.key_transform = key_transform
 
     def __getitem__(self, key):
@@ -49,9 +100,11 @@ class StructureIndex(dict):
 class MonosaccharideIndex(StructureIndex):
     def __init__(self, stream=None, key_transform=identity, value_transform=lambda x: x.root):
         if stream is None:
-            stream = importlib.resources.open_text("glypy.structure.data", "monosaccharides.hjson")
-        with stream:
-            super(MonosaccharideIndex, self).__init__(stream, key_transform, value_transform)
+            super(MonosaccharideIndex, self).__init__(
+                None, key_transform, value_transform, structures=load_structure_table("monosaccharides.hjson"))
+        else:
+            with stream:
+                super(MonosaccharideIndex, self).__init__(stream, key_transform, value_transform)
 
 
 monosaccharides = (MonosaccharideIndex)()
@@ -66,9 +119,10 @@ class MonosaccharideResidueIndex(MonosaccharideIndex):
         def value_transform(x):
             return MonosaccharideResidue.from_monosaccharide(x.root)
 
+        structures = None
         if stream is None:
-            stream = importlib.resources.open_text("glypy.structure.data", "monosaccharides.hjson")
-        super(MonosaccharideIndex, self).__init__(stream, key_transform, value_transform)
+            structures = load_structure_table("monosaccharides.hjson")
+        super(MonosaccharideIndex, self).__init__(stream, key_transform, value_transform, structures=structures)
 
 
 monosaccharide_residues = ProxyObject(MonosaccharideResidueIndex)
@@ -76,9 +130,10 @@ monosaccharide_residues = ProxyObject(MonosaccharideResidueIndex)
 
 class GlycanIndex(StructureIndex):
     def __init__(self, stream=None, key_transform=identity, value_transform=identity):
+        structures = None
         if stream is None:
-            stream = importlib.resources.open_text("glypy.structure.data", "glycans.hjson")
-        super(GlycanIndex, self).__init__(stream, key_transform, value_transform)
+            structures = load_structure_table("glycans.hjson")
+        super(GlycanIndex, self).__init__(stream, key_transform, value_transform, structures=structures)
 
 
 glycans = ProxyObject(GlycanIndex)
@@ -87,23 +142,16 @@ glycans = ProxyObject(GlycanIndex)
 class MotifIndex(StructureIndex):
     def __init__(self, stream=None, key_transform=identity, value_transform=identity):
         if stream is None:
-            stream = importlib.resources.open_text("glypy.structure.data", "motifs.hjson")
-        with stream:
-            data = hjson.load(stream)
+            data = _compile_resource("motifs.hjson", _parse_motif_table)
+        else:
+            with stream:
+                data = _parse_motif_table(stream)
         motif_classes = set()
         motif_categories = set()
-        for motif in data:
-            name = motif['name']
-            motif_class = motif['class']
-            motif_category = motif['category']
-            motif_structure = NamedGlycan(name=name, root=glycoct.loads(motif['glycoct']).root, index_method=None)
-            motif_structure.motif_name = name
-            motif_structure.motif_class = motif_class
-            motif_structure.motif_category = motif_category
-            motif_structure.is_core_motif = motif["core_motif"]
-            self[name] = motif_structure
-            motif_classes.add(motif_class)
-            motif_categories.add(motif_category)
+        for motif_structure in data:
+            self[motif_structure.motif_name] = motif_structure
+            motif_classes.add(motif_structure.motif_class)
+            motif_categories.add(motif_structure.motif_category)
         self._category_map = {}
         self._class_map = {}
         self.motif_classes = motif_classes
@@ -181,7 +181,8 @@ class Substituent(SubstituentBase):
         self.name = name
         self.links = links
         if composition is None:
-            composition = substituent_compositions[self._name]
+            # The table holds shared frozen compositions, so copy it for this node
+            composition = substituent_compositions[self._name].clone()
         elif composition is not None and not is_registered(self._name):
             self.register(
                 name, composition, can_nh_derivatize=can_nh_derivatize,
@@ -8,10 +8,10 @@ import pickle
 from collections import defaultdict
 from io import StringIO
 
-try:  # pragma: no cover
-    from lxml import etree as ET
-except ImportError:  # pragma: no cover
-    from xml.etree import ElementTree as ET
+from .lazy import LazyModule
+
+# Prefer lxml, but only import an XML library when it is first used
+ET = LazyModule("lxml.etree", "xml.etree.ElementTree")
 
 from typing import (List, Type, Optional, Protocol, TYPE_CHECKING,
                     Iterable, TypeVar, DefaultDict, Hashable,
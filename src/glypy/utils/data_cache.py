@@ -0,0 +1,169 @@
+'''A persistent cache of objects compiled from package data files.
+
+Several of :mod:`glypy`'s reference tables are stored as text, like the
+:title-reference:`hjson` files behind :mod:`glypy.structure.named_structures`,
+and must be parsed into object graphs before use. Doing so on every interpreter
+start dominates the import time of short-lived processes. :func:`load_compiled`
+stores the parsed result as a pickle keyed by a digest of the source data and
+the :mod:`glypy` version, so that later processes can load it directly.
+
+The cache directory is taken from the ``GLYPY_CACHE_DIR`` environment variable,
+falling back to ``$XDG_CACHE_HOME/glypy`` or ``~/.cache/glypy``. Setting
+``GLYPY_NO_DATA_CACHE`` disables the cache entirely. Failing to read or write
+the cache is never an error, the data is just parsed from source instead.
+'''
+import hashlib
+import importlib.resources
+import logging
+import os
+import pickle
+import tempfile
+
+from typing import Any, Callable, Optional
+
+from glypy.version import version
+
+
+logger = logging.getLogger(__name__)
+
+#: Incremented whenever the layout of compiled entries changes
+CACHE_FORMAT_VERSION = 1
+
+
+def cache_directory() -> str:
+    '''Locate the directory compiled data is stored in.
+
+    Returns
+    -------
+    str
+    '''
+    path = os.environ.get("GLYPY_CACHE_DIR")
+    if path:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "glypy")
+
+
+def cache_enabled() -> bool:
+    return not os.environ.get("GLYPY_NO_DATA_CACHE")
+
+
+def source_digest(data: bytes) -> str:
+    '''Compute the key identifying the compiled form of `data` for this version of
+    :mod:`glypy`.
+
+    Parameters
+    ----------
+    data : bytes
+        The source data
+
+    Returns
+    -------
+    str
+    '''
+    hasher = hashlib.sha256()
+    hasher.update(("%s:%d:" % (version, CACHE_FORMAT_VERSION)).encode('utf8'))
+    hasher.update(data)
+    return hasher.hexdigest()
+
+
+def _cache_path(name: str, directory: Optional[str] = None) -> str:
+    if directory is None:
+        directory = cache_directory()
+    return os.path.join(directory, "%s.pkl" % (name, ))
+
+
+def read_compiled(name: str, digest: str, directory: Optional[str] = None) -> Any:
+    '''Read the compiled entry `name` if it exists and was compiled from data
+    with the same `digest`.
+
+    Returns
+    -------
+    object or :const:`None`
+    '''
+    path = _cache_path(name, directory)
+    try:
+        with open(path, 'rb') as fh:
+            stored_digest = pickle.load(fh)
+            if stored_digest != digest:
+                logger.debug("Compiled data %r is stale", path)
+                return None
+            return pickle.load(fh)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as err:
+        logger.debug("Could not read compiled data %r: %r", path, err)
+        return None
+    except Exception as err:
+        # A corrupt or foreign pickle can fail in many other ways, none of which
+        # should stop the data being parsed from source
+        logger.warning("Could not read compiled data %r: %r", path, err)
+        return None
+
+
+def write_compiled(name: str, digest: str, payload: Any, directory: Optional[str] = None) -> bool:
+    '''Store `payload` as the compiled entry `name` for data with `digest`.
+
+    The entry is written to a temporary file and moved into place so that
+    concurrent readers never observe a partial entry.
+
+    Returns
+    -------
+    bool :
+        Whether the entry was written
+    '''
+    path = _cache_path(name, directory)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=name, suffix=".tmp")
+        try:
+            with os.fdopen(handle, 'wb') as fh:
+                pickle.dump(digest, fh, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(payload, fh, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return True
+    except (OSError, pickle.PicklingError) as err:
+        logger.debug("Could not write compiled data %r: %r", path, err)
+        return False
+
+
+def read_resource(package: str, resource: str) -> bytes:
+    try:
+        files = importlib.resources.files
+    except AttributeError:  # pragma: no cover
+        return importlib.resources.read_binary(package, resource)
+    return files(package).joinpath(resource).read_bytes()
+
+
+def load_compiled(package: str, resource: str, builder: Callable[[bytes], Any],
+                  directory: Optional[str] = None) -> Any:
+    '''Load the object compiled from package resource `resource`, compiling and
+    storing it with `builder` if it is missing or out of date.
+
+    Parameters
+    ----------
+    package : str
+        The package containing the resource
+    resource : str
+        The name of the resource file
+    builder : Callable
+        A function which takes the resource content as :class:`bytes` and returns
+        a picklable object
+    directory : str, optional
+        The cache directory, defaulting to :func:`cache_directory`
+
+    Returns
+    -------
+    object
+    '''
+    data = read_resource(package, resource)
+    if not cache_enabled():
+        return builder(data)
+    digest = source_digest(data)
+    name = "%s.%s" % (package, resource)
+    payload = read_compiled(name, digest, directory)
+    if payload is None:
+        payload = builder(data)
+        write_compiled(name, digest, payload, directory)
+    return payload
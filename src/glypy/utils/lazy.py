@@ -1,3 +1,5 @@
+import importlib
+import sys
 
 oget = object.__getattribute__
 oset = object.__setattr__
@@ -65,3 +67,82 @@ class ProxyObject(object):
         if self._source is None:
             self._prepare()
         return dir(self._source)
+
+
+class LazyModule(object):
+    '''A lazy module proxy.
+
+    Defers importing a module until one of its attributes is requested. If several
+    module names are given, the first one which can be imported is used, allowing
+    an optional dependency to fall back to an alternative.
+    '''
+    def __init__(self, *names):
+        oset(self, "_names", names)
+        oset(self, "_module", None)
+
+    def _load(self):
+        module = oget(self, "_module")
+        if module is not None:
+            return module
+        names = oget(self, "_names")
+        for name in names[:-1]:
+            try:
+                module = importlib.import_module(name)
+                break
+            except ImportError:
+                continue
+        else:
+            module = importlib.import_module(names[-1])
+        oset(self, "_module", module)
+        return module
+
+    def __getattribute__(self, name):
+        return getattr(oget(self, "_load")(), name)
+
+    def __dir__(self):  # pragma: no cover
+        return dir(oget(self, "_load")())
+
+    def __repr__(self):  # pragma: no cover
+        module = oget(self, "_module")
+        if module is None:
+            return "<LazyModule {}>".format(oget(self, "_names")[0])
+        return "<LazyModule {!r}>".format(module)
+
+
+def lazy_attributes(package_name, submodules=(), attributes=None):
+    '''Build a module-level ``__getattr__`` and ``__dir__`` (:pep:`562`) pair which
+    import `submodules` and the modules defining `attributes` of the package
+    named `package_name` only when they are first requested.
+
+    Parameters
+    ----------
+    package_name : str
+        The ``__name__`` of the package
+    submodules : Iterable of str
+        The names of submodules which are imported on first access
+    attributes : dict, optional
+        Maps attribute names to the name of the submodule defining them
+
+    Returns
+    -------
+    __getattr__ : Callable
+    __dir__ : Callable
+    '''
+    submodules = frozenset(submodules)
+    attributes = dict(attributes or {})
+
+    def __getattr__(name):
+        if name in submodules:
+            return importlib.import_module("." + name, package_name)
+        try:
+            source = attributes[name]
+        except KeyError:
+            raise AttributeError("module {!r} has no attribute {!r}".format(package_name, name))
+        value = getattr(importlib.import_module("." + source, package_name), name)
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package_name])) | submodules | set(attributes))
+
+    return __getattr__, __dir__
@@ -1,3 +1,10 @@
+import threading
+import time
+
+from email.utils import parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
 import glypy
 from glypy.structure import constants, substituent, glycan
 from glypy.structure import link, named_structures, structure_composition
@@ -14,6 +21,71 @@ def emit(arg):
     return arg
 
 
+class StandInServer(ThreadingHTTPServer):
+    """A local HTTP server answering requests from a table of routes"""
+
+    daemon_threads = True
+
+    def __init__(self, routes, delay=0.0):
+        self.routes = routes
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.requests = []
+        self.request_headers = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        ThreadingHTTPServer.__init__(self, ("127.0.0.1", 0), StandInHandler)
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d" % self.server_address[1]
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        parsed = urlparse(self.path)
+        with server.lock:
+            server.requests.append(self.path)
+            server.request_headers.append(dict(self.headers))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            route = server.routes.get(parsed.path)
+            headers = {}
+            if route is None:
+                status, body = 404, b"not found"
+            else:
+                status, body, *rest = route(parse_qs(parsed.query))
+                if rest:
+                    headers = rest[0]
+            # Answer conditional requests like a static file server
+            last_modified = headers.get("Last-Modified")
+            since = self.headers.get("If-Modified-Since")
+            if status == 200 and last_modified and since and (
+                    parsedate_to_datetime(since) >= parsedate_to_datetime(last_modified)):
+                status, body = 304, b""
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, *args):
+        pass
+
+
 def load(name):
     structure_composition.do_warn = False
     res = glycoct.loads(structures[name])
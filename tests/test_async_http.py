@@ -0,0 +1,114 @@
+import json
+import unittest
+import warnings
+
+import glypy
+from glypy.io import glycoct, glyconnect
+from glypy.io.async_http import AsyncHTTPClient, collect, run_sync
+
+from .common import StandInServer
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from glypy.io import glycomedb
+
+
+class AsyncHTTPClientTest(unittest.TestCase):
+    def test_retry(self):
+        attempts = []
+
+        def flaky(query):
+            attempts.append(1)
+            if len(attempts) < 3:
+                return 503, b"busy"
+            return 200, b"done"
+
+        server = StandInServer({"/flaky": flaky})
+        try:
+            with AsyncHTTPClient(max_retries=3, backoff=0.01) as client:
+                response = run_sync(client.get(server.url + "/flaky"))
+            self.assertEqual(response.text, "done")
+            self.assertEqual(len(attempts), 3)
+
+            attempts.clear()
+            with AsyncHTTPClient(max_retries=1, backoff=0.01) as client:
+                with self.assertRaises(glyconnect.requests.HTTPError):
+                    run_sync(client.get(server.url + "/flaky"))
+            self.assertEqual(len(attempts), 2)
+        finally:
+            server.stop()
+
+    def test_stream_concurrency(self):
+        server = StandInServer({"/item": lambda query: (200, query['i'][0].encode('utf8'))}, delay=0.05)
+        try:
+            with AsyncHTTPClient(concurrency=3) as client:
+                async def fetch(i):
+                    return int((await client.get(server.url + "/item", params={"i": i})).text)
+
+                async def run():
+                    return [result async for result in client.stream(range(12), fetch)]
+
+                results = run_sync(run())
+            self.assertEqual(sorted(r.value for r in results), list(range(12)))
+            self.assertTrue(all(r.key == r.value for r in results))
+            self.assertLessEqual(server.max_in_flight, 3)
+            self.assertGreater(server.max_in_flight, 1)
+        finally:
+            server.stop()
+
+    def test_stream_errors(self):
+        server = StandInServer({})
+        try:
+            with AsyncHTTPClient(max_retries=0) as client:
+                results = run_sync(collect(client.stream(
+                    ["a", "b"], lambda key: client.get(server.url + "/" + key), raise_errors=False)))
+            self.assertEqual(set(results), {"a", "b"})
+            self.assertFalse(any(r.ok for r in results.values()))
+        finally:
+            server.stop()
+
+
+class ClientModuleTest(unittest.TestCase):
+    def test_glycomedb_get_many(self):
+        names = {"1": "N-Linked Core", "2": "High-Mannose Precursor"}
+
+        def show(query):
+            structure = glypy.glycans[names[query["glycomeId"][0]]]
+            body = "<structure><condenced>%s</condenced></structure>" % glycoct.dumps(structure)
+            return 200, body.encode('utf8')
+
+        server = StandInServer({"/showStructure": show})
+        template = glycomedb.get_url_template
+        glycomedb.get_url_template = server.url + "/showStructure?glycomeId={id}"
+        try:
+            structures = glycomedb.get_many([2, 1, 2], concurrency=2)
+            self.assertEqual(structures[0], glypy.glycans["High-Mannose Precursor"])
+            self.assertEqual(structures[1], glypy.glycans["N-Linked Core"])
+            self.assertEqual(structures[2], structures[0])
+        finally:
+            glycomedb.get_url_template = template
+            server.stop()
+
+    def test_compozitor(self):
+        def glycosylations(query):
+            return 200, json.dumps({"results": [], "query": query}).encode('utf8')
+
+        routes = {"/glycosylations": glycosylations}
+        for path in ("/proteins-all", "/sources-all", "/cell_lines-all", "/diseases-all"):
+            routes[path] = lambda query: (200, b"[]")
+        server = StandInServer(routes)
+        try:
+            client = glyconnect.Compozitor(api_server=server.url)
+            results = client.query_many([{"taxonomy": "Homo sapiens"}, {"protein": "P02763"}])
+            self.assertEqual(results, [[], []])
+            client.load_collections()
+            self.assertEqual(len(client._cache), 4)
+            n = len(server.requests)
+            self.assertEqual(client.proteins, [])
+            self.assertEqual(len(server.requests), n)
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
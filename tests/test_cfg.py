@@ -0,0 +1,40 @@
+import unittest
+
+from glypy.io import cfg, glycoct
+
+
+class CFGTests(unittest.TestCase):
+    def test_parse(self):
+        structure = cfg.loads("Neu5Aca2-3Galb1-4(Fuca1-3)(6S)GlcNAcb-Sp0")
+        self.assertEqual(len(structure), 4)
+        self.assertEqual(structure.root.substituents()[0][1].name, "sulfate")
+        structure = cfg.loads("Galb1-4GlcNAcb1-2Mana1-3(Galb1-4GlcNAcb1-2Mana1-6)Manb1-4GlcNAcb1-4GlcNAcb-Sp8")
+        self.assertEqual(len(structure), 9)
+        self.assertEqual(len(list(structure.leaves())), 2)
+        with self.assertRaises(cfg.CFGError):
+            cfg.loads("Galb1-4(GlcNAcb-Sp8")
+
+    def test_many(self):
+        seqs = ["Gala1-3Galb1-4GlcNAcb-Sp8", "Fuca1-2Galb1-3GalNAca-Sp8", "Gala1-3Galb1-4GlcNAcb-Sp8"]
+        cfg.residue_cache.clear()
+        structures = cfg.loads_many(seqs)
+        self.assertEqual(structures[0], structures[2])
+        self.assertIsNot(structures[0].root, structures[2].root)
+        stats = cfg.residue_cache.stats()
+        self.assertEqual(stats["residues"], 5)
+        self.assertEqual(stats["hits"] + stats["misses"], 18)
+        cache = cfg.ResidueCache()
+        parser = cfg.MonosaccharideDeserializer(cache=cache)
+        token = parser.tokenize("Galb1-4")[0]
+        a, _ = parser.monosaccharide_from_token(token)
+        b, _ = parser.monosaccharide_from_token(token)
+        self.assertIsNot(a, b)
+        self.assertEqual(a, b)
+        self.assertEqual(cache.stats(), {"residues": 1, "linkages": 1, "hits": 2, "misses": 2})
+        self.assertEqual(glycoct.dumps(structures[1]), glycoct.dumps(cfg.loads(seqs[1])))
+        self.assertEqual(cfg.loads_many(["Galb1-4X!b-Sp8", seqs[1]], raise_errors=False),
+                         [None, structures[1]])
+
+
+if __name__ == '__main__':
+    unittest.main()
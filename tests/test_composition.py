@@ -1,8 +1,10 @@
 import pickle
 import unittest
 
-from glypy.composition import composition, composition_transform
+from glypy.composition import composition, composition_transform, formula_parser, mass_dict
 from glypy.structure import monosaccharide
+from glypy.structure.modification import Modification
+import glypy
 
 from .common import load
 
@@ -91,6 +93,36 @@ def make_composition_suite(composition_type):
             self.assertEqual(comp, {'H[1]': 2, 'O[16]': 1})
             self.assertAlmostEqual(probability, 0.997, 3)
 
+        def test_formula_cache(self):
+            cache = formula_parser.formula_cache
+            case = composition_type("C2H5(C[13]H2)3OH")
+            hits = cache.hits
+            again = composition_type("C2H5(C[13]H2)3OH")
+            self.assertEqual(cache.hits, hits + 1)
+            self.assertEqual(case, again)
+            self.assertEqual(case, composition_type({"C": 2, "C[13]": 3, "H": 12, "O": 1}))
+            again["O"] += 1
+            self.assertEqual(composition_type("C2H5(C[13]H2)3OH")["O"], 1)
+
+            mass_data = dict(mass_dict.nist_mass)
+            mass_data["Hex"] = {0: (162.0528, 1.0)}
+            mass_data["He"] = mass_dict.nist_mass["He"]
+            case = composition_type("(Hex)2(He)", mass_data=mass_data)
+            self.assertEqual(case, composition_type({"Hex": 2, "He": 1}))
+            self.assertRaises(
+                composition.ChemicalCompositionError, lambda: composition_type("(Hex)2"))
+
+        def test_from_formula_adds(self):
+            case = composition_type("H2O")
+            mass = case.mass
+            case._from_formula("H2", mass_dict.nist_mass)
+            self.assertEqual(case, composition_type("H4O"))
+            self.assertAlmostEqual(case.mass, mass + 2 * mass_dict.nist_mass["H"][0][0], 6)
+            case._from_formula("(O[18])2H-4", mass_dict.nist_mass)
+            self.assertEqual(case, composition_type({"O": 1, "O[18]": 2}))
+            case._from_formula_parens("(H)2", mass_dict.nist_mass)
+            self.assertEqual(case, composition_type("H2OO[18]2"))
+
     return CompositionTests
 
 
@@ -102,5 +134,90 @@ try:
 except ImportError:
     pass
 
+
+class FrozenCompositionTest(unittest.TestCase):
+    def test_frozen(self):
+        frozen = composition.FrozenComposition("H2O")
+        self.assertEqual(frozen, composition.Composition("H2O"))
+        self.assertEqual(hash(frozen), hash(composition.FrozenComposition({"H": 2, "O": 1, "N": 0})))
+        self.assertAlmostEqual(frozen.mass, 18.0105, 3)
+        self.assertAlmostEqual(frozen.calc_mass(charge=1), 19.01784, 3)
+        self.assertAlmostEqual(composition.calculate_mass(frozen, charge=1), 19.01784, 3)
+        self.assertRaises(TypeError, frozen.__setitem__, "H", 3)
+        self.assertRaises(TypeError, frozen.update, {"H": 3})
+        self.assertRaises(TypeError, frozen.pop, "H")
+
+        case = frozen
+        case += {"O": 1}
+        self.assertEqual(case, composition.Composition("H2O2"))
+        self.assertNotIsInstance(case, composition.FrozenComposition)
+        self.assertEqual(frozen, composition.Composition("H2O"))
+        self.assertNotIsInstance(frozen * 2, composition.FrozenComposition)
+        self.assertNotIsInstance(frozen.clone(), composition.FrozenComposition)
+        self.assertIsInstance(frozen.multiply(2), composition.FrozenComposition)
+        self.assertNotIsInstance(frozen.subtract({"O": 1}, frozen=False), composition.FrozenComposition)
+
+        restored = pickle.loads(pickle.dumps(frozen))
+        self.assertIsInstance(restored, composition.FrozenComposition)
+        self.assertEqual(restored, frozen)
+
+    def test_intern(self):
+        cache = composition.FrozenCompositionCache()
+        first = cache.intern("H2O")
+        self.assertIs(cache.intern(composition.Composition("H2O")), first)
+        self.assertIs(cache.intern(composition.FrozenComposition("OH2")), first)
+        self.assertEqual(cache.stats(), {"compositions": 1, "hits": 2, "misses": 1})
+        self.assertEqual({first: 1}[composition.FrozenComposition("H2O")], 1)
+        self.assertIs(composition.FrozenComposition.intern("H4O2"), composition.FrozenComposition.intern("H2O").add(first))
+
+    def test_composition_tables(self):
+        from glypy.composition.structure_composition import (
+            monosaccharide_composition, modification_compositions, substituent_compositions)
+        self.assertIs(monosaccharide_composition["hex"], monosaccharide_composition["hex"])
+        self.assertIsInstance(substituent_compositions["n_acetyl"], composition.FrozenComposition)
+        self.assertIs(modification_compositions["d"](2), modification_compositions["d"](2))
+        self.assertEqual(modification_compositions["keto"](2), composition.Composition({"H": -2}))
+
+        # Nodes built from the tables own mutable copies
+        hexose = glypy.monosaccharides.Hex
+        hexose.composition["H"] -= 1
+        self.assertEqual(hexose.composition["H"], 11)
+        self.assertEqual(monosaccharide_composition["hex"]["H"], 12)
+        substituent = glypy.Substituent("n_acetyl")
+        substituent.composition["H"] += 1
+        self.assertEqual(glypy.Substituent("n_acetyl").composition, substituent_compositions["n_acetyl"])
+        self.assertNotIsInstance(Modification("d", 2).composition, composition.FrozenComposition)
+
+    def test_mass_data_identity(self):
+        for case in (composition.FrozenComposition("H2O"), composition.Composition("H2O")):
+            expected = []
+            for mass in (1.0, 2.0):
+                # Each dict is released before the next is built, so the second is
+                # likely to reuse the id of the first. The cached mass must not be
+                # returned for it.
+                mass_data = dict(mass_dict.nist_mass)
+                mass_data["H"] = {0: (mass, 1.0), 1: (mass, 1.0)}
+                expected.append(case.calc_mass(mass_data=mass_data))
+                del mass_data
+            oxygen = mass_dict.nist_mass["O"][0][0]
+            self.assertEqual(expected, [2.0 + oxygen, 4.0 + oxygen])
+
+    def test_frozen_fill_methods(self):
+        frozen = composition.FrozenComposition("H2O")
+        self.assertRaises(TypeError, frozen._from_dict, {"H": 3})
+        self.assertRaises(TypeError, frozen._from_formula, "H3", mass_dict.nist_mass)
+        self.assertRaises(TypeError, frozen._from_formula_parens, "(H3)", mass_dict.nist_mass)
+        self.assertRaises(TypeError, frozen.__delitem__, "H")
+        for method in (frozen.clear, frozen.popitem):
+            self.assertRaises(TypeError, method)
+        self.assertRaises(TypeError, frozen.setdefault, "N", 1)
+        case = frozen
+        case -= {"H": 2}
+        case *= 2
+        self.assertEqual(case, composition.Composition("O2"))
+        self.assertEqual(frozen, composition.Composition("H2O"))
+        self.assertEqual(hash(frozen), hash(composition.FrozenComposition("H2O")))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+
+from glypy.io import byonic, glyconnect
+from glypy.io.composition_cache import CompositionCache
+from glypy.structure.glycan_composition import HashableGlycanComposition
+
+
+class CompositionCacheTest(unittest.TestCase):
+    def test_byonic(self):
+        cache = CompositionCache(byonic.composition_cache.parser, byonic.dumps)
+        texts = ["HexNAc(4)Hex(5)NeuAc(2)", "HexNAc(2)Hex(9)", "HexNAc(4)Hex(5)NeuAc(2)"]
+        compositions = byonic.loads_many(texts, cache=cache)
+        self.assertIs(compositions[0], compositions[2])
+        self.assertIsInstance(compositions[1], HashableGlycanComposition)
+        self.assertEqual(compositions[1], HashableGlycanComposition.parse("{HexNAc:2; Hex:9}"))
+        self.assertEqual(compositions[0], byonic.loads(texts[0]))
+        self.assertEqual(cache.stats(), {"compositions": 2, "texts": 0, "hits": 1, "misses": 2})
+
+        self.assertEqual(byonic.dumps_many(compositions, cache=cache), texts)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(len(cache), 4)
+
+        with self.assertRaises(KeyError):
+            byonic.loads_many(["Hex(5)Foo(1)"], cache=cache)
+        self.assertEqual(byonic.loads_many(["Hex(5)Foo(1)", texts[1]], cache=cache, raise_errors=False),
+                         [None, compositions[1]])
+        cache.clear()
+        self.assertEqual(cache.stats(), {"compositions": 0, "texts": 0, "hits": 0, "misses": 0})
+
+    def test_glyconnect(self):
+        texts = ["Hex:5 HexNAc:4 NeuAc:2", "Hex5HexNAc4NeuAc2", "Hex:3 HexNAc:2"] * 3
+        compositions = glyconnect.loads_many(texts)
+        self.assertEqual(compositions[0], compositions[1])
+        self.assertIs(compositions[0], compositions[3])
+        parsed = glyconnect.parse_composition(texts[2])
+        self.assertEqual(parsed, compositions[2])
+        self.assertIsNot(parsed, compositions[2])
+        self.assertEqual(glyconnect.dumps_many(compositions[:3]),
+                         ["Hex:5 HexNAc:4 NeuAc:2", "Hex:5 HexNAc:4 NeuAc:2", "Hex:3 HexNAc:2"])
+
+    def test_maxsize(self):
+        cache = CompositionCache(glyconnect.composition_cache.parser, glyconnect.dumps, maxsize=1)
+        a, b = cache.parse_many(["Hex:3 HexNAc:2", "Hex:5 HexNAc:2"])
+        self.assertIs(cache.parse("Hex:3 HexNAc:2"), a)
+        self.assertIsNot(cache.parse("Hex:5 HexNAc:2"), b)
+        self.assertEqual(cache.parse("Hex:5 HexNAc:2"), b)
+        self.assertEqual(len(cache.compositions), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import glypy
+from glypy.composition import Composition, calculate_mass
+from glypy.composition.composition_transform import derivatize
+from glypy.composition.mass_dict import nist_mass
+
+try:
+    from glypy.composition.composition_matrix import CompositionMatrix, GlycanCompositionMatrix
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+@unittest.skipIf(np is None, "Requires numpy")
+class CompositionMatrixTest(unittest.TestCase):
+    def test_composition_matrix(self):
+        compositions = [Composition("C6H12O6"), Composition("C[13]6H12O6"), Composition("C34H53N2O15")]
+        matrix = CompositionMatrix.from_compositions(compositions + ["H2O"])
+        self.assertEqual(len(matrix), 4)
+        self.assertEqual(matrix.to_compositions()[:3], compositions)
+        self.assertEqual(matrix[3], Composition("H2O"))
+        self.assertEqual(len(matrix[1:]), 3)
+        for average in (False, True):
+            expected = [calculate_mass(c, average=average) for c in compositions]
+            self.assertTrue(np.allclose(matrix.mass(average=average)[:3], expected))
+        mz = matrix.mass(charge=[0, 2, -1])
+        self.assertEqual(mz.shape, (4, 3))
+        self.assertTrue(np.allclose(mz[:3, 1], [calculate_mass(c, charge=2) for c in compositions]))
+        self.assertTrue(np.allclose(mz[:3, 2], [calculate_mass(c, charge=-1) for c in compositions]))
+        self.assertTrue(np.allclose(mz[:, 0], matrix.mass()))
+
+        mass_data = dict(nist_mass)
+        mass_data["C"] = {0: (12.5, 1.0), 12: (12.5, 1.0)}
+        matrix = CompositionMatrix.from_compositions([compositions[0]])
+        self.assertAlmostEqual(matrix.mass(mass_data=mass_data)[0], calculate_mass(compositions[0], mass_data=mass_data))
+        self.assertNotAlmostEqual(matrix.mass()[0], matrix.mass(mass_data=mass_data)[0])
+
+    def test_glycan_composition_matrix(self):
+        compositions = [glypy.GlycanComposition.parse(text) for text in [
+            "{Hex:5; HexNAc:4; Neu5Ac:2}", "{Hex:9; HexNAc:2}", "{Fuc:1; Hex:3; HexNAc:4}$C1H4"]]
+        compositions.append(derivatize(compositions[0].clone(), "methyl"))
+        matrix = GlycanCompositionMatrix.from_glycan_compositions(compositions)
+        self.assertEqual(len(matrix), 4)
+        self.assertTrue(np.allclose(matrix.mass(), [c.mass() for c in compositions]))
+        self.assertTrue(np.allclose(matrix.mass(average=True, charge=-2),
+                                    [c.total_composition().calc_mass(average=True, charge=-2) for c in compositions]))
+        self.assertEqual(matrix.to_glycan_compositions(), compositions)
+        self.assertEqual(matrix[2].reducing_end, compositions[2].reducing_end)
+        self.assertTrue(np.allclose(matrix.element_matrix().mass(), matrix.mass()))
+        self.assertEqual(matrix.element_matrix().to_compositions(), [c.total_composition() for c in compositions])
+        self.assertTrue(np.allclose(matrix[[0, 3]].mass(), matrix.mass()[[0, 3]]))
+
+    def test_empty(self):
+        matrix = CompositionMatrix.from_compositions([])
+        self.assertEqual(len(matrix), 0)
+        self.assertEqual(matrix.mass().shape, (0,))
+        self.assertEqual(matrix.mass(charge=[1, 2]).shape, (0, 2))
+        matrix = CompositionMatrix.from_compositions([{}, Composition()])
+        self.assertEqual(len(matrix), 2)
+        self.assertTrue(np.allclose(matrix.mass(), [0, 0]))
+        self.assertEqual(len(matrix[1:]), 1)
+
+        matrix = GlycanCompositionMatrix.from_glycan_compositions([])
+        self.assertEqual(len(matrix), 0)
+        self.assertEqual(matrix.mass().shape, (0,))
+        self.assertEqual(matrix.to_glycan_compositions(), [])
+
+        empty = glypy.GlycanComposition()
+        matrix = GlycanCompositionMatrix.from_glycan_compositions([empty])
+        self.assertEqual(len(matrix), 1)
+        self.assertAlmostEqual(matrix.mass()[0], empty.mass())
+        self.assertAlmostEqual(matrix.mass(charge=2)[0], empty.total_composition().calc_mass(charge=2))
+        self.assertEqual(matrix.to_glycan_compositions(), [empty])
+        self.assertEqual(matrix.element_matrix().to_compositions(), [empty.total_composition()])
+
+
+if __name__ == '__main__':
+    unittest.main()
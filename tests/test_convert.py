@@ -0,0 +1,59 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+import glypy
+from glypy import convert
+from glypy.io import glycoct, wurcs
+from glypy.utils import StringIO
+
+
+class ConvertTest(unittest.TestCase):
+    def setUp(self):
+        self.structures = list(glypy.glycans.values())[:3]
+
+    def glycoct_text(self, structures):
+        return ''.join(glycoct.dumps(s) + '\n\n' for s in structures)
+
+    def test_glycoct_records(self):
+        records = list(convert.iter_records(StringIO(self.glycoct_text(self.structures)), 'glycoct'))
+        self.assertEqual(len(records), 3)
+        for record, structure in zip(records, self.structures):
+            self.assertEqual(glycoct.loads(record.payload), structure)
+
+    def test_convert_with_dedup(self):
+        text = self.glycoct_text(self.structures + self.structures[:2])
+        output = StringIO()
+        summary = convert.convert(StringIO(text), output, 'glycoct', 'wurcs', dedup=True)
+        self.assertEqual(summary.total, 5)
+        self.assertEqual(summary.converted, 3)
+        self.assertEqual(summary.duplicates, 2)
+        lines = output.getvalue().splitlines()
+        self.assertEqual([wurcs.loads(line) for line in lines], self.structures)
+
+    def test_failures_and_identifiers(self):
+        text = "a\t%s\nb\tWURCS=garbage\n" % (wurcs.dumps(self.structures[0]), )
+        output = StringIO()
+        summary = convert.convert(StringIO(text), output, 'wurcs', 'glycoct')
+        self.assertEqual(summary.converted, 1)
+        self.assertEqual(len(summary.failures), 1)
+        self.assertEqual(summary.failures[0].identifier, 'b')
+        self.assertEqual(glycoct.loads(output.getvalue()), self.structures[0])
+
+    def test_gzip_and_processes(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        source = os.path.join(tmpdir, "structures.glycoct")
+        dest = os.path.join(tmpdir, "structures.wurcs.gz")
+        with gzip.open(source, 'wt') as fh:
+            fh.write(self.glycoct_text(self.structures))
+        self.assertEqual(convert.main([source, dest, "-f", "glycoct", "-t", "wurcs", "-p", "2"]), 0)
+        with gzip.open(dest, 'rt') as fh:
+            lines = fh.read().splitlines()
+        self.assertEqual([wurcs.loads(line) for line in lines], self.structures)
+
+
+if __name__ == '__main__':
+    unittest.main()
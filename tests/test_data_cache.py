@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from glypy.utils import data_cache
+from glypy.structure import named_structures
+
+
+class Unloadable(object):
+    # Unpickling calls int("corrupt"), which raises ValueError
+    def __reduce__(self):
+        return (int, ("corrupt", ))
+
+
+class DataCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.calls = 0
+
+    def builder(self, data):
+        self.calls += 1
+        return data.decode('utf8').splitlines()[:3]
+
+    def test_compile_once(self):
+        first = data_cache.load_compiled(
+            named_structures.DATA_PACKAGE, "glycans.hjson", self.builder, directory=self.directory)
+        second = data_cache.load_compiled(
+            named_structures.DATA_PACKAGE, "glycans.hjson", self.builder, directory=self.directory)
+        self.assertEqual(first, second)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    def test_stale_entry(self):
+        data_cache.write_compiled("entry", "a", [1, 2], directory=self.directory)
+        self.assertEqual(data_cache.read_compiled("entry", "a", directory=self.directory), [1, 2])
+        self.assertIsNone(data_cache.read_compiled("entry", "b", directory=self.directory))
+        self.assertIsNone(data_cache.read_compiled("missing", "a", directory=self.directory))
+
+    def test_corrupt_entry(self):
+        data_cache.write_compiled("entry", "a", Unloadable(), directory=self.directory)
+        with self.assertLogs(data_cache.logger, "WARNING"):
+            self.assertIsNone(data_cache.read_compiled("entry", "a", directory=self.directory))
+
+    def test_compiled_structures_match_source(self):
+        data_dir = os.path.join(os.path.dirname(named_structures.__file__), "data")
+        with mock.patch.dict(os.environ, {"GLYPY_CACHE_DIR": self.directory}):
+            # The first index compiles the data into the cache, the second reads it back
+            named_structures.MonosaccharideIndex()
+            compiled = named_structures.MonosaccharideIndex()
+        with open(os.path.join(data_dir, "monosaccharides.hjson")) as stream:
+            parsed = named_structures.MonosaccharideIndex(stream)
+        self.assertEqual(set(compiled), set(parsed))
+        for key in parsed:
+            self.assertEqual(compiled[key], parsed[key])
+        with mock.patch.dict(os.environ, {"GLYPY_CACHE_DIR": self.directory}):
+            named_structures.MotifIndex()
+            compiled = named_structures.MotifIndex()
+        with open(os.path.join(data_dir, "motifs.hjson")) as stream:
+            parsed = named_structures.MotifIndex(stream)
+        self.assertEqual(compiled.motif_classes, parsed.motif_classes)
+        for key in parsed:
+            self.assertEqual(compiled[key], parsed[key])
+            self.assertEqual(dict.__getitem__(compiled, key).motif_category,
+                             dict.__getitem__(parsed, key).motif_category)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+
+if __name__ == '__main__':
+    unittest.main()
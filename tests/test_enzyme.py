@@ -1,9 +1,20 @@
+import io
+import os
+import shutil
+import tempfile
 import unittest
+from unittest import mock
 
 import glypy
-from glypy.io import iupac
+from glypy.io import iupac, glycoct
+from glypy.algorithms import structure_key, DistinctGlycanSet, HashedGlycanSet
 from glypy.enzyme import (
-    MultiprocessingGlycome, make_n_glycan_pathway, EnzymeGraph)
+    Glycome, MultiprocessingGlycome, make_n_glycan_pathway, make_mucin_type_o_glycan_pathway, EnzymeGraph,
+    GlycanCompositionEnzymeGraph, EnzymeGraphWriter, SeenFilter, SiteIndex,
+    CompositionGlycome, CompositionRule, IndexedEnzymeGraph)
+from glypy.enzyme import composition_glycome
+from glypy.algorithms import subtree_search
+from glypy.structure.glycan_composition import HashableGlycanComposition
 
 
 class GlycomeTests(unittest.TestCase):
@@ -26,6 +37,12 @@ class GlycomeTests(unittest.TestCase):
         c = sorted(graph)[-1].child
         path = graph.path_between(p, c)
         assert len(path) == 13
+        assert graph.path_between(p, p) == []
+        # Edges only lead away from the seeds, so nothing reaches them
+        with self.assertRaisesRegex(ValueError, "no path from"):
+            graph.path_between(c, p)
+        with self.assertRaisesRegex(ValueError, "no path from"):
+            graph.path_between(p, "not a node")
 
     def test_synthesize_glycome(self):
         glycome = self._make_glycome()
@@ -47,6 +64,271 @@ class GlycomeTests(unittest.TestCase):
         assert seed == ref
         assert set(eg.children(seed)) == set(graph.children(seed))
 
+    def test_structure_key(self):
+        a = iupac.loads("a-D-Manp-(1-6)-[a-D-Manp-(1-3)]b-D-Manp-(1-4)-b-D-Glcp2NAc")
+        b = iupac.loads("a-D-Manp-(1-3)-[a-D-Manp-(1-6)]b-D-Manp-(1-4)-b-D-Glcp2NAc")
+        c = iupac.loads("a-D-Manp-(1-2)-[a-D-Manp-(1-6)]b-D-Manp-(1-4)-b-D-Glcp2NAc")
+        self.assertEqual(structure_key(a), structure_key(b))
+        self.assertNotEqual(structure_key(a), structure_key(c))
+        self.assertEqual(structure_key(a), structure_key(glycoct.loads(str(a))))
+        structures = HashedGlycanSet([a, b, c])
+        self.assertEqual(len(structures), 2)
+        self.assertIn(b, structures)
+        self.assertEqual(len(structures - HashedGlycanSet([c])), 1)
+
+    def test_glycome_step(self):
+        glycome = self._make_glycome()
+        glycome = Glycome(glycome.glycosylases, glycome.glycosyltransferases, glycome.seeds)
+        generations = list(glycome.run(4))
+        self.assertEqual([len(gen) for gen in generations], [3, 6, 8, 9])
+        self.assertIsInstance(generations[-1], DistinctGlycanSet)
+        self.assertEqual({structure_key(s) for s in generations[-1]}, glycome.last_product_keys)
+        self.assertEqual(len(glycome.seen_keys), 1 + 3 + 6 + 8)
+        seen = glycome.seen
+        self.assertIsInstance(seen, DistinctGlycanSet)
+        self.assertEqual(len(seen), len(glycome.seen_keys))
+        self.assertTrue(all(seed in seen for seed in glycome.seeds))
+        graph = glycome.to_enzyme_graph()
+        with open("test_data/enzyme_graph.json", 'rt') as fh:
+            reference = EnzymeGraph.load(fh)
+        self.assertEqual(graph.seeds, reference.seeds)
+        self.assertTrue(graph.edges() <= reference.edges())
+
+    def test_seen_filter(self):
+        seen = SeenFilter(2 ** 12)
+        keys = [("%032x" % i).encode('ascii') for i in range(50)]
+        seen.update(keys[:25])
+        self.assertTrue(all(key in seen for key in keys[:25]))
+        self.assertLess(sum(key in seen for key in keys[25:]), 5)
+        self.assertEqual(seen.count, 25)
+
+    def test_multiprocessing_seen_filter(self):
+        glycome = self._make_glycome()
+        reference = Glycome(glycome.glycosylases, glycome.glycosyltransferases, glycome.seeds)
+        # A saturated filter withholds every product, so all of them are regenerated locally
+        glycome = MultiprocessingGlycome(
+            glycome.glycosylases, glycome.glycosyltransferases, glycome.seeds, processes=1, filter_size=8)
+        glycome._log = lambda message: None
+        try:
+            generations = list(glycome.run(4))
+            expected = list(reference.run(4))
+        finally:
+            glycome.close()
+        self.assertEqual([len(gen) for gen in generations], [len(gen) for gen in expected])
+        self.assertIsInstance(generations[-1], DistinctGlycanSet)
+        self.assertEqual(set(generations[-1].raw_data_buffer), set(expected[-1].raw_data_buffer))
+        self.assertEqual(glycome.last_product_keys, reference.last_product_keys)
+        self.assertGreater(glycome.filter_false_positives, 0)
+        self.assertEqual(glycome.seen_keys, reference.seen_keys)
+        self.assertEqual(set(glycome.current_generation.keys()), set(reference.current_generation.keys()))
+        self.assertEqual(glycome.to_enzyme_graph(), reference.to_enzyme_graph())
+
+    def test_site_index(self):
+        glycosylases, glycosyltransferases, seeds = make_n_glycan_pathway()
+        structure = seeds[0]
+        index = SiteIndex(structure)
+        for enzyme in list(glycosyltransferases.values()):
+            for parent in enzyme.parents:
+                self.assertEqual(index.matching_roots(parent),
+                                 subtree_search.find_matching_subtree_roots(parent, structure, exact=True))
+                self.assertEqual(index.subtree_of(parent), subtree_search.subtree_of(parent, structure, exact=True))
+        for enzyme in list(glycosylases.values()) + list(glycosyltransferases.values()):
+            self.assertEqual([str(x) for x in enzyme.traverse(structure, index)],
+                             [str(x) for x in enzyme.traverse(structure)])
+        self.assertEqual(len(glycosylases["manI"].traverse(structure, index)), 2)
+        self.assertGreater(index.matcher.hits, 0)
+
+    def test_enzyme_products(self):
+        glycosylases, glycosyltransferases, seeds = make_n_glycan_pathway()
+        structure = seeds[0]
+        products = glycosylases["manI"].products(structure, refund=True)
+        self.assertEqual(len(products), 2)
+        for product in products:
+            self.assertIsNone(product._result)
+            self.assertEqual(product.key, structure_key(product.materialize()[0]))
+            self.assertIsNone(product._result)
+        trimmed = products[0].structure
+        for enzyme in glycosyltransferases.values():
+            for product in enzyme.products(trimmed):
+                self.assertEqual(product.key, structure_key(product.materialize()))
+
+        glycome = Glycome(glycosylases, {}, seeds, limits=[lambda s: len(s) > 12])
+        self.assertEqual([len(gen) for gen in glycome.run()], [3])
+        self.assertEqual(len(glycome.rejected), 6)
+
+    def test_checkpoint_resume(self):
+        glycome = self._make_glycome()
+        reference = Glycome(glycome.glycosylases, glycome.glycosyltransferases, glycome.seeds)
+        generations = [len(gen) for gen in reference.run(5)]
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "run")
+        glycome = Glycome(glycome.glycosylases, glycome.glycosyltransferases, glycome.seeds)
+        glycome.checkpoint_to(path, interval=2)
+        self.assertEqual([len(gen) for gen in glycome.run(3)], generations[:3])
+        glycome.close()
+        # Records of an interrupted checkpoint after the last complete one are discarded
+        with open(os.path.join(path, "glycome.log"), 'a') as fh:
+            fh.write("S\tdeadbeef\tAAAA\nG\t4\t")
+        with open(os.path.join(path, "edges.graph"), 'a') as fh:
+            fh.write("E\t0\t1\t0\n")
+
+        resumed = Glycome.resume(path, glycome.glycosylases, glycome.glycosyltransferases)
+        self.assertEqual(resumed.generation, 3)
+        self.assertEqual(resumed.seen_keys, glycome.seen_keys)
+        self.assertEqual(resumed.seed_keys, glycome.seed_keys)
+        self.assertEqual(set(resumed.current_generation.keys()), set(glycome.current_generation.keys()))
+        self.assertEqual(resumed.to_enzyme_graph(), glycome.to_enzyme_graph())
+        self.assertEqual([len(gen) for gen in resumed.run(2)], generations[3:])
+        self.assertEqual(resumed.seen_keys, reference.seen_keys)
+        with open(os.path.join(path, "edges.graph"), 'rt') as fh:
+            self.assertEqual(EnzymeGraph.load_compact(fh), reference.to_enzyme_graph())
+        resumed.close()
+
+        # Attaching a checkpoint part way through a run records the generations already run
+        path = os.path.join(directory, "late")
+        glycome = Glycome(glycome.glycosylases, glycome.glycosyltransferases, glycome.seeds)
+        self.assertEqual([len(gen) for gen in glycome.run(2)], generations[:2])
+        glycome.checkpoint_to(path)
+        glycome.close()
+        resumed = Glycome.resume(path, glycome.glycosylases, glycome.glycosyltransferases)
+        self.assertEqual(resumed.generation, 2)
+        self.assertEqual(resumed.seen_keys, glycome.seen_keys)
+        self.assertEqual([len(gen) for gen in resumed.run(3)], generations[2:])
+        self.assertEqual(resumed.seen_keys, reference.seen_keys)
+        with open(os.path.join(path, "edges.graph"), 'rt') as fh:
+            self.assertEqual(EnzymeGraph.load_compact(fh), reference.to_enzyme_graph())
+        resumed.close()
+
+    def test_composition_glycome(self):
+        glycosylases, glycosyltransferases, seeds = make_mucin_type_o_glycan_pathway()
+        structures = Glycome(glycosylases, glycosyltransferases, seeds)
+        list(structures.run(4))
+        compositions = CompositionGlycome(glycosylases, glycosyltransferases, seeds)
+        self.assertEqual([len(gen) for gen in compositions.run(4)], [4, 10, 21, 40])
+        graph = compositions.to_enzyme_graph()
+        self.assertIsInstance(graph, GlycanCompositionEnzymeGraph)
+        self.assertEqual(graph.seeds, {HashableGlycanComposition.parse("{Gal2NAc:1}")})
+
+        # Every structure edge appears between the compositions of its structures
+        projected = set()
+        for edge in structures.to_enzyme_graph().edges():
+            parent, child = [HashableGlycanComposition.from_glycan(glycoct.loads(text))
+                             for text in (edge.parent, edge.child)]
+            projected.add((parent, child, edge.enzyme))
+        self.assertTrue(projected <= {(edge.parent, edge.child, edge.enzyme) for edge in graph.edges()})
+        self.assertEqual(EnzymeGraph.loads(graph.dumps()), graph)
+
+        with mock.patch.object(composition_glycome, "np", None):
+            fallback = CompositionGlycome(glycosylases, glycosyltransferases, seeds)
+            list(fallback.run(4))
+        self.assertEqual(fallback.to_enzyme_graph(), graph)
+
+        limited = CompositionGlycome(glycosylases, glycosyltransferases, seeds,
+                                     limits=[lambda composition: sum(composition.values()) <= 3])
+        self.assertEqual([len(gen) for gen in limited.run()], [4, 10])
+        self.assertTrue(all(sum(key) <= 3 for key in limited.seen))
+
+        rule = CompositionRule.from_enzyme("manI", make_n_glycan_pathway()[0]["manI"])
+        self.assertEqual([(str(k), v) for k, v in rule.delta.items()], [("Man", -1)])
+        self.assertEqual([(str(k), v) for acceptor in rule.acceptors for k, v in acceptor.items()], [("Man", 2)])
+
+    def test_indexed_graph(self):
+        with open("test_data/enzyme_graph.json", 'rt') as fh:
+            graph = EnzymeGraph.load(fh)
+        index = graph.index()
+        self.assertIsInstance(index, IndexedEnzymeGraph)
+        self.assertEqual(len(index), graph.node_count())
+        self.assertEqual(index.parentless(), graph.parentless())
+        self.assertEqual(index.to_enzyme_graph(), graph)
+        seed = list(graph.seeds)[0]
+        sink = sorted(graph)[-1].child
+        self.assertEqual(sorted(index.parents(sink)), sorted(graph.parents(sink)))
+        self.assertEqual(sorted(index.children(seed)), sorted(graph.children(seed)))
+
+        path = index.shortest_path(seed, sink)
+        self.assertEqual(len(path), 13)
+        self.assertEqual(len(graph.path_between(seed, sink)), 13)
+        self.assertEqual(path[0].parent, seed)
+        self.assertEqual(path[-1].child, sink)
+        for edge, next_edge in zip(path, path[1:]):
+            self.assertEqual(edge.child, next_edge.parent)
+            self.assertEqual(edge.enzyme, graph[edge.parent][edge.child])
+        distances = index.distances_from(seed)
+        self.assertEqual(distances[sink], 13)
+        paths = index.shortest_paths_from(seed, [sink, seed])
+        self.assertEqual(len(paths[sink]), 13)
+        self.assertEqual(paths[seed], [])
+        self.assertEqual(len(index.shortest_paths_from(seed)), len(distances))
+
+        enzymes = index.enzymes_between(path[0].parent, path[0].child)
+        self.assertIsNone(index.shortest_path(seed, sink, enzymes=enzymes))
+        self.assertEqual(index.remove(path[0].child), 1)
+        self.assertNotIn(path[0].child, index)
+        self.assertEqual(len(index), graph.node_count() - 1)
+        self.assertNotIn(path[0].child, index.children(seed))
+        self.assertGreaterEqual(len(index.shortest_path(seed, sink)), 13)
+
+    def test_indexed_graph_queries(self):
+        with open("test_data/enzyme_graph.json", 'rt') as fh:
+            graph = EnzymeGraph.load(fh)
+        index = graph.index()
+        seed = list(graph.seeds)[0]
+        sink = sorted(graph)[-1].child
+        self.assertEqual(index.descendants([seed]), graph.nodes())
+        ancestors = index.ancestors([sink])
+        self.assertIn(seed, ancestors)
+        self.assertTrue(all(index.reachable([sink], sources=[node])[sink] for node in ancestors))
+
+        enzymes = set(index.enzymes) - {"manI"}
+        pruned = graph.clone()
+        pruned.remove_enzyme("manI")
+        subgraph = index.subgraph(index.descendants(graph.seeds, enzymes), enzymes)
+        self.assertEqual(subgraph.to_enzyme_graph(), pruned)
+        self.assertEqual(subgraph.to_enzyme_graph().seeds, pruned.seeds)
+        self.assertIs(subgraph.nodes[subgraph.node_id(seed)], seed)
+        self.assertEqual(index.reachable([sink, seed], enzymes=enzymes), {sink: False, seed: True})
+
+        minimal = index.minimal_enzymes(sink)
+        self.assertTrue(index.reachable([sink], enzymes=minimal)[sink])
+        for enzyme in minimal:
+            self.assertFalse(index.reachable([sink], enzymes=minimal - {enzyme})[sink])
+        targets = sorted(graph.nodes())[:20]
+        self.assertEqual(index.minimal_enzymes_many(targets),
+                         {target: index.minimal_enzymes(target) for target in targets})
+        self.assertIsNone(index.minimal_enzymes(sink, enzymes=enzymes))
+
+    def test_compact_format(self):
+        with open("test_data/enzyme_graph.json", 'rt') as fh:
+            graph = EnzymeGraph.load(fh)
+        buffer = io.StringIO()
+        graph.dump_compact(buffer)
+        self.assertLess(len(buffer.getvalue()), len(graph.dumps()) / 2)
+        dup = EnzymeGraph.load_compact(io.StringIO(buffer.getvalue()))
+        self.assertEqual(dup, graph)
+        self.assertEqual(dup.seeds, graph.seeds)
+        self.assertEqual(set(EnzymeGraph.iter_compact(io.StringIO(buffer.getvalue()))), graph.edges())
+
+        with self.assertRaises(ValueError):
+            EnzymeGraph.load_compact(io.StringIO(graph.dumps()))
+
+    def test_compact_stream(self):
+        a, b, c = map(HashableGlycanComposition.parse, [
+            "{Hex:3; HexNAc:2}", "{Hex:4; HexNAc:2}", "{Hex:3; HexNAc:3}"])
+        buffer = io.StringIO()
+        writer = EnzymeGraphWriter(buffer, metadata={"source": "test"})
+        writer.add_seed(a)
+        writer.add_edge(a, b, "galt")
+        writer.add_edge(a, c, "gnt")
+        writer.add_edge(b, c, "gnt")
+        self.assertEqual(buffer.getvalue().count("\nN\t"), 3)
+        graph = GlycanCompositionEnzymeGraph.load_compact(io.StringIO(buffer.getvalue()))
+        self.assertEqual(graph.seeds, {a})
+        self.assertEqual(graph.metadata, {"source": "test"})
+        self.assertEqual(graph[a][c], {"gnt"})
+        self.assertEqual(graph.edge_count(), 3)
+        self.assertIsInstance(list(graph.nodes())[0], HashableGlycanComposition)
+
     def test_galt(self):
         _, glycosyltransferases, _ = make_n_glycan_pathway()
         galt = glycosyltransferases['galt']
@@ -172,6 +172,17 @@ class GlycanCompositionTests(unittest.TestCase):
         comp2 = self.GlycanCompositionType.parse(ref)
         self.assertEqual(comp, comp2)
 
+    def test_parse_many(self):
+        refs = ['{Man:3; Glc2NAc:2}', '{Hex:5; HexNAc:4; NeuAc:2}$C1H4', '{Man:3; Glc2NAc:2}']
+        comps = self.GlycanCompositionType.parse_many(refs)
+        self.assertEqual(comps, [self.GlycanCompositionType.parse(ref) for ref in refs])
+        self.assertEqual(str(comps[1]), '{Hex:5; HexNAc:4; Neu5Ac:2}$C1H4')
+        self.assertIsNot(comps[0], comps[2])
+        with self.assertRaises(ValueError):
+            self.GlycanCompositionType.parse_many(['{Hex:5; HexNAc}'])
+        self.assertEqual(self.GlycanCompositionType.parse_many(['{Hex:5; HexNAc}', refs[0]], raise_errors=False),
+                         [None, comps[0]])
+
     def test_update(self):
         ref = '{Man:3; Glc2NAc:2}'
         comp = self.GlycanCompositionType.parse(ref)
@@ -296,6 +307,17 @@ class FrozenGlycanCompositionTests(GlycanCompositionTests):
         with self.assertRaises(glycan_composition.FrozenError):
             comp.drop_positions()
 
+    def test_parse_cached(self):
+        ref = '{Man:3; Glc2NAc:2}$C1H4'
+        comp = self.GlycanCompositionType.parse(ref)
+        comp["Man"] += 2
+        comp.reducing_end.composition["H"] += 2
+        dup = self.GlycanCompositionType.parse(ref)
+        self.assertEqual(dup["Man"], 3)
+        self.assertEqual(str(dup), ref)
+        self.assertAlmostEqual(dup.mass(), GlycanComposition.parse(ref).mass(), 5)
+        self.assertIn((self.GlycanCompositionType, ref), self.GlycanCompositionType.get_parse_cache())
+
 
 class SubstituentResidueTests(unittest.TestCase):
     def test_parse(self):
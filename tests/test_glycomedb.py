@@ -0,0 +1,112 @@
+import gzip
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+import warnings
+
+import glypy
+from glypy.io import glycoct
+from glypy.algorithms import database
+
+from .common import StandInServer
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from glypy.io import glycomedb
+
+
+names = {1: "N-Linked Core", 2: "High-Mannose Precursor", 3: "Fucosylated N-Linked Core"}
+
+
+class GlycomeDBCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "glycomedb.db")
+
+    def tearDown(self):
+        if glycomedb.cache is not None:
+            glycomedb.cache.close()
+        glycomedb.cache = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_record_database_bulk_load(self):
+        db = database.RecordDatabase(record_type=database.GlycanRecordWithTaxon)
+        records = (database.GlycanRecordWithTaxon(glypy.glycans[name], taxa=[database.Taxon(9606, None, None)])
+                   for name in names.values())
+        self.assertEqual(db.load_data(records, batch_size=2), 3)
+        self.assertEqual(len(db), 3)
+        self.assertIn(2, db)
+        self.assertNotIn(4, db)
+        self.assertEqual(db.contains_many([1, 3, 4]), {1, 3})
+        self.assertEqual(db[2].structure, glypy.glycans[names[2]])
+        self.assertEqual(len(list(db.query_by_taxon_id(9606))), 3)
+
+    def test_record_database_duplicate_key(self):
+        db = database.RecordDatabase(record_type=database.GlycanRecord)
+        db.load_data(database.GlycanRecord(glypy.glycans[names[1]], id=1), set_id=False)
+        duplicate = database.GlycanRecord(glypy.glycans[names[2]], id=1)
+        with self.assertRaises(sqlite3.IntegrityError):
+            db.load_data(duplicate, set_id=False)
+        db.rollback()
+        self.assertEqual(db[1].structure, glypy.glycans[names[1]])
+        db.load_data(duplicate, set_id=False, replace=True)
+        self.assertEqual(len(db), 1)
+        self.assertEqual(db[1].structure, glypy.glycans[names[2]])
+
+    def test_uncommitted_per_cache(self):
+        glycomedb.set_cache(self.path)
+        first = glycomedb.cache
+        glycomedb.add_cache(database.GlycanRecord(glypy.glycans[names[1]], id=1))
+        self.assertEqual(glycomedb._uncommitted[first], 1)
+        glycomedb.set_cache(os.path.join(self.directory, "other.db"))
+        self.assertNotIn(first, glycomedb._uncommitted)
+        glycomedb.add_cache(database.GlycanRecord(glypy.glycans[names[2]], id=2))
+        self.assertEqual(glycomedb._uncommitted[glycomedb.cache], 1)
+        glycomedb.flush_cache()
+        self.assertNotIn(glycomedb.cache, glycomedb._uncommitted)
+        self.assertIn(1, first)
+        first.close()
+
+    def test_prefetch(self):
+        def show(query):
+            structure = glypy.glycans[names[int(query["glycomeId"][0])]]
+            body = "<structure><condenced>%s</condenced></structure>" % glycoct.dumps(structure)
+            return 200, body.encode('utf8')
+
+        server = StandInServer({"/showStructure": show})
+        template = glycomedb.get_url_template
+        glycomedb.get_url_template = server.url + "/showStructure?glycomeId={id}"
+        try:
+            glycomedb.set_cache(self.path)
+            self.assertEqual(glycomedb.prefetch([1, 2, 1], concurrency=2), 2)
+            self.assertEqual(len(server.requests), 2)
+            self.assertEqual(glycomedb.prefetch([1, 2, 3]), 1)
+            self.assertEqual(len(server.requests), 3)
+            self.assertTrue(glycomedb.check_cache(3))
+            self.assertEqual(glycomedb.get(2), glypy.glycans[names[2]])
+            self.assertEqual(len(server.requests), 3)
+        finally:
+            glycomedb.get_url_template = template
+            server.stop()
+
+    def test_download_all_structures(self):
+        entries = []
+        for i, name in names.items():
+            entries.append(
+                '<structure id="%d"><sequence>%s</sequence><taxon ncbi="9606"/></structure>' % (
+                    i, glycoct.dumps(glypy.glycans[name])))
+        entries.append('<structure id="4"><sequence>not glycoct</sequence></structure>')
+        dump_path = os.path.join(self.directory, "dump.xml.gz")
+        with gzip.open(dump_path, 'wb') as fh:
+            fh.write(("<structures>%s</structures>" % ''.join(entries)).encode('utf8'))
+        db = glycomedb.download_all_structures(self.path, source=dump_path, batch_size=2)
+        self.assertEqual(len(db), 3)
+        self.assertEqual(db[3].structure, glypy.glycans[names[3]])
+        self.assertEqual([m[0] for m in db.get_metadata("misses")], [4])
+        db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
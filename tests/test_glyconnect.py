@@ -0,0 +1,102 @@
+import json
+import shutil
+import tempfile
+import unittest
+
+from glypy.io import glyconnect
+from glypy.structure.glycan_composition import HashableGlycanComposition
+
+from .common import StandInServer
+
+
+def make_result(i, composition="Hex:5 HexNAc:4 NeuAc:2"):
+    taxonomy = {"id": 1, "taxonomy_id": "9606", "common_name": "Human", "species": "Homo sapiens"}
+    return {
+        "composition": {
+            "format_byonic": "", "format_condensed": "", "format_glyconnect": composition,
+            "format_numeric": "", "id": i, "mass": 2224.0, "mass_monoisotopic": 2222.78,
+            "reviewed": True, "glytoucan_id": None},
+        "structure": {
+            "glycan_core": "N-Linked", "glycan_type": "complex", "has_image": False, "id": i,
+            "is_undefined": True, "reviewed": False},
+        "taxonomy": taxonomy,
+        "protein": {"id": 7, "name": "Alpha-1-acid glycoprotein 1", "taxonomy": taxonomy,
+                    "uniprots": [{"uniprot_acc": "P02763"}]},
+    }
+
+
+class GlyConnectTest(unittest.TestCase):
+    def test_parse_composition(self):
+        gc = glyconnect.parse_composition("Hex:5 HexNAc:4 NeuAc:2")
+        self.assertIsInstance(gc, HashableGlycanComposition)
+        self.assertEqual(gc, HashableGlycanComposition.parse("{Hex:5; HexNAc:4; Neu5Ac:2}"))
+        other = glyconnect.parse_composition("Hex:5 HexNAc:4 NeuAc:2")
+        self.assertIsNot(other, gc)
+        other["Hex"] += 1
+        self.assertEqual(gc, HashableGlycanComposition.parse("{Hex:5; HexNAc:4; Neu5Ac:2}"))
+        self.assertEqual(glyconnect.parse_composition("Hex:5 HexNAc:4 NeuAc:2"), gc)
+        self.assertEqual(glyconnect.dumps(gc), "Hex:5 HexNAc:4 NeuAc:2")
+
+    def test_iter_query(self):
+        body = json.dumps({
+            "query": {"results": "not these"},
+            "results": [make_result(i) for i in range(25)] + [make_result(25, "Hex:3 HexNAc:2")],
+            "count": 26}).encode('utf8')
+        server = StandInServer({
+            "/glycosylations": lambda query: (200, body),
+            "/broken/glycosylations": lambda query: (200, b"[]"),
+        })
+        try:
+            client = glyconnect.Compozitor(api_server=server.url)
+            results = list(client.iter_query(protein="P02763", chunk_size=7))
+            self.assertEqual(len(results), 26)
+            self.assertIsInstance(results[0], glyconnect.LazyCompozitorGlycan)
+            self.assertEqual(results[3].composition.id, 3)
+            self.assertEqual(results[3].protein.uniprots[0].uniprot_acc, "P02763")
+            self.assertEqual(results[0].composition.parse(), results[1].composition.parse())
+            self.assertIsNot(results[0].composition.parse(), results[1].composition.parse())
+            self.assertEqual(results[-1].composition.parse(), HashableGlycanComposition.parse("{Hex:3; HexNAc:2}"))
+
+            self.assertEqual(client.query(protein="P02763"), [r.materialize() for r in results])
+            self.assertEqual([len(page) for page in client.iter_query_pages(page_size=10)], [10, 10, 6])
+
+            client.api_server = server.url + "/broken"
+            with self.assertRaises(ValueError):
+                list(client.iter_query())
+        finally:
+            server.stop()
+
+    def test_collection_cache(self):
+        directory = tempfile.mkdtemp()
+        state = {"modified": "Mon, 02 Jan 2023 00:00:00 GMT",
+                 "body": [{"cellosaurus_id": "CVCL_0023", "id": 1, "is_problematic": False, "name": "A549"}]}
+
+        def cell_lines(query):
+            return 200, json.dumps(state["body"]).encode('utf8'), {"Last-Modified": state["modified"]}
+
+        server = StandInServer({"/cell_lines-all": cell_lines})
+        try:
+            client = glyconnect.Compozitor(api_server=server.url, collection_cache=directory)
+            self.assertEqual(client.cell_lines[0].name, "A549")
+            self.assertNotIn("If-Modified-Since", server.request_headers[-1])
+
+            # Not modified, so the stored response is used
+            state["body"][0]["name"] = "A-549"
+            client = glyconnect.Compozitor(api_server=server.url, collection_cache=directory)
+            self.assertEqual(client.cell_lines[0].name, "A549")
+            self.assertEqual(server.request_headers[-1]["If-Modified-Since"], state["modified"])
+
+            state["modified"] = "Tue, 03 Jan 2023 00:00:00 GMT"
+            client = glyconnect.Compozitor(api_server=server.url, collection_cache=directory)
+            self.assertEqual(client.cell_lines[0].name, "A-549")
+            client = glyconnect.Compozitor(api_server=server.url, collection_cache=directory)
+            self.assertEqual(client.cell_lines[0].name, "A-549")
+            self.assertEqual(server.request_headers[-1]["If-Modified-Since"], state["modified"])
+            self.assertEqual(len(server.requests), 4)
+        finally:
+            server.stop()
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,15 @@
+import os
+import shutil
+import tempfile
+import threading
 import unittest
-from glypy.io import glyspace
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import glypy
+from glypy.io import glyspace, glycoct
+from glypy.io.async_http import run_sync
 from glypy import tree, root
 
 from pytest import mark
@@ -67,6 +77,192 @@ class RDFClientTest(unittest.TestCase):
         self.assertTrue(graph.isomorphic(client))
 
 
+def make_sequence_client():
+    client = LocalClient()
+    client.bind("glycan", glyspace.NSGlycan)
+    for accession, name in [("G00001AA", "N-Linked Core"), ("G00002AA", "High-Mannose Precursor")]:
+        saccharide = glyspace.NSGlycoinfo[accession]
+        sequence = glyspace.URIRef(str(saccharide) + "/glycoct")
+        client.add((saccharide, glyspace.NSGlycan.has_glycosequence, sequence))
+        client.add((sequence, glyspace.NSGlycan.has_sequence,
+                    glyspace.Literal(glycoct.dumps(glypy.glycans[name]))))
+        client.add((saccharide, glyspace.NSGlyTouCan.has_primary_id, glyspace.Literal(accession)))
+    return client
+
+
+class SPARQLStandIn(ThreadingHTTPServer):
+    """A minimal SPARQL endpoint answering queries from a local graph"""
+
+    daemon_threads = True
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.lock = threading.Lock()
+        self.requests = 0
+        ThreadingHTTPServer.__init__(self, ("127.0.0.1", 0), SPARQLHandler)
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d/sparql" % self.server_address[1]
+
+
+class SPARQLHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.respond(parse_qs(urlparse(self.path).query)["query"][0])
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode("utf8")
+        if self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+            body = parse_qs(body)["query"][0]
+        self.respond(body)
+
+    def respond(self, query):
+        with self.server.lock:
+            self.server.requests += 1
+            payload = self.server.graph.query(query).serialize(format="xml")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/sparql-results+xml")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class RemoteClient(glyspace.GlyTouCanRDFClient):
+    def __init__(self, endpoint):
+        glyspace.RDFClientBase.__init__(self, endpoint, glyspace.NSGlycoinfo)
+        self.bind("glycan", glyspace.NSGlycan)
+
+
+class BatchedQueryTest(unittest.TestCase):
+    def test_get_many(self):
+        client = LocalClient()
+        client.parse(data=example_n3, format='n3')
+        client.add((glyspace.NSGlycoinfo.G00031MO, glyspace.NSGlyTouCan.has_primary_id,
+                    glyspace.Literal("G00031MO")))
+        refs = client.get_many(["G80903UK", "G00031MO", "G80903UK"], batch_size=1, max_workers=1)
+        self.assertEqual([r.has_primary_id for r in refs], ["G80903UK", "G00031MO", "G80903UK"])
+        self.assertEqual(sorted(refs[0].has_motif), sorted(LocalClient().parse(
+            data=example_n3, format='n3').objects(glyspace.NSGlycoinfo.G80903UK, glyspace.NSGlycan.has_motif)))
+
+    def test_concurrent_remote(self):
+        server = SPARQLStandIn(make_sequence_client())
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            client = RemoteClient(server.url)
+            structures = client.structure("G00001AA", "G00002AA", batch_size=1, max_workers=2)
+            self.assertEqual(structures[1], glypy.glycans["High-Mannose Precursor"])
+            self.assertEqual(server.requests, 2)
+            refs = client.get_many(["G00001AA", "G00002AA"], batch_size=1, max_workers=2)
+            self.assertEqual([r.has_primary_id for r in refs], ["G00001AA", "G00002AA"])
+
+            async def stream():
+                return [r async for r in client.iter_structures(
+                    ["G00001AA", "G00003AA", "G00002AA"], batch_size=1, max_workers=3)]
+
+            results = {r.key: r for r in run_sync(stream())}
+            self.assertEqual(results[glyspace.NSGlycoinfo.G00001AA].value, glypy.glycans["N-Linked Core"])
+            self.assertIsInstance(results[glyspace.NSGlycoinfo.G00003AA].error, KeyError)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_structure(self):
+        client = make_sequence_client()
+        structures = client.structure("G00001AA", "G00002AA", "G00001AA", batch_size=1, max_workers=1)
+        self.assertEqual(structures[0], glypy.glycans["N-Linked Core"])
+        self.assertEqual(structures[1], glypy.glycans["High-Mannose Precursor"])
+        self.assertEqual(structures[2], structures[0])
+        with self.assertRaises(KeyError):
+            client.structure("G00003AA")
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "responses.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_replay(self):
+        client = LocalClient()
+        client.parse(data=example_n3, format='n3')
+        client.set_response_cache(self.path)
+        ref = client.get("G80903UK")
+        client.response_cache.close()
+
+        # A client without any data must answer from the stored responses
+        offline = LocalClient()
+        cache = offline.set_response_cache(self.path)
+        replayed = offline.get("G80903UK")
+        self.assertEqual(replayed.has_primary_id, ref.has_primary_id)
+        self.assertEqual(sorted(replayed.has_motif), sorted(ref.has_motif))
+        self.assertGreater(cache.hits, 0)
+        cache.close()
+
+    def test_ttl(self):
+        cache = glyspace.ResponseCache(self.path, ttl=-1)
+        cache["key"] = [1, 2, 3]
+        self.assertNotIn("key", cache)
+        self.assertIsNone(cache.get("key"))
+        self.assertEqual(cache.expire(), 1)
+        self.assertEqual(len(cache), 0)
+        cache.close()
+
+    def test_endpoints_do_not_share_responses(self):
+        servers = [SPARQLStandIn(make_sequence_client()), SPARQLStandIn(glyspace.ConjunctiveGraph())]
+        for server in servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        cache = glyspace.ResponseCache(self.path)
+        try:
+            populated, empty = [RemoteClient(server.url) for server in servers]
+            self.assertNotEqual(populated.sparql_endpoint, empty.sparql_endpoint)
+            populated.set_response_cache(cache)
+            empty.set_response_cache(cache)
+            self.assertEqual(populated.structure("G00001AA"), glypy.glycans["N-Linked Core"])
+            requests = servers[0].requests
+            self.assertEqual(populated.structure("G00001AA"), glypy.glycans["N-Linked Core"])
+            self.assertEqual(servers[0].requests, requests)
+            # The other endpoint has no such structure, and must be asked rather than
+            # answered from the first endpoint's responses
+            with self.assertRaises(KeyError):
+                empty.structure("G00001AA")
+            self.assertGreater(servers[1].requests, 0)
+        finally:
+            cache.close()
+            for server in servers:
+                server.shutdown()
+                server.server_close()
+
+    def test_get_many(self):
+        client = LocalClient()
+        client.parse(data=example_n3, format='n3')
+        cache = client.set_response_cache(self.path)
+        refs = client.get_many(["G80903UK"])
+        self.assertIn(client._response_key("triples", glyspace.NSGlycoinfo.G80903UK, None, None), cache)
+
+        offline = LocalClient()
+        offline.set_response_cache(cache)
+        self.assertEqual(offline.get_many(["G80903UK"])[0].has_primary_id, refs[0].has_primary_id)
+        self.assertGreater(cache.hits, 0)
+        cache.close()
+
+    def test_structure(self):
+        client = make_sequence_client()
+        client.set_response_cache(self.path)
+        client.structure("G00001AA", "G00002AA", batch_size=1, max_workers=1)
+        client.response_cache.close()
+
+        offline = LocalClient()
+        offline.set_response_cache(self.path)
+        self.assertEqual(offline.structure("G00002AA"), glypy.glycans["High-Mannose Precursor"])
+        offline.response_cache.close()
+
+
 @skip_not_online
 class GlyTouCanRDFClientTest(unittest.TestCase):
     def test_get(self):
@@ -0,0 +1,189 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from glypy.io import gnome
+from glypy.structure.glycan_composition import HashableGlycanComposition
+
+
+OBO = "http://purl.obolibrary.org/obo/"
+
+properties = {
+    "IAO_0000115": "definition",
+    "GNO_00000021": "has_subsumption_category",
+    "GNO_00000022": "has_glytoucan_id",
+    "GNO_00000033": "has_basecomposition",
+    "GNO_00000034": "has_composition",
+    "GNO_00000035": "has_topology",
+    "GNO_00000101": "_widget_button_state",
+}
+
+levels = {
+    "GNO_00000012": "molecular weight",
+    "GNO_00000013": "basecomposition",
+    "GNO_00000014": "composition",
+    "GNO_00000015": "topology",
+    "GNO_00000016": "saccharide",
+}
+
+
+def mass_definition(glycan):
+    mass = HashableGlycanComposition.parse(glycan).mass()
+    return "A glycan characterized by underivatized molecular weight of %0.2f Daltons" % mass
+
+
+# accession, parent, category, glycan, extra properties
+terms = [
+    ("G00000MW", "GNO_00000001", "GNO_00000012", "{Hex:3; HexNAc:2}", {}),
+    ("G00001MW", "GNO_00000001", "GNO_00000012", "{Hex:5; HexNAc:2}", {}),
+    ("G00002MW", "GNO_00000001", "GNO_00000012", "{Hex:3; HexNAc:2; dHex:1}", {}),
+    ("G00000BC", "G00000MW", "GNO_00000013", "Hex3HexNAc2", {"GNO_00000022": "G00000BC"}),
+    ("G00001BC", "G00001MW", "GNO_00000013", "Hex5HexNAc2", {"GNO_00000022": "G00001BC"}),
+    ("G00002BC", "G00002MW", "GNO_00000013", "Hex3HexNAc2dHex1", {}),
+    ("G00000CO", "G00000BC", "GNO_00000014", "Man3GlcNAc2", {"GNO_00000033": OBO + "G00000BC"}),
+    ("G00001CO", "G00001BC", "GNO_00000014", "Man5GlcNAc2", {"GNO_00000033": OBO + "G00001BC"}),
+    ("G00000TO", "G00000CO", "GNO_00000015", "Man3GlcNAc2",
+     {"GNO_00000033": OBO + "G00000BC", "GNO_00000034": OBO + "G00000CO"}),
+    # Residues without a generic class, whose nodes are matched residue by residue
+    ("G00003MW", "GNO_00000001", "GNO_00000012", "{Hex:2; HexNAc:2; HexS:1}", {}),
+    ("G00004BC", "G00003MW", "GNO_00000013", "Hex1HexNAc2HexS2", {}),
+    ("G00003BC", "G00003MW", "GNO_00000013", "Hex2HexNAc2HexS1", {}),
+    ("G00004CO", "G00003BC", "GNO_00000014", "Glc2GlcNAc2HexS1", {"GNO_00000033": OBO + "G00003BC"}),
+    ("G00003CO", "G00003BC", "GNO_00000014", "Man2GlcNAc2HexS1", {"GNO_00000033": OBO + "G00003BC"}),
+    ("G00005MW", "GNO_00000001", "GNO_00000012", "{Hex:3; HexNAc:2; Glc1Me:1}", {}),
+    ("G00005BC", "G00005MW", "GNO_00000013", "Hex3HexNAc2Glc1", {}),
+    ("G00006BC", "G00005MW", "GNO_00000013", "Hex3HexNAc3", {}),
+]
+
+
+def build_owl():
+    parts = ['<?xml version="1.0"?>',
+             '<rdf:RDF xmlns:obo="http://purl.obolibrary.org/obo/" xmlns:owl="http://www.w3.org/2002/07/owl#" '
+             'xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" '
+             'xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#">']
+    for acc, label in properties.items():
+        parts.append('<owl:AnnotationProperty rdf:about="%s%s"><rdfs:label>%s</rdfs:label>'
+                     '</owl:AnnotationProperty>' % (OBO, acc, label))
+    for acc, label in levels.items():
+        parts.append('<owl:NamedIndividual rdf:about="%s%s"><rdfs:label>%s</rdfs:label>'
+                     '</owl:NamedIndividual>' % (OBO, acc, label))
+    parts.append('<owl:Class rdf:about="%sGNO_00000001"><rdfs:label>glycan</rdfs:label></owl:Class>' % OBO)
+    for acc, parent, category, glycan, extra in terms:
+        parts.append('<owl:Class rdf:about="%s%s">' % (OBO, acc))
+        parts.append('<rdfs:subClassOf rdf:resource="%s%s"/>' % (OBO, parent))
+        parts.append('<obo:GNO_00000021 rdf:resource="%s%s"/>' % (OBO, category))
+        if category == "GNO_00000012":
+            parts.append('<obo:IAO_0000115>%s</obo:IAO_0000115>' % mass_definition(glycan))
+        else:
+            parts.append('<obo:IAO_0000115>A glycan %s</obo:IAO_0000115>' % glycan)
+            parts.append('<obo:GNO_00000101>%s</obo:GNO_00000101>' % glycan)
+        for prop, value in extra.items():
+            if value.startswith("http"):
+                parts.append('<obo:%s rdf:resource="%s"/>' % (prop, value))
+            else:
+                parts.append('<obo:%s>%s</obo:%s>' % (prop, value, prop))
+        parts.append('</owl:Class>')
+    parts.append('</rdf:RDF>')
+    return '\n'.join(parts).encode('utf8')
+
+
+queries = ["{Hex:3; HexNAc:2}", "{Hex:5; HexNAc:2}", "{Man:3; GlcNAc:2}", "{Hex:3; HexNAc:2; dHex:1}",
+           "{Hex:4; HexNAc:2}"]
+
+# HexS and Glc1Me belong to no generic residue class, so they are keyed on themselves
+reference_queries = queries + [
+    "{Hex:2; HexNAc:2; HexS:1}", "{Man:2; GlcNAc:2; HexS:1}", "{Glc:2; GlcNAc:2; HexS:1}",
+    "{Gal:2; GlcNAc:2; HexS:1}", "{Hex:3; HexNAc:2; Glc1Me:1}", "{Man:3; GlcNAc:2; Glc1Me:1}",
+    "{Hex:4; HexNAc:2; Glc:1}",
+]
+
+
+class GNOmeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.gnome = gnome.GNOme.load(io.BytesIO(build_owl()))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_load(self):
+        self.assertEqual(len(self.gnome.terms), len(terms))
+        self.assertEqual(self.gnome.terms["G00000CO"].base_composition, "G00000BC")
+        self.assertEqual(self.gnome.mass_accessions,
+                         ["G00000MW", "G00003MW", "G00002MW", "G00005MW", "G00001MW"])
+        self.assertEqual(self.gnome.resolve(HashableGlycanComposition.parse("{Hex:3; HexNAc:2}"),
+                                            gnome.SubsumptionLevel.basecomposition).id, "G00000BC")
+
+    def test_resolve(self):
+        gcs = [HashableGlycanComposition.parse(query) for query in queries]
+        self.assertEqual(self.gnome.resolve(gcs[2], gnome.SubsumptionLevel.composition).id, "G00000CO")
+        self.assertEqual(self.gnome.resolve(gcs[2]).id, "G00000TO")
+        self.assertEqual(self.gnome.composition_key("G00000CO"), HashableGlycanComposition.parse("{Man:3; GlcNAc:2}"))
+        self.assertEqual(self.gnome.composition_key("G00002BC"), gcs[3])
+        for level in levels.values():
+            level = gnome.SubsumptionLevel[level]
+            self.assertEqual(self.gnome.resolve_many(gcs, level), [self.gnome.resolve(gc, level) for gc in gcs])
+        resolved = self.gnome.resolve_many(gcs)
+        self.assertEqual([node.id if node else None for node in resolved],
+                         ["G00000BC", "G00001BC", "G00000TO", "G00002BC", None])
+
+    def test_reference_search(self):
+        # The composition index must find the same subclass as matching each
+        # subclass's glycan residue by residue, in order
+        def reference(gc, node):
+            for acc in node.subclasses:
+                base = self.gnome.parsed_glycan(acc)
+                if base and self.gnome._match_base_composition(gc, base):
+                    return self.gnome.terms[acc]
+            return None
+
+        for query in reference_queries:
+            gc = HashableGlycanComposition.parse(query)
+            for node in self.gnome.terms.values():
+                self.assertEqual(self.gnome.resolve_base_composition(gc, node), reference(gc, node),
+                                 "%s under %s" % (query, node.id))
+
+        resolved = self.gnome.resolve_many(HashableGlycanComposition.parse(query) for query in reference_queries)
+        self.assertEqual([node.id if node else None for node in resolved[len(queries):]],
+                         ["G00003BC", "G00003CO", "G00004CO", "G00003BC", None, None, "G00001BC"])
+        self.assertEqual(self.gnome.composition_key("G00003CO"),
+                         HashableGlycanComposition.parse("{Man:2; GlcNAc:2; HexS:1}"))
+        self.assertIsNone(self.gnome.composition_key("G00003BC"))
+
+    def test_snapshot(self):
+        path = os.path.join(self.directory, "gnome.snapshot")
+        self.gnome.save(path)
+        for use_mmap in (True, False):
+            loaded = gnome.GNOme.load_snapshot(path, use_mmap=use_mmap)
+            self.assertEqual(dict(loaded.terms), dict(self.gnome.terms))
+            self.assertEqual(loaded.subsumption_levels, dict(self.gnome.subsumption_levels))
+            self.assertEqual(list(loaded.mass_values), list(self.gnome.mass_values))
+            self.assertEqual(loaded.mass_index, self.gnome.mass_index)
+            self.assertEqual(loaded.parsed_glycan("G00002BC"), {"Hex": 3, "HexNAc": 2, "dHex": 1})
+            for query in queries:
+                gc = HashableGlycanComposition.parse(query)
+                for level in levels.values():
+                    level = gnome.SubsumptionLevel[level]
+                    self.assertEqual(loaded.resolve(gc, level), self.gnome.resolve(gc, level))
+            loaded.close()
+        loaded = gnome.GNOme.load_snapshot(path)
+        node = loaded.terms["G00000CO"]
+        loaded.close()
+        loaded.close()
+        self.assertIs(loaded.terms["G00000CO"], node)
+        self.assertIn("G00000BC", loaded.terms)
+        self.assertEqual(list(loaded.mass_values), list(self.gnome.mass_values))
+        with self.assertRaisesRegex(ValueError, "closed"):
+            loaded.terms["G00000BC"]
+        with self.assertRaisesRegex(ValueError, "closed"):
+            loaded.parsed_glycan("G00002BC")
+        with open(path, 'wb') as fh:
+            fh.write(b"not a snapshot" * 10)
+        with self.assertRaises(ValueError):
+            gnome.GNOme.load_snapshot(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
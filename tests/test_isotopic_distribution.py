@@ -0,0 +1,82 @@
+import unittest
+import weakref
+
+import glypy
+from glypy.composition import Composition, calculate_mass
+from glypy.composition.mass_dict import nist_mass
+
+try:
+    from glypy.composition.isotopic_distribution import (
+        isotopic_pattern, isotopic_patterns, IsotopicDistributionCache)
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+
+@unittest.skipIf(np is None, "Requires numpy")
+class IsotopicDistributionTest(unittest.TestCase):
+    def test_carbon(self):
+        cache = IsotopicDistributionCache()
+        mz, intensity = isotopic_pattern("C100", max_peaks=4, truncate_after=1.0, cache=cache)
+        self.assertEqual(len(mz), 4)
+        c12 = nist_mass['C'][12][1]
+        c13 = nist_mass['C'][13][1]
+        self.assertAlmostEqual(intensity[0], c12 ** 100)
+        self.assertAlmostEqual(intensity[1], 100 * c12 ** 99 * c13)
+        self.assertAlmostEqual(mz[0], 1200.0)
+        self.assertAlmostEqual(mz[1] - mz[0], nist_mass['C'][13][0] - 12.0)
+        self.assertEqual(cache.stats()["misses"], len(cache))
+        hits = cache.hits
+        isotopic_pattern("C100", max_peaks=4, truncate_after=1.0, cache=cache)
+        self.assertEqual(cache.hits, hits + 1)
+
+    def test_mass_data_identity(self):
+        class MassData(dict):
+            pass
+
+        cache = IsotopicDistributionCache()
+        patterns = []
+        for abundance in (0.5, 0.25):
+            mass_data = MassData(nist_mass)
+            mass_data["C"] = {0: (12.0, 1.0), 12: (12.0, 1.0 - abundance), 13: (13.0, abundance)}
+            patterns.append(isotopic_pattern("C2", truncate_after=1.0, mass_data=mass_data, cache=cache)[1])
+            # The cache keeps mass_data alive, so its id cannot be reused by another
+            # dict while distributions are stored under it
+            ref = weakref.ref(mass_data)
+            del mass_data
+            self.assertIsNotNone(ref())
+        self.assertTrue(np.allclose(patterns[0], [0.25, 0.5, 0.25]))
+        self.assertTrue(np.allclose(patterns[1], [0.5625, 0.375, 0.0625]))
+        cache.clear()
+        self.assertIsNone(ref())
+
+    def test_pattern(self):
+        composition = Composition("C34H53N2O15")
+        mz, intensity = isotopic_pattern(composition, truncate_after=1.0)
+        self.assertAlmostEqual(intensity.sum(), 1.0)
+        self.assertAlmostEqual(mz[0], calculate_mass(composition))
+        self.assertTrue(np.all(np.diff(mz) > 0))
+        charged = isotopic_pattern(composition, charge=[-1, 2])
+        self.assertAlmostEqual(charged[2][0][0], calculate_mass(composition, charge=2))
+        self.assertAlmostEqual(charged[-1][0][0], calculate_mass(composition, charge=-1))
+        self.assertLess(len(charged[2][0]), len(mz))
+
+        labeled = Composition("C[13]2C32H53N2O15")
+        mz, intensity = isotopic_pattern(labeled)
+        self.assertAlmostEqual(mz[0], calculate_mass(labeled))
+
+    def test_glycan_composition(self):
+        gc = glypy.GlycanComposition.parse("{Hex:5; HexNAc:4; Neu5Ac:2}")
+        mz, intensity = isotopic_pattern(gc, charge=3)
+        self.assertAlmostEqual(mz[0], gc.mass(charge=3))
+        compositions = [gc, glypy.GlycanComposition.parse("{Hex:5; HexNAc:2}"), gc.clone()]
+        patterns = isotopic_patterns(compositions, charge=3)
+        self.assertIs(patterns[0], patterns[2])
+        self.assertTrue(np.allclose(patterns[0][0], mz))
+        self.assertTrue(np.allclose(patterns[1][1], isotopic_pattern(compositions[1])[1]))
+        patterns = isotopic_patterns(compositions, charge=np.int64(3))
+        self.assertTrue(np.allclose(patterns[0][0], mz))
+
+
+if __name__ == '__main__':
+    unittest.main()
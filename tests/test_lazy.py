@@ -1,3 +1,5 @@
+import subprocess
+import sys
 import unittest
 
 from glypy.utils import lazy
@@ -15,3 +17,28 @@ class ProxyTest(unittest.TestCase):
         self.assertEqual(index.dHex, index.Fucose)
         index['ldeoxyGal'] = fucose
         self.assertEqual(index['ldeoxyGal'], index.Fucose)
+
+
+class LazyModuleTest(unittest.TestCase):
+    def test_fallback(self):
+        module = lazy.LazyModule("glypy.no_such_module", "json")
+        self.assertEqual(module.loads("[1]"), [1])
+
+    def test_import_glypy(self):
+        script = "import sys, glypy; print('\\n'.join(sorted(sys.modules)))"
+        output = subprocess.check_output([sys.executable, "-c", script], universal_newlines=True)
+        modules = set(output.splitlines())
+        self.assertIn("glypy.structure.glycan", modules)
+        for name in ["lxml", "rdflib", "matplotlib", "numpy", "requests", "SPARQLWrapper",
+                     "pkg_resources", "dill", "glypy.plot", "glypy.enzyme", "glypy.algorithms.storage",
+                     "glypy.algorithms.database", "glypy.io.glyspace", "glypy.io.gnome", "glypy.io.wurcs"]:
+            self.assertNotIn(name, modules)
+
+    def test_lazy_attributes(self):
+        import glypy
+        from glypy import enzyme
+        self.assertIs(glypy.io.wurcs, sys.modules['glypy.io.wurcs'])
+        self.assertIs(enzyme.EnzymeGraph, sys.modules['glypy.enzyme.graph'].EnzymeGraph)
+        self.assertIn("Glycome", dir(enzyme))
+        with self.assertRaises(AttributeError):
+            enzyme.NotAnEnzyme
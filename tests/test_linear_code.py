@@ -29,6 +29,25 @@ class LinearCodeTests(unittest.TestCase):
         structure = linear_code.loads(seq)
         self.assertEqual(len(structure), 4)
 
+    def test_many(self):
+        seqs = ['NNa3Ab3(NNa6)AN', 'Ma3(Ma6)Mb4GNb4(Fa6)GNb', 'NNa3Ab3(NNa6)AN']
+        cache = linear_code.ResidueCache()
+        structures = linear_code.loads_many(seqs, cache=cache)
+        self.assertEqual(structures[0], linear_code.loads(seqs[0]))
+        self.assertEqual(structures[0], structures[2])
+        self.assertIsNot(structures[0].root, structures[2].root)
+        self.assertEqual(len(cache.residues), 7)
+        self.assertEqual(linear_code.dumps_many(structures, cache=cache),
+                         [linear_code.dumps(s) for s in structures])
+        self.assertGreater(cache.hits, 0)
+
+        with self.assertRaises(linear_code.LinearCodeError):
+            linear_code.loads('Ma3(Ma6)Mb4!GNb')
+        self.assertEqual(linear_code.loads_many(['Ma3(Ma6)Mb4!GNb', seqs[1]], raise_errors=False),
+                         [None, structures[1]])
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -193,6 +193,34 @@ class TestWURCS(unittest.TestCase):
         self.assertEqual(gc, test)
         self.assertAlmostEqual(gc.mass(), test.mass())
 
+    def test_residue_cache(self):
+        cache = wurcs.ResidueCache()
+        ref = glycoct.loads(G71237SD_glycoct)
+        first = wurcs.loads(G71237SD_wurcs, cache=cache)
+        misses = cache.misses
+        self.assertEqual(len(cache.node_types), 6)
+        second = wurcs.loads(G71237SD_wurcs, cache=cache)
+        self.assertEqual(cache.misses, misses)
+        self.assertEqual(first, second)
+        self.assertEqual(ref, second)
+        self.assertIsNot(first.root, second.root)
+
+        text = wurcs.dumps(ref, cache=cache)
+        self.assertEqual(len(cache.residues), 6)
+        self.assertEqual(text, wurcs.dumps(ref, cache=wurcs.ResidueCache()))
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_batch(self):
+        texts = [G71237SD_wurcs, G35323LT_wurcs, G41928NU_wurcs]
+        refs = [glycoct.loads(G71237SD_glycoct), glycoct.loads(G35323LT_glycoct),
+                glycoct.loads(G41928NU_glycoct)]
+        structures = wurcs.loads_many(texts)
+        self.assertEqual(structures, refs)
+        self.assertEqual(wurcs.loads_many(wurcs.dumps_many(refs)), refs)
+        self.assertEqual(wurcs.loads_many(texts[:1] + ["WURCS=2.0/2,2,1/[a2122h-1b_1-5][a1122h-1a_1-5]/1-2/a4-b1*OPO*/3O/3=O"],
+                                          raise_errors=False)[1], None)
+
 
 if __name__ == '__main__':
     unittest.main()